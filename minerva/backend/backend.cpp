@@ -11,5 +11,9 @@ BackendChunk* Backend::CreateOne(BackendChunk* param, const Scale& result_size,
   return Create({param}, {result_size}, fn)[0];
 }
 
+BackendStats Backend::GetStats() {
+  return BackendStats();
+}
+
 }  // namespace minerva
 
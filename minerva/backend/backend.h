@@ -1,4 +1,5 @@
 #pragma once
+#include <cstdint>
 #include <vector>
 #include <memory>
 #include "op/compute_fn.h"
@@ -8,6 +9,19 @@
 
 namespace minerva {
 
+// Counters since the creation of a backend, and gauges read at the call
+struct BackendStats {
+  uint64_t nodes_created = 0;
+  uint64_t nodes_deleted = 0;
+  int64_t nodes_yet_to_finish = 0;
+  // Tasks waiting in the dispatcher queue, by `TaskType`
+  std::vector<size_t> dispatcher_queue;
+  // Time of the ops from ready (all inputs computed) to dispatched to their
+  // device, and from dispatched to completed; see `LatencyHistogram`
+  std::vector<uint64_t> ready_to_dispatch;
+  std::vector<uint64_t> dispatch_to_complete;
+};
+
 class Backend {
  public:
   Backend() = default;
@@ -20,6 +34,7 @@ class Backend {
   virtual void Wait(BackendChunk*) = 0;
   virtual void WaitForAll() = 0;
   virtual std::shared_ptr<float> GetValue(BackendChunk*) = 0;
+  virtual BackendStats GetStats();
 };
 
 }  // namespace minerva
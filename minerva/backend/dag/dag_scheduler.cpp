@@ -1,4 +1,5 @@
 #include "dag_scheduler.h"
+#include <chrono>
 #include <vector>
 #include <set>
 #include <memory>
@@ -13,7 +14,7 @@ using namespace std;
 
 namespace minerva {
 
-DagScheduler::DagScheduler(PhysicalDag* d, DeviceManager* dm) : dag_(d), dm_(dm), dispatcher_0(&DagScheduler::DispatcherRoutine, this), dispatcher_1(&DagScheduler::DispatcherRoutine, this), num_nodes_yet_to_finish_(0) {
+DagScheduler::DagScheduler(PhysicalDag* d, DeviceManager* dm) : dag_(d), dm_(dm), nodes_created_(0), nodes_deleted_(0), dispatcher_0(&DagScheduler::DispatcherRoutine, this), dispatcher_1(&DagScheduler::DispatcherRoutine, this), num_nodes_yet_to_finish_(0) {
   dm->RegisterListener(this);
 }
 
@@ -27,8 +28,11 @@ DagScheduler::~DagScheduler() {
 vector<BackendChunk*> DagScheduler::Create(const vector<BackendChunk*>& params,
     const std::vector<Scale>& result_sizes, shared_ptr<ComputeFn> fn) {
   auto current_device_id = MinervaSystem::Instance().current_device_id();
+  auto& creator = typeid(*fn);
   auto rst_data_nodes = Map<PhysicalDataNode*>(result_sizes, [&](const Scale& size) {
-    return dag_->NewDataNode(PhysicalData(size, current_device_id, MinervaSystem::Instance().GenerateDataId()));
+    PhysicalData data(size, current_device_id, MinervaSystem::Instance().GenerateDataId());
+    data.creator = &creator;
+    return dag_->NewDataNode(data);
   });
   Iter(rst_data_nodes, [this](PhysicalDataNode* n) {
     OnCreateNode(n);
@@ -42,8 +46,16 @@ vector<BackendChunk*> DagScheduler::Create(const vector<BackendChunk*>& params,
   });
   {
     MultiNodeLock lock(dag_, unique_predecessors);
-    auto op_node = dag_->NewOpNode(param_data_nodes, rst_data_nodes, {fn, current_device_id});
+    auto op_node = dag_->NewOpNode(param_data_nodes, rst_data_nodes, {fn, current_device_id, MinervaSystem::Instance().op_tag()});
     DLOG(INFO) << "create new op node #" << op_node->node_id_ << " on device #" << current_device_id;
+    auto& tracer = MinervaSystem::Instance().tracer();
+    if (tracer.enabled()) {
+      tracer.Record(TraceEventType::kEnqueue, current_device_id, op_node->node_id_, fn->Name());
+    }
+    auto& recorder = MinervaSystem::Instance().dag_recorder();
+    if (recorder.enabled()) {
+      recorder.RecordOp(op_node);
+    }
     OnCreateNode(op_node);
     Iter(unique_predecessors, [&](PhysicalDataNode* n) {
       OnCreateEdge(n, op_node);
@@ -59,11 +71,11 @@ vector<BackendChunk*> DagScheduler::Create(const vector<BackendChunk*>& params,
 void DagScheduler::Wait(BackendChunk* data) {
   unique_lock<mutex> lck(finish_mutex_);
   auto node_id = CHECK_NOTNULL(dynamic_cast<DagChunk*>(data))->node()->node_id_;
-  target_ = node_id;
+  auto target = targets_.insert(node_id);
   while (rt_info_.GetState(node_id) != NodeState::kCompleted) {
     finish_cond_.wait(lck);
   }
-  target_ = -1;
+  targets_.erase(target);
 }
 
 void DagScheduler::WaitForAll() {
@@ -72,7 +84,6 @@ void DagScheduler::WaitForAll() {
    * This is really a design issue. Since we cannot keep synchronization of
    * states, we have to check for states explicitly.
    */
-  CHECK_EQ(target_, -1);
   while (num_nodes_yet_to_finish_) {
     finish_cond_.wait(lck);
   }
@@ -88,8 +99,20 @@ shared_ptr<float> DagScheduler::GetValue(BackendChunk* chunk) {
   return ret;
 }
 
+BackendStats DagScheduler::GetStats() {
+  BackendStats ret;
+  ret.nodes_created = nodes_created_;
+  ret.nodes_deleted = nodes_deleted_;
+  ret.nodes_yet_to_finish = num_nodes_yet_to_finish_;
+  ret.dispatcher_queue = dispatcher_queue_.Sizes();
+  ret.ready_to_dispatch = ready_to_dispatch_.Counts();
+  ret.dispatch_to_complete = dispatch_to_complete_.Counts();
+  return ret;
+}
+
 // Device listener
 void DagScheduler::OnOperationComplete(Task* task) {
+  dispatch_to_complete_.Add(chrono::steady_clock::now() - task->dispatch_time);
   dispatcher_queue_.Push({TaskType::kToComplete, task->id});
   delete task;
 }
@@ -121,15 +144,25 @@ void DagScheduler::ExternRCUpdate(PhysicalDataNode* node, int delta) {
 
 void DagScheduler::FreeDataNodeRes(PhysicalDataNode* node) {
   DLOG(INFO) << "free data node resource for node #" << node->node_id_ << " data #" << node->data_.data_id;
+  auto& tracer = MinervaSystem::Instance().tracer();
+  if (tracer.enabled()) {
+    tracer.Record(TraceEventType::kFree, node->data_.device_id, node->node_id_, "free", node->data_.size.Prod() * sizeof(float));
+  }
+  auto& recorder = MinervaSystem::Instance().dag_recorder();
+  if (recorder.enabled()) {
+    recorder.RecordFree(node->node_id_, DagRecorder::Clock::now());
+  }
   dm_->FreeData(node->data_.data_id);
 }
 
 void DagScheduler::OnCreateNode(DagNode* node) {
   rt_info_.AddNode(node->node_id_);
+  ++nodes_created_;
 }
 
 void DagScheduler::OnDeleteNode(DagNode* node) {
   rt_info_.RemoveNode(node->node_id_);
+  ++nodes_deleted_;
 }
 
 void DagScheduler::OnCreateEdge(DagNode* from, DagNode* to) {
@@ -143,11 +176,20 @@ void DagScheduler::OnCreateEdge(DagNode* from, DagNode* to) {
 void DagScheduler::ProcessIfReady(PhysicalOpNode* target) {
   auto node_id = target->node_id_;
   CHECK_EQ(rt_info_.GetState(node_id), NodeState::kReady) << "invalid state of node #" << node_id;
-  if (rt_info_.At(node_id).num_triggers_needed == 0) {
-    ++num_nodes_yet_to_finish_;
-    dispatcher_queue_.Push({TaskType::kToRun, node_id});
+  auto& ri = rt_info_.At(node_id);
+  if (ri.num_triggers_needed == 0) {
     DLOG(INFO) << "node #" << node_id << " running right after creation";
+    PushReady(target, ri);
+  }
+}
+
+void DagScheduler::PushReady(DagNode* node, RuntimeInfo& ri) {
+  if (node->Type() == DagNode::NodeType::kOpNode) {
+    ri.ready_time = chrono::steady_clock::now();
+    dm_->GetDevice(CHECK_NOTNULL(dynamic_cast<PhysicalOpNode*>(node))->op_.device_id)->AddReadyTasks(1);
   }
+  ++num_nodes_yet_to_finish_;
+  dispatcher_queue_.Push({TaskType::kToRun, node->node_id_});
 }
 
 void DagScheduler::DispatcherRoutine() {
@@ -173,8 +215,20 @@ void DagScheduler::DispatcherRoutine() {
         });
         task->op = op_node->op_;
         task->id = node_id;
+        task->dispatch_time = chrono::steady_clock::now();
+        ready_to_dispatch_.Add(task->dispatch_time - ri.ready_time);
         DLOG(INFO) << "dispatching node #" << node_id << " to device #" << device_id;
-        dm_->GetDevice(device_id)->PushTask(task);
+        auto& tracer = MinervaSystem::Instance().tracer();
+        if (tracer.enabled()) {
+          tracer.Record(TraceEventType::kDispatch, device_id, node_id, task->op.compute_fn->Name());
+        }
+        auto& recorder = MinervaSystem::Instance().dag_recorder();
+        if (recorder.enabled()) {
+          recorder.RecordDispatch(node_id, task->dispatch_time);
+        }
+        auto device = dm_->GetDevice(device_id);
+        device->AddReadyTasks(-1);
+        device->PushTask(task);
       } else if (task.first == TaskType::kToComplete ||
           (task.first == TaskType::kToRun &&
            node->Type() == DagNode::NodeType::kDataNode)) {  // Task completed
@@ -217,8 +271,7 @@ void DagScheduler::DispatcherRoutine() {
           --ri.num_triggers_needed;
           if (ri.state == NodeState::kReady && ri.num_triggers_needed == 0) {
             DLOG(INFO) << "trigger node #" << succ->node_id_;
-            ++num_nodes_yet_to_finish_;
-            dispatcher_queue_.Push({TaskType::kToRun, succ->node_id_});
+            PushReady(succ, ri);
           }
         }
         DecrNumNodesYetToFinish(node_id);
@@ -240,7 +293,7 @@ void DagScheduler::DecrNumNodesYetToFinish(uint64_t node_id) {
   --num_nodes_yet_to_finish_;
   {
     unique_lock<mutex> lck(finish_mutex_);
-    if (num_nodes_yet_to_finish_ == 0 || node_id == target_) {
+    if (num_nodes_yet_to_finish_ == 0 || targets_.count(node_id)) {
       finish_cond_.notify_all();
     }
   }
@@ -4,6 +4,7 @@
 #include <thread>
 #include <atomic>
 #include <memory>
+#include <set>
 #include "backend/dag/runtime_info_map.h"
 #include "backend/backend.h"
 #include "device/device_listener.h"
@@ -14,6 +15,7 @@
 #include "device/device_manager.h"
 #include "backend/dag/task_type.h"
 #include "backend/dag/priority_dispatcher_queue.h"
+#include "profiler/latency_histogram.h"
 
 namespace minerva {
 
@@ -31,6 +33,7 @@ class DagScheduler :
   void Wait(BackendChunk*) override;
   void WaitForAll() override;
   std::shared_ptr<float> GetValue(BackendChunk*) override;
+  BackendStats GetStats() override;
   // Device listener
   void OnOperationComplete(Task*) override;
   // Interface for `DagChunk`
@@ -42,12 +45,18 @@ class DagScheduler :
   void OnDeleteNode(DagNode*);
   void OnCreateEdge(DagNode*, DagNode*);
   void ProcessIfReady(PhysicalOpNode*);
+  void PushReady(DagNode*, RuntimeInfo&);
   // Dag
   PhysicalDag* dag_;
   // Device manager
   DeviceManager* dm_;
   // Runtime information
   RuntimeInfoMap rt_info_;
+  // Statistics, set up before the dispatchers start
+  std::atomic<uint64_t> nodes_created_;
+  std::atomic<uint64_t> nodes_deleted_;
+  LatencyHistogram ready_to_dispatch_;
+  LatencyHistogram dispatch_to_complete_;
   // Scheduler dispatcher
   PriorityDispatcherQueue dispatcher_queue_;
   void DispatcherRoutine();
@@ -56,7 +65,8 @@ class DagScheduler :
   std::thread dispatcher_1;
   // Evaluation finishing signal
   std::atomic<int> num_nodes_yet_to_finish_;
-  uint64_t target_ = -1;
+  // Nodes waited for by `Wait`, which may be called from several threads at once
+  std::multiset<uint64_t> targets_;
   std::mutex finish_mutex_;
   std::condition_variable finish_cond_;
 };
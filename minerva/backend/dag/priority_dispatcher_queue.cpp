@@ -44,6 +44,15 @@ bool PriorityDispatcherQueue::Pop(TaskPair& task_pair) {
   }
 }
 
+vector<size_t> PriorityDispatcherQueue::Sizes() {
+  unique_lock<mutex> lock(m_);
+  vector<size_t> ret;
+  for (auto& t : tasks_) {
+    ret.push_back(t.size());
+  }
+  return ret;
+}
+
 void PriorityDispatcherQueue::SignalForKill() {
   unique_lock<mutex> lock(m_);
   exit_now_.Write(true);
@@ -18,6 +18,8 @@ class PriorityDispatcherQueue {
   ~PriorityDispatcherQueue() = default;
   void Push(const TaskPair&);
   bool Pop(TaskPair&);
+  // Number of waiting tasks of each type
+  std::vector<size_t> Sizes();
   void SignalForKill();
 
  private:
@@ -3,6 +3,7 @@
 #include <unordered_set>
 #include <unordered_map>
 #include <atomic>
+#include <chrono>
 #include "common/common.h"
 #include "common/concurrent_unordered_map.h"
 
@@ -20,6 +21,8 @@ struct RuntimeInfo {
   int num_triggers_needed;
   int reference_count;
   NodeState state;
+  // When the node was pushed to the dispatcher to run
+  std::chrono::steady_clock::time_point ready_time;
 };
 
 class RuntimeInfoMap {
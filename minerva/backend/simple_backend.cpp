@@ -43,7 +43,7 @@ std::vector<BackendChunk*> SimpleBackend::Create(const std::vector<BackendChunk*
     result_chunks.emplace_back(o);
     task->outputs.emplace_back(o->data(), 0);
   }
-  task->op = PhysicalOp{fn, current_device_id};
+  task->op = PhysicalOp{fn, current_device_id, MinervaSystem::Instance().op_tag()};
   task->id = 0;
   DLOG(INFO) << "executing task name=" << fn->Name() << " to device #" << current_device_id;
   // wait for finish
@@ -0,0 +1,66 @@
+#pragma once
+#include <cstdint>
+
+// Conversion between float and IEEE half precision, shared by the CPU and CUDA kernels
+#ifdef __CUDACC__
+#define MINERVA_HOST_DEVICE __host__ __device__
+#else
+#define MINERVA_HOST_DEVICE
+#endif
+
+namespace minerva {
+
+// Round to nearest even; values out of range become infinity
+MINERVA_HOST_DEVICE inline uint16_t FloatToHalf(float f) {
+  union {
+    float f;
+    uint32_t u;
+  } v;
+  v.f = f;
+  uint16_t sign = (v.u >> 16) & 0x8000;
+  uint32_t abs = v.u & 0x7fffffff;
+  if (abs >= 0x7f800000) {  // inf or nan
+    return sign | 0x7c00 | (abs > 0x7f800000 ? 0x200 : 0);
+  }
+  if (abs >= 0x477ff000) {  // rounds above 65504
+    return sign | 0x7c00;
+  }
+  if (abs < 0x38800000) {  // subnormal half
+    if (abs < 0x33000000) {  // rounds to zero
+      return sign;
+    }
+    uint32_t mantissa = (abs & 0x7fffff) | 0x800000;
+    uint32_t shift = 126 - (abs >> 23);
+    uint32_t half = mantissa >> shift;
+    uint32_t rest = mantissa & ((1u << shift) - 1);
+    uint32_t halfway = 1u << (shift - 1);
+    half += rest > halfway || (rest == halfway && (half & 1));
+    return sign | half;
+  }
+  uint32_t half = (abs - 0x38000000) >> 13;
+  uint32_t rest = abs & 0x1fff;
+  half += rest > 0x1000 || (rest == 0x1000 && (half & 1));
+  return sign | half;
+}
+
+MINERVA_HOST_DEVICE inline float HalfToFloat(uint16_t h) {
+  union {
+    float f;
+    uint32_t u;
+  } v;
+  uint32_t sign = static_cast<uint32_t>(h & 0x8000) << 16;
+  uint32_t exponent = (h >> 10) & 0x1f;
+  uint32_t mantissa = h & 0x3ff;
+  if (exponent == 0x1f) {
+    v.u = sign | 0x7f800000 | (mantissa << 13);
+  } else if (exponent == 0) {  // zero or subnormal: mantissa * 2^-24
+    v.f = mantissa * 5.9604644775390625e-8f;
+    v.u |= sign;
+  } else {
+    v.u = sign | ((exponent + 112) << 23) | (mantissa << 13);
+  }
+  return v.f;
+}
+
+}  // namespace minerva
+
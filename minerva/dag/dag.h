@@ -32,6 +32,8 @@ class Dag {
   ONode* GetOpNode(uint64_t) const;
   DNode* GetDataNode(uint64_t) const;
   size_t NumNodes() const;
+  // Visit all nodes; nodes cannot be added or removed meanwhile
+  void ForEachNode(std::function<void(DagNode*)>) const;
   virtual std::string ToDotString(
       std::function<std::string(const Data&)>,
       std::function<std::string(const Op&)>) const;
@@ -122,6 +124,15 @@ size_t Dag<D, O>::NumNodes() const {
   return index_to_node_.Size();
 }
 
+template<typename D, typename O>
+void Dag<D, O>::ForEachNode(std::function<void(DagNode*)> f) const {
+  index_to_node_.LockRead();
+  for (auto i : index_to_node_.VolatilePayload()) {
+    f(i.second);
+  }
+  index_to_node_.UnlockRead();
+}
+
 template<typename D, typename O>
 std::string Dag<D, O>::ToDotString(
     std::function<std::string(const D&)> data_to_string,
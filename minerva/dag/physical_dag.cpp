@@ -1,6 +1,11 @@
 #include "physical_dag.h"
 #include <string>
 #include <sstream>
+#include <algorithm>
+#ifdef __GNUG__
+#include <cxxabi.h>
+#include <cstdlib>
+#endif
 using namespace std;
 
 namespace minerva {
@@ -13,6 +18,36 @@ string PhysicalDag::ToString() const {
   return ToString(DataToString, OpToString);
 }
 
+vector<DataNodeInfo> PhysicalDag::DataNodes() const {
+  vector<DataNodeInfo> ret;
+  ForEachNode([&ret](DagNode* node) {
+    if (node->Type() != DagNode::NodeType::kDataNode) {
+      return;
+    }
+    auto& data = CHECK_NOTNULL(dynamic_cast<PhysicalDataNode*>(node))->data_;
+    ret.push_back({node->node_id_, data.device_id, data.size, data.creator ? TypeName(*data.creator) : "", data.extern_rc});
+  });
+  sort(ret.begin(), ret.end(), [](const DataNodeInfo& a, const DataNodeInfo& b) {
+    return a.node_id < b.node_id;
+  });
+  return ret;
+}
+
+string PhysicalDag::TypeName(const type_info& type) {
+  string ret = type.name();
+#ifdef __GNUG__
+  int status;
+  char* demangled = abi::__cxa_demangle(type.name(), nullptr, nullptr, &status);
+  if (status == 0) {
+    ret = demangled;
+  }
+  free(demangled);
+#endif
+  // Drop the namespace
+  auto pos = ret.rfind("::");
+  return pos == string::npos ? ret : ret.substr(pos + 2);
+}
+
 string PhysicalDag::DataToString(const PhysicalData& d) {
   stringstream ss;
   ss << d.size;
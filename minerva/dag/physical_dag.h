@@ -2,20 +2,32 @@
 #include <string>
 #include <sstream>
 #include <mutex>
+#include <vector>
 #include "dag/dag.h"
 #include "op/physical.h"
 #include "op/compute_fn.h"
 
 namespace minerva {
 
+struct DataNodeInfo {
+  uint64_t node_id;
+  uint64_t device_id;
+  Scale size;
+  std::string creator;  // class of the op computing the data
+  int extern_rc;  // number of `NArray`s referring to the data
+};
+
 class PhysicalDag : public Dag<PhysicalData, PhysicalOp> {
  public:
   using Dag<PhysicalData, PhysicalOp>::ToDotString;
   using Dag<PhysicalData, PhysicalOp>::ToString;
   std::string ToDotString() const override;
   std::string ToString() const override;
+  // Data nodes still in the dag, i.e. computed or to be computed and not freed yet
+  std::vector<DataNodeInfo> DataNodes() const;
 
  private:
+  static std::string TypeName(const std::type_info&);
   static std::string DataToString(const PhysicalData&);
   static std::string OpToString(const PhysicalOp&);
 };
@@ -1,4 +1,5 @@
 #include "data_store.h"
+#include <algorithm>
 
 using namespace std;
 
@@ -21,6 +22,7 @@ float* DataStore::CreateData(uint64_t id, size_t length) {
   auto& ds = it.first->second;
   ds.length = length;
   ds.ptr = allocator_(length);
+  OnCreateData(length);
   return static_cast<float*>(ds.ptr);
 }
 
@@ -39,6 +41,7 @@ void DataStore::FreeData(uint64_t id) {
   lock_guard<mutex> lck(access_mutex_);
   auto& ds = data_states_.at(id);
   deallocator_(ds.ptr);
+  OnFreeData(ds.length);
   CHECK_EQ(data_states_.erase(id), 1);
 }
 
@@ -51,4 +54,32 @@ size_t DataStore::GetTotalBytes() const {
   return total_bytes;
 }
 
+MemoryStats DataStore::GetMemoryStats() const {
+  lock_guard<mutex> lck(access_mutex_);
+  return {live_bytes_, CachedBytes(), peak_bytes_, {size_histogram_.begin(), size_histogram_.end()}};
+}
+
+void DataStore::ResetPeakBytes() {
+  lock_guard<mutex> lck(access_mutex_);
+  peak_bytes_ = live_bytes_;
+}
+
+void DataStore::OnCreateData(size_t length) {
+  live_bytes_ += length;
+  peak_bytes_ = max(peak_bytes_, live_bytes_);
+  size_t bucket = 1;
+  while (bucket < length) {
+    bucket <<= 1;
+  }
+  ++size_histogram_[bucket];
+}
+
+void DataStore::OnFreeData(size_t length) {
+  live_bytes_ -= length;
+}
+
+size_t DataStore::CachedBytes() const {
+  return 0;
+}
+
 }  // namespace minerva
@@ -4,11 +4,21 @@
 #include <mutex>
 #include <cstdint>
 #include <cstddef>
+#include <map>
+#include <vector>
 #include <dmlc/logging.h>
 #include "common/common.h"
 
 namespace minerva {
 
+struct MemoryStats {
+  size_t live_bytes;  // held by data
+  size_t cached_bytes;  // freed but kept for reuse
+  size_t peak_bytes;  // max of `live_bytes` since the last reset
+  // Number of allocations by size, rounded up to a power of two
+  std::vector<std::pair<size_t, uint64_t>> size_histogram;
+};
+
 class DataStore {
  public:
   DataStore(std::function<void*(size_t)> a, std::function<void(void*)> d);
@@ -19,12 +29,21 @@ class DataStore {
   virtual bool ExistData(uint64_t id) const;
   virtual void FreeData(uint64_t);
   virtual size_t GetTotalBytes() const;
+  MemoryStats GetMemoryStats() const;
+  void ResetPeakBytes();
 
  protected:
   struct DataState {
     void* ptr;
     size_t length;
   };
+  // Bookkeeping of the stats, called with `access_mutex_` held
+  void OnCreateData(size_t);
+  void OnFreeData(size_t);
+  virtual size_t CachedBytes() const;
+  size_t live_bytes_ = 0;
+  size_t peak_bytes_ = 0;
+  std::map<size_t, uint64_t> size_histogram_;
   mutable std::mutex access_mutex_;
   std::unordered_map<uint64_t, DataState> data_states_;
   std::function<void*(size_t)> allocator_;
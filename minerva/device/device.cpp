@@ -1,6 +1,7 @@
 #include <utility>
 #include <cstdlib>
 #include <array>
+#include <chrono>
 #include <mutex>
 #include <sstream>
 #include <cstring>
@@ -14,7 +15,6 @@
 #include "op/context.h"
 #include "common/cuda_utils.h"
 #include "device/pooled_data_store.h"
-#include "profiler/wall_timer.h"
 #ifdef HAS_CUDA
 #include <cuda_runtime.h>
 #include <cudnn.h>
@@ -29,7 +29,7 @@ using namespace std;
 
 namespace minerva {
 
-Device::Device(uint64_t device_id, DeviceListener* l) : device_id_(device_id), data_store_{unique_ptr<DataStore>(nullptr)}, listener_(l) {
+Device::Device(uint64_t device_id, DeviceListener* l) : device_id_(device_id), data_store_{unique_ptr<DataStore>(nullptr)}, listener_(l), num_workers_(0), ready_tasks_(0), queued_tasks_(0), running_tasks_(0), completed_tasks_(0), busy_ns_(0) {
 }
 
 pair<Device::MemType, float*> Device::GetPtr(uint64_t data_id) {
@@ -49,13 +49,34 @@ string Device::GetMemUsage() const {
   return common::FString("device #%d used %dB", device_id_, data_store_->GetTotalBytes());
 }
 
+MemoryStats Device::GetMemoryStats() const {
+  return data_store_->GetMemoryStats();
+}
+
+void Device::ResetPeakMemory() {
+  data_store_->ResetPeakBytes();
+}
+
+TaskStats Device::GetTaskStats() const {
+  return {ready_tasks_, queued_tasks_, running_tasks_, completed_tasks_, num_workers_, busy_ns_ / 1000.0};
+}
+
+void Device::AddReadyTasks(int delta) {
+  ready_tasks_ += delta;
+}
+
 ThreadedDevice::ThreadedDevice(uint64_t device_id, DeviceListener* l, size_t parallelism) : Device(device_id, l), pool_(parallelism) {
+  num_workers_ = parallelism;
 }
 
 void ThreadedDevice::PushTask(Task* task) {
-  if (!task->light)
+  if (MinervaSystem::Instance().profiler().enabled()) {
+    task->push_time = ExecutionProfiler::Clock::now();
+  }
+  if (!task->light) {
+    ++queued_tasks_;
     pool_.Push(bind(&ThreadedDevice::Execute, this, task, placeholders::_1));
-  else
+  } else
     // light weight tasks are executed directly to avoid thread switching
     Execute(task, 0);
 }
@@ -66,11 +87,29 @@ void ThreadedDevice::FreeDataIfExist(uint64_t data_id) {
 }
 
 void ThreadedDevice::Execute(Task* task, int thrid) {
+  auto start = chrono::steady_clock::now();
+  if (!task->light) {
+    --queued_tasks_;
+  }
+  ++running_tasks_;
   PreExecute();
-#ifndef NDEBUG
-  WallTimer memory_timer;
-  memory_timer.Start();
-#endif
+  auto& profiler = MinervaSystem::Instance().profiler();
+  bool profiling = profiler.enabled();
+  string op_name;
+  ExecutionProfiler::Clock::time_point memory_start;
+  if (profiling) {
+    op_name = task->op.compute_fn->Name();
+    memory_start = ExecutionProfiler::Clock::now();
+    // Tasks pushed before the profiler was enabled have no push time
+    if (task->push_time != ExecutionProfiler::Clock::time_point()) {
+      profiler.Record(op_name, device_id_, ProfilePhase::kQueueWait, task->push_time, memory_start);
+    }
+  }
+  auto& tracer = MinervaSystem::Instance().tracer();
+  bool tracing = tracer.enabled();
+  auto& recorder = MinervaSystem::Instance().dag_recorder();
+  bool recording = recorder.enabled();
+  auto compute_begin = start;
   DataList input_shards;
   for (auto& i : task->inputs) {
     auto& input_data = i.physical_data;
@@ -83,15 +122,23 @@ void ThreadedDevice::Execute(Task* task, int thrid) {
         DLOG(INFO) << Name() << " input task data #" << i.id << " is remote and not copied";
         size_t size = input_data.size.Prod() * sizeof(float);
         auto ptr = data_store_->CreateData(input_data.data_id, size);
+        if (tracing) {
+          tracer.Record(TraceEventType::kCopyStart, device_id_, i.id, "copy", size, thrid);
+        }
         DoCopyRemoteData(ptr, MinervaSystem::Instance().GetPtr(input_data.device_id, input_data.data_id).second, size, thrid);
+        if (tracing) {
+          tracer.Record(TraceEventType::kCopyEnd, device_id_, i.id, "copy", size, thrid);
+        }
         CHECK(remote_data_.Insert(input_data.data_id));
       }
     }
     input_shards.emplace_back(data_store_->GetData(input_data.data_id), input_data.size);
   }
   DataList output_shards;
+  size_t output_bytes = 0;
   for (auto& i : task->outputs) {
     size_t size = i.physical_data.size.Prod() * sizeof(float);
+    output_bytes += size;
     DLOG(INFO) << Name() << " create output for task data #" << i.id;
     auto ptr = data_store_->CreateData(i.physical_data.data_id, size);
     CHECK(local_data_.Insert(i.physical_data.data_id));
@@ -100,21 +147,40 @@ void ThreadedDevice::Execute(Task* task, int thrid) {
   auto& op = task->op;
   CHECK(op.compute_fn);
   if(!FLAGS_no_execute) {
-#ifndef NDEBUG
-    Barrier(thrid);
-    memory_timer.Stop();
-    MinervaSystem::Instance().profiler().RecordTime(TimerType::kMemory, op.compute_fn->Name(), memory_timer);
-    WallTimer calculate_timer;
-    calculate_timer.Start();
-#endif
+    ExecutionProfiler::Clock::time_point compute_start;
+    if (profiling) {
+      Barrier(thrid);
+      compute_start = ExecutionProfiler::Clock::now();
+      profiler.Record(op_name, device_id_, ProfilePhase::kMemory, memory_start, compute_start);
+    }
     DLOG(INFO) << Name() << " execute task #" << task->id << ": " << op.compute_fn->Name();
+    if (tracing) {
+      tracer.Record(TraceEventType::kComputeStart, device_id_, task->id, op.compute_fn->Name(), output_bytes, thrid);
+    }
+    if (recording) {
+      compute_begin = chrono::steady_clock::now();
+    }
     DoExecute(input_shards, output_shards, op, thrid);
+    if (tracing) {
+      tracer.Record(TraceEventType::kComputeEnd, device_id_, task->id, op.compute_fn->Name(), output_bytes, thrid);
+    }
     DLOG(INFO) << Name() << " finished execute task #" << task->id << ": " << op.compute_fn->Name();
-#ifndef NDEBUG
-    calculate_timer.Stop();
-    MinervaSystem::Instance().profiler().RecordTime(TimerType::kCalculation, op.compute_fn->Name(), calculate_timer);
-#endif
+    if (profiling) {
+      auto compute_end = ExecutionProfiler::Clock::now();
+      auto cost = op.compute_fn->Cost(input_shards, output_shards);
+      profiler.Record(op_name, device_id_, ProfilePhase::kCompute, compute_start, compute_end, cost.flops, cost.bytes);
+      if (op.tag) {
+        profiler.RecordTag(*op.tag, device_id_, compute_start, compute_end, cost.flops, cost.bytes, output_bytes);
+      }
+    }
+  }
+  auto end = chrono::steady_clock::now();
+  busy_ns_ += chrono::duration_cast<chrono::nanoseconds>(end - start).count();
+  if (recording) {
+    recorder.RecordExecution(task->id, start, compute_begin, end);
   }
+  --running_tasks_;
+  ++completed_tasks_;
   listener_->OnOperationComplete(task);
 }
 
@@ -139,6 +205,8 @@ struct GpuDevice::Impl {
 # endif
   int const device;
   array<cudaStream_t, kParallelism> stream;
+  // Non-blocking streams for host-to-device uploads
+  array<cudaStream_t, kParallelism> copy_stream;
   array<cublasHandle_t, kParallelism> cublas_handle;
   array<cudnnHandle_t, kParallelism> cudnn_handle;
 };
@@ -147,6 +215,7 @@ GpuDevice::Impl::Impl(int d) : device(d) {
   ActivateDevice();
   for (size_t i = 0; i < kParallelism; ++i) {
     CUDA_CALL(cudaStreamCreate(&stream[i]));
+    CUDA_CALL(cudaStreamCreateWithFlags(&copy_stream[i], cudaStreamNonBlocking));
     CUBLAS_CALL(cublasCreate(&cublas_handle[i]));
     CUBLAS_CALL(cublasSetStream(cublas_handle[i], stream[i]));
     CUDNN_CALL(cudnnCreate(&cudnn_handle[i]));
@@ -159,6 +228,7 @@ GpuDevice::Impl::~Impl() {
   for (size_t i = 0; i < kParallelism; ++i) {
     CUDNN_CALL(cudnnDestroy(cudnn_handle[i]));
     CUBLAS_CALL(cublasDestroy(cublas_handle[i]));
+    CUDA_CALL(cudaStreamDestroy(copy_stream[i]));
     CUDA_CALL(cudaStreamDestroy(stream[i]));
   }
 }
@@ -215,6 +285,7 @@ void GpuDevice::DoExecute(const DataList& in, const DataList& out, PhysicalOp& o
   Context ctx;
   ctx.impl_type = ImplType::kCuda;
   ctx.stream = impl_->stream[thrid];
+  ctx.copy_stream = impl_->copy_stream[thrid];
   ctx.cublas_handle = impl_->cublas_handle[thrid];
   ctx.cudnn_handle = impl_->cudnn_handle[thrid];
   op.compute_fn->Execute(in, out, ctx);
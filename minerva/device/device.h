@@ -3,6 +3,7 @@
 #include <utility>
 #include <mutex>
 #include <memory>
+#include <atomic>
 #include "device/task.h"
 #include "device/data_store.h"
 #include "device/device_listener.h"
@@ -15,6 +16,16 @@
 
 namespace minerva {
 
+// Tasks of a device: gauges read at the call, and counters since its creation
+struct TaskStats {
+  int64_t ready;  // ops with all their inputs, not yet dispatched to the device
+  int64_t queued;  // dispatched, waiting for a worker
+  int64_t running;
+  uint64_t completed;
+  size_t num_workers;
+  double busy_us;  // time the workers spent executing tasks
+};
+
 class Device {
  public:
   enum class MemType {
@@ -29,6 +40,11 @@ class Device {
   virtual std::pair<MemType, float*> GetPtr(uint64_t data_id);
   virtual void FreeDataIfExist(uint64_t data_id);
   virtual std::string GetMemUsage() const;
+  MemoryStats GetMemoryStats() const;
+  void ResetPeakMemory();
+  TaskStats GetTaskStats() const;
+  // Called by the scheduler as ops become ready (+1) and are dispatched (-1)
+  void AddReadyTasks(int);
   virtual std::string Name() const = 0;
   virtual MemType GetMemType() const = 0;
 
@@ -38,6 +54,12 @@ class Device {
   uint64_t device_id_;
   std::unique_ptr<DataStore> data_store_;
   DeviceListener* listener_;
+  size_t num_workers_;
+  std::atomic<int64_t> ready_tasks_;
+  std::atomic<int64_t> queued_tasks_;
+  std::atomic<int64_t> running_tasks_;
+  std::atomic<uint64_t> completed_tasks_;
+  std::atomic<uint64_t> busy_ns_;
 };
 
 class ThreadedDevice : public Device {
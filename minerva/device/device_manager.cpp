@@ -1,4 +1,5 @@
 #include "device_manager.h"
+#include <algorithm>
 #include <dmlc/logging.h>
 #include "device/device.h"
 #include "common/cuda_utils.h"
@@ -57,6 +58,15 @@ Device* DeviceManager::GetDevice(uint64_t id) {
   return device_storage_.at(id);
 }
 
+vector<uint64_t> DeviceManager::GetDeviceIds() const {
+  vector<uint64_t> ret;
+  for (auto& i : device_storage_) {
+    ret.push_back(i.first);
+  }
+  sort(ret.begin(), ret.end());
+  return ret;
+}
+
 void DeviceManager::FreeData(uint64_t id) {
   for (auto i : device_storage_) {
     i.second->FreeDataIfExist(id);
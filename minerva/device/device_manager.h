@@ -1,5 +1,6 @@
 #pragma once
 #include <unordered_map>
+#include <vector>
 #include "device/device.h"
 #include "device/device_listener.h"
 #include "common/common.h"
@@ -14,6 +15,7 @@ class DeviceManager {
   uint64_t CreateGpuDevice(int gid);
   int GetGpuDeviceCount();
   Device* GetDevice(uint64_t id);
+  std::vector<uint64_t> GetDeviceIds() const;
   void FreeData(uint64_t id);
   void RegisterListener(DeviceListener* l) { listener_ = l; }
 
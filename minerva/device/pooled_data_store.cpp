@@ -38,6 +38,7 @@ float* PooledDataStore::CreateData(uint64_t id, size_t length) {
       ReleaseFreeSpace();
     }
   }
+  OnCreateData(length);
   return static_cast<float*>(ds.ptr);
 }
 
@@ -45,6 +46,7 @@ void PooledDataStore::FreeData(uint64_t id) {
   lock_guard<mutex> lck(access_mutex_);
   auto& ds = data_states_.at(id);
   free_space_[ds.length].push(ds.ptr);
+  OnFreeData(ds.length);
   CHECK_EQ(data_states_.erase(id), 1);
 }
 
@@ -53,6 +55,10 @@ size_t PooledDataStore::GetTotalBytes() const {
   return total_;
 }
 
+size_t PooledDataStore::CachedBytes() const {
+  return total_ - live_bytes_;
+}
+
 void PooledDataStore::ReleaseFreeSpace() {
   for (auto& i : free_space_) {
     while (i.second.size()) {
@@ -14,6 +14,7 @@ class PooledDataStore final : public DataStore {
   size_t GetTotalBytes() const override;
 
  private:
+  size_t CachedBytes() const override;
   size_t threshold_;
   size_t total_ = 0;
   std::unordered_map<size_t, std::queue<void*>> free_space_;
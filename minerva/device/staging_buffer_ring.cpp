@@ -0,0 +1,64 @@
+#include "device/staging_buffer_ring.h"
+#include <cstdlib>
+#include <dmlc/logging.h>
+#include "common/cuda_utils.h"
+#ifdef HAS_CUDA
+#include <cuda_runtime.h>
+#endif
+
+using namespace std;
+
+namespace minerva {
+
+StagingBufferRing::StagingBufferRing(size_t num_buffers, size_t capacity) : capacity_(capacity) {
+  CHECK_GT(num_buffers, 0) << "staging ring needs at least one buffer";
+  for (size_t i = 0; i < num_buffers; ++i) {
+    float* ptr;
+#ifdef HAS_CUDA
+    CUDA_CALL(cudaMallocHost(&ptr, capacity * sizeof(float)));
+#else
+    ptr = static_cast<float*>(malloc(capacity * sizeof(float)));
+    CHECK(ptr) << "failed to allocate staging buffer";
+#endif
+    buffers_.push_back(ptr);
+    free_buffers_.push_back(ptr);
+  }
+}
+
+StagingBufferRing::~StagingBufferRing() {
+  {
+    // Buffers still referenced by pending upload ops must come back first
+    unique_lock<mutex> lock(m_);
+    while (free_buffers_.size() != buffers_.size()) {
+      cv_.wait(lock);
+    }
+  }
+  for (auto ptr : buffers_) {
+#ifdef HAS_CUDA
+    CUDA_CALL(cudaFreeHost(ptr));
+#else
+    free(ptr);
+#endif
+  }
+}
+
+shared_ptr<float> StagingBufferRing::Acquire() {
+  unique_lock<mutex> lock(m_);
+  while (free_buffers_.empty()) {
+    cv_.wait(lock);
+  }
+  float* ptr = free_buffers_.back();
+  free_buffers_.pop_back();
+  return shared_ptr<float>(ptr, [this](float* p) {
+    Release(p);
+  });
+}
+
+void StagingBufferRing::Release(float* ptr) {
+  lock_guard<mutex> lock(m_);
+  free_buffers_.push_back(ptr);
+  cv_.notify_all();
+}
+
+}  // namespace minerva
+
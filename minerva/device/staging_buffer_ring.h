@@ -0,0 +1,41 @@
+#pragma once
+#include <vector>
+#include <memory>
+#include <mutex>
+#include <condition_variable>
+#include "common/common.h"
+
+namespace minerva {
+
+/* A fixed ring of host staging buffers for uploading minibatches.
+ * On CUDA builds the buffers are page-locked, so that an `UploadOp` can be
+ * copied asynchronously to the device. On CPU builds they are plain host
+ * memory with the same interface.
+ */
+class StagingBufferRing {
+ public:
+  StagingBufferRing(size_t num_buffers, size_t capacity);
+  DISALLOW_COPY_AND_ASSIGN(StagingBufferRing);
+  ~StagingBufferRing();
+  // Block until a buffer is free. The buffer returns to the ring when the last
+  // reference of the returned pointer is released.
+  std::shared_ptr<float> Acquire();
+  size_t num_buffers() const {
+    return buffers_.size();
+  }
+  // Capacity of each buffer in number of floats
+  size_t capacity() const {
+    return capacity_;
+  }
+
+ private:
+  void Release(float*);
+  size_t capacity_;
+  std::vector<float*> buffers_;
+  std::vector<float*> free_buffers_;
+  std::mutex m_;
+  std::condition_variable cv_;
+};
+
+}  // namespace minerva
+
@@ -1,6 +1,7 @@
 #pragma once
 #include <vector>
 #include <cstdint>
+#include <chrono>
 #include "op/physical.h"
 #include "device/task_data.h"
 
@@ -15,6 +16,10 @@ struct Task {
   // is this a light weight op? light weight op will be executed by the 
   // main thread to avoid thread switching
   bool light = false;
+  // Set when the task is pushed while the profiler is enabled
+  std::chrono::steady_clock::time_point push_time;
+  // Set by the scheduler when it dispatches the task
+  std::chrono::steady_clock::time_point dispatch_time;
 };
 
 }  // namespace minerva
@@ -6,4 +6,6 @@
 #include "narray/image_batch.h"
 #include "narray/convolution.h"
 #include "narray/convolution_info.h"
+#include "narray/quantization.h"
 #include "system/minerva_system.h"
+#include "device/staging_buffer_ring.h"
@@ -26,6 +26,27 @@ ImageBatch Convolution::ConvForward(ImageBatch src, Filter filter, NArray bias,
   return NArray::ComputeOne({src, filter, bias}, new_size, op);
 }
 
+ImageBatch Convolution::FusedConvForward(ImageBatch src, Filter filter, NArray bias, ConvInfo info, ActivationAlgorithm algorithm) {
+  CHECK_EQ(src.GetNumFeatureMaps(), filter.GetNumInputs()) << "#input channels mismatch";
+  CHECK_EQ(bias.Size().NumDims(), 1) << "bias dimension mismatch";
+  CHECK_EQ(bias.Size()[0], filter.GetNumOutputs()) << "bias size mismatch";
+  Scale new_size {
+    (src.GetWidth() + 2 * info.pad_width - filter.GetWidth()) / info.stride_horizontal + 1,
+    (src.GetHeight() + 2 * info.pad_height - filter.GetHeight()) / info.stride_vertical + 1,
+    filter.GetNumOutputs(),
+    src.GetNumImages()
+  };
+  FusedConvForwardOp* op = new FusedConvForwardOp();
+  op->closure = {
+    info.pad_height,
+    info.pad_width,
+    info.stride_vertical,
+    info.stride_horizontal,
+    algorithm
+  };
+  return NArray::ComputeOne({src, filter, bias}, new_size, op);
+}
+
 ImageBatch Convolution::ConvBackwardData(ImageBatch diff, ImageBatch bottom, Filter filter, ConvInfo info) {
   CHECK_EQ(diff.GetNumFeatureMaps(), filter.GetNumOutputs()) << "#output channels mismatch";
   /*
@@ -174,5 +195,27 @@ ImageBatch Convolution::LRNBackward(ImageBatch bottom_data, ImageBatch top_data,
   return NArray::ComputeOne({bottom_data, top_data, scale, top_diff}, bottom_data.Size(), op);
 }
 
+ImageBatch Convolution::ImageNormalize(NArray bytes, NArray crop_info, NArray mean_image, const Scale& src_size, int crop_size) {
+  CHECK_EQ(src_size.NumDims(), 4) << "source should be 4D";
+  CHECK_EQ(mean_image.Size().Prod(), src_size.Prod() / src_size[3]) << "mean image size mismatch";
+  CHECK_EQ(crop_info.Size().Prod(), 3 * src_size[3]) << "crop info size mismatch";
+  CHECK(0 < crop_size && crop_size <= src_size[0] && crop_size <= src_size[1]) << "crop size larger than the images";
+  ImageNormalizeOp* op = new ImageNormalizeOp();
+  op->closure = {src_size, crop_size, {}};
+  Scale new_size {crop_size, crop_size, src_size[2], src_size[3]};
+  return NArray::ComputeOne({bytes, crop_info, mean_image}, new_size, op);
+}
+
+ImageBatch Convolution::ImageNormalize(NArray bytes, NArray crop_info, const std::vector<float>& mean_value, const Scale& src_size, int crop_size) {
+  CHECK_EQ(src_size.NumDims(), 4) << "source should be 4D";
+  CHECK_EQ(mean_value.size(), static_cast<size_t>(src_size[2])) << "mean value size mismatch";
+  CHECK_EQ(crop_info.Size().Prod(), 3 * src_size[3]) << "crop info size mismatch";
+  CHECK(0 < crop_size && crop_size <= src_size[0] && crop_size <= src_size[1]) << "crop size larger than the images";
+  ImageNormalizeOp* op = new ImageNormalizeOp();
+  op->closure = {src_size, crop_size, mean_value};
+  Scale new_size {crop_size, crop_size, src_size[2], src_size[3]};
+  return NArray::ComputeOne({bytes, crop_info}, new_size, op);
+}
+
 }  // namespace minerva
 
@@ -7,6 +7,7 @@ namespace minerva {
 class Convolution {
  public:
   static ImageBatch ConvForward(ImageBatch src, Filter filter, NArray bias, ConvInfo info);
+  static ImageBatch FusedConvForward(ImageBatch src, Filter filter, NArray bias, ConvInfo info, ActivationAlgorithm algorithm);
   static ImageBatch ConvBackwardData(ImageBatch diff, ImageBatch bottom, Filter filter, ConvInfo info);
   static Filter ConvBackwardFilter(ImageBatch diff, ImageBatch bottom, Filter filter, ConvInfo info);
   static NArray ConvBackwardBias(ImageBatch diff);
@@ -20,6 +21,8 @@ class Convolution {
   static ImageBatch LRNForward(ImageBatch src, ImageBatch scale, int local_size, float alpha, float beta);
   static ImageBatch LRNBackward(ImageBatch bottom_data, ImageBatch top_data, ImageBatch scale, ImageBatch top_diff , int local_size, float alpha, float beta);
 
+  static ImageBatch ImageNormalize(NArray bytes, NArray crop_info, NArray mean_image, const Scale& src_size, int crop_size);
+  static ImageBatch ImageNormalize(NArray bytes, NArray crop_info, const std::vector<float>& mean_value, const Scale& src_size, int crop_size);
 };
 
 }  // namespace minerva
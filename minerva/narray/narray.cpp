@@ -46,6 +46,12 @@ NArray NArray::MakeNArray(const Scale& size, shared_ptr<float> array) {
   return NArray::GenerateOne(size, loader_op);
 }
 
+NArray NArray::Upload(const Scale& size, shared_ptr<float> staging) {
+  UploadOp* upload_op = new UploadOp();
+  upload_op->closure = {staging};
+  return NArray::GenerateOne(size, upload_op);
+}
+
 NArray NArray::PushGradAndPullWeight(const NArray& grad, const std::string& layer_name) {
   SyncWithPSOp* op = new SyncWithPSOp();
   op->closure = {layer_name};
@@ -119,6 +125,7 @@ NArray operator*(const NArray& lhs, const NArray& rhs) {
   CHECK_EQ(lhs.Size(1), rhs.Size(0)) << "size must match";
   Scale newsize = {lhs.Size(0), rhs.Size(1)};
   MatMultOp* matmult_op = new MatMultOp();
+  matmult_op->closure = {false};
   return NArray::ComputeOne({lhs, rhs}, newsize, matmult_op);
 }
 
@@ -180,6 +187,16 @@ NArray NArray::Trans() const {
   return NArray::ComputeOne({*this}, newsize, trans_op);
 }
 
+NArray NArray::TransMult(const NArray& rhs) const {
+  CHECK_EQ(Size().NumDims(), 2) << "eligible only for 2D";
+  CHECK_EQ(rhs.Size().NumDims(), 2) << "eligible only for 2D";
+  CHECK_EQ(Size(0), rhs.Size(0)) << "size must match";
+  Scale newsize = {Size(1), rhs.Size(1)};
+  MatMultOp* matmult_op = new MatMultOp();
+  matmult_op->closure = {true};
+  return NArray::ComputeOne({*this, rhs}, newsize, matmult_op);
+}
+
 NArray NArray::Select(std::vector<int> const& indices) const {
   CHECK_EQ(Size().NumDims() , 2);
   CHECK_LT(0, indices.size());
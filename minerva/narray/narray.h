@@ -25,6 +25,7 @@ class NArray {
   static NArray Zeros(const Scale& size);
   static NArray Ones(const Scale& size);
   static NArray MakeNArray(const Scale& size, std::shared_ptr<float> array);
+  static NArray Upload(const Scale& size, std::shared_ptr<float> staging);
   static NArray PushGradAndPullWeight(const NArray& grad, const std::string& layer_name);
   // DAG generating operations
   static std::vector<NArray> Compute(
@@ -79,6 +80,7 @@ class NArray {
   int Size(int dim) const { return CHECK_NOTNULL(data_)->shape()[dim]; }
   NArray Reshape(const Scale& dims) const;
   NArray Trans() const;
+  NArray TransMult(const NArray& rhs) const;  // Same as Trans() * rhs, without the transpose
   NArray Select(std::vector<int> const&) const;
   // Lazy reductions
   NArray Sum(int dim) const;
@@ -86,6 +88,7 @@ class NArray {
   NArray Max(int dim) const;
   NArray Max(const Scale& dims) const;
   NArray MaxIndex(int dim) const;
+  std::vector<NArray> TopK(int k, int dim) const;  // {values, indices} of the k largest along dim
 
   // Replicate matrix
   NArray NormArithmetic(const NArray&, ArithmeticType) const;
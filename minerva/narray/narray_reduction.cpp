@@ -50,6 +50,16 @@ NArray NArray::MaxIndex(int dim) const {
   return NArray::ComputeOne({*this}, size, op);
 }
 
+std::vector<NArray> NArray::TopK(int k, int dim) const {
+  auto size = Size();
+  CHECK(0 <= dim && dim < static_cast<int>(size.NumDims())) << "dim out of bound";
+  CHECK(0 < k && k <= size[dim]) << "k out of bound";
+  size[dim] = k;
+  TopKOp* op = new TopKOp();
+  op->closure = {dim, k};
+  return NArray::Compute({*this}, {size, size}, op);
+}
+
 // Non-lazy reductions
 float NArray::Sum() const {
   // TODO
@@ -0,0 +1,61 @@
+#include "narray/quantization.h"
+#include "op/physical_op.h"
+
+namespace minerva {
+
+int Quantization::PackedSize(const Scale& size, QuantizedType type) {
+  int num_bytes = size.Prod() * (type == QuantizedType::kHalf ? 2 : 1);
+  return (num_bytes + sizeof(float) - 1) / sizeof(float);
+}
+
+NArray Quantization::ToHalf(NArray src) {
+  QuantizeOp* op = new QuantizeOp();
+  op->closure = {QuantizedType::kHalf};
+  return NArray::ComputeOne({src}, {PackedSize(src.Size(), QuantizedType::kHalf)}, op);
+}
+
+NArray Quantization::FromHalf(NArray packed, const Scale& size) {
+  CHECK_EQ(packed.Size().Prod(), PackedSize(size, QuantizedType::kHalf)) << "packed size mismatch";
+  DequantizeOp* op = new DequantizeOp();
+  op->closure = {QuantizedType::kHalf, size};
+  return NArray::ComputeOne({packed}, size, op);
+}
+
+std::vector<NArray> Quantization::ToInt8(NArray src) {
+  auto& size = src.Size();
+  QuantizeOp* op = new QuantizeOp();
+  op->closure = {QuantizedType::kInt8};
+  return NArray::Compute({src}, {{PackedSize(size, QuantizedType::kInt8)}, {size[size.NumDims() - 1]}}, op);
+}
+
+NArray Quantization::FromInt8(NArray packed, NArray scale, const Scale& size) {
+  CHECK_EQ(packed.Size().Prod(), PackedSize(size, QuantizedType::kInt8)) << "packed size mismatch";
+  CHECK_EQ(scale.Size().Prod(), size[size.NumDims() - 1]) << "scale size mismatch";
+  DequantizeOp* op = new DequantizeOp();
+  op->closure = {QuantizedType::kInt8, size};
+  return NArray::ComputeOne({packed, scale}, size, op);
+}
+
+NArray Quantization::HalfTransMult(NArray packed, const Scale& size, NArray rhs) {
+  CHECK_EQ(size.NumDims(), 2) << "eligible only for 2D";
+  CHECK_EQ(rhs.Size().NumDims(), 2) << "eligible only for 2D";
+  CHECK_EQ(size[0], rhs.Size(0)) << "size must match";
+  CHECK_EQ(packed.Size().Prod(), PackedSize(size, QuantizedType::kHalf)) << "packed size mismatch";
+  QuantizedTransMultOp* op = new QuantizedTransMultOp();
+  op->closure = {QuantizedType::kHalf, size};
+  return NArray::ComputeOne({packed, rhs}, {size[1], rhs.Size(1)}, op);
+}
+
+NArray Quantization::Int8TransMult(NArray packed, NArray scale, const Scale& size, NArray rhs) {
+  CHECK_EQ(size.NumDims(), 2) << "eligible only for 2D";
+  CHECK_EQ(rhs.Size().NumDims(), 2) << "eligible only for 2D";
+  CHECK_EQ(size[0], rhs.Size(0)) << "size must match";
+  CHECK_EQ(packed.Size().Prod(), PackedSize(size, QuantizedType::kInt8)) << "packed size mismatch";
+  CHECK_EQ(scale.Size().Prod(), size[1]) << "scale size mismatch";
+  QuantizedTransMultOp* op = new QuantizedTransMultOp();
+  op->closure = {QuantizedType::kInt8, size};
+  return NArray::ComputeOne({packed, scale, rhs}, {size[1], rhs.Size(1)}, op);
+}
+
+}  // namespace minerva
+
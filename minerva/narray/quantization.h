@@ -0,0 +1,24 @@
+#pragma once
+#include <vector>
+#include "narray/narray.h"
+
+namespace minerva {
+
+// Reduced-precision weights. The quantized values are packed as bytes into a float array, the same
+// way as the uint8 images of Convolution::ImageNormalize, so they are stored and moved as any NArray.
+// Int8 values are scaled per slice along the last dimension, i.e. per output of a transposed fc
+// weight or of a conv filter.
+class Quantization {
+ public:
+  static int PackedSize(const Scale& size, QuantizedType type);
+  static NArray ToHalf(NArray src);
+  static NArray FromHalf(NArray packed, const Scale& size);
+  static std::vector<NArray> ToInt8(NArray src);  // {packed values, scales}
+  static NArray FromInt8(NArray packed, NArray scale, const Scale& size);
+  // Same as FromHalf(packed, size).TransMult(rhs), without dequantizing the left operand first
+  static NArray HalfTransMult(NArray packed, const Scale& size, NArray rhs);
+  static NArray Int8TransMult(NArray packed, NArray scale, const Scale& size, NArray rhs);
+};
+
+}  // namespace minerva
+
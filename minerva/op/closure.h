@@ -1,5 +1,6 @@
 #pragma once
 #include <memory>
+#include <vector>
 #include "common/scale.h"
 #include "narray/convolution_info.h"
 
@@ -27,6 +28,10 @@ struct ArrayLoaderClosure {
   std::shared_ptr<float> data;
 };
 
+struct UploadClosure {
+  std::shared_ptr<float> data;
+};
+
 struct RandnClosure {
   float mu, var;
 };
@@ -44,6 +49,7 @@ struct SyncWithPSClosure {
 };
 
 struct MatMultClosure {
+  bool transpose_left;  // Multiply the transpose of the left matrix
 };
 
 struct TransposeClosure {
@@ -61,6 +67,11 @@ struct MaxIndexClosure {
   int dim;
 };
 
+struct TopKClosure {
+  int dim;
+  int k;
+};
+
 struct ElewiseClosure {
   ElewiseType type;
 };
@@ -118,6 +129,14 @@ typedef ConvClosure<2> ConvBackwardFilterClosure;
 struct ConvBackwardBiasClosure {
 };
 
+struct FusedConvForwardClosure {
+  int pad_height;
+  int pad_width;
+  int stride_vertical;
+  int stride_horizontal;
+  ActivationAlgorithm algorithm;  // Applied to the convolution plus bias
+};
+
 template<int i> struct SoftmaxClosure {
   SoftmaxAlgorithm algorithm;
 };
@@ -167,6 +186,31 @@ struct SliceClosure {
   int slice_count;
 };
 
+struct ImageNormalizeClosure {
+  Scale src_size;  // {width, height, channels, #images} of the uint8 source
+  int crop_size;
+  std::vector<float> mean_value;  // Per-channel mean, used when no mean image is given
+};
+
+enum class QuantizedType {
+  kHalf,  // IEEE half precision, two values per float of storage
+  kInt8,  // Symmetric 8-bit with a scale per slice along the last dimension, four values per float
+};
+
+struct QuantizeClosure {
+  QuantizedType type;
+};
+
+struct DequantizeClosure {
+  QuantizedType type;
+  Scale size;  // Size of the original array
+};
+
+struct QuantizedTransMultClosure {
+  QuantizedType type;
+  Scale size;  // Size of the quantized left operand
+};
+
 struct IndexClosure {
   int idx;
 };
@@ -6,9 +6,28 @@ namespace minerva {
 
 struct Context;
 
+// Work done by one execution of an op
+struct OpCost {
+  double flops;
+  double bytes;  // read and written in the memory of the device
+};
+
+inline double NumElements(DataList const& list) {
+  double ret = 0;
+  for (auto& d : list) {
+    ret += d.size_.Prod();
+  }
+  return ret;
+}
+
 class ComputeFn : public BasicFn {
  public:
   virtual void Execute(DataList const&, DataList const&, Context const&) = 0;
+  // By default every input is read and every output written once, with one
+  // flop per output element, as for element-wise ops
+  virtual OpCost Cost(DataList const& inputs, DataList const& outputs) const {
+    return {NumElements(outputs), (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+  }
 };
 
 }  // namespace minerva
@@ -29,6 +29,7 @@ struct Context {
   ImplType impl_type;
 #ifdef HAS_CUDA
   cudaStream_t stream;
+  cudaStream_t copy_stream;
   cublasHandle_t cublas_handle;
   cudnnHandle_t cudnn_handle;
 #endif
@@ -1,11 +1,14 @@
 #include "basic.h"
 #include "op/closure.h"
+#include "common/half.h"
 #include <cmath>
 #include <dmlc/logging.h>
 #include <chrono>
 #include <algorithm>
 #include <random>
 #include <cstring>
+#include <limits>
+#include <numeric>
 
 using namespace std;
 
@@ -155,12 +158,29 @@ void MatMult(const DataList& inputs, const DataList& outputs, MatMultClosure& cl
   float* res_data = outputs[0].data_;
   int m = outputs[0].size_[0];
   int n = outputs[0].size_[1];
-  int o = inputs[0].size_[1];
+  int o = closure.transpose_left ? inputs[0].size_[0] : inputs[0].size_[1];
   // ATTENTION: the data is column major !!
 #ifdef HAS_CBLAS
   memset(res_data, 0, sizeof(float) * m * n);
-  cblas_sgemm(CblasColMajor, CblasNoTrans, CblasNoTrans, m, n, o, 1.0, left_data, m, right_data, o, 0.0, res_data, m);
+  if (closure.transpose_left) {
+    cblas_sgemm(CblasColMajor, CblasTrans, CblasNoTrans, m, n, o, 1.0, left_data, o, right_data, o, 0.0, res_data, m);
+  } else {
+    cblas_sgemm(CblasColMajor, CblasNoTrans, CblasNoTrans, m, n, o, 1.0, left_data, m, right_data, o, 0.0, res_data, m);
+  }
 #else
+  if (closure.transpose_left) {
+    // Both operands are read contiguously along the inner dimension
+    for (int i = 0; i < m; ++i) {
+      for (int j = 0; j < n; ++j) {
+        float sum = 0;
+        for (int k = 0; k < o; ++k) {
+          sum += left_data[k + i * o] * right_data[k + j * o];
+        }
+        res_data[i + j * m] = sum;
+      }
+    }
+    return;
+  }
   for (int i = 0; i < m; ++i) {
     for (int j = 0; j < n; ++j) {
       res_data[i + j * m] = 0;
@@ -260,6 +280,39 @@ void SoftmaxForward(const DataList& inputs, const DataList& outputs, SoftmaxForw
   } while (accumulator.IncrWithDimensionsFixed(res_max, dim_to_norm));
 }
 
+void SoftmaxBackward(const DataList& inputs, const DataList& outputs, SoftmaxBackwardClosure& closure) {
+  CHECK_EQ(inputs.size(), 2) << "(softmax backward) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(softmax backward) #outputs wrong";
+  auto& size = inputs[0].size_;
+  float* top_diff = inputs[0].data_;
+  float* top = inputs[1].data_;
+  float* bottom_diff = outputs[0].data_;
+  // Softmax is over `length` elements `step` apart, for `num_groups` groups of
+  // `step` such sets: all the features of an image, or the channels of a pixel
+  int num_groups = size[size.NumDims() - 1];
+  int length = size.Prod() / num_groups;
+  int step = 1;
+  if (closure.algorithm == SoftmaxAlgorithm::kChannel) {
+    CHECK_EQ(size.NumDims(), 4) << "(softmax backward) channel softmax needs 4D input";
+    step = size[0] * size[1];
+    length = size[2];
+  } else {
+    CHECK(closure.algorithm == SoftmaxAlgorithm::kInstance) << "softmax algorithm not supported";
+  }
+  for (int n = 0; n < num_groups; ++n) {
+    for (int p = 0; p < step; ++p) {
+      int offset = n * length * step + p;
+      float dot = 0;
+      for (int i = 0; i < length; ++i) {
+        dot += top_diff[offset + i * step] * top[offset + i * step];
+      }
+      for (int i = 0; i < length; ++i) {
+        bottom_diff[offset + i * step] = top[offset + i * step] * (top_diff[offset + i * step] - dot);
+      }
+    }
+  }
+}
+
 void ArrayLoader(const DataList& outputs, ArrayLoaderClosure& closure) {
   CHECK_EQ(outputs.size(), 1) << "(array loader) #outputs wrong";
   CHECK(closure.data) << "probably already executed";
@@ -267,6 +320,14 @@ void ArrayLoader(const DataList& outputs, ArrayLoaderClosure& closure) {
   closure.data.reset();
 }
 
+void Upload(const DataList& outputs, UploadClosure& closure) {
+  CHECK_EQ(outputs.size(), 1) << "(upload) #outputs wrong";
+  CHECK(closure.data) << "probably already executed";
+  memcpy(outputs[0].data_, closure.data.get(), outputs[0].size_.Prod() * sizeof(float));
+  // Return the staging buffer to its ring
+  closure.data.reset();
+}
+
 void Randn(const DataList& output, RandnClosure& closure) {
   CHECK_EQ(output.size(), 1) << "wrong number of randn output";
   int length = output[0].size_.Prod();
@@ -397,6 +458,51 @@ void MaxIndex(const DataList& inputs, const DataList& outputs, MaxIndexClosure&
   } while (iterator.IncrWithDimensionsFixed(res_max, dims));
 }
 
+void TopK(const DataList& inputs, const DataList& outputs, TopKClosure& closure) {
+  CHECK_EQ(inputs.size(), 1) << "basic::TopK #input wrong";
+  CHECK_EQ(outputs.size(), 2) << "basic::TopK #output wrong";
+  float* in_data = inputs[0].data_;
+  float* val_data = outputs[0].data_;
+  float* idx_data = outputs[1].data_;
+  auto in_size = inputs[0].size_;
+  int k = closure.k;
+  // Elements of a slice are `interval` apart
+  int interval = 1;
+  for (int i = 0; i < closure.dim; ++i) {
+    interval *= in_size[i];
+  }
+  int length = in_size[closure.dim];
+  int num_outer = in_size.Prod() / (interval * length);
+  std::vector<float> vals(k);
+  std::vector<int> idxs(k);
+  for (int outer = 0; outer < num_outer; ++outer) {
+    for (int inner = 0; inner < interval; ++inner) {
+      float* src = in_data + outer * length * interval + inner;
+      // Partial selection: keep the k largest elements seen so far, sorted in descending order
+      int filled = 0;
+      for (int i = 0; i < length; ++i) {
+        float v = src[i * interval];
+        if (filled == k && !(vals[k - 1] < v)) {
+          continue;
+        }
+        int pos = filled < k ? filled++ : k - 1;
+        while (pos > 0 && vals[pos - 1] < v) {
+          vals[pos] = vals[pos - 1];
+          idxs[pos] = idxs[pos - 1];
+          --pos;
+        }
+        vals[pos] = v;
+        idxs[pos] = i;
+      }
+      int dst = outer * k * interval + inner;
+      for (int j = 0; j < k; ++j) {
+        val_data[dst + j * interval] = vals[j];
+        idx_data[dst + j * interval] = idxs[j];
+      }
+    }
+  }
+}
+
 void Reshape(const DataList& inputs, const DataList& outputs, ReshapeClosure&) {
   CHECK_EQ(inputs.size(), 1);
   CHECK_EQ(outputs.size(), 1);
@@ -417,6 +523,21 @@ void SigmoidForward(const DataList& inputs, const DataList& outputs, SigmoidForw
   }
 }
 
+void SigmoidBackward(const DataList& inputs, const DataList& outputs, SigmoidBackwardClosure&) {
+  CHECK_EQ(inputs.size(), 3) << "sigmoid backward #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "sigmoid backward #outputs wrong";
+
+  float* top_diff = inputs[0].data_;
+  float* top = inputs[1].data_;
+  float* bottom_diff = outputs[0].data_;
+
+  size_t numbers = inputs[0].size_.Prod();
+
+  for (size_t i = 0; i < numbers; i++) {
+    bottom_diff[i] = top_diff[i] * top[i] * (1 - top[i]);
+  }
+}
+
 void ReluForward(const DataList& inputs, const DataList& outputs, ReluForwardClosure&) {
   CHECK_EQ(inputs.size(), 1) << "relu forward #inputs wrong";
   CHECK_EQ(outputs.size(), 1) << "relu forward #outputs wrong";
@@ -431,6 +552,21 @@ void ReluForward(const DataList& inputs, const DataList& outputs, ReluForwardClo
   }
 }
 
+void ReluBackward(const DataList& inputs, const DataList& outputs, ReluBackwardClosure&) {
+  CHECK_EQ(inputs.size(), 3) << "relu backward #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "relu backward #outputs wrong";
+
+  float* top_diff = inputs[0].data_;
+  float* bottom = inputs[2].data_;
+  float* bottom_diff = outputs[0].data_;
+
+  size_t numbers = inputs[0].size_.Prod();
+
+  for (size_t i = 0; i < numbers; i++) {
+    bottom_diff[i] = bottom[i] > 0 ? top_diff[i] : 0;
+  }
+}
+
 void TanhForward(const DataList& inputs, const DataList& outputs, TanhForwardClosure&) {
   CHECK_EQ(inputs.size(), 1) << "tanh forward #inputs wrong";
   CHECK_EQ(outputs.size(), 1) << "tanh forward #outputs wrong";
@@ -445,6 +581,21 @@ void TanhForward(const DataList& inputs, const DataList& outputs, TanhForwardClo
   }
 }
 
+void TanhBackward(const DataList& inputs, const DataList& outputs, TanhBackwardClosure&) {
+  CHECK_EQ(inputs.size(), 3) << "tanh backward #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "tanh backward #outputs wrong";
+
+  float* top_diff = inputs[0].data_;
+  float* top = inputs[1].data_;
+  float* bottom_diff = outputs[0].data_;
+
+  size_t numbers = inputs[0].size_.Prod();
+
+  for (size_t i = 0; i < numbers; i++) {
+    bottom_diff[i] = top_diff[i] * (1 - top[i] * top[i]);
+  }
+}
+
 void ActivationForward(const DataList& inputs, const DataList& outputs, ActivationForwardClosure& closure) {
   CHECK_EQ(inputs.size(), 1) << "(activation forward) #inputs wrong";
   CHECK_EQ(outputs.size(), 1) << "(activation forward) #outputs wrong";
@@ -469,6 +620,30 @@ void ActivationForward(const DataList& inputs, const DataList& outputs, Activati
   }
 }
 
+void ActivationBackward(const DataList& inputs, const DataList& outputs, ActivationBackwardClosure& closure) {
+  CHECK_EQ(inputs.size(), 3) << "(activation backward) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(activation backward) #outputs wrong";
+  switch (closure.algorithm) {
+    case ActivationAlgorithm::kSigmoid: {
+      SigmoidBackwardClosure c;
+      SigmoidBackward(inputs, outputs, c);
+      break;
+    }
+    case ActivationAlgorithm::kRelu: {
+      ReluBackwardClosure c;
+      ReluBackward(inputs, outputs, c);
+      break;
+    }
+    case ActivationAlgorithm::kTanh: {
+      TanhBackwardClosure c;
+      TanhBackward(inputs, outputs, c);
+      break;
+    }
+    default:
+      LOG(FATAL) << "activation algorithm not supported";
+  }
+}
+
 
 void Index(const DataList& inputs, const DataList& outputs, IndexClosure& closure) {
 	CHECK_EQ(inputs.size(), 1) << "(activation forward) #inputs wrong";
@@ -487,5 +662,432 @@ void Index(const DataList& inputs, const DataList& outputs, IndexClosure& closur
 		output_data[i] = input_data[i + idx * output_length];
 }
 
+void ImageNormalize(const DataList& inputs, const DataList& outputs, ImageNormalizeClosure& closure) {
+  CHECK(inputs.size() == 2 || inputs.size() == 3) << "(image normalize) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(image normalize) #outputs wrong";
+  int width = closure.src_size[0];
+  int height = closure.src_size[1];
+  int channels = closure.src_size[2];
+  int num_images = closure.src_size[3];
+  int crop_size = closure.crop_size;
+  CHECK_GE(inputs[0].size_.Prod() * sizeof(float), closure.src_size.Prod()) << "(image normalize) source too small";
+  auto src = reinterpret_cast<const unsigned char*>(inputs[0].data_);
+  float* crop_info = inputs[1].data_;
+  float* mean_image = inputs.size() == 3 ? inputs[2].data_ : 0;
+  if (!mean_image) {
+    CHECK_EQ(closure.mean_value.size(), static_cast<size_t>(channels)) << "(image normalize) mean value size wrong";
+  }
+  float* dst = outputs[0].data_;
+  for (int n = 0; n < num_images; ++n) {
+    int crop_h = static_cast<int>(crop_info[n * 3]);
+    int crop_w = static_cast<int>(crop_info[n * 3 + 1]);
+    bool mirror = crop_info[n * 3 + 2] != 0;
+    CHECK(0 <= crop_h && crop_h + crop_size <= height) << "(image normalize) crop height offset " << crop_h << " of image " << n << " out of bounds";
+    CHECK(0 <= crop_w && crop_w + crop_size <= width) << "(image normalize) crop width offset " << crop_w << " of image " << n << " out of bounds";
+    for (int c = 0; c < channels; ++c) {
+      for (int y = 0; y < crop_size; ++y) {
+        int h = crop_h + y;
+        for (int x = 0; x < crop_size; ++x) {
+          int w = crop_w + (mirror ? crop_size - 1 - x : x);
+          float mean = mean_image ? mean_image[(c * height + h) * width + w] : closure.mean_value[c];
+          *dst++ = src[((n * channels + c) * height + h) * width + w] - mean;
+        }
+      }
+    }
+  }
+}
+
+namespace {
+
+// Shapes of a convolution of `bottom` with `filter` into `top`
+struct ConvShape {
+  template<typename Closure>
+  ConvShape(const Scale& bottom, const Scale& filter, const Scale& top, const Closure& closure)
+    : num_images(bottom[3]), bottom_channels(bottom[2]), bottom_height(bottom[1]), bottom_width(bottom[0])
+    , top_channels(top[2]), top_height(top[1]), top_width(top[0])
+    , filter_height(filter[1]), filter_width(filter[0])
+    , pad_height(closure.pad_height), pad_width(closure.pad_width)
+    , stride_vertical(closure.stride_vertical), stride_horizontal(closure.stride_horizontal) {
+    CHECK_EQ(top[3], num_images) << "(conv) #images mismatch";
+    CHECK_EQ(filter[2], bottom_channels) << "(conv) #input channels mismatch";
+    CHECK_EQ(filter[3], top_channels) << "(conv) #output channels mismatch";
+  }
+  int num_images, bottom_channels, bottom_height, bottom_width;
+  int top_channels, top_height, top_width;
+  int filter_height, filter_width;
+  int pad_height, pad_width, stride_vertical, stride_horizontal;
+};
+
+// Outputs [begin, end) whose input `out * stride - pad + offset` lies in [0, in_size)
+void ValidOutputs(int out_size, int in_size, int stride, int pad, int offset, int& begin, int& end) {
+  begin = pad > offset ? (pad - offset + stride - 1) / stride : 0;
+  int last = in_size - 1 + pad - offset;
+  end = last < 0 ? 0 : min(out_size, last / stride + 1);
+  end = max(begin, end);
+}
+
+// Calls `fn(top_row, bottom_row, filter_index, x_begin, x_end)` for every row of
+// the top and element of the filter that meet: element `x` of the top row is
+// multiplied with element `x * stride_horizontal` of the bottom row. Rows are
+// offsets into the data. Same as cudnn's CUDNN_CONVOLUTION mode, the filter is
+// flipped.
+template<typename Fn>
+void ForEachConvRow(const ConvShape& s, Fn fn) {
+  for (int n = 0; n < s.num_images; ++n) {
+    for (int k = 0; k < s.top_channels; ++k) {
+      for (int c = 0; c < s.bottom_channels; ++c) {
+        for (int i = 0; i < s.filter_height; ++i) {
+          int y_begin, y_end;
+          ValidOutputs(s.top_height, s.bottom_height, s.stride_vertical, s.pad_height, i, y_begin, y_end);
+          for (int j = 0; j < s.filter_width; ++j) {
+            int x_begin, x_end;
+            ValidOutputs(s.top_width, s.bottom_width, s.stride_horizontal, s.pad_width, j, x_begin, x_end);
+            int filter_index = ((k * s.bottom_channels + c) * s.filter_height + s.filter_height - 1 - i) * s.filter_width + s.filter_width - 1 - j;
+            for (int y = y_begin; y < y_end; ++y) {
+              int top_row = ((n * s.top_channels + k) * s.top_height + y) * s.top_width;
+              int bottom_row = ((n * s.bottom_channels + c) * s.bottom_height + y * s.stride_vertical - s.pad_height + i) * s.bottom_width - s.pad_width + j;
+              fn(top_row, bottom_row, filter_index, x_begin, x_end);
+            }
+          }
+        }
+      }
+    }
+  }
+}
+
+// Pooling window of output element `out`, clipped to the input; `size` is the
+// size of the window within the padded input, by which averages are divided
+void PoolingWindow(int out, int in_size, int window, int stride, int pad, int& begin, int& end, int& size) {
+  begin = out * stride - pad;
+  end = min(begin + window, in_size + pad);
+  size = end - begin;
+  begin = max(begin, 0);
+  end = min(end, in_size);
+}
+
+}  // namespace
+
+void ConvForward(const DataList& inputs, const DataList& outputs, ConvForwardClosure& closure) {
+  CHECK_EQ(inputs.size(), 3) << "(conv forward) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(conv forward) #outputs wrong";
+  ConvShape shape(inputs[0].size_, inputs[1].size_, outputs[0].size_, closure);
+  float* bottom_data = inputs[0].data_;
+  float* filter_data = inputs[1].data_;
+  float* bias_data = inputs[2].data_;
+  float* top_data = outputs[0].data_;
+  int top_area = shape.top_height * shape.top_width;
+  for (int n = 0; n < shape.num_images; ++n) {
+    for (int k = 0; k < shape.top_channels; ++k) {
+      fill_n(top_data + (n * shape.top_channels + k) * top_area, top_area, bias_data[k]);
+    }
+  }
+  int stride = shape.stride_horizontal;
+  ForEachConvRow(shape, [&](int top_row, int bottom_row, int filter_index, int x_begin, int x_end) {
+    float weight = filter_data[filter_index];
+    for (int x = x_begin; x < x_end; ++x) {
+      top_data[top_row + x] += weight * bottom_data[bottom_row + x * stride];
+    }
+  });
+}
+
+void FusedConvForward(const DataList& inputs, const DataList& outputs, FusedConvForwardClosure& closure) {
+  CHECK_EQ(inputs.size(), 3) << "(fused conv forward) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(fused conv forward) #outputs wrong";
+  ConvForwardClosure conv_closure{closure.pad_height, closure.pad_width, closure.stride_vertical, closure.stride_horizontal};
+  ConvForward(inputs, outputs, conv_closure);
+  // Activations may run in place
+  ActivationForwardClosure activation_closure{closure.algorithm};
+  ActivationForward(outputs, outputs, activation_closure);
+}
+
+void ConvBackwardData(const DataList& inputs, const DataList& outputs, ConvBackwardDataClosure& closure) {
+  CHECK_EQ(inputs.size(), 2) << "(conv backward data) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(conv backward data) #outputs wrong";
+  ConvShape shape(outputs[0].size_, inputs[1].size_, inputs[0].size_, closure);
+  float* top_diff = inputs[0].data_;
+  float* filter_data = inputs[1].data_;
+  float* bottom_diff = outputs[0].data_;
+  fill_n(bottom_diff, outputs[0].size_.Prod(), 0);
+  int stride = shape.stride_horizontal;
+  ForEachConvRow(shape, [&](int top_row, int bottom_row, int filter_index, int x_begin, int x_end) {
+    float weight = filter_data[filter_index];
+    for (int x = x_begin; x < x_end; ++x) {
+      bottom_diff[bottom_row + x * stride] += weight * top_diff[top_row + x];
+    }
+  });
+}
+
+void ConvBackwardFilter(const DataList& inputs, const DataList& outputs, ConvBackwardFilterClosure& closure) {
+  CHECK_EQ(inputs.size(), 2) << "(conv backward filter) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(conv backward filter) #outputs wrong";
+  ConvShape shape(inputs[1].size_, outputs[0].size_, inputs[0].size_, closure);
+  float* top_diff = inputs[0].data_;
+  float* bottom_data = inputs[1].data_;
+  float* filter_diff = outputs[0].data_;
+  fill_n(filter_diff, outputs[0].size_.Prod(), 0);
+  int stride = shape.stride_horizontal;
+  ForEachConvRow(shape, [&](int top_row, int bottom_row, int filter_index, int x_begin, int x_end) {
+    float sum = 0;
+    for (int x = x_begin; x < x_end; ++x) {
+      sum += top_diff[top_row + x] * bottom_data[bottom_row + x * stride];
+    }
+    filter_diff[filter_index] += sum;
+  });
+}
+
+void ConvBackwardBias(const DataList& inputs, const DataList& outputs, ConvBackwardBiasClosure&) {
+  CHECK_EQ(inputs.size(), 1) << "(conv backward bias) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(conv backward bias) #outputs wrong";
+  auto& top_diff = inputs[0];
+  int num_images = top_diff.size_[3];
+  int num_channels = top_diff.size_[2];
+  int area = top_diff.size_[1] * top_diff.size_[0];
+  float* bias_diff = outputs[0].data_;
+  fill_n(bias_diff, num_channels, 0);
+  for (int n = 0; n < num_images; ++n) {
+    for (int k = 0; k < num_channels; ++k) {
+      float* plane = top_diff.data_ + (n * num_channels + k) * area;
+      bias_diff[k] = accumulate(plane, plane + area, bias_diff[k]);
+    }
+  }
+}
+
+void PoolingForward(const DataList& inputs, const DataList& outputs, PoolingForwardClosure& closure) {
+  CHECK_EQ(inputs.size(), 1) << "(pooling forward) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(pooling forward) #outputs wrong";
+  auto& bottom = inputs[0];
+  auto& top = outputs[0];
+  int num_planes = bottom.size_[3] * bottom.size_[2];
+  int bottom_height = bottom.size_[1];
+  int bottom_width = bottom.size_[0];
+  int top_height = top.size_[1];
+  int top_width = top.size_[0];
+  bool is_max = closure.algorithm == PoolingInfo::Algorithm::kMax;
+  CHECK(is_max || closure.algorithm == PoolingInfo::Algorithm::kAverage) << "pooling algorithm not supported";
+  for (int p = 0; p < num_planes; ++p) {
+    float* bottom_plane = bottom.data_ + p * bottom_height * bottom_width;
+    float* top_plane = top.data_ + p * top_height * top_width;
+    for (int y = 0; y < top_height; ++y) {
+      int h_begin, h_end, h_size;
+      PoolingWindow(y, bottom_height, closure.height, closure.stride_vertical, closure.pad_height, h_begin, h_end, h_size);
+      for (int x = 0; x < top_width; ++x) {
+        int w_begin, w_end, w_size;
+        PoolingWindow(x, bottom_width, closure.width, closure.stride_horizontal, closure.pad_width, w_begin, w_end, w_size);
+        float res = is_max ? -numeric_limits<float>::max() : 0;
+        for (int h = h_begin; h < h_end; ++h) {
+          for (int w = w_begin; w < w_end; ++w) {
+            float v = bottom_plane[h * bottom_width + w];
+            res = is_max ? max(res, v) : res + v;
+          }
+        }
+        top_plane[y * top_width + x] = is_max ? res : res / (h_size * w_size);
+      }
+    }
+  }
+}
+
+void PoolingBackward(const DataList& inputs, const DataList& outputs, PoolingBackwardClosure& closure) {
+  CHECK_EQ(inputs.size(), 3) << "(pooling backward) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(pooling backward) #outputs wrong";
+  auto& top_diff = inputs[0];
+  auto& bottom = inputs[2];
+  int num_planes = bottom.size_[3] * bottom.size_[2];
+  int bottom_height = bottom.size_[1];
+  int bottom_width = bottom.size_[0];
+  int top_height = top_diff.size_[1];
+  int top_width = top_diff.size_[0];
+  bool is_max = closure.algorithm == PoolingInfo::Algorithm::kMax;
+  CHECK(is_max || closure.algorithm == PoolingInfo::Algorithm::kAverage) << "pooling algorithm not supported";
+  float* bottom_diff = outputs[0].data_;
+  fill_n(bottom_diff, outputs[0].size_.Prod(), 0);
+  for (int p = 0; p < num_planes; ++p) {
+    float* bottom_plane = bottom.data_ + p * bottom_height * bottom_width;
+    float* bottom_diff_plane = bottom_diff + p * bottom_height * bottom_width;
+    float* top_diff_plane = top_diff.data_ + p * top_height * top_width;
+    for (int y = 0; y < top_height; ++y) {
+      int h_begin, h_end, h_size;
+      PoolingWindow(y, bottom_height, closure.height, closure.stride_vertical, closure.pad_height, h_begin, h_end, h_size);
+      for (int x = 0; x < top_width; ++x) {
+        int w_begin, w_end, w_size;
+        PoolingWindow(x, bottom_width, closure.width, closure.stride_horizontal, closure.pad_width, w_begin, w_end, w_size);
+        float diff = top_diff_plane[y * top_width + x];
+        if (is_max) {
+          // The whole gradient goes to the first maximum of the window
+          int argmax = h_begin * bottom_width + w_begin;
+          for (int h = h_begin; h < h_end; ++h) {
+            for (int w = w_begin; w < w_end; ++w) {
+              if (bottom_plane[h * bottom_width + w] > bottom_plane[argmax]) {
+                argmax = h * bottom_width + w;
+              }
+            }
+          }
+          bottom_diff_plane[argmax] += diff;
+        } else {
+          diff /= h_size * w_size;
+          for (int h = h_begin; h < h_end; ++h) {
+            for (int w = w_begin; w < w_end; ++w) {
+              bottom_diff_plane[h * bottom_width + w] += diff;
+            }
+          }
+        }
+      }
+    }
+  }
+}
+
+void LRNForward(const DataList& inputs, const DataList& outputs, LRNForwardClosure& closure) {
+  CHECK_EQ(inputs.size(), 2) << "(LRNForward) #inputs is wrong!";
+  CHECK_EQ(outputs.size(), 1) << "(LRNForward) #outputs is wrong!";
+  float* bottom_data = inputs[0].data_;
+  // As on the GPU, the scale is written into its input, to be reused by the backward pass
+  float* scale_data = inputs[1].data_;
+  float* res_data = outputs[0].data_;
+  int num_img = closure.data_shape[3];
+  int channel = closure.data_shape[2];
+  int area = closure.data_shape[1] * closure.data_shape[0];
+  int pre_pad = (closure.local_size - 1) / 2;
+  int post_pad = closure.local_size - pre_pad - 1;
+  float alpha_over_size = closure.alpha / closure.local_size;
+  for (int n = 0; n < num_img; ++n) {
+    for (int c = 0; c < channel; ++c) {
+      float* scale = scale_data + (n * channel + c) * area;
+      fill_n(scale, area, 0);
+      for (int other = max(c - pre_pad, 0); other <= min(c + post_pad, channel - 1); ++other) {
+        float* in = bottom_data + (n * channel + other) * area;
+        for (int i = 0; i < area; ++i) {
+          scale[i] += in[i] * in[i];
+        }
+      }
+      float* in = bottom_data + (n * channel + c) * area;
+      float* res = res_data + (n * channel + c) * area;
+      for (int i = 0; i < area; ++i) {
+        scale[i] = 1 + alpha_over_size * scale[i];
+        res[i] = in[i] * powf(scale[i], -closure.beta);
+      }
+    }
+  }
+}
+
+void LRNBackward(const DataList& inputs, const DataList& outputs, LRNBackwardClosure& closure) {
+  CHECK_EQ(inputs.size(), 4) << "(LRNBackward) #inputs is wrong!";
+  CHECK_EQ(outputs.size(), 1) << "(LRNBackward) #outputs is wrong!";
+  float* bottom_data = inputs[0].data_;
+  float* top_data = inputs[1].data_;
+  float* scale_data = inputs[2].data_;
+  float* top_diff = inputs[3].data_;
+  float* bottom_diff = outputs[0].data_;
+  int num_img = closure.data_shape[3];
+  int channel = closure.data_shape[2];
+  int area = closure.data_shape[1] * closure.data_shape[0];
+  int pre_pad = (closure.local_size - 1) / 2;
+  int post_pad = closure.local_size - pre_pad - 1;
+  float cache_ratio = 2 * closure.alpha * closure.beta / closure.local_size;
+  vector<float> accum(area);
+  for (int n = 0; n < num_img; ++n) {
+    for (int c = 0; c < channel; ++c) {
+      // Channel `c` is in the window of channels [c - post_pad, c + pre_pad]
+      fill(accum.begin(), accum.end(), 0);
+      for (int other = max(c - post_pad, 0); other <= min(c + pre_pad, channel - 1); ++other) {
+        int offset = (n * channel + other) * area;
+        for (int i = 0; i < area; ++i) {
+          accum[i] += top_diff[offset + i] * top_data[offset + i] / scale_data[offset + i];
+        }
+      }
+      int offset = (n * channel + c) * area;
+      for (int i = 0; i < area; ++i) {
+        bottom_diff[offset + i] = top_diff[offset + i] * powf(scale_data[offset + i], -closure.beta) - cache_ratio * bottom_data[offset + i] * accum[i];
+      }
+    }
+  }
+}
+
+void Quantize(const DataList& inputs, const DataList& outputs, QuantizeClosure& closure) {
+  CHECK_EQ(inputs.size(), 1) << "(quantize) #inputs wrong";
+  float* src = inputs[0].data_;
+  int length = inputs[0].size_.Prod();
+  // Clear the padding at the end of the packed values
+  outputs[0].data_[outputs[0].size_.Prod() - 1] = 0;
+  if (closure.type == QuantizedType::kHalf) {
+    CHECK_EQ(outputs.size(), 1) << "(quantize) #outputs wrong";
+    auto dst = reinterpret_cast<uint16_t*>(outputs[0].data_);
+    for (int i = 0; i < length; ++i) {
+      dst[i] = FloatToHalf(src[i]);
+    }
+    return;
+  }
+  CHECK_EQ(outputs.size(), 2) << "(quantize) #outputs wrong";
+  auto dst = reinterpret_cast<int8_t*>(outputs[0].data_);
+  float* scale = outputs[1].data_;
+  int num_slices = outputs[1].size_.Prod();
+  int slice_length = length / num_slices;
+  for (int s = 0; s < num_slices; ++s) {
+    float max_abs = 0;
+    for (int i = s * slice_length; i < (s + 1) * slice_length; ++i) {
+      max_abs = max(max_abs, fabsf(src[i]));
+    }
+    scale[s] = max_abs / 127;
+    float inv_scale = max_abs > 0 ? 127 / max_abs : 0;
+    for (int i = s * slice_length; i < (s + 1) * slice_length; ++i) {
+      dst[i] = static_cast<int8_t>(max(-127.0f, min(127.0f, roundf(src[i] * inv_scale))));
+    }
+  }
+}
+
+void Dequantize(const DataList& inputs, const DataList& outputs, DequantizeClosure& closure) {
+  CHECK_EQ(outputs.size(), 1) << "(dequantize) #outputs wrong";
+  float* dst = outputs[0].data_;
+  int length = outputs[0].size_.Prod();
+  if (closure.type == QuantizedType::kHalf) {
+    CHECK_EQ(inputs.size(), 1) << "(dequantize) #inputs wrong";
+    auto src = reinterpret_cast<const uint16_t*>(inputs[0].data_);
+    for (int i = 0; i < length; ++i) {
+      dst[i] = HalfToFloat(src[i]);
+    }
+    return;
+  }
+  CHECK_EQ(inputs.size(), 2) << "(dequantize) #inputs wrong";
+  auto src = reinterpret_cast<const int8_t*>(inputs[0].data_);
+  float* scale = inputs[1].data_;
+  int slice_length = length / inputs[1].size_.Prod();
+  for (int i = 0; i < length; ++i) {
+    dst[i] = src[i] * scale[i / slice_length];
+  }
+}
+
+void QuantizedTransMult(const DataList& inputs, const DataList& outputs, QuantizedTransMultClosure& closure) {
+  bool is_half = closure.type == QuantizedType::kHalf;
+  CHECK_EQ(inputs.size(), is_half ? 2 : 3) << "(quantized matmult) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(quantized matmult) #outputs wrong";
+  float* right_data = inputs.back().data_;
+  float* res_data = outputs[0].data_;
+  int m = outputs[0].size_[0];
+  int n = outputs[0].size_[1];
+  int o = closure.size[0];
+  // Each column of the left operand is expanded once and multiplied with all columns of the right one
+  vector<float> column(o);
+  for (int i = 0; i < m; ++i) {
+    float scale = 1;
+    if (is_half) {
+      auto left = reinterpret_cast<const uint16_t*>(inputs[0].data_) + i * o;
+      for (int k = 0; k < o; ++k) {
+        column[k] = HalfToFloat(left[k]);
+      }
+    } else {
+      auto left = reinterpret_cast<const int8_t*>(inputs[0].data_) + i * o;
+      for (int k = 0; k < o; ++k) {
+        column[k] = left[k];
+      }
+      scale = inputs[1].data_[i];
+    }
+    for (int j = 0; j < n; ++j) {
+      float sum = 0;
+      for (int k = 0; k < o; ++k) {
+        sum += column[k] * right_data[k + j * o];
+      }
+      res_data[i + j * m] = sum * scale;
+    }
+  }
+}
+
 }  // end of namespace basic
 }  // end of namespace minerva
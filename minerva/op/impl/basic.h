@@ -14,10 +14,12 @@ void Transpose(const DataList&, const DataList&, TransposeClosure&);
 void Reduction(const DataList&, const DataList&, ReductionClosure&);
 void NormArithmetic(const DataList&, const DataList&, NormArithmeticClosure&);
 void MaxIndex(const DataList&, const DataList&, MaxIndexClosure&);
+void TopK(const DataList&, const DataList&, TopKClosure&);
 void Reshape(const DataList&, const DataList&, ReshapeClosure&);
 void SyncWithPS(const DataList& inputs, const DataList& outputs, SyncWithPSClosure& closure);
 
 void ArrayLoader(const DataList&, ArrayLoaderClosure&);
+void Upload(const DataList&, UploadClosure&);
 void Randn(const DataList&, RandnClosure&);
 void RandBernoulli(const DataList&, RandBernoulliClosure&);
 void Fill(const DataList&, FillClosure&);
@@ -35,6 +37,22 @@ void ActivationForward(const DataList&, const DataList&, ActivationForwardClosur
 void ActivationBackward(const DataList&, const DataList&, ActivationBackwardClosure&);
 
 void SoftmaxForward(const DataList&, const DataList&, SoftmaxForwardClosure&);
+void SoftmaxBackward(const DataList&, const DataList&, SoftmaxBackwardClosure&);
 void Index(const DataList&, const DataList&, IndexClosure&);
+void ImageNormalize(const DataList&, const DataList&, ImageNormalizeClosure&);
+
+void ConvForward(const DataList&, const DataList&, ConvForwardClosure&);
+void FusedConvForward(const DataList&, const DataList&, FusedConvForwardClosure&);
+void ConvBackwardData(const DataList&, const DataList&, ConvBackwardDataClosure&);
+void ConvBackwardFilter(const DataList&, const DataList&, ConvBackwardFilterClosure&);
+void ConvBackwardBias(const DataList&, const DataList&, ConvBackwardBiasClosure&);
+void PoolingForward(const DataList&, const DataList&, PoolingForwardClosure&);
+void PoolingBackward(const DataList&, const DataList&, PoolingBackwardClosure&);
+void LRNForward(const DataList&, const DataList&, LRNForwardClosure&);
+void LRNBackward(const DataList&, const DataList&, LRNBackwardClosure&);
+
+void Quantize(const DataList&, const DataList&, QuantizeClosure&);
+void Dequantize(const DataList&, const DataList&, DequantizeClosure&);
+void QuantizedTransMult(const DataList&, const DataList&, QuantizedTransMultClosure&);
 }  // end of namespace basic
 }  // end of namespace minerva
@@ -23,35 +23,42 @@ INSTALL_COMPUTE_FN(TransposeClosure, basic::Transpose, NO_IMPL, cuda::Transpose)
 INSTALL_COMPUTE_FN(ReductionClosure, basic::Reduction, NO_IMPL, cuda::Reduction);
 INSTALL_COMPUTE_FN(NormArithmeticClosure, basic::NormArithmetic, NO_IMPL, cuda::NormArithmetic);
 INSTALL_COMPUTE_FN(MaxIndexClosure, basic::MaxIndex, NO_IMPL, cuda::MaxIndex);
+INSTALL_COMPUTE_FN(TopKClosure, basic::TopK, NO_IMPL, cuda::TopK);
 INSTALL_COMPUTE_FN(ReshapeClosure, basic::Reshape, NO_IMPL, cuda::Reshape);
 INSTALL_COMPUTE_FN(ElewiseClosure, basic::Elewise, NO_IMPL, cuda::Elewise);
 INSTALL_COMPUTE_FN(SigmoidForwardClosure, basic::SigmoidForward, NO_IMPL, cuda::SigmoidForward);
-INSTALL_COMPUTE_FN(SigmoidBackwardClosure, NO_IMPL, NO_IMPL, cuda::SigmoidBackward);
+INSTALL_COMPUTE_FN(SigmoidBackwardClosure, basic::SigmoidBackward, NO_IMPL, cuda::SigmoidBackward);
 INSTALL_COMPUTE_FN(ReluForwardClosure, basic::ReluForward, NO_IMPL, cuda::ReluForward);
 INSTALL_COMPUTE_FN(ThresholdNormClosure, basic::ThresholdNorm, NO_IMPL, NO_IMPL);
-INSTALL_COMPUTE_FN(ReluBackwardClosure, NO_IMPL, NO_IMPL, cuda::ReluBackward);
+INSTALL_COMPUTE_FN(ReluBackwardClosure, basic::ReluBackward, NO_IMPL, cuda::ReluBackward);
 INSTALL_COMPUTE_FN(TanhForwardClosure, basic::TanhForward, NO_IMPL, cuda::TanhForward);
-INSTALL_COMPUTE_FN(TanhBackwardClosure, NO_IMPL, NO_IMPL, cuda::TanhBackward);
-INSTALL_COMPUTE_FN(ConvForwardClosure, NO_IMPL, NO_IMPL, cuda::ConvForward);
-INSTALL_COMPUTE_FN(ConvBackwardDataClosure, NO_IMPL, NO_IMPL, cuda::ConvBackwardData);
-INSTALL_COMPUTE_FN(ConvBackwardFilterClosure, NO_IMPL, NO_IMPL, cuda::ConvBackwardFilter);
-INSTALL_COMPUTE_FN(ConvBackwardBiasClosure, NO_IMPL, NO_IMPL, cuda::ConvBackwardBias);
+INSTALL_COMPUTE_FN(TanhBackwardClosure, basic::TanhBackward, NO_IMPL, cuda::TanhBackward);
+INSTALL_COMPUTE_FN(ConvForwardClosure, basic::ConvForward, NO_IMPL, cuda::ConvForward);
+INSTALL_COMPUTE_FN(FusedConvForwardClosure, basic::FusedConvForward, NO_IMPL, cuda::FusedConvForward);
+INSTALL_COMPUTE_FN(ConvBackwardDataClosure, basic::ConvBackwardData, NO_IMPL, cuda::ConvBackwardData);
+INSTALL_COMPUTE_FN(ConvBackwardFilterClosure, basic::ConvBackwardFilter, NO_IMPL, cuda::ConvBackwardFilter);
+INSTALL_COMPUTE_FN(ConvBackwardBiasClosure, basic::ConvBackwardBias, NO_IMPL, cuda::ConvBackwardBias);
 INSTALL_COMPUTE_FN(SoftmaxForwardClosure, basic::SoftmaxForward, NO_IMPL, cuda::SoftmaxForward);
-INSTALL_COMPUTE_FN(SoftmaxBackwardClosure, NO_IMPL, NO_IMPL, cuda::SoftmaxBackward);
+INSTALL_COMPUTE_FN(SoftmaxBackwardClosure, basic::SoftmaxBackward, NO_IMPL, cuda::SoftmaxBackward);
 INSTALL_COMPUTE_FN(ActivationForwardClosure, basic::ActivationForward, NO_IMPL, cuda::ActivationForward);
-INSTALL_COMPUTE_FN(ActivationBackwardClosure, NO_IMPL, NO_IMPL, cuda::ActivationBackward);
-INSTALL_COMPUTE_FN(PoolingForwardClosure, NO_IMPL, NO_IMPL, cuda::PoolingForward);
-INSTALL_COMPUTE_FN(PoolingBackwardClosure, NO_IMPL, NO_IMPL, cuda::PoolingBackward);
+INSTALL_COMPUTE_FN(ActivationBackwardClosure, basic::ActivationBackward, NO_IMPL, cuda::ActivationBackward);
+INSTALL_COMPUTE_FN(PoolingForwardClosure, basic::PoolingForward, NO_IMPL, cuda::PoolingForward);
+INSTALL_COMPUTE_FN(PoolingBackwardClosure, basic::PoolingBackward, NO_IMPL, cuda::PoolingBackward);
 INSTALL_COMPUTE_FN(SyncWithPSClosure, basic::SyncWithPS, NO_IMPL, cuda::SyncWithPS);
 
 INSTALL_DATAGEN_FN(ArrayLoaderClosure, basic::ArrayLoader, NO_IMPL, cuda::ArrayLoader);
+INSTALL_DATAGEN_FN(UploadClosure, basic::Upload, NO_IMPL, cuda::Upload);
 INSTALL_DATAGEN_FN(RandnClosure, basic::Randn, NO_IMPL, cuda::Randn);
 INSTALL_DATAGEN_FN(RandBernoulliClosure, basic::RandBernoulli, NO_IMPL, cuda::RandBernoulli);
 INSTALL_DATAGEN_FN(FillClosure, basic::Fill, NO_IMPL, cuda::Fill);
-INSTALL_COMPUTE_FN(LRNForwardClosure, NO_IMPL, NO_IMPL, cuda::LRNForward);
-INSTALL_COMPUTE_FN(LRNBackwardClosure, NO_IMPL, NO_IMPL, cuda::LRNBackward);
+INSTALL_COMPUTE_FN(LRNForwardClosure, basic::LRNForward, NO_IMPL, cuda::LRNForward);
+INSTALL_COMPUTE_FN(LRNBackwardClosure, basic::LRNBackward, NO_IMPL, cuda::LRNBackward);
 INSTALL_COMPUTE_FN(ConcatClosure, NO_IMPL, NO_IMPL, cuda::Concat);
 INSTALL_COMPUTE_FN(SliceClosure, NO_IMPL, NO_IMPL, cuda::Slice);
 INSTALL_COMPUTE_FN(IndexClosure, basic::Index, NO_IMPL, NO_IMPL);
 INSTALL_COMPUTE_FN(SelectClosure, NO_IMPL, NO_IMPL, cuda::Select);
+INSTALL_COMPUTE_FN(ImageNormalizeClosure, basic::ImageNormalize, NO_IMPL, cuda::ImageNormalize);
+INSTALL_COMPUTE_FN(QuantizeClosure, basic::Quantize, NO_IMPL, cuda::Quantize);
+INSTALL_COMPUTE_FN(DequantizeClosure, basic::Dequantize, NO_IMPL, cuda::Dequantize);
+INSTALL_COMPUTE_FN(QuantizedTransMultClosure, basic::QuantizedTransMult, NO_IMPL, cuda::QuantizedTransMult);
 }  // namespace minerva
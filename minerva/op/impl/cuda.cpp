@@ -161,10 +161,15 @@ void MatMult(const DataList& inputs, const DataList& outputs, MatMultClosure& cl
   float* left_data = inputs[0].data_;
   float* right_data = inputs[1].data_;
   float* res_data = outputs[0].data_;
-  int m = inputs[0].size_[0];
-  int k = inputs[0].size_[1];
+  int m = outputs[0].size_[0];
   int n = outputs[0].size_[1];
-  CudaPerformMatMult(left_data, right_data, res_data, m, n, k, context.cublas_handle);
+  if (closure.transpose_left) {
+    int k = inputs[0].size_[0];
+    CudaPerformTransposedMatMult(left_data, right_data, res_data, m, n, k, context.cublas_handle);
+  } else {
+    int k = inputs[0].size_[1];
+    CudaPerformMatMult(left_data, right_data, res_data, m, n, k, context.cublas_handle);
+  }
 }
 
 void ArithmeticConst(const DataList& inputs, const DataList& outputs,
@@ -309,6 +314,19 @@ void MaxIndex(const DataList& inputs, const DataList& outputs,
   }
 }
 
+void TopK(const DataList& inputs, const DataList& outputs, TopKClosure& closure, const Context& context) {
+  CHECK_EQ(inputs.size(), 1) << "TopK kernel wrong #input";
+  CHECK_EQ(outputs.size(), 2) << "TopK kernel wrong #output";
+  auto in_size = inputs[0].size_;
+  int interval = 1;
+  for (int i = 0; i < closure.dim; ++i) {
+    interval *= in_size[i];
+  }
+  int length = in_size[closure.dim];
+  int num_slices = in_size.Prod() / length;
+  CudaPerformTopK(inputs[0].data_, outputs[0].data_, outputs[1].data_, num_slices, interval, length, closure.k, context.stream);
+}
+
 void Reshape(const DataList& inputs, const DataList& outputs, ReshapeClosure&, const Context& context) {
   CHECK_EQ(inputs.size(), 1);
   CHECK_EQ(outputs.size(), 1);
@@ -408,6 +426,37 @@ void ConvForward(const DataList& inputs, const DataList& outputs, ConvForwardClo
   CudaPerformConvForward(bottom.data_, filter.data_, bias.data_, top.data_, num_images, bottom_num_channels, top_num_channels, bottom_height, bottom_width, closure.pad_height, closure.pad_width, closure.stride_vertical, closure.stride_horizontal, filter_height, filter_width, context.stream, context.cudnn_handle);
 }
 
+void FusedConvForward(const DataList& inputs, const DataList& outputs, FusedConvForwardClosure& closure, const Context& context) {
+  CHECK_EQ(inputs.size(), 3) << "(fused conv forward) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(fused conv forward) #outputs wrong";
+  auto& bottom = inputs[0];
+  auto& filter = inputs[1];
+  auto& bias = inputs[2];
+  auto& top = outputs[0];
+  cudnnActivationMode_t activation;
+  switch (closure.algorithm) {
+    case ActivationAlgorithm::kSigmoid:
+      activation = CUDNN_ACTIVATION_SIGMOID;
+      break;
+    case ActivationAlgorithm::kRelu:
+      activation = CUDNN_ACTIVATION_RELU;
+      break;
+    case ActivationAlgorithm::kTanh:
+      activation = CUDNN_ACTIVATION_TANH;
+      break;
+    default:
+      LOG(FATAL) << "activation algorithm not supported";
+  }
+  int num_images = bottom.size_[3];
+  int bottom_num_channels = bottom.size_[2];
+  int top_num_channels = top.size_[2];
+  int bottom_height = bottom.size_[1];
+  int bottom_width = bottom.size_[0];
+  int filter_height = filter.size_[1];
+  int filter_width = filter.size_[0];
+  CudaPerformFusedConvForward(bottom.data_, filter.data_, bias.data_, top.data_, num_images, bottom_num_channels, top_num_channels, bottom_height, bottom_width, closure.pad_height, closure.pad_width, closure.stride_vertical, closure.stride_horizontal, filter_height, filter_width, activation, context.stream, context.cudnn_handle);
+}
+
 void ConvBackwardData(const DataList& inputs, const DataList& outputs, ConvBackwardDataClosure& closure, const Context& context) {
   CHECK_EQ(inputs.size(), 2) << "(conv backward data) #inputs wrong";
   CHECK_EQ(outputs.size(), 1) << "(conv backward data) #outputs wrong";
@@ -596,6 +645,17 @@ void ArrayLoader(const DataList& outputs, ArrayLoaderClosure& closure, const Con
   closure.data.reset();
 }
 
+void Upload(const DataList& outputs, UploadClosure& closure, const Context& context) {
+  CHECK_EQ(outputs.size(), 1) << "(upload) #outputs wrong";
+  CHECK(closure.data) << "probably already executed";
+  // Source is a page-locked staging buffer, so the copy runs on the copy stream
+  // without blocking computation issued on the other streams
+  CUDA_CALL(cudaMemcpyAsync(outputs[0].data_, closure.data.get(), outputs[0].size_.Prod() * sizeof(float), cudaMemcpyHostToDevice, context.copy_stream));
+  CUDA_CALL(cudaStreamSynchronize(context.copy_stream));
+  // Return the staging buffer to its ring
+  closure.data.reset();
+}
+
 void Randn(const DataList& outputs, RandnClosure& closure, const Context&) {
   CHECK_EQ(outputs.size(), 1) << "(normal) #outputs wrong";
   CudaPerformRandn(outputs[0].data_, outputs[0].size_.Prod(), chrono::system_clock::now().time_since_epoch().count(), closure.mu, closure.var);
@@ -654,6 +714,55 @@ void Select(DataList const& inputs, DataList const& outputs, SelectClosure& clos
   CudaPerformSelect(outputs[0].data_, inputs[0].data_, closure.indices, inputs[0].size_[1], inputs[0].size_[0], context.stream);
 }
 
+void ImageNormalize(const DataList& inputs, const DataList& outputs, ImageNormalizeClosure& closure, const Context& context) {
+  CHECK(inputs.size() == 2 || inputs.size() == 3) << "(image normalize) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(image normalize) #outputs wrong";
+  CHECK_GE(inputs[0].size_.Prod() * sizeof(float), closure.src_size.Prod()) << "(image normalize) source too small";
+  float* mean_image = inputs.size() == 3 ? inputs[2].data_ : 0;
+  if (!mean_image) {
+    CHECK_EQ(closure.mean_value.size(), static_cast<size_t>(closure.src_size[2])) << "(image normalize) mean value size wrong";
+  }
+  CudaPerformImageNormalize(outputs[0].data_, reinterpret_cast<const unsigned char*>(inputs[0].data_), inputs[1].data_, mean_image, closure.mean_value, closure.src_size[3], closure.src_size[2], closure.src_size[1], closure.src_size[0], closure.crop_size, context.stream);
+}
+
+
+void Quantize(const DataList& inputs, const DataList& outputs, QuantizeClosure& closure, const Context& context) {
+  CHECK_EQ(inputs.size(), 1) << "(quantize) #inputs wrong";
+  int length = inputs[0].size_.Prod();
+  if (closure.type == QuantizedType::kHalf) {
+    CHECK_EQ(outputs.size(), 1) << "(quantize) #outputs wrong";
+    CudaPerformQuantizeHalf(inputs[0].data_, outputs[0].data_, length, context.stream);
+  } else {
+    CHECK_EQ(outputs.size(), 2) << "(quantize) #outputs wrong";
+    int num_slices = outputs[1].size_.Prod();
+    CudaPerformQuantizeInt8(inputs[0].data_, outputs[0].data_, outputs[1].data_, num_slices, length / num_slices, context.stream);
+  }
+}
+
+void Dequantize(const DataList& inputs, const DataList& outputs, DequantizeClosure& closure, const Context& context) {
+  CHECK_EQ(outputs.size(), 1) << "(dequantize) #outputs wrong";
+  int length = outputs[0].size_.Prod();
+  if (closure.type == QuantizedType::kHalf) {
+    CHECK_EQ(inputs.size(), 1) << "(dequantize) #inputs wrong";
+    CudaPerformDequantizeHalf(inputs[0].data_, outputs[0].data_, length, context.stream);
+  } else {
+    CHECK_EQ(inputs.size(), 2) << "(dequantize) #inputs wrong";
+    int num_slices = inputs[1].size_.Prod();
+    CudaPerformDequantizeInt8(inputs[0].data_, inputs[1].data_, outputs[0].data_, num_slices, length / num_slices, context.stream);
+  }
+}
+
+void QuantizedTransMult(const DataList& inputs, const DataList& outputs, QuantizedTransMultClosure& closure, const Context& context) {
+  bool is_half = closure.type == QuantizedType::kHalf;
+  CHECK_EQ(inputs.size(), is_half ? 2 : 3) << "(quantized matmult) #inputs wrong";
+  CHECK_EQ(outputs.size(), 1) << "(quantized matmult) #outputs wrong";
+  int m = outputs[0].size_[0];
+  int n = outputs[0].size_[1];
+  int o = closure.size[0];
+  float* scale = is_half ? 0 : inputs[1].data_;
+  CudaPerformQuantizedTransMult(inputs[0].data_, scale, inputs.back().data_, outputs[0].data_, m, n, o, context.stream);
+}
+
 }
 #endif
 }
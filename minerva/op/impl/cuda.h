@@ -14,6 +14,7 @@ void Transpose(const DataList&, const DataList&, TransposeClosure&, const Contex
 void NormArithmetic(const DataList&, const DataList&, NormArithmeticClosure&, const Context &);
 void Reduction(const DataList&, const DataList&, ReductionClosure&, const Context&);
 void MaxIndex(const DataList&, const DataList&, MaxIndexClosure&, const Context&);
+void TopK(const DataList&, const DataList&, TopKClosure&, const Context&);
 void Reshape(const DataList&, const DataList&, ReshapeClosure&, const Context&);
 void Elewise(const DataList&, const DataList&, ElewiseClosure&, const Context&);
 void SigmoidForward(const DataList&, const DataList&, SigmoidForwardClosure&, const Context&);
@@ -23,6 +24,7 @@ void ReluBackward(const DataList&, const DataList&, ReluBackwardClosure&, const
 void TanhForward(const DataList&, const DataList&, TanhForwardClosure&, const Context&);
 void TanhBackward(const DataList&, const DataList&, TanhBackwardClosure&, const Context&);
 void ConvForward(const DataList&, const DataList&, ConvForwardClosure&, const Context&);
+void FusedConvForward(const DataList&, const DataList&, FusedConvForwardClosure&, const Context&);
 void ConvBackwardData(const DataList&, const DataList&, ConvBackwardDataClosure&, const Context&);
 void ConvBackwardFilter(const DataList&, const DataList&, ConvBackwardFilterClosure&, const Context&);
 void ConvBackwardBias(const DataList&, const DataList&, ConvBackwardBiasClosure&, const Context&);
@@ -35,6 +37,7 @@ void PoolingBackward(const DataList&, const DataList&, PoolingBackwardClosure&,
 void SyncWithPS(const DataList& inputs, const DataList& outputs, SyncWithPSClosure& closure, const Context&);
 
 void ArrayLoader(const DataList&, ArrayLoaderClosure& closure, const Context&);
+void Upload(const DataList&, UploadClosure& closure, const Context&);
 void Randn(const DataList&, RandnClosure&, const Context&);
 void RandBernoulli(const DataList&, RandBernoulliClosure&, const Context&);
 void Fill(const DataList&, FillClosure&, const Context&);
@@ -46,6 +49,10 @@ void Slice(const DataList&, const DataList&, SliceClosure&, const Context&);
 void Index(const DataList&, const DataList&, IndexClosure&, const Context&);
 
 void Select(DataList const&, DataList const&, SelectClosure&, Context const&);
+void ImageNormalize(const DataList&, const DataList&, ImageNormalizeClosure&, const Context&);
+void Quantize(const DataList&, const DataList&, QuantizeClosure&, const Context&);
+void Dequantize(const DataList&, const DataList&, DequantizeClosure&, const Context&);
+void QuantizedTransMult(const DataList&, const DataList&, QuantizedTransMultClosure&, const Context&);
 
 }
 #endif
@@ -1,5 +1,6 @@
 #pragma once
 #include <curand_kernel.h>
+#include "common/half.h"
 
 // Unary functions
 class ExpOp {
@@ -197,6 +198,45 @@ __global__ static void CudaPerformMaxIndexOnRowKernel(float* matrix, float* col,
   }
 }
 
+// Largest k supported by CudaPerformTopKKernel, whose per-thread buffers live in registers
+const int kCudaMaxTopK = 32;
+
+// values, indices = TopKOp(matrix)
+// Each thread selects from one slice, whose `length` elements are `interval` apart, by keeping the k largest
+// elements seen so far sorted in descending order
+__global__ static void CudaPerformTopKKernel(float* matrix, float* values, float* indices, int num_slices, int interval, int length, int k) {
+  int slice_id = threadIdx.x + blockIdx.x * blockDim.x;
+  int step = gridDim.x * blockDim.x;
+  float vals[kCudaMaxTopK];
+  int idxs[kCudaMaxTopK];
+  while (slice_id < num_slices) {
+    int outer = slice_id / interval;
+    int inner = slice_id % interval;
+    float* src = matrix + outer * length * interval + inner;
+    int filled = 0;
+    for (int i = 0; i < length; ++i) {
+      float v = src[i * interval];
+      if (filled == k && !(vals[k - 1] < v)) {
+        continue;
+      }
+      int pos = filled < k ? filled++ : k - 1;
+      while (pos > 0 && vals[pos - 1] < v) {
+        vals[pos] = vals[pos - 1];
+        idxs[pos] = idxs[pos - 1];
+        --pos;
+      }
+      vals[pos] = v;
+      idxs[pos] = i;
+    }
+    int dst = outer * k * interval + inner;
+    for (int j = 0; j < k; ++j) {
+      values[dst + j * interval] = vals[j];
+      indices[dst + j * interval] = idxs[j];
+    }
+    slice_id += step;
+  }
+}
+
 __global__ static void CudaPerformRandBernoulliKernel(float* dst, size_t size, unsigned int seed, float p) {
   int step = gridDim.x * blockDim.x;
   int cur = threadIdx.x + blockIdx.x * blockDim.x;
@@ -341,3 +381,107 @@ __global__ void SelectKernel(float * dst, float* src, int* indices, size_t cols,
   }
 }
 
+struct ChannelMean {
+  static const int kMaxChannels = 4;
+  float val[kMaxChannels];
+};
+
+__global__ static void ImageNormalizeKernel(float* dst, const unsigned char* src, const float* crop_info, const float* mean_image, ChannelMean mean, int num_images, int channels, int height, int width, int crop_size) {
+  int loc = threadIdx.x + blockIdx.x * blockDim.x;
+  int step = blockDim.x * gridDim.x;
+  int end = crop_size * crop_size * channels * num_images;
+  while (loc < end) {
+    int x = loc % crop_size;
+    int y = loc / crop_size % crop_size;
+    int c = loc / (crop_size * crop_size) % channels;
+    int n = loc / (crop_size * crop_size * channels);
+    // The offsets are on the device and cannot be checked by the caller, so bad ones are clamped
+    int crop_h = min(max(static_cast<int>(crop_info[n * 3]), 0), height - crop_size);
+    int crop_w = min(max(static_cast<int>(crop_info[n * 3 + 1]), 0), width - crop_size);
+    int h = crop_h + y;
+    int w = crop_w + (crop_info[n * 3 + 2] != 0 ? crop_size - 1 - x : x);
+    float m = mean_image ? mean_image[(c * height + h) * width + w] : mean.val[c];
+    dst[loc] = src[((n * channels + c) * height + h) * width + w] - m;
+    loc += step;
+  }
+}
+
+__global__ static void QuantizeHalfKernel(const float* src, uint16_t* dst, int length) {
+  int loc = threadIdx.x + blockIdx.x * blockDim.x;
+  int step = blockDim.x * gridDim.x;
+  // The thread writing the last value also clears the padding of the packed array
+  if (loc == 0 && length % 2) {
+    dst[length] = 0;
+  }
+  while (loc < length) {
+    dst[loc] = minerva::FloatToHalf(src[loc]);
+    loc += step;
+  }
+}
+
+// One thread per slice, which is fine for the few hundred output channels of a weight
+__global__ static void QuantizeInt8Kernel(const float* src, int8_t* dst, float* scale, int num_slices, int slice_length) {
+  int s = threadIdx.x + blockIdx.x * blockDim.x;
+  int step = blockDim.x * gridDim.x;
+  if (s == 0) {
+    for (int i = num_slices * slice_length; i % 4; ++i) {
+      dst[i] = 0;
+    }
+  }
+  while (s < num_slices) {
+    const float* in = src + s * slice_length;
+    float max_abs = 0;
+    for (int i = 0; i < slice_length; ++i) {
+      max_abs = fmaxf(max_abs, fabsf(in[i]));
+    }
+    scale[s] = max_abs / 127;
+    float inv_scale = max_abs > 0 ? 127 / max_abs : 0;
+    for (int i = 0; i < slice_length; ++i) {
+      dst[s * slice_length + i] = static_cast<int8_t>(fmaxf(-127.0f, fminf(127.0f, roundf(in[i] * inv_scale))));
+    }
+    s += step;
+  }
+}
+
+__global__ static void DequantizeHalfKernel(const uint16_t* src, float* dst, int length) {
+  int loc = threadIdx.x + blockIdx.x * blockDim.x;
+  int step = blockDim.x * gridDim.x;
+  while (loc < length) {
+    dst[loc] = minerva::HalfToFloat(src[loc]);
+    loc += step;
+  }
+}
+
+__global__ static void DequantizeInt8Kernel(const int8_t* src, const float* scale, float* dst, int length, int slice_length) {
+  int loc = threadIdx.x + blockIdx.x * blockDim.x;
+  int step = blockDim.x * gridDim.x;
+  while (loc < length) {
+    dst[loc] = src[loc] * scale[loc / slice_length];
+    loc += step;
+  }
+}
+
+__device__ inline float Dequantized(uint16_t v) {
+  return minerva::HalfToFloat(v);
+}
+
+__device__ inline float Dequantized(int8_t v) {
+  return v;
+}
+
+// res = dequantize(left)^T * right, one thread per element of res
+template<typename T>
+__global__ static void QuantizedTransMultKernel(const T* left, const float* scale, const float* right, float* res, int m, int n, int o) {
+  int loc = threadIdx.x + blockIdx.x * blockDim.x;
+  int step = blockDim.x * gridDim.x;
+  while (loc < m * n) {
+    int i = loc % m;
+    int j = loc / m;
+    float sum = 0;
+    for (int k = 0; k < o; ++k) {
+      sum += Dequantized(left[k + i * o]) * right[k + j * o];
+    }
+    res[loc] = scale ? sum * scale[i] : sum;
+    loc += step;
+  }
+}
@@ -69,6 +69,12 @@ void CudaPerformMatMult(float* a, float* b, float* c, int m, int n, int k, cubla
   CUBLAS_CALL(cublasSgemm(handle, CUBLAS_OP_N, CUBLAS_OP_N, m, n, k, &one, a, m, b, k, &zero, c, m));
 }
 
+void CudaPerformTransposedMatMult(float* a, float* b, float* c, int m, int n, int k, cublasHandle_t handle) {
+  float one = 1.0;
+  float zero = 0.0;
+  CUBLAS_CALL(cublasSgemm(handle, CUBLAS_OP_T, CUBLAS_OP_N, m, n, k, &one, a, k, b, k, &zero, c, m));
+}
+
 void CudaPerformScale(float* in_data, float* res_data, size_t size, float val, cublasHandle_t handle) {
   CUBLAS_CALL(cublasScopy(handle, size, in_data, 1, res_data, 1));
   CUBLAS_CALL(cublasSscal(handle, size, &val, res_data, 1));
@@ -199,6 +205,14 @@ void CudaPerformMaxIndexOnRow(float* in, float* out, int m, int n, cudaStream_t
   CheckCudaError("CudaPerformMaxIndexOnRow");
 }
 
+void CudaPerformTopK(float* in, float* values, float* indices, int num_slices, int interval, int length, int k, cudaStream_t stream) {
+  CHECK_LE(k, kCudaMaxTopK) << "k too large for top k";
+  int block, thread;
+  FindConfiguration(num_slices, block, thread);
+  CudaPerformTopKKernel<<<block, thread, 0, stream>>>(in, values, indices, num_slices, interval, length, k);
+  CheckCudaError("CudaPerformTopK");
+}
+
 void CudaPerformReshape(float* in, float* out, size_t size, cudaStream_t stream) {
   CUDA_CALL(cudaMemcpyAsync(out, in, size, cudaMemcpyDefault, stream));
 }
@@ -224,7 +238,8 @@ void CudaPerformElewiseNegative(float* in, float* out, size_t size, cudaStream_t
   CheckCudaError("CudaPerformEleWiseNegative");
 }
 
-void CudaPerformConvForward(float* bottom, float* filter, float* bias, float* top, int num_images, int bottom_num_channels, int top_num_channels, int bottom_height, int bottom_width, int pad_height, int pad_width, int stride_vertical, int stride_horizontal, int filter_height, int filter_width, cudaStream_t stream, cudnnHandle_t handle) {
+// Convolution plus bias, followed by the activation in place if `activation` is given
+static void ConvForwardWithActivation(float* bottom, float* filter, float* bias, float* top, int num_images, int bottom_num_channels, int top_num_channels, int bottom_height, int bottom_width, int pad_height, int pad_width, int stride_vertical, int stride_horizontal, int filter_height, int filter_width, const cudnnActivationMode_t* activation, cudaStream_t stream, cudnnHandle_t handle) {
   cudnnTensorDescriptor_t bottom_desc;
   cudnnFilterDescriptor_t filter_desc;
   cudnnTensorDescriptor_t bias_desc;
@@ -253,6 +268,9 @@ void CudaPerformConvForward(float* bottom, float* filter, float* bias, float* to
   CUDA_CALL(cudaMalloc(&workspace, workspace_size));
   CUDNN_CALL(cudnnConvolutionForward(handle, &one, bottom_desc, bottom, filter_desc, filter, conv_desc, algorithm, workspace, workspace_size, &zero, top_desc, top));
   CUDNN_CALL(cudnnAddTensor(handle, CUDNN_ADD_SAME_C, &one, bias_desc, bias, &one, top_desc, top));
+  if (activation) {
+    CUDNN_CALL(cudnnActivationForward(handle, *activation, &one, top_desc, top, &zero, top_desc, top));
+  }
   CUDA_CALL(cudaStreamSynchronize(stream));  // Synchronize before destruction
 
   CUDA_CALL(cudaFree(workspace));
@@ -263,6 +281,14 @@ void CudaPerformConvForward(float* bottom, float* filter, float* bias, float* to
   CUDNN_CALL(cudnnDestroyTensorDescriptor(bottom_desc));
 }
 
+void CudaPerformConvForward(float* bottom, float* filter, float* bias, float* top, int num_images, int bottom_num_channels, int top_num_channels, int bottom_height, int bottom_width, int pad_height, int pad_width, int stride_vertical, int stride_horizontal, int filter_height, int filter_width, cudaStream_t stream, cudnnHandle_t handle) {
+  ConvForwardWithActivation(bottom, filter, bias, top, num_images, bottom_num_channels, top_num_channels, bottom_height, bottom_width, pad_height, pad_width, stride_vertical, stride_horizontal, filter_height, filter_width, nullptr, stream, handle);
+}
+
+void CudaPerformFusedConvForward(float* bottom, float* filter, float* bias, float* top, int num_images, int bottom_num_channels, int top_num_channels, int bottom_height, int bottom_width, int pad_height, int pad_width, int stride_vertical, int stride_horizontal, int filter_height, int filter_width, cudnnActivationMode_t activation, cudaStream_t stream, cudnnHandle_t handle) {
+  ConvForwardWithActivation(bottom, filter, bias, top, num_images, bottom_num_channels, top_num_channels, bottom_height, bottom_width, pad_height, pad_width, stride_vertical, stride_horizontal, filter_height, filter_width, &activation, stream, handle);
+}
+
 void CudaPerformConvBackwardData(float* top_diff, float* filter, float* bottom_diff, int num_images, int bottom_num_channels, int top_num_channels, int top_height, int top_width, int pad_height, int pad_width, int stride_vertical, int stride_horizontal, int filter_height, int filter_width, cudaStream_t stream, cudnnHandle_t handle) {
   cudnnTensorDescriptor_t bottom_diff_desc;
   cudnnFilterDescriptor_t filter_desc;
@@ -677,6 +703,59 @@ void CudaPerformSelect(float* dst, float* src, std::vector<int> indices, size_t
   CheckCudaError("Select");
 }
 
+void CudaPerformImageNormalize(float* dst, const unsigned char* src, const float* crop_info, const float* mean_image, const std::vector<float>& mean_value, int num_images, int channels, int height, int width, int crop_size, cudaStream_t stream) {
+  int block, thread;
+  int size = crop_size * crop_size * channels * num_images;
+  FindConfiguration(size, block, thread);
+  // Per-channel mean is passed by value, so no device allocation is needed
+  ChannelMean mean;
+  CHECK(mean_image || mean_value.size() <= ChannelMean::kMaxChannels) << "too many channels for mean value";
+  for (size_t i = 0; i < mean_value.size() && i < ChannelMean::kMaxChannels; ++i) {
+    mean.val[i] = mean_value[i];
+  }
+  ImageNormalizeKernel<<<block, thread, 0, stream>>>(dst, src, crop_info, mean_image, mean, num_images, channels, height, width, crop_size);
+  CheckCudaError("ImageNormalize");
+}
+
+void CudaPerformQuantizeHalf(const float* src, float* packed, int length, cudaStream_t stream) {
+  int block, thread;
+  FindConfiguration(length, block, thread);
+  QuantizeHalfKernel<<<block, thread, 0, stream>>>(src, reinterpret_cast<uint16_t*>(packed), length);
+  CheckCudaError("CudaPerformQuantizeHalf");
+}
+
+void CudaPerformQuantizeInt8(const float* src, float* packed, float* scale, int num_slices, int slice_length, cudaStream_t stream) {
+  int block, thread;
+  FindConfiguration(num_slices, block, thread);
+  QuantizeInt8Kernel<<<block, thread, 0, stream>>>(src, reinterpret_cast<int8_t*>(packed), scale, num_slices, slice_length);
+  CheckCudaError("CudaPerformQuantizeInt8");
+}
+
+void CudaPerformDequantizeHalf(const float* packed, float* dst, int length, cudaStream_t stream) {
+  int block, thread;
+  FindConfiguration(length, block, thread);
+  DequantizeHalfKernel<<<block, thread, 0, stream>>>(reinterpret_cast<const uint16_t*>(packed), dst, length);
+  CheckCudaError("CudaPerformDequantizeHalf");
+}
+
+void CudaPerformDequantizeInt8(const float* packed, const float* scale, float* dst, int num_slices, int slice_length, cudaStream_t stream) {
+  int block, thread;
+  FindConfiguration(num_slices * slice_length, block, thread);
+  DequantizeInt8Kernel<<<block, thread, 0, stream>>>(reinterpret_cast<const int8_t*>(packed), scale, dst, num_slices * slice_length, slice_length);
+  CheckCudaError("CudaPerformDequantizeInt8");
+}
+
+void CudaPerformQuantizedTransMult(const float* packed, const float* scale, const float* right, float* res, int m, int n, int o, cudaStream_t stream) {
+  int block, thread;
+  FindConfiguration(m * n, block, thread);
+  if (scale) {
+    QuantizedTransMultKernel<<<block, thread, 0, stream>>>(reinterpret_cast<const int8_t*>(packed), scale, right, res, m, n, o);
+  } else {
+    QuantizedTransMultKernel<<<block, thread, 0, stream>>>(reinterpret_cast<const uint16_t*>(packed), scale, right, res, m, n, o);
+  }
+  CheckCudaError("CudaPerformQuantizedTransMult");
+}
+
 }  // namespace cuda
 }  // namespace minerva
 
@@ -15,6 +15,7 @@ void CudaPerformAdd(float* a, float* b, float* c, size_t, cudaStream_t);
 void CudaPerformCopy(float* a, float* b, size_t, cublasHandle_t);
 void CudaPerformSub(float* a, float* b, float* c, size_t, cublasHandle_t);
 void CudaPerformMatMult(float*, float*, float*, int, int, int, cublasHandle_t);
+void CudaPerformTransposedMatMult(float*, float*, float*, int, int, int, cublasHandle_t);
 void CudaPerformScale(float* in_data, float* res_data, size_t, float val, cublasHandle_t);
 void CudaPerformTranspose(float* a, float* c, int m, int n, cublasHandle_t);
 
@@ -39,6 +40,7 @@ void CudaPerformReductionMaxOnRow(float* in, float* out, int m, int n, cudaStrea
 
 void CudaPerformMaxIndexOnCol(float* in, float* out, int m, int n, cudaStream_t);
 void CudaPerformMaxIndexOnRow(float* in, float* out, int m, int n, cudaStream_t);
+void CudaPerformTopK(float* in, float* values, float* indices, int num_slices, int interval, int length, int k, cudaStream_t);
 
 void CudaPerformReshape(float* in, float* out, size_t size, cudaStream_t);
 
@@ -47,6 +49,7 @@ void CudaPerformElewiseLn(float* in, float* out, size_t size, cudaStream_t);
 void CudaPerformElewiseNegative(float* in, float* out, size_t size, cudaStream_t);
 
 void CudaPerformConvForward(float* bottom, float* filter, float* bias, float* top, int num_images, int bottom_num_channels, int top_num_channels, int bottom_height, int bottom_width, int pad_height, int pad_width, int stride_vertical, int stride_horizontal, int filter_height, int filter_width, cudaStream_t stream, cudnnHandle_t handle);
+void CudaPerformFusedConvForward(float* bottom, float* filter, float* bias, float* top, int num_images, int bottom_num_channels, int top_num_channels, int bottom_height, int bottom_width, int pad_height, int pad_width, int stride_vertical, int stride_horizontal, int filter_height, int filter_width, cudnnActivationMode_t activation, cudaStream_t stream, cudnnHandle_t handle);
 void CudaPerformConvBackwardData(float* top_diff, float* filter, float* bottom_diff, int num_images, int bottom_num_channels, int top_num_channels, int top_height, int top_width, int pad_height, int pad_width, int stride_vertical, int stride_horizontal, int filter_height, int filter_width, cudaStream_t stream, cudnnHandle_t handle);
 void CudaPerformConvBackwardFilter(float* bottom, float* top_diff, float* filter_diff, int num_images, int bottom_num_channels, int top_num_channels, int bottom_height, int bottom_width, int pad_height, int pad_width, int stride_vertical, int stride_horizontal, int filter_height, int filter_width, cudaStream_t stream, cudnnHandle_t handle);
 void CudaPerformConvBackwardBias(float* top_diff, float* bias_diff, int num_images, int top_num_channels, int top_height, int top_width, cudaStream_t stream, cudnnHandle_t handle);
@@ -75,6 +78,15 @@ void CudaPerformLRNBackward(float* bottom_data, float* top_data, float* scale, f
 
 void CudaPerformSelect(float* dst, float* src, std::vector<int> indices, size_t cols, size_t rows, cudaStream_t );
 
+void CudaPerformImageNormalize(float* dst, const unsigned char* src, const float* crop_info, const float* mean_image, const std::vector<float>& mean_value, int num_images, int channels, int height, int width, int crop_size, cudaStream_t);
+
+// Quantized values are packed into float arrays; a null scale means half precision
+void CudaPerformQuantizeHalf(const float* src, float* packed, int length, cudaStream_t);
+void CudaPerformQuantizeInt8(const float* src, float* packed, float* scale, int num_slices, int slice_length, cudaStream_t);
+void CudaPerformDequantizeHalf(const float* packed, float* dst, int length, cudaStream_t);
+void CudaPerformDequantizeInt8(const float* packed, const float* scale, float* dst, int num_slices, int slice_length, cudaStream_t);
+void CudaPerformQuantizedTransMult(const float* packed, const float* scale, const float* right, float* res, int m, int n, int o, cudaStream_t);
+
 } // end of namespace cuda
 } // end of namespace minerva
 
@@ -1,5 +1,7 @@
 #pragma once
 #include <memory>
+#include <string>
+#include <typeinfo>
 #include "common/scale.h"
 
 namespace minerva {
@@ -13,11 +15,15 @@ struct PhysicalData {
   uint64_t device_id;
   uint64_t data_id;
   int extern_rc = 0;
+  // Type of the op that computes the data, kept for memory snapshots
+  const std::type_info* creator = nullptr;
 };
 
 struct PhysicalOp {
   std::shared_ptr<ComputeFn> compute_fn;
   uint64_t device_id;
+  // Tag of the thread that created the op, null if none
+  std::shared_ptr<const std::string> tag;
 };
 
 }  // end of namespace minerva
@@ -24,6 +24,9 @@ class PhyDataGenFnWithClosure : public ComputeFn, public ClosureTrait<Closure> {
   void Execute(const DataList&, const DataList& outputs, const Context& context) {
     FnBundle<Closure>::Call(outputs, ClosureTrait<Closure>::closure, context);
   }
+  OpCost Cost(const DataList&, const DataList& outputs) const {
+    return {0, NumElements(outputs) * sizeof(float)};
+  }
 };
 
 }
@@ -9,6 +9,17 @@
 
 namespace minerva {
 
+// Ops that only move data
+inline OpCost CopyCost(const DataList& inputs, const DataList& outputs) {
+  return {0, (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+}
+
+// Multiply-adds of a convolution between `top` and `filter`, both in
+// Minerva's order ({width, height, channels, num}); the same for the gradients
+inline double ConvFlops(const Scale& top, const Scale& filter) {
+  return 2.0 * top.Prod() * filter.Prod() / filter[3];
+}
+
 // Data generate functions
 
 class ArrayLoaderOp : public PhyDataGenFnWithClosure<ArrayLoaderClosure> {
@@ -18,6 +29,13 @@ class ArrayLoaderOp : public PhyDataGenFnWithClosure<ArrayLoaderClosure> {
   }
 };
 
+class UploadOp : public PhyDataGenFnWithClosure<UploadClosure> {
+ public:
+  std::string Name() const {
+    return ":upload";
+  }
+};
+
 class RandnOp : public PhyDataGenFnWithClosure<RandnClosure> {
  public:
   std::string Name() const {
@@ -52,7 +70,11 @@ public:
 class MatMultOp : public ComputeFnWithClosure<MatMultClosure> {
  public:
   std::string Name() const {
-    return "*";
+    return closure.transpose_left ? "trans *" : "*";
+  }
+  // The right operand is {k, n} whether or not the left one is transposed
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return {2.0 * outputs[0].size_.Prod() * inputs[1].size_[0], (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
   }
 };
 
@@ -61,6 +83,9 @@ class TransOp : public ComputeFnWithClosure<TransposeClosure> {
   std::string Name() const {
     return "trans";
   }
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return CopyCost(inputs, outputs);
+  }
 };
 
 class ReductionOp : public ComputeFnWithClosure<ReductionClosure> {
@@ -74,6 +99,9 @@ class ReductionOp : public ComputeFnWithClosure<ReductionClosure> {
    }
    return "reduction N/A";
   }
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return {NumElements(inputs), (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+  }
 };
 
 class MaxIndexOp : public ComputeFnWithClosure<MaxIndexClosure> {
@@ -81,6 +109,19 @@ class MaxIndexOp : public ComputeFnWithClosure<MaxIndexClosure> {
   std::string Name() const {
     return "max index";
   }
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return {NumElements(inputs), (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+  }
+};
+
+class TopKOp : public ComputeFnWithClosure<TopKClosure> {
+ public:
+  std::string Name() const {
+    return "top k";
+  }
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return {NumElements(inputs), (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+  }
 };
 
 class ReshapeOp : public ComputeFnWithClosure<ReshapeClosure> {
@@ -88,6 +129,9 @@ class ReshapeOp : public ComputeFnWithClosure<ReshapeClosure> {
   std::string Name() const {
     return "reshape";
   }
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return CopyCost(inputs, outputs);
+  }
 };
 
 class ElewiseOp : public ComputeFnWithClosure<ElewiseClosure> {
@@ -216,6 +260,37 @@ class ConvForwardOp : public ComputeFnWithClosure<ConvForwardClosure> {
     ss << " conv ff";
     return ss.str();
   }
+  // Inputs are the bottom, the filter and the bias
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    double top = outputs[0].size_.Prod();
+    return {ConvFlops(outputs[0].size_, inputs[1].size_) + top, (NumElements(inputs) + top) * sizeof(float)};
+  }
+};
+
+class FusedConvForwardOp : public ComputeFnWithClosure<FusedConvForwardClosure> {
+ public:
+  std::string Name() const {
+    std::stringstream ss;
+    ss << "pad:" << closure.pad_height << "*" << closure.pad_width;
+    ss << " stride:" << closure.stride_vertical << "*" << closure.stride_horizontal;
+    switch (closure.algorithm) {
+      case ActivationAlgorithm::kSigmoid:
+        ss << " conv sigmoid ff";
+        break;
+      case ActivationAlgorithm::kRelu:
+        ss << " conv relu ff";
+        break;
+      case ActivationAlgorithm::kTanh:
+        ss << " conv tanh ff";
+        break;
+    }
+    return ss.str();
+  }
+  // The activation adds a flop per output element to the bias
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    double top = outputs[0].size_.Prod();
+    return {ConvFlops(outputs[0].size_, inputs[1].size_) + 2 * top, (NumElements(inputs) + top) * sizeof(float)};
+  }
 };
 
 class ConvBackwardDataOp : public ComputeFnWithClosure<ConvBackwardDataClosure> {
@@ -227,6 +302,10 @@ class ConvBackwardDataOp : public ComputeFnWithClosure<ConvBackwardDataClosure>
     ss << " conv bp data";
     return ss.str();
   }
+  // Inputs are the top diff and the filter
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return {ConvFlops(inputs[0].size_, inputs[1].size_), (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+  }
 };
 
 class ConvBackwardFilterOp : public ComputeFnWithClosure<ConvBackwardFilterClosure> {
@@ -238,6 +317,10 @@ class ConvBackwardFilterOp : public ComputeFnWithClosure<ConvBackwardFilterClosu
     ss << " conv bp filter";
     return ss.str();
   }
+  // Inputs are the top diff and the bottom, the output is the filter
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return {ConvFlops(inputs[0].size_, outputs[0].size_), (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+  }
 };
 
 class ConvBackwardBiasOp : public ComputeFnWithClosure<ConvBackwardBiasClosure> {
@@ -245,6 +328,9 @@ class ConvBackwardBiasOp : public ComputeFnWithClosure<ConvBackwardBiasClosure>
   std::string Name() const {
     return "conv bp bias";
   }
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return {NumElements(inputs), (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+  }
 };
 
 class SoftmaxForwardOp : public ComputeFnWithClosure<SoftmaxForwardClosure> {
@@ -319,6 +405,9 @@ class PoolingForwardOp : public ComputeFnWithClosure<PoolingForwardClosure> {
     ss << " stride:" << closure.stride_horizontal << "*" << closure.stride_vertical;
     return ss.str();
   }
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return {NumElements(outputs) * closure.height * closure.width, (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+  }
 };
 
 class PoolingBackwardOp : public ComputeFnWithClosure<PoolingBackwardClosure> {
@@ -337,6 +426,41 @@ class PoolingBackwardOp : public ComputeFnWithClosure<PoolingBackwardClosure> {
     ss << " stride:" << closure.stride_horizontal << "*" << closure.stride_vertical;
     return ss.str();
   }
+  // Inputs are the top diff, the top and the bottom
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return {2.0 * inputs[0].size_.Prod() * closure.height * closure.width, (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+  }
+};
+
+class ImageNormalizeOp : public ComputeFnWithClosure<ImageNormalizeClosure> {
+ public:
+  std::string Name() const {
+    return "image normalize";
+  }
+};
+
+class QuantizeOp : public ComputeFnWithClosure<QuantizeClosure> {
+ public:
+  std::string Name() const {
+    return closure.type == QuantizedType::kHalf ? "quantize fp16" : "quantize int8";
+  }
+};
+
+class DequantizeOp : public ComputeFnWithClosure<DequantizeClosure> {
+ public:
+  std::string Name() const {
+    return closure.type == QuantizedType::kHalf ? "dequantize fp16" : "dequantize int8";
+  }
+};
+
+class QuantizedTransMultOp : public ComputeFnWithClosure<QuantizedTransMultClosure> {
+ public:
+  std::string Name() const {
+    return closure.type == QuantizedType::kHalf ? "trans fp16 *" : "trans int8 *";
+  }
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return {2.0 * outputs[0].size_.Prod() * closure.size[0], (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+  }
 };
 
 class LRNForwardOp : public ComputeFnWithClosure<LRNForwardClosure> {
@@ -344,6 +468,10 @@ class LRNForwardOp : public ComputeFnWithClosure<LRNForwardClosure> {
   std::string Name() const {
     return "LRN Forward";
   }
+  // A multiply-add per neighbouring channel of each element
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return {2.0 * NumElements(outputs) * closure.local_size, (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+  }
 };
 
 class LRNBackwardOp : public ComputeFnWithClosure<LRNBackwardClosure> {
@@ -351,6 +479,10 @@ class LRNBackwardOp : public ComputeFnWithClosure<LRNBackwardClosure> {
   std::string Name() const {
     return "LRN Backward";
   }
+  // A multiply-add per neighbouring channel of each element
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return {2.0 * NumElements(outputs) * closure.local_size, (NumElements(inputs) + NumElements(outputs)) * sizeof(float)};
+  }
 };
 
 class ConcatOp : public ComputeFnWithClosure<ConcatClosure> {
@@ -358,6 +490,9 @@ class ConcatOp : public ComputeFnWithClosure<ConcatClosure> {
   std::string Name() const {
     return "Concat";
   }
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return CopyCost(inputs, outputs);
+  }
 };
 
 class SliceOp : public ComputeFnWithClosure<SliceClosure> {
@@ -365,6 +500,9 @@ class SliceOp : public ComputeFnWithClosure<SliceClosure> {
   std::string Name() const {
     return "Slice";
   }
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return CopyCost(inputs, outputs);
+  }
 };
 
 class IndexOp : public ComputeFnWithClosure<IndexClosure> {
@@ -372,6 +510,9 @@ class IndexOp : public ComputeFnWithClosure<IndexClosure> {
   std::string Name() const {
     return "Index";
   }
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return CopyCost(inputs, outputs);
+  }
 };
 
 class SelectOp : public ComputeFnWithClosure<SelectClosure> {
@@ -379,6 +520,9 @@ class SelectOp : public ComputeFnWithClosure<SelectClosure> {
   std::string Name() const {
     return "Select";
   }
+  OpCost Cost(const DataList& inputs, const DataList& outputs) const {
+    return CopyCost(inputs, outputs);
+  }
 };
 
 }  // namespace minerva
@@ -0,0 +1,161 @@
+#include "profiler/dag_recorder.h"
+#include <iomanip>
+
+using namespace std;
+
+namespace minerva {
+
+namespace {
+
+string Escape(const string& s) {
+  string ret;
+  for (auto c : s) {
+    if (c == '"' || c == '\\') {
+      ret += '\\';
+    }
+    ret += c;
+  }
+  return ret;
+}
+
+void WriteTime(ostream& os, double t) {
+  if (t < 0) {
+    os << "null";
+  } else {
+    os << t;
+  }
+}
+
+void WriteIds(ostream& os, const vector<uint64_t>& ids) {
+  os << "[";
+  for (size_t i = 0; i < ids.size(); ++i) {
+    os << (i == 0 ? "" : ",") << ids[i];
+  }
+  os << "]";
+}
+
+}  // namespace
+
+DagRecorder::DagRecorder() : enabled_(false), epoch_(Clock::now()) {
+}
+
+DagRecorder::~DagRecorder() {
+}
+
+void DagRecorder::Enable() {
+  Clear();
+  enabled_ = true;
+}
+
+void DagRecorder::Disable() {
+  enabled_ = false;
+}
+
+void DagRecorder::Clear() {
+  lock_guard<mutex> lck(mutex_);
+  ops_.clear();
+  data_.clear();
+}
+
+double DagRecorder::Time(Clock::time_point t) const {
+  return chrono::duration<double, micro>(t - epoch_).count();
+}
+
+void DagRecorder::RecordOp(PhysicalOpNode* node) {
+  Op op;
+  op.name = node->op_.compute_fn->Name();
+  op.device_id = node->op_.device_id;
+  op.created = Time(Clock::now());
+  lock_guard<mutex> lck(mutex_);
+  for (auto i : node->inputs_) {
+    op.inputs.push_back(i->node_id_);
+    if (!data_.count(i->node_id_)) {
+      // Computed before the recording started
+      auto& d = data_[i->node_id_];
+      d.device_id = i->data_.device_id;
+      d.size = i->data_.size;
+    }
+  }
+  for (auto o : node->outputs_) {
+    op.outputs.push_back(o->node_id_);
+    auto& d = data_[o->node_id_];
+    d.device_id = o->data_.device_id;
+    d.size = o->data_.size;
+    d.producer = node->node_id_;
+  }
+  ops_[node->node_id_] = move(op);
+}
+
+void DagRecorder::RecordDispatch(uint64_t node_id, Clock::time_point t) {
+  lock_guard<mutex> lck(mutex_);
+  auto it = ops_.find(node_id);
+  if (it != ops_.end()) {
+    it->second.dispatched = Time(t);
+  }
+}
+
+void DagRecorder::RecordExecution(uint64_t node_id, Clock::time_point start, Clock::time_point compute_start, Clock::time_point end) {
+  lock_guard<mutex> lck(mutex_);
+  auto it = ops_.find(node_id);
+  if (it != ops_.end()) {
+    it->second.started = Time(start);
+    it->second.compute_started = Time(compute_start);
+    it->second.finished = Time(end);
+  }
+}
+
+void DagRecorder::RecordFree(uint64_t node_id, Clock::time_point t) {
+  lock_guard<mutex> lck(mutex_);
+  auto it = data_.find(node_id);
+  if (it != data_.end()) {
+    it->second.freed = Time(t);
+  }
+}
+
+void DagRecorder::ExportJson(ostream& os) {
+  lock_guard<mutex> lck(mutex_);
+  os << fixed << setprecision(3) << "{\"ops\":[";
+  bool first = true;
+  for (auto& it : ops_) {
+    auto& op = it.second;
+    os << (first ? "\n" : ",\n") << "{\"id\":" << it.first << ",\"name\":\"" << Escape(op.name)
+      << "\",\"device\":" << op.device_id << ",\"inputs\":";
+    WriteIds(os, op.inputs);
+    os << ",\"outputs\":";
+    WriteIds(os, op.outputs);
+    os << ",\"created\":";
+    WriteTime(os, op.created);
+    os << ",\"dispatched\":";
+    WriteTime(os, op.dispatched);
+    os << ",\"started\":";
+    WriteTime(os, op.started);
+    os << ",\"compute_started\":";
+    WriteTime(os, op.compute_started);
+    os << ",\"finished\":";
+    WriteTime(os, op.finished);
+    os << "}";
+    first = false;
+  }
+  os << "],\n\"data\":[";
+  first = true;
+  for (auto& it : data_) {
+    auto& d = it.second;
+    os << (first ? "\n" : ",\n") << "{\"id\":" << it.first << ",\"device\":" << d.device_id << ",\"shape\":[";
+    for (size_t i = 0; i < d.size.NumDims(); ++i) {
+      os << (i == 0 ? "" : ",") << d.size[i];
+    }
+    os << "],\"bytes\":" << d.size.Prod() * sizeof(float) << ",\"producer\":";
+    if (d.producer < 0) {
+      os << "null";
+    } else {
+      os << d.producer;
+    }
+    os << ",\"freed\":";
+    WriteTime(os, d.freed);
+    os << "}";
+    first = false;
+  }
+  os << "]}\n";
+}
+
+}  // namespace minerva
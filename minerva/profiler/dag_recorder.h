@@ -0,0 +1,71 @@
+#pragma once
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <map>
+#include <mutex>
+#include <ostream>
+#include <string>
+#include <vector>
+#include "common/common.h"
+#include "common/scale.h"
+#include "dag/physical_dag.h"
+
+namespace minerva {
+
+// Records the ops created while enabled, with their inputs and outputs and
+// when they were dispatched and executed, and when their data were freed.
+// Unlike the physical dag, which drops the nodes once they are done, it
+// keeps the whole executed dag, e.g. of one iteration.
+class DagRecorder {
+ public:
+  typedef std::chrono::steady_clock Clock;
+  DagRecorder();
+  DISALLOW_COPY_AND_ASSIGN(DagRecorder);
+  ~DagRecorder();
+  // What was recorded before is dropped
+  void Enable();
+  void Disable();
+  bool enabled() const {
+    return enabled_.load(std::memory_order_relaxed);
+  }
+  void Clear();
+  // Called with the node locked, before it may be dispatched
+  void RecordOp(PhysicalOpNode*);
+  // The others are ignored for nodes not recorded
+  void RecordDispatch(uint64_t node_id, Clock::time_point);
+  // `start` is when the device began copying the inputs and allocating the
+  // outputs, `compute_start` when it began computing
+  void RecordExecution(uint64_t node_id, Clock::time_point start, Clock::time_point compute_start, Clock::time_point end);
+  void RecordFree(uint64_t node_id, Clock::time_point);
+  // Ops and data by node id, times in microseconds since the recorder was
+  // created and null for what did not happen yet
+  void ExportJson(std::ostream&);
+
+ private:
+  struct Op {
+    std::string name;
+    uint64_t device_id;
+    std::vector<uint64_t> inputs;
+    std::vector<uint64_t> outputs;
+    double created;
+    double dispatched = -1;
+    double started = -1;
+    double compute_started = -1;
+    double finished = -1;
+  };
+  struct Data {
+    uint64_t device_id;
+    Scale size;
+    int64_t producer = -1;  // op node, if recorded
+    double freed = -1;
+  };
+  double Time(Clock::time_point) const;
+  std::atomic<bool> enabled_;
+  Clock::time_point const epoch_;
+  std::map<uint64_t, Op> ops_;
+  std::map<uint64_t, Data> data_;
+  std::mutex mutex_;
+};
+
+}  // namespace minerva
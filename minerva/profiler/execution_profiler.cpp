@@ -1,55 +1,280 @@
 #include "profiler/execution_profiler.h"
 #include <cstdio>
+#include <algorithm>
+#include <functional>
+#include <map>
+#include <unordered_map>
+#include "common/spin_lock.h"
 
 using namespace std;
 
 namespace minerva {
 
-ExecutionProfiler::ExecutionProfiler() {
+namespace {
+
+// Samples kept per op type, device and phase in each thread
+size_t constexpr kReservoirSize = 1024;
+
+struct Key {
+  string name;
+  uint64_t device_id;
+  ProfilePhase phase;
+  bool operator==(const Key& k) const {
+    return device_id == k.device_id && phase == k.phase && name == k.name;
+  }
+};
+
+struct KeyHash {
+  size_t operator()(const Key& k) const {
+    return hash<string>()(k.name) ^ (k.device_id << 2) ^ static_cast<size_t>(k.phase);
+  }
+};
+
+struct Samples {
+  uint64_t count = 0;
+  double total = 0;
+  double max = 0;
+  double flops = 0;
+  double bytes = 0;
+  // Uniform sample of the durations (reservoir sampling), kept as double so
+  // that no percentile rounds above `max`
+  vector<double> reservoir;
+};
+
+struct TagSamples {
+  uint64_t count = 0;
+  double total = 0;
+  double flops = 0;
+  double bytes = 0;
+  double output_bytes = 0;
+};
+
+// Value below which lies the given fraction of the weighted samples
+double Percentile(vector<pair<double, double>>& weighted, double fraction) {
+  double total_weight = 0;
+  for (auto& w : weighted) {
+    total_weight += w.second;
+  }
+  double target = fraction * total_weight;
+  double acc = 0;
+  for (auto& w : weighted) {
+    acc += w.second;
+    if (acc >= target) {
+      return w.first;
+    }
+  }
+  return weighted.empty() ? 0 : weighted.back().first;
+}
+
+atomic<uint64_t> profiler_counter{0};
+
+}  // namespace
+
+struct ExecutionProfiler::ThreadBuffer {
+  common::SpinLock lock;
+  // By op name, then by device and phase; looked up without copying the name
+  unordered_map<string, vector<pair<pair<uint64_t, ProfilePhase>, Samples>>> samples;
+  Samples& Find(const string& name, uint64_t device_id, ProfilePhase phase) {
+    auto& entries = samples[name];
+    auto key = make_pair(device_id, phase);
+    for (auto& e : entries) {
+      if (e.first == key) {
+        return e.second;
+      }
+    }
+    entries.emplace_back(key, Samples());
+    return entries.back().second;
+  }
+  // By tag, then by device
+  unordered_map<string, vector<pair<uint64_t, TagSamples>>> tags;
+  TagSamples& FindTag(const string& tag, uint64_t device_id) {
+    auto& entries = tags[tag];
+    for (auto& e : entries) {
+      if (e.first == device_id) {
+        return e.second;
+      }
+    }
+    entries.emplace_back(device_id, TagSamples());
+    return entries.back().second;
+  }
+  uint64_t rng = 88172645463325252ull;
+  uint64_t Random() {
+    rng ^= rng << 13;
+    rng ^= rng >> 7;
+    rng ^= rng << 17;
+    return rng;
+  }
+};
+
+string ProfilePhaseName(ProfilePhase phase) {
+  switch (phase) {
+    case ProfilePhase::kQueueWait:
+      return "queue_wait";
+    case ProfilePhase::kMemory:
+      return "memory";
+    case ProfilePhase::kCompute:
+      return "compute";
+    default:
+      return "unknown";
+  }
+}
+
+ExecutionProfiler::ExecutionProfiler() : id_(++profiler_counter), enabled_(false) {
 }
 
 ExecutionProfiler::~ExecutionProfiler() {
-  for (auto it : time_) {
-    delete[] (it.second);
+}
+
+void ExecutionProfiler::Enable() {
+  enabled_ = true;
+}
+
+void ExecutionProfiler::Disable() {
+  enabled_ = false;
+}
+
+ExecutionProfiler::ThreadBuffer& ExecutionProfiler::LocalBuffer() {
+  // Profilers are told apart by id rather than address, which may be reused
+  thread_local uint64_t owner = 0;
+  thread_local ThreadBuffer* buffer = nullptr;
+  if (owner != id_) {
+    lock_guard<mutex> lck(buffers_mutex_);
+    buffers_.emplace_back(new ThreadBuffer());
+    buffer = buffers_.back().get();
+    owner = id_;
   }
+  return *buffer;
 }
 
-void ExecutionProfiler::RecordTime(TimerType type, const string& name, const Timer& timer) {
-  lock_guard<mutex> lock_(m_);
-  auto it = time_.find(name);
-  if (it == time_.end()) {  // Not existent before
-    it = time_.insert({name, new double[static_cast<size_t>(TimerType::kEnd)]()}).first;
+void ExecutionProfiler::Record(const string& name, uint64_t device_id, ProfilePhase phase, Clock::time_point start, Clock::time_point end, double flops, double bytes) {
+  double duration = chrono::duration<double, micro>(end - start).count();
+  auto& buffer = LocalBuffer();
+  buffer.lock.Lock();
+  auto& s = buffer.Find(name, device_id, phase);
+  ++s.count;
+  s.total += duration;
+  s.max = std::max(s.max, duration);
+  s.flops += flops;
+  s.bytes += bytes;
+  if (s.reservoir.size() < kReservoirSize) {
+    s.reservoir.push_back(duration);
+  } else {
+    auto i = buffer.Random() % s.count;
+    if (i < kReservoirSize) {
+      s.reservoir[i] = duration;
+    }
   }
-  (it->second)[static_cast<size_t>(type)] += timer.ReadMicrosecond();
-  (it->second)[static_cast<size_t>(TimerType::kCount)] += .5;
+  buffer.lock.Unlock();
+}
+
+void ExecutionProfiler::RecordTag(const string& tag, uint64_t device_id, Clock::time_point start, Clock::time_point end, double flops, double bytes, double output_bytes) {
+  auto& buffer = LocalBuffer();
+  buffer.lock.Lock();
+  auto& s = buffer.FindTag(tag, device_id);
+  ++s.count;
+  s.total += chrono::duration<double, micro>(end - start).count();
+  s.flops += flops;
+  s.bytes += bytes;
+  s.output_bytes += output_bytes;
+  buffer.lock.Unlock();
 }
 
 void ExecutionProfiler::Reset() {
-  lock_guard<mutex> lock_(m_);
-  for (auto it : time_) {
-    delete[] (it.second);
+  lock_guard<mutex> lck(buffers_mutex_);
+  for (auto& buffer : buffers_) {
+    buffer->lock.Lock();
+    buffer->samples.clear();
+    buffer->tags.clear();
+    buffer->lock.Unlock();
   }
-  time_.clear();
+}
+
+vector<ProfileRecord> ExecutionProfiler::Report() {
+  struct Merged {
+    uint64_t count = 0;
+    double total = 0;
+    double max = 0;
+    double flops = 0;
+    double bytes = 0;
+    // Each sample stands for `count / reservoir.size()` durations of its thread
+    vector<pair<double, double>> weighted;
+  };
+  unordered_map<Key, Merged, KeyHash> merged;
+  {
+    lock_guard<mutex> lck(buffers_mutex_);
+    for (auto& buffer : buffers_) {
+      buffer->lock.Lock();
+      for (auto& it : buffer->samples) {
+        for (auto& e : it.second) {
+          auto& m = merged[Key{it.first, e.first.first, e.first.second}];
+          auto& s = e.second;
+          m.count += s.count;
+          m.total += s.total;
+          m.max = std::max(m.max, s.max);
+          m.flops += s.flops;
+          m.bytes += s.bytes;
+          double weight = static_cast<double>(s.count) / s.reservoir.size();
+          for (auto d : s.reservoir) {
+            m.weighted.emplace_back(d, weight);
+          }
+        }
+      }
+      buffer->lock.Unlock();
+    }
+  }
+  vector<ProfileRecord> ret;
+  for (auto& it : merged) {
+    auto& m = it.second;
+    sort(m.weighted.begin(), m.weighted.end());
+    ret.push_back({it.first.name, it.first.device_id, it.first.phase, m.count, m.total, Percentile(m.weighted, .5), Percentile(m.weighted, .99), m.max, m.flops, m.bytes});
+  }
+  sort(ret.begin(), ret.end(), [](const ProfileRecord& a, const ProfileRecord& b) {
+    return a.total > b.total;
+  });
+  return ret;
+}
+
+vector<TagRecord> ExecutionProfiler::TagReport() {
+  map<pair<string, uint64_t>, TagSamples> merged;
+  {
+    lock_guard<mutex> lck(buffers_mutex_);
+    for (auto& buffer : buffers_) {
+      buffer->lock.Lock();
+      for (auto& it : buffer->tags) {
+        for (auto& e : it.second) {
+          auto& m = merged[make_pair(it.first, e.first)];
+          m.count += e.second.count;
+          m.total += e.second.total;
+          m.flops += e.second.flops;
+          m.bytes += e.second.bytes;
+          m.output_bytes += e.second.output_bytes;
+        }
+      }
+      buffer->lock.Unlock();
+    }
+  }
+  vector<TagRecord> ret;
+  for (auto& it : merged) {
+    auto& m = it.second;
+    ret.push_back({it.first.first, it.first.second, m.count, m.total, m.flops, m.bytes, m.output_bytes});
+  }
+  return ret;
 }
 
 void ExecutionProfiler::PrintResult() {
-  printf("%33s|%6sMemory%8sCalculation%8sCount\n", "", "", "", "");
-  for (int i = 0; i < 33; ++i) {
-    printf("-");
-  }
-  printf("|");
-  for (int i = 0; i < 34; ++i) {
-    printf("-");
-  }
-  printf("\n");
-  float allmemtime = 0;
-  float allcaltime = 0;
-  for (auto it : time_) {
-    printf("%32.32s | %16f %16f %16d\n", it.first.c_str(), it.second[0], it.second[1], static_cast<int>(it.second[2]));
-	allmemtime += it.second[0];
-	allcaltime += it.second[1];
-  }
-  printf("All Mem Time: %16f  All Cal Time: % 16f  All Time: %16f\n", allmemtime, allcaltime ,allmemtime + allcaltime);
+  auto records = Report();
+  printf("%32s | %6s | %10s | %8s | %14s | %10s | %10s | %9s | %9s\n", "Op", "Device", "Phase", "Count", "Total(us)", "p50(us)", "p99(us)", "GFLOP/s", "GB/s");
+  double phase_total[static_cast<size_t>(ProfilePhase::kEnd)] = {};
+  for (auto& r : records) {
+    // Totals per microsecond are mega per second
+    double gflops = r.total > 0 ? r.flops / r.total / 1e3 : 0;
+    double gbps = r.total > 0 ? r.bytes / r.total / 1e3 : 0;
+    printf("%32.32s | %6d | %10s | %8d | %14.1f | %10.1f | %10.1f | %9.2f | %9.2f\n", r.name.c_str(), static_cast<int>(r.device_id), ProfilePhaseName(r.phase).c_str(), static_cast<int>(r.count), r.total, r.p50, r.p99, gflops, gbps);
+    phase_total[static_cast<size_t>(r.phase)] += r.total;
+  }
+  for (size_t i = 0; i < static_cast<size_t>(ProfilePhase::kEnd); ++i) {
+    printf("All %s time: %.1fus\n", ProfilePhaseName(static_cast<ProfilePhase>(i)).c_str(), phase_total[i]);
+  }
 }
 
 }  // namespace minerva
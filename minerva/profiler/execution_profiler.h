@@ -1,31 +1,82 @@
 #pragma once
-#include <string>
-#include <unordered_map>
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <memory>
 #include <mutex>
+#include <string>
+#include <vector>
 #include "common/common.h"
-#include "profiler/timer.h"
 
 namespace minerva {
 
-enum class TimerType {
-  kMemory,
-  kCalculation,
-  kCount,
+enum class ProfilePhase {
+  kQueueWait,  // from the push of a task to its device until it starts
+  kMemory,  // copying remote inputs and allocating outputs
+  kCompute,
   kEnd
 };
 
+std::string ProfilePhaseName(ProfilePhase);
+
+// Aggregate of one phase of one op type on one device, in microseconds.
+// Compute phases also sum the flops and bytes of the ops.
+struct ProfileRecord {
+  std::string name;
+  uint64_t device_id;
+  ProfilePhase phase;
+  uint64_t count;
+  double total;
+  double p50;
+  double p99;
+  double max;
+  double flops;
+  double bytes;
+};
+
+// Aggregate of the ops of one tag on one device
+struct TagRecord {
+  std::string tag;
+  uint64_t device_id;
+  uint64_t count;
+  double total;  // compute time, in microseconds
+  double flops;
+  double bytes;
+  double output_bytes;  // allocated for the results of the ops
+};
+
+// Timings of the phases of executed ops. Recording is off until `Enable`,
+// and then costs two clock reads and a spin lock per phase: every thread
+// records into its own buffer, whose lock is only contended while `Report`
+// or `Reset` visits it from another thread. Percentiles are computed from a bounded sample
+// of each thread, so memory does not grow while the profiler stays on.
 class ExecutionProfiler {
  public:
+  typedef std::chrono::steady_clock Clock;
   ExecutionProfiler();
-  virtual ~ExecutionProfiler();
-  void RecordTime(TimerType, const std::string&, const Timer&);
+  DISALLOW_COPY_AND_ASSIGN(ExecutionProfiler);
+  ~ExecutionProfiler();
+  void Enable();
+  void Disable();
+  bool enabled() const {
+    return enabled_.load(std::memory_order_relaxed);
+  }
+  void Record(const std::string& name, uint64_t device_id, ProfilePhase, Clock::time_point start, Clock::time_point end, double flops = 0, double bytes = 0);
+  // Compute phase of a tagged op, on top of its `Record`
+  void RecordTag(const std::string& tag, uint64_t device_id, Clock::time_point start, Clock::time_point end, double flops, double bytes, double output_bytes);
   void Reset();
+  // Sorted by decreasing total time
+  std::vector<ProfileRecord> Report();
+  std::vector<TagRecord> TagReport();
   void PrintResult();
 
  private:
-  std::mutex m_;
-  std::unordered_map<std::string, double*> time_;
-  DISALLOW_COPY_AND_ASSIGN(ExecutionProfiler);
+  struct ThreadBuffer;
+  ThreadBuffer& LocalBuffer();
+  uint64_t const id_;
+  std::atomic<bool> enabled_;
+  std::mutex buffers_mutex_;
+  std::vector<std::unique_ptr<ThreadBuffer>> buffers_;
 };
 
 }  // namespace minerva
@@ -0,0 +1,31 @@
+#include "profiler/latency_histogram.h"
+
+using namespace std;
+
+namespace minerva {
+
+LatencyHistogram::LatencyHistogram() {
+  for (auto& c : counts_) {
+    c = 0;
+  }
+}
+
+void LatencyHistogram::Add(chrono::steady_clock::duration d) {
+  auto us = chrono::duration_cast<chrono::microseconds>(d).count();
+  size_t bucket = 0;
+  while (us > 0 && bucket + 1 < kNumBuckets) {
+    us >>= 1;
+    ++bucket;
+  }
+  counts_[bucket].fetch_add(1, memory_order_relaxed);
+}
+
+vector<uint64_t> LatencyHistogram::Counts() const {
+  vector<uint64_t> ret;
+  for (auto& c : counts_) {
+    ret.push_back(c.load(memory_order_relaxed));
+  }
+  return ret;
+}
+
+}  // namespace minerva
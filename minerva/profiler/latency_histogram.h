@@ -0,0 +1,26 @@
+#pragma once
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <vector>
+#include "common/common.h"
+
+namespace minerva {
+
+// Counts of durations by powers of two of microseconds, updated without
+// locks. Bucket 0 counts durations under 1us, bucket i those in
+// [2^(i-1), 2^i)us and the last bucket all the longer ones.
+class LatencyHistogram {
+ public:
+  static size_t const kNumBuckets = 24;
+  LatencyHistogram();
+  DISALLOW_COPY_AND_ASSIGN(LatencyHistogram);
+  ~LatencyHistogram() = default;
+  void Add(std::chrono::steady_clock::duration);
+  std::vector<uint64_t> Counts() const;
+
+ private:
+  std::atomic<uint64_t> counts_[kNumBuckets];
+};
+
+}  // namespace minerva
@@ -0,0 +1,192 @@
+#include "profiler/tracer.h"
+#include <algorithm>
+#include <cstring>
+#include <iomanip>
+#include <map>
+#include <set>
+#include <dmlc/logging.h>
+
+using namespace std;
+
+namespace minerva {
+
+namespace {
+
+struct Snapshot {
+  TraceEventType type;
+  double time;
+  uint64_t device_id;
+  uint64_t node_id;
+  uint64_t bytes;
+  int thread;
+  int stream;
+  string name;
+};
+
+// Small ids of the threads, in the order they first record
+int ThreadIndex() {
+  static atomic<int> counter{0};
+  thread_local int index = counter++;
+  return index;
+}
+
+string Escape(const string& s) {
+  string ret;
+  for (auto c : s) {
+    if (c == '"' || c == '\\') {
+      ret += '\\';
+    }
+    ret += c;
+  }
+  return ret;
+}
+
+const char* Category(TraceEventType type) {
+  switch (type) {
+    case TraceEventType::kEnqueue:
+      return "enqueue";
+    case TraceEventType::kDispatch:
+      return "dispatch";
+    case TraceEventType::kCopyStart:
+    case TraceEventType::kCopyEnd:
+      return "copy";
+    case TraceEventType::kComputeStart:
+    case TraceEventType::kComputeEnd:
+      return "compute";
+    case TraceEventType::kFree:
+      return "free";
+    default:
+      return "unknown";
+  }
+}
+
+void WriteEvent(ostream& os, const Snapshot& e, const char* phase, double duration) {
+  os << "{\"name\":\"" << Escape(e.name) << "\",\"cat\":\"" << Category(e.type)
+    << "\",\"ph\":\"" << phase << "\",\"ts\":" << e.time;
+  if (duration >= 0) {
+    os << ",\"dur\":" << duration;
+  } else {
+    os << ",\"s\":\"t\"";
+  }
+  os << ",\"pid\":" << e.device_id << ",\"tid\":" << e.thread
+    << ",\"args\":{\"node\":" << e.node_id << ",\"bytes\":" << e.bytes << ",\"stream\":" << e.stream << "}}";
+}
+
+}  // namespace
+
+Tracer::Tracer() : enabled_(false), epoch_(Clock::now()), head_(0), start_(0), ring_(nullptr) {
+}
+
+Tracer::~Tracer() {
+}
+
+void Tracer::Enable(size_t capacity) {
+  CHECK_GT(capacity, 0) << "trace buffer needs room for some events";
+  lock_guard<mutex> lck(mutex_);
+  auto ring = ring_.load();
+  if (ring == nullptr || ring->capacity != capacity) {
+    rings_.emplace_back(new Ring(capacity));
+    ring_ = rings_.back().get();
+  }
+  start_ = head_.load();
+  enabled_ = true;
+}
+
+void Tracer::Disable() {
+  enabled_ = false;
+}
+
+void Tracer::Record(TraceEventType type, uint64_t device_id, uint64_t node_id, const string& name, uint64_t bytes, int stream) {
+  auto ring = ring_.load(memory_order_acquire);
+  if (ring == nullptr) {
+    return;
+  }
+  auto ticket = head_.fetch_add(1, memory_order_relaxed);
+  auto& e = ring->events[ticket % ring->capacity];
+  e.seq.store(0, memory_order_relaxed);
+  atomic_thread_fence(memory_order_release);
+  e.type = type;
+  e.time = chrono::duration<double, micro>(Clock::now() - epoch_).count();
+  e.device_id = device_id;
+  e.node_id = node_id;
+  e.bytes = bytes;
+  e.thread = ThreadIndex();
+  e.stream = stream;
+  strncpy(e.name, name.c_str(), sizeof(e.name) - 1);
+  e.name[sizeof(e.name) - 1] = '\0';
+  e.seq.store(ticket + 1, memory_order_release);
+}
+
+void Tracer::Clear() {
+  lock_guard<mutex> lck(mutex_);
+  start_ = head_.load();
+}
+
+void Tracer::ExportChromeTrace(ostream& os) {
+  vector<Snapshot> events;
+  {
+    lock_guard<mutex> lck(mutex_);
+    auto ring = ring_.load();
+    uint64_t head = head_;
+    uint64_t begin = start_;
+    if (ring != nullptr && head > begin + ring->capacity) {
+      begin = head - ring->capacity;
+    }
+    for (auto ticket = begin; ring != nullptr && ticket < head; ++ticket) {
+      auto& e = ring->events[ticket % ring->capacity];
+      if (e.seq.load(memory_order_acquire) != ticket + 1) {
+        continue;
+      }
+      Snapshot s{e.type, e.time, e.device_id, e.node_id, e.bytes, e.thread, e.stream, e.name};
+      atomic_thread_fence(memory_order_acquire);
+      if (e.seq.load(memory_order_relaxed) == ticket + 1) {
+        events.push_back(move(s));
+      }
+    }
+  }
+  stable_sort(events.begin(), events.end(), [](const Snapshot& a, const Snapshot& b) {
+    return a.time < b.time;
+  });
+  os << fixed << setprecision(3) << "{\"displayTimeUnit\":\"ms\",\"traceEvents\":[";
+  bool first = true;
+  auto separate = [&]() {
+    if (!first) {
+      os << ",\n";
+    }
+    first = false;
+  };
+  set<uint64_t> devices;
+  // Start of the copy or compute running on each thread
+  map<pair<int, TraceEventType>, Snapshot> running;
+  for (auto& e : events) {
+    devices.insert(e.device_id);
+    switch (e.type) {
+      case TraceEventType::kCopyStart:
+      case TraceEventType::kComputeStart:
+        running[make_pair(e.thread, e.type)] = e;
+        break;
+      case TraceEventType::kCopyEnd:
+      case TraceEventType::kComputeEnd: {
+        auto start_type = e.type == TraceEventType::kCopyEnd ? TraceEventType::kCopyStart : TraceEventType::kComputeStart;
+        auto it = running.find(make_pair(e.thread, start_type));
+        // The start may have been overwritten in the ring
+        if (it != running.end() && it->second.node_id == e.node_id) {
+          separate();
+          WriteEvent(os, it->second, "X", e.time - it->second.time);
+          running.erase(it);
+        }
+        break;
+      }
+      default:
+        separate();
+        WriteEvent(os, e, "i", -1);
+    }
+  }
+  for (auto d : devices) {
+    separate();
+    os << "{\"name\":\"process_name\",\"ph\":\"M\",\"pid\":" << d << ",\"args\":{\"name\":\"device #" << d << "\"}}";
+  }
+  os << "]}\n";
+}
+
+}  // namespace minerva
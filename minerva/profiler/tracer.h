@@ -0,0 +1,77 @@
+#pragma once
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <memory>
+#include <mutex>
+#include <ostream>
+#include <string>
+#include <vector>
+#include "common/common.h"
+
+namespace minerva {
+
+enum class TraceEventType {
+  kEnqueue,  // an op is created
+  kDispatch,  // an op has all its inputs and is pushed to its device
+  kCopyStart,
+  kCopyEnd,
+  kComputeStart,
+  kComputeEnd,
+  kFree  // the data of a node is freed
+};
+
+struct TraceEvent {
+  // Ticket of the event plus one, zero while the slot is being written
+  std::atomic<uint64_t> seq;
+  TraceEventType type;
+  double time;  // microseconds since the tracer was created
+  uint64_t device_id;
+  uint64_t node_id;
+  uint64_t bytes;
+  int thread;
+  int stream;
+  char name[40];
+};
+
+// Timeline of the engine, kept in a ring buffer that holds the latest
+// events. Writers claim slots with an atomic counter and never wait for each
+// other; an event overwritten while it is read is dropped from the export.
+class Tracer {
+ public:
+  typedef std::chrono::steady_clock Clock;
+  Tracer();
+  DISALLOW_COPY_AND_ASSIGN(Tracer);
+  ~Tracer();
+  // Events recorded before are dropped
+  void Enable(size_t capacity);
+  void Disable();
+  bool enabled() const {
+    return enabled_.load(std::memory_order_relaxed);
+  }
+  void Record(TraceEventType, uint64_t device_id, uint64_t node_id, const std::string& name, uint64_t bytes = 0, int stream = -1);
+  void Clear();
+  // Chrome Trace Event format, as read by chrome://tracing and Perfetto.
+  // Devices are processes; copy and compute are complete events on the
+  // thread that ran them, the others are instant events.
+  void ExportChromeTrace(std::ostream&);
+
+ private:
+  struct Ring {
+    explicit Ring(size_t c) : capacity(c), events(new TraceEvent[c]()) {}
+    size_t const capacity;
+    std::unique_ptr<TraceEvent[]> events;
+  };
+  std::atomic<bool> enabled_;
+  Clock::time_point const epoch_;
+  // Tickets only grow, so a slot holds the event of a ticket iff its `seq` matches
+  std::atomic<uint64_t> head_;
+  // Events before this ticket were cleared
+  std::atomic<uint64_t> start_;
+  std::atomic<Ring*> ring_;
+  // Replaced rings are kept, as writers may still hold them
+  std::vector<std::unique_ptr<Ring>> rings_;
+  std::mutex mutex_;
+};
+
+}  // namespace minerva
@@ -2,6 +2,8 @@
 #include <cstdlib>
 #include <mutex>
 #include <cstring>
+#include <chrono>
+#include <map>
 #ifdef HAS_CUDA
 #include <cuda_runtime.h>
 #endif
@@ -13,11 +15,34 @@
 
 DEFINE_bool(use_dag, true, "Use dag engine");
 DEFINE_bool(no_init_glog, false, "Skip initializing Google Logging");
+DEFINE_bool(profile, false, "Enable the execution profiler from the start");
+DEFINE_int32(engine_stats_every, 0, "Print the engine statistics every this many seconds (0: never)");
 
 using namespace std;
 
 namespace minerva {
 
+namespace {
+
+// Upper bound of the bucket holding the median of the durations added to a
+// `LatencyHistogram` between two reads
+double MedianBound(const vector<uint64_t>& counts, const vector<uint64_t>& last) {
+  uint64_t total = 0;
+  for (size_t i = 0; i < counts.size(); ++i) {
+    total += counts[i] - (i < last.size() ? last[i] : 0);
+  }
+  uint64_t acc = 0;
+  for (size_t i = 0; i < counts.size(); ++i) {
+    acc += counts[i] - (i < last.size() ? last[i] : 0);
+    if (total != 0 && 2 * acc >= total) {
+      return static_cast<double>(1ull << i);
+    }
+  }
+  return 0;
+}
+
+}  // namespace
+
 void MinervaSystem::UniversalMemcpy(
     pair<Device::MemType, float*> to,
     pair<Device::MemType, float*> from,
@@ -41,9 +66,19 @@ int const MinervaSystem::has_cuda_ =
 ;
 
 MinervaSystem::~MinervaSystem() {
+  {
+    lock_guard<mutex> lck(stats_printer_mutex_);
+    exiting_ = true;
+  }
+  stats_printer_cond_.notify_all();
+  if (stats_printer_.joinable()) {
+    stats_printer_.join();
+  }
   delete backend_;
   delete device_manager_;
   delete profiler_;
+  delete tracer_;
+  delete dag_recorder_;
   delete physical_dag_;
   //google::ShutdownGoogleLogging(); //XXX comment out since we switch to dmlc/logging
 }
@@ -62,15 +97,67 @@ uint64_t MinervaSystem::CreateCpuDevice() {
 uint64_t MinervaSystem::CreateGpuDevice(int id) {
   return MinervaSystem::Instance().device_manager().CreateGpuDevice(id);
 }
+uint64_t const MinervaSystem::kNoDevice = -1;
+
+// Set by threads that issue their operations to a device of their own
+static thread_local uint64_t thread_device_id = MinervaSystem::kNoDevice;
+
 void MinervaSystem::SetDevice(uint64_t id) {
   current_device_id_ = id;
 }
+void MinervaSystem::SetThreadDevice(uint64_t id) {
+  thread_device_id = id;
+}
+uint64_t MinervaSystem::current_device_id() const {
+  return thread_device_id != kNoDevice ? thread_device_id : current_device_id_.load();
+}
+
+static thread_local shared_ptr<const string> thread_op_tag;
+
+void MinervaSystem::SetOpTag(const string& tag) {
+  if (tag.empty()) {
+    thread_op_tag.reset();
+  } else if (!thread_op_tag || *thread_op_tag != tag) {
+    thread_op_tag = make_shared<const string>(tag);
+  }
+}
+shared_ptr<const string> MinervaSystem::op_tag() const {
+  return thread_op_tag;
+}
 void MinervaSystem::WaitForAll() {
   backend_->WaitForAll();
 }
 
+void MinervaSystem::StatsPrinterRoutine(int seconds) {
+  auto last = backend_->GetStats();
+  map<uint64_t, TaskStats> last_devices;
+  unique_lock<mutex> lck(stats_printer_mutex_);
+  while (!stats_printer_cond_.wait_for(lck, chrono::seconds(seconds), [this]() { return exiting_; })) {
+    auto stats = backend_->GetStats();
+    auto& queue = stats.dispatcher_queue;
+    LOG(INFO) << common::FString("engine: %d nodes to finish, dispatcher queue %d/%d/%d (run/complete/delete), created %.0f/s, deleted %.0f/s, median ready to dispatch <%.0fus, dispatch to complete <%.0fus",
+        static_cast<int>(stats.nodes_yet_to_finish),
+        static_cast<int>(queue.size() > 0 ? queue[0] : 0), static_cast<int>(queue.size() > 1 ? queue[1] : 0), static_cast<int>(queue.size() > 2 ? queue[2] : 0),
+        static_cast<double>(stats.nodes_created - last.nodes_created) / seconds,
+        static_cast<double>(stats.nodes_deleted - last.nodes_deleted) / seconds,
+        MedianBound(stats.ready_to_dispatch, last.ready_to_dispatch),
+        MedianBound(stats.dispatch_to_complete, last.dispatch_to_complete));
+    last = stats;
+    for (auto id : device_manager_->GetDeviceIds()) {
+      auto d = device_manager_->GetDevice(id)->GetTaskStats();
+      auto& l = last_devices[id];
+      double utilization = d.num_workers == 0 ? 0 : (d.busy_us - l.busy_us) / (seconds * 1e6 * d.num_workers);
+      LOG(INFO) << common::FString("device #%d: %d ready, %d queued, %d/%d running, %.0f completed/s, utilization %.0f%%",
+          static_cast<int>(id), static_cast<int>(d.ready), static_cast<int>(d.queued),
+          static_cast<int>(d.running), static_cast<int>(d.num_workers),
+          static_cast<double>(d.completed - l.completed) / seconds, utilization * 100);
+      l = d;
+    }
+  }
+}
+
 MinervaSystem::MinervaSystem(int* argc, char*** argv)
-  : data_id_counter_(0), current_device_id_(0) {
+  : data_id_counter_(0), current_device_id_(0), exiting_(false) {
   gflags::ParseCommandLineFlags(argc, argv, true);
 #ifndef HAS_PS
   // glog is initialized in PS::main, and also here, so we will hit a
@@ -81,6 +168,11 @@ MinervaSystem::MinervaSystem(int* argc, char*** argv)
 #endif
   physical_dag_ = new PhysicalDag();
   profiler_ = new ExecutionProfiler();
+  tracer_ = new Tracer();
+  dag_recorder_ = new DagRecorder();
+  if (FLAGS_profile) {
+    profiler_->Enable();
+  }
   device_manager_ = new DeviceManager();
   if (FLAGS_use_dag) {
     LOG(INFO) << "dag engine enabled";
@@ -89,6 +181,9 @@ MinervaSystem::MinervaSystem(int* argc, char*** argv)
     LOG(INFO) << "dag engine disabled";
     backend_ = new SimpleBackend(*device_manager_);
   }
+  if (FLAGS_engine_stats_every > 0) {
+    stats_printer_ = thread(&MinervaSystem::StatsPrinterRoutine, this, FLAGS_engine_stats_every);
+  }
 }
 
 }  // end of namespace minerva
@@ -1,12 +1,18 @@
 #pragma once
 #include <atomic>
+#include <condition_variable>
 #include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
 #include "common/singleton.h"
 #include "dag/physical_dag.h"
 #include "backend/backend.h"
 #include "device/device_manager.h"
 #include "device/device.h"
 #include "profiler/execution_profiler.h"
+#include "profiler/tracer.h"
+#include "profiler/dag_recorder.h"
 
 namespace minerva {
 
@@ -33,6 +39,12 @@ class MinervaSystem :
   ExecutionProfiler& profiler() {
     return *profiler_;
   }
+  Tracer& tracer() {
+    return *tracer_;
+  }
+  DagRecorder& dag_recorder() {
+    return *dag_recorder_;
+  }
   DeviceManager& device_manager() {
     return *device_manager_;
   }
@@ -40,10 +52,18 @@ class MinervaSystem :
   uint64_t GenerateDataId();
 
   // device
+  static uint64_t const kNoDevice;
   uint64_t CreateCpuDevice();
   uint64_t CreateGpuDevice(int);
+  // Device of all threads that did not select their own
   void SetDevice(uint64_t );
-  uint64_t current_device_id() const { return current_device_id_; }
+  // Device of the calling thread only; kNoDevice goes back to the one given to SetDevice
+  void SetThreadDevice(uint64_t);
+  uint64_t current_device_id() const;
+  // Ops created by the calling thread are tagged with it, so the profiler can
+  // aggregate them (e.g. per layer); empty for no tag
+  void SetOpTag(const std::string&);
+  std::shared_ptr<const std::string> op_tag() const;
   // system
   void WaitForAll();
 
@@ -52,9 +72,17 @@ class MinervaSystem :
   PhysicalDag* physical_dag_;
   Backend* backend_;
   ExecutionProfiler* profiler_;
+  Tracer* tracer_;
+  DagRecorder* dag_recorder_;
   DeviceManager* device_manager_;
   std::atomic<uint64_t> data_id_counter_;
-  uint64_t current_device_id_;
+  std::atomic<uint64_t> current_device_id_;
+  // Prints the engine statistics periodically, with `--engine_stats_every`
+  void StatsPrinterRoutine(int seconds);
+  std::thread stats_printer_;
+  std::mutex stats_printer_mutex_;
+  std::condition_variable stats_printer_cond_;
+  bool exiting_;
 };
 
 }  // end of namespace minerva
@@ -88,9 +88,48 @@ def set_device(dev):
     till another ``set_device`` is called.
 
     :param int dev: the id of the device (usually returned by create_xxx_device)
+
+    .. seealso::
+
+        :py:func:`owl.set_thread_device` to select a device for one thread only
     """
     _owl.set_device(dev)
 
+def set_thread_device(dev):
+    """ Switch the calling thread to the given device for running computations
+
+    Unlike :py:func:`owl.set_device`, only the computations issued by the calling thread run on
+    ``dev``, so threads working on different devices do not interfere with each other.
+
+    :param dev: the id of the device, or ``None`` to follow :py:func:`owl.set_device` again
+    :type dev: int or None
+    """
+    if dev == None:
+        _owl.reset_thread_device()
+    else:
+        _owl.set_thread_device(dev)
+
+def engine_stats():
+    """ Statistics of the dataflow engine
+
+    Gauges are read at the call: ``nodes_yet_to_finish``, ``dispatcher_queue`` (tasks waiting in the
+    dispatcher queue, by type ``'run'``, ``'complete'`` and ``'delete'``) and, in ``devices``, the
+    ``ready`` ops of each device not yet dispatched to it, the ``queued`` ones waiting for a worker and
+    the ``running`` ones. The others are totals since the start: ``nodes_created``, ``nodes_deleted``
+    and, per device, ``completed`` tasks and ``busy_us``, the time its ``num_workers`` workers spent
+    executing. Rates and utilization are differences between two calls, e.g. a device is busy for
+    ``delta(busy_us) / (seconds * 1e6 * num_workers)`` of the time.
+
+    ``ready_to_dispatch`` and ``dispatch_to_complete`` count the ops by the time they spent from having
+    all their inputs to being dispatched, and from being dispatched to completing: element ``i`` counts
+    the times below ``2 ** i`` microseconds and above the bound of element ``i - 1``.
+
+    The engine can also print them periodically with the ``--engine_stats_every=<seconds>`` flag.
+
+    :rtype: dict
+    """
+    return _owl.engine_stats()
+
 def zeros(shape):
     """ Create ndarray of zero values
 
@@ -158,6 +197,45 @@ def from_numpy(nparr):
     """
     return NArray.from_numpy(np.require(nparr, dtype=np.float32, requirements=['C']))
 
+def from_numpy_uint8(nparr):
+    """ Create an owl.NArray holding the raw bytes of an uint8 numpy.ndarray
+
+    The bytes are packed four per element, so only a quarter of the memory of :py:func:`from_numpy`
+    is transferred. The result is a flat ``owl.NArray`` that is only meaningful as the input of
+    :py:func:`owl.conv.image_normalize`.
+
+    :param numpy.ndarray nparr: uint8 numpy ndarray
+    :return: Minerva's ndarray of packed bytes
+    :rtype: owl.NArray
+    """
+    return NArray.from_numpy_uint8(np.require(nparr, dtype=np.uint8, requirements=['C']).reshape(-1))
+
+def create_staging_ring(num_buffers, capacity):
+    """ Create a ring of host staging buffers for uploading data
+
+    Fill a buffer through the numpy view returned by ``array`` and then call ``upload``
+    to get an ``owl.NArray``. On CUDA builds the buffers are page-locked and the upload
+    is issued asynchronously on a copy stream, so the transfer of the next batch overlaps
+    with the computation on the current one. A buffer returns to the ring once its upload
+    is executed; ``acquire`` blocks if all buffers are in flight.
+
+        >>> ring = owl.create_staging_ring(3, 224 * 224 * 3 * 256)
+        >>> buf = ring.acquire()
+        >>> buf.array([256, 3, 224, 224])[:] = samples
+        >>> x = buf.upload([256, 3, 224, 224])
+
+    .. note::
+
+        As in :py:func:`from_numpy`, the dimension of the uploaded ``owl.NArray`` is *reversed*.
+        The numpy view must not be used after ``upload`` is called.
+
+    :param int num_buffers: number of buffers in the ring
+    :param int capacity: capacity of each buffer in number of floats
+    :return: the staging ring
+    :rtype: owl.libowl.StagingRing
+    """
+    return _owl.StagingRing(num_buffers, capacity)
+
 def concat(narrays, concat_dim):
     """  Concatenate NArrays according to concat_dim
 
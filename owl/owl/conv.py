@@ -9,6 +9,9 @@ soft_op = _owl.softmax_algo
 pool_op = _owl.pooling_algo
 """ Same enum type as cudnn's ``cudnnPoolingMode_t``. Either ``pool_op.max`` or ``pool_op.avg``.
 """
+act_op = _owl.activation_algo
+""" Same enum type as cudnn's ``cudnnActivationMode_t``. One of ``act_op.sigmoid``, ``act_op.relu`` or ``act_op.tanh``.
+"""
 
 def softmax(x, op = soft_op.instance):
     """ Perform softmax on the given ndarray.
@@ -29,6 +32,22 @@ def softmax(x, op = soft_op.instance):
         soft_shape = x.shape[0:-1] + [1 for i in range(4 - len(ori_shape))] + [x.shape[-1]]
         return _owl.NArray.softmax_forward(x.reshape(soft_shape), op).reshape(ori_shape)
 
+def image_normalize(packed, src_shape, crop_info, crop_size, mean):
+    """ Convert a batch of uint8 images to float, subtract the mean, crop and mirror in one op.
+
+    :param owl.NArray packed: the images created by :py:func:`owl.from_numpy_uint8` from an uint8
+        numpy array of shape ``[N, C, H, W]``
+    :param list src_shape: shape of the uint8 numpy array, i.e. ``[N, C, H, W]``
+    :param owl.NArray crop_info: ``owl.from_numpy`` of a ``[N, 3]`` array whose rows are
+        ``(crop_h, crop_w, mirror)`` of each image
+    :param int crop_size: size of the cropped images
+    :param mean: either the mean image (``owl.from_numpy`` of a ``[C, H, W]`` array) or a list of
+        per-channel mean values
+    :return: the normalized images of shape ``[crop_size, crop_size, C, N]``
+    :rtype: owl.NArray
+    """
+    return _owl.NArray.image_normalize(packed, crop_info, mean, src_shape, crop_size)
+
 class Lrner:
     """ Wrapper class for LRN.
 
@@ -102,6 +121,18 @@ class Convolver:
         """
         return _owl.NArray.conv_forward(x, w, b, self.param)
 
+    def ff_act(self, x, w, b, act = act_op.relu):
+        """ Feed-forward convolution followed by an activation, computed as one operation
+
+        :param owl.NArray x: input of the convolution
+        :param owl.NArray w: filters
+        :param owl.NArray b: bias of the convolution
+        :param act: activation applied to the result (``owl.conv.act_op``)
+        :return: result ndarray after forward convolution and activation
+        :rtype: owl.NArray
+        """
+        return _owl.NArray.fused_conv_forward(x, w, b, self.param, act)
+
     def bp(self, y, x, w):
         """ Backward convolution
 
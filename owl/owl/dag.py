@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+""" This module contains the recorder of the executed dag
+
+While recording, the engine keeps every op created, with its device, its input and output data and
+when it was created, dispatched, started (copying inputs and allocating outputs), started computing
+and finished, and when each data was freed. Unlike the physical dag, whose nodes are dropped once
+done, the recorded dag covers everything executed, e.g. one iteration. It is saved as JSON for
+``scripts/system/dag_analyzer.py``, which computes the critical path, the available parallelism, the
+utilization of the devices, the transfers between them and the live memory over time::
+
+    >>> import owl.dag
+    >>> owl.dag.start()
+    >>> net.forward('TRAIN'); net.backward('TRAIN'); owl.wait_for_all()
+    >>> owl.dag.stop()
+    >>> owl.dag.save('iteration.json')
+
+The JSON has a list of ``ops``, each with ``id``, ``name``, ``device``, the node ids of its
+``inputs`` and ``outputs`` and the times ``created``, ``dispatched``, ``started``,
+``compute_started`` and ``finished``, and a list of ``data``, each with ``id``, ``device``,
+``shape``, ``bytes``, its ``producer`` op and the time it was ``freed``. Times are in microseconds,
+and ``null`` for what did not happen (yet); data computed before the recording have no producer.
+"""
+import json
+import libowl as _owl
+
+def start():
+    """ Start recording; what was recorded before is dropped
+    """
+    _owl.enable_dag_recorder()
+
+def stop():
+    """ Stop recording; what was recorded stays until the next :py:func:`start` or :py:func:`clear`
+
+    .. note::
+        Call ``owl.wait_for_all()`` before, or the ops not done yet miss their times
+    """
+    _owl.disable_dag_recorder()
+
+def clear():
+    """ Drop what was recorded so far
+    """
+    _owl.clear_dag_recorder()
+
+def dump():
+    """ The recorded dag
+
+    :return: ``{'ops': list, 'data': list}``
+    :rtype: dict
+    """
+    return json.loads(_owl.export_dag_json())
+
+def save(filename):
+    """ Save the recorded dag as JSON
+
+    :param str filename: the JSON file
+    """
+    with open(filename, 'w') as f:
+        f.write(_owl.export_dag_json())
@@ -8,15 +8,21 @@ import numpy as np
 cimport numpy as np
 cimport minerva as m
 
+np.import_array()
+
 cdef vector[int] _list_to_vector(l):
     cdef vector[int] ret
+    cdef int i
+    if isinstance(l, (list, tuple)):
+        ret.reserve(len(l))
     for i in l:
         ret.push_back(i)
     return ret
 
 cdef NArray _wrap_cpp_narray(m.NArray n):
-    ret = NArray()
-    ret._d.assign(n)
+    # Moved rather than copied, as each copy of an NArray allocates a chunk in the engine
+    cdef NArray ret = NArray.__new__(NArray)
+    m.MoveNArray(ret._d, n)
     return ret
 
 def create_cpu_device():
@@ -34,6 +40,139 @@ def wait_for_all():
 def set_device(i):
     m.SetDevice(i)
 
+def set_thread_device(i):
+    m.SetThreadDevice(i)
+
+def reset_thread_device():
+    m.ResetThreadDevice()
+
+def enable_profiler():
+    m.EnableProfiler()
+
+def disable_profiler():
+    m.DisableProfiler()
+
+def reset_profiler():
+    m.ResetProfiler()
+
+def profiler_report():
+    cdef vector[m.ProfileRecord] records = m.ProfilerReport()
+    cdef m.ProfileRecord r
+    ret = []
+    for i in range(records.size()):
+        r = records[i]
+        ret.append({
+            'op': r.name,
+            'device': r.device_id,
+            'phase': m.ProfilePhaseName(r.phase),
+            'count': r.count,
+            'total_us': r.total,
+            'p50_us': r.p50,
+            'p99_us': r.p99,
+            'max_us': r.max,
+            'flops': r.flops,
+            'bytes': r.bytes})
+    return ret
+
+def profiler_tag_report():
+    cdef vector[m.TagRecord] records = m.ProfilerTagReport()
+    cdef m.TagRecord r
+    ret = []
+    for i in range(records.size()):
+        r = records[i]
+        ret.append({
+            'tag': r.tag,
+            'device': r.device_id,
+            'count': r.count,
+            'total_us': r.total,
+            'flops': r.flops,
+            'bytes': r.bytes,
+            'output_bytes': r.output_bytes})
+    return ret
+
+def set_op_tag(tag):
+    m.SetOpTag(tag)
+
+def enable_tracer(capacity):
+    m.EnableTracer(capacity)
+
+def disable_tracer():
+    m.DisableTracer()
+
+def clear_tracer():
+    m.ClearTracer()
+
+def export_chrome_trace():
+    return m.ExportChromeTrace()
+
+def enable_dag_recorder():
+    m.EnableDagRecorder()
+
+def disable_dag_recorder():
+    m.DisableDagRecorder()
+
+def clear_dag_recorder():
+    m.ClearDagRecorder()
+
+def export_dag_json():
+    return m.ExportDagJson()
+
+def get_device_ids():
+    return m.GetDeviceIds()
+
+def memory_stats(dev):
+    cdef m.MemoryStats s = m.GetMemoryStats(dev)
+    histogram = {}
+    for i in range(s.size_histogram.size()):
+        histogram[s.size_histogram[i].first] = s.size_histogram[i].second
+    return {
+        'live_bytes': s.live_bytes,
+        'cached_bytes': s.cached_bytes,
+        'peak_bytes': s.peak_bytes,
+        'size_histogram': histogram}
+
+def reset_peak_memory(dev):
+    m.ResetPeakMemory(dev)
+
+def data_nodes():
+    cdef vector[m.DataNodeInfo] nodes = m.GetDataNodes()
+    cdef m.DataNodeInfo n
+    ret = []
+    for i in range(nodes.size()):
+        n = nodes[i]
+        ret.append({
+            'node': n.node_id,
+            'device': n.device_id,
+            'shape': list(m.OfScale(n.size)),
+            'creator': n.creator,
+            'extern_rc': n.extern_rc})
+    return ret
+
+def engine_stats():
+    cdef m.BackendStats s = m.GetBackendStats()
+    cdef m.TaskStats t
+    queue = {}
+    for (i, name) in enumerate(['run', 'complete', 'delete']):
+        queue[name] = s.dispatcher_queue[i] if i < s.dispatcher_queue.size() else 0
+    devices = {}
+    for d in m.GetDeviceIds():
+        t = m.GetTaskStats(d)
+        devices[d] = {
+            'ready': t.ready,
+            'queued': t.queued,
+            'running': t.running,
+            'completed': t.completed,
+            'num_workers': t.num_workers,
+            'busy_us': t.busy_us}
+    return {
+        'nodes_created': s.nodes_created,
+        'nodes_deleted': s.nodes_deleted,
+        'nodes_yet_to_finish': s.nodes_yet_to_finish,
+        'dispatcher_queue': queue,
+        'ready_to_dispatch': s.ready_to_dispatch,
+        'dispatch_to_complete': s.dispatch_to_complete,
+        'devices': devices}
+
 def initialize():
     cdef int argc = len(sys.argv)
     cdef char** argv = <char**>(calloc(argc, sizeof(char*)))
@@ -49,13 +188,10 @@ def has_cuda():
     return m.has_cuda_
 
 cdef class NArray(object):
-    cdef m.NArray* _d
-
-    def __cinit__(self):
-        self._d = new m.NArray()
-
-    def __dealloc__(self):
-        del self._d
+    # Held by value, so wrapping a result allocates only the Python object
+    cdef m.NArray _d
+    # Shape as a tuple, once asked for
+    cdef object _shape
 
     def __add__(self, rhs):
         cdef NArray l
@@ -66,22 +202,22 @@ cdef class NArray(object):
             if isinstance(rhs, NArray):
                 r = rhs
                 return _wrap_cpp_narray(
-                    m.NArrayAddNArray(deref(l._d), deref(r._d)))
+                    m.NArrayAddNArray(l._d, r._d))
             else:
                 f = rhs
                 return _wrap_cpp_narray(
-                    (m.NArrayAddNum(deref(l._d), f)))
+                    (m.NArrayAddNum(l._d, f)))
         else:
             f = self
             r = rhs
-            return _wrap_cpp_narray(m.NumAddNArray(f, deref(r._d)))
+            return _wrap_cpp_narray(m.NumAddNArray(f, r._d))
 
     def __iadd__(self, rhs):
         cdef NArray r
         cdef float f
         if isinstance(rhs, NArray):
             r = rhs
-            self._d.AddAssignNArray(deref(r._d))
+            self._d.AddAssignNArray(r._d)
         else:
             f = rhs
             self._d.AddAssignNum(f)
@@ -96,22 +232,22 @@ cdef class NArray(object):
             if isinstance(rhs, NArray):
                 r = rhs
                 return _wrap_cpp_narray(
-                    m.NArraySubNArray(deref(l._d), deref(r._d)))
+                    m.NArraySubNArray(l._d, r._d))
             else:
                 f = rhs
                 return _wrap_cpp_narray(
-                    m.NArraySubNum(deref(l._d), f))
+                    m.NArraySubNum(l._d, f))
         else:
             f = self
             r = rhs
-            return _wrap_cpp_narray(m.NumSubNArray(f, deref(r._d)))
+            return _wrap_cpp_narray(m.NumSubNArray(f, r._d))
 
     def __isub__(self, rhs):
         cdef NArray r
         cdef float f
         if isinstance(rhs, NArray):
             r = rhs
-            self._d.SubAssignNArray(deref(r._d))
+            self._d.SubAssignNArray(r._d)
         else:
             f = rhs
             self._d.SubAssignNum(f)
@@ -126,22 +262,23 @@ cdef class NArray(object):
             if isinstance(rhs, NArray):
                 r = rhs
                 return _wrap_cpp_narray(
-                    m.NArrayMulNArray(deref(l._d), deref(r._d)))
+                    m.NArrayMulNArray(l._d, r._d))
             else:
                 f = rhs
                 return _wrap_cpp_narray(
-                    m.NArrayMulNum(deref(l._d), f))
+                    m.NArrayMulNum(l._d, f))
         else:
             f = self
             r = rhs
-            return _wrap_cpp_narray(m.NumMulNArray(f, deref(r._d)))
+            return _wrap_cpp_narray(m.NumMulNArray(f, r._d))
 
     def __imul__(self, rhs):
         cdef NArray r
         cdef float f
         if isinstance(rhs, NArray):
             r = rhs
-            self._d.MulAssignNArray(deref(r._d))
+            self._d.MulAssignNArray(r._d)
+            self._shape = None
         else:
             f = rhs
             self._d.MulAssignNum(f)
@@ -156,22 +293,22 @@ cdef class NArray(object):
             if isinstance(rhs, NArray):
                 r = rhs
                 return _wrap_cpp_narray(
-                    m.NArrayDivNArray(deref(l._d), deref(r._d)))
+                    m.NArrayDivNArray(l._d, r._d))
             else:
                 f = rhs
                 return _wrap_cpp_narray(
-                    m.NArrayDivNum(deref(l._d), f))
+                    m.NArrayDivNum(l._d, f))
         else:
             f = self
             r = rhs
-            return _wrap_cpp_narray(m.NumDivNArray(f, deref(r._d)))
+            return _wrap_cpp_narray(m.NumDivNArray(f, r._d))
 
     def __idiv__(self, rhs):
         cdef NArray r
         cdef float f
         if isinstance(rhs, NArray):
             r = rhs
-            self._d.DivAssignNArray(deref(r._d))
+            self._d.DivAssignNArray(r._d)
         else:
             f = rhs
             self._d.DivAssignNum(f)
@@ -179,69 +316,84 @@ cdef class NArray(object):
 
     @staticmethod
     def mult(NArray lhs, NArray rhs):
-        return _wrap_cpp_narray(m.Mult(deref(lhs._d), deref(rhs._d)))
+        return _wrap_cpp_narray(m.Mult(lhs._d, rhs._d))
 
     @staticmethod
     def exp(NArray lhs):
-        return _wrap_cpp_narray(m.Exp(deref(lhs._d)))
+        return _wrap_cpp_narray(m.Exp(lhs._d))
 
     @staticmethod
     def ln(NArray lhs):
-        return _wrap_cpp_narray(m.Ln(deref(lhs._d)))
+        return _wrap_cpp_narray(m.Ln(lhs._d))
 
     @staticmethod
     def sigm(NArray lhs):
-        return _wrap_cpp_narray(m.SigmoidForward(deref(lhs._d)))
+        return _wrap_cpp_narray(m.SigmoidForward(lhs._d))
 
     @staticmethod
     def sigm_back(NArray diff, NArray top, NArray bottom):
         return _wrap_cpp_narray(
                 m.SigmoidBackward(
-                    deref(diff._d)
-                ,   deref(top._d)
-                ,   deref(bottom._d)))
+                    diff._d
+                ,   top._d
+                ,   bottom._d))
 
     @staticmethod
     def relu(NArray lhs):
-        return _wrap_cpp_narray(m.ReluForward(deref(lhs._d)))
+        return _wrap_cpp_narray(m.ReluForward(lhs._d))
 
     @staticmethod
     def relu_back(NArray diff, NArray top, NArray bottom):
         return _wrap_cpp_narray(
                 m.ReluBackward(
-                    deref(diff._d)
-                ,   deref(top._d)
-                ,   deref(bottom._d)))
+                    diff._d
+                ,   top._d
+                ,   bottom._d))
 
     @staticmethod
     def tanh(NArray lhs):
-        return _wrap_cpp_narray(m.TanhForward(deref(lhs._d)))
+        return _wrap_cpp_narray(m.TanhForward(lhs._d))
 
     @staticmethod
     def tanh_back(NArray diff, NArray top, NArray bottom):
         return _wrap_cpp_narray(
                 m.TanhBackward(
-                    deref(diff._d)
-                ,   deref(top._d)
-                ,   deref(bottom._d)))
+                    diff._d
+                ,   top._d
+                ,   bottom._d))
 
     @staticmethod
     def conv_forward(NArray src, NArray filter, NArray bias, ConvInfo info):
         return _wrap_cpp_narray(
                 m.ConvForward(
-                    deref(src._d)
-                ,   deref(filter._d)
-                ,   deref(bias._d)
+                    src._d
+                ,   filter._d
+                ,   bias._d
                 ,   deref(info._d)));
 
+    @staticmethod
+    def fused_conv_forward(
+            NArray src
+        ,   NArray filter
+        ,   NArray bias
+        ,   ConvInfo info
+        ,   ActivationAlgorithmWrapper algo):
+        return _wrap_cpp_narray(
+                m.FusedConvForward(
+                    src._d
+                ,   filter._d
+                ,   bias._d
+                ,   deref(info._d)
+                ,   m.ToActivationAlgorithm(algo._d)));
+
     @staticmethod
     def conv_backward_data(
             NArray diff, NArray bottom, NArray filter, ConvInfo info):
         return _wrap_cpp_narray(
                 m.ConvBackwardData(
-                    deref(diff._d)
-                ,   deref(bottom._d)
-                ,   deref(filter._d)
+                    diff._d
+                ,   bottom._d
+                ,   filter._d
                 ,   deref(info._d)));
 
     @staticmethod
@@ -249,35 +401,35 @@ cdef class NArray(object):
             NArray diff, NArray bottom, NArray filter, ConvInfo info):
         return _wrap_cpp_narray(
                 m.ConvBackwardFilter(
-                    deref(diff._d)
-                ,   deref(bottom._d)
-                ,   deref(filter._d)
+                    diff._d
+                ,   bottom._d
+                ,   filter._d
                 ,   deref(info._d)));
 
     @staticmethod
     def conv_backward_bias(NArray diff):
-        return _wrap_cpp_narray(m.ConvBackwardBias(deref(diff._d)));
+        return _wrap_cpp_narray(m.ConvBackwardBias(diff._d));
 
     @staticmethod
     def softmax_forward(NArray src, SoftmaxAlgorithmWrapper algo):
         return _wrap_cpp_narray(
                 m.SoftmaxForward(
-                    deref(src._d)
+                    src._d
                 ,   m.ToSoftmaxAlgorithm(algo._d)));
 
     @staticmethod
     def softmax_backward(NArray diff, NArray top, SoftmaxAlgorithmWrapper algo):
         return _wrap_cpp_narray(
                 m.SoftmaxBackward(
-                    deref(diff._d)
-                ,   deref(top._d)
+                    diff._d
+                ,   top._d
                 ,   m.ToSoftmaxAlgorithm(algo._d)));
 
     @staticmethod
     def activation_forward(NArray src, ActivationAlgorithmWrapper algo):
         return _wrap_cpp_narray(
                 m.ActivationForward(
-                    deref(src._d)
+                    src._d
                 ,   m.ToActivationAlgorithm(algo._d)));
 
     @staticmethod
@@ -288,16 +440,16 @@ cdef class NArray(object):
         ,   ActivationAlgorithmWrapper algo):
         return _wrap_cpp_narray(
                 m.ActivationBackward(
-                    deref(diff._d)
-                ,   deref(top._d)
-                ,   deref(bottom._d)
+                    diff._d
+                ,   top._d
+                ,   bottom._d
                 ,   m.ToActivationAlgorithm(algo._d)));
 
     @staticmethod
     def pooling_forward(NArray src, PoolingInfo algo):
         return _wrap_cpp_narray(
                 m.PoolingForward(
-                    deref(src._d)
+                    src._d
                 ,   deref(algo._d)));
 
     @staticmethod
@@ -308,17 +460,17 @@ cdef class NArray(object):
         ,   PoolingInfo algo):
         return _wrap_cpp_narray(
                 m.PoolingBackward(
-                    deref(diff._d)
-                ,   deref(top._d)
-                ,   deref(bottom._d)
+                    diff._d
+                ,   top._d
+                ,   bottom._d
                 ,   deref(algo._d)));
 
     @staticmethod
     def lrn_forward(NArray src, NArray scale, int local_size, float a, float b):
         return _wrap_cpp_narray(
                 m.LRNForward(
-                    deref(src._d)
-                ,   deref(scale._d)
+                    src._d
+                ,   scale._d
                 ,   local_size
                 ,   a
                 ,   b));
@@ -334,10 +486,10 @@ cdef class NArray(object):
         ,   float b):
         return _wrap_cpp_narray(
                 m.LRNBackward(
-                    deref(bottom_data._d)
-                ,   deref(top_data._d)
-                ,   deref(scale._d)
-                ,   deref(top_diff._d)
+                    bottom_data._d
+                ,   top_data._d
+                ,   scale._d
+                ,   top_diff._d
                 ,   local_size
                 ,   a
                 ,   b));
@@ -367,12 +519,44 @@ cdef class NArray(object):
     def max_index(self, int rhs):
         return _wrap_cpp_narray(self._d.MaxIndex(rhs))
 
+    def topk(self, int k, int dim):
+        """ Values and indices of the k largest elements along a dimension, in descending order
+
+        :param int k: number of elements to select
+        :param int dim: the dimension to select along
+        :return: ``(values, indices)``, both of the same shape as this array except ``k`` on ``dim``
+        :rtype: tuple
+        """
+        cdef vector[m.NArray] ret = self._d.TopK(k, dim)
+        return (_wrap_cpp_narray(ret[0]), _wrap_cpp_narray(ret[1]))
+
     def count_zero(self):
         return self._d.CountZero()
 
     def trans(self):
         return _wrap_cpp_narray(self._d.Trans())
 
+    def trans_mult(self, NArray rhs):
+        """ Same as ``self.trans() * rhs``, but multiplies without transposing this array
+
+        :param owl.NArray rhs: the right operand
+        :rtype: owl.NArray
+        """
+        return _wrap_cpp_narray(self._d.TransMult(rhs._d))
+
+    @staticmethod
+    def momentum_update(NArray weight, NArray delta, NArray grad, float momentum, float grad_rate, float decay_rate):
+        """ One step of SGD with momentum, issuing its ops in a single call
+
+        Same as ``delta = momentum * delta - grad_rate * grad - decay_rate * weight`` and then
+        ``weight + delta``.
+
+        :return: ``(weight, delta)``, the updated weight and delta
+        :rtype: tuple
+        """
+        cdef vector[m.NArray] ret = m.MomentumUpdate(weight._d, delta._d, grad._d, momentum, grad_rate, decay_rate)
+        return (_wrap_cpp_narray(ret[0]), _wrap_cpp_narray(ret[1]))
+
     def reshape(self, s):
         cdef vector[int] v = _list_to_vector(s)
         return _wrap_cpp_narray(self._d.Reshape(m.ToScale(&v)))
@@ -382,8 +566,11 @@ cdef class NArray(object):
 
     property shape:
         def __get__(self):
-            cdef vector[int] scale = m.OfScale(self._d.Size())
-            return list(scale)
+            cdef vector[int] scale
+            if self._shape is None:
+                scale = m.OfScale(self._d.Size())
+                self._shape = tuple(scale)
+            return list(self._shape)
 
     @staticmethod
     def zeros(s):
@@ -411,13 +598,13 @@ cdef class NArray(object):
         cdef NArray n
         for i in arrays:
             n = i
-            v.push_back(deref(n._d))
+            v.push_back(n._d)
         return _wrap_cpp_narray(m.Concat(v, dim))
 
     @staticmethod
     def slice(NArray n, int slice_dim, int st_off, int slice_count):
         return _wrap_cpp_narray(
-                m.Slice(deref(n._d), slice_dim, st_off, slice_count))
+                m.Slice(n._d, slice_dim, st_off, slice_count))
 
     @staticmethod
     @cython.boundscheck(False)
@@ -434,15 +621,156 @@ cdef class NArray(object):
         cdef vector[int] shape = _list_to_vector(reversed(s))
         return _wrap_cpp_narray(m.FromNumpy(&n[0], m.ToScale(&shape)))
 
+    @staticmethod
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def from_numpy_uint8(np.ndarray[np.uint8_t, ndim=1, mode='c'] n):
+        return _wrap_cpp_narray(m.FromNumpyUint8(&n[0], n.shape[0]))
+
+    @staticmethod
+    def image_normalize(NArray packed, NArray crop_info, mean, src_shape, int crop_size):
+        cdef vector[int] shape = _list_to_vector(reversed(list(src_shape)))
+        cdef NArray mean_image
+        cdef vector[float] mean_value
+        if isinstance(mean, NArray):
+            mean_image = mean
+            return _wrap_cpp_narray(
+                m.ImageNormalize(
+                    packed._d
+                ,   crop_info._d
+                ,   mean_image._d
+                ,   m.ToScale(&shape)
+                ,   crop_size))
+        else:
+            for v in mean:
+                mean_value.push_back(v)
+            return _wrap_cpp_narray(
+                m.ImageNormalize(
+                    packed._d
+                ,   crop_info._d
+                ,   mean_value
+                ,   m.ToScale(&shape)
+                ,   crop_size))
+
+    def to_half(self):
+        """ Values of this array in half precision, packed two per float
+
+        :rtype: owl.NArray
+        """
+        return _wrap_cpp_narray(m.ToHalf(self._d))
+
+    def to_int8(self):
+        """ Values of this array in 8 bits, packed four per float
+
+        Values are scaled per slice along the last dimension, so that the largest absolute value
+        of a slice is 127.
+
+        :return: ``(packed, scale)``, ``scale`` having the size of the last dimension
+        :rtype: tuple
+        """
+        cdef vector[m.NArray] ret = m.ToInt8(self._d)
+        return (_wrap_cpp_narray(ret[0]), _wrap_cpp_narray(ret[1]))
+
+    @staticmethod
+    def from_half(NArray packed, shape):
+        cdef vector[int] v = _list_to_vector(shape)
+        return _wrap_cpp_narray(m.FromHalf(packed._d, m.ToScale(&v)))
+
+    @staticmethod
+    def from_int8(NArray packed, NArray scale, shape):
+        cdef vector[int] v = _list_to_vector(shape)
+        return _wrap_cpp_narray(
+                m.FromInt8(packed._d, scale._d, m.ToScale(&v)))
+
+    @staticmethod
+    def half_trans_mult(NArray packed, shape, NArray rhs):
+        cdef vector[int] v = _list_to_vector(shape)
+        return _wrap_cpp_narray(
+                m.HalfTransMult(packed._d, m.ToScale(&v), rhs._d))
+
+    @staticmethod
+    def int8_trans_mult(NArray packed, NArray scale, shape, NArray rhs):
+        cdef vector[int] v = _list_to_vector(shape)
+        return _wrap_cpp_narray(
+                m.Int8TransMult(
+                    packed._d
+                ,   scale._d
+                ,   m.ToScale(&v)
+                ,   rhs._d))
+
     def to_numpy(self):
         cdef int size = 1
         for i in self.shape:
             size *= i
         cdef np.ndarray[np.float32_t, ndim=1, mode='c'] dest
         dest = np.empty(size, dtype=np.float32, order='c')
-        m.ToNumpy(&dest[0], deref(self._d))
+        cdef float* dest_ptr = &dest[0]
+        # Waiting for the result should not block other Python threads
+        with nogil:
+            m.ToNumpy(dest_ptr, self._d)
         return dest.reshape(tuple(reversed(self.shape)))
 
+cdef class StagingRing(object):
+    ''' A ring of host staging buffers for uploading minibatches
+
+    On CUDA builds the buffers are page-locked and uploaded asynchronously on a
+    separate copy stream; on CPU builds they are plain host memory.
+    '''
+    cdef m.StagingBufferRing* _d
+
+    def __cinit__(self, size_t num_buffers, size_t capacity):
+        self._d = new m.StagingBufferRing(num_buffers, capacity)
+
+    def __dealloc__(self):
+        del self._d
+
+    property num_buffers:
+        def __get__(self):
+            return self._d.num_buffers()
+
+    property capacity:
+        def __get__(self):
+            return self._d.capacity()
+
+    def acquire(self):
+        cdef StagingBuffer buf = StagingBuffer.__new__(StagingBuffer)
+        buf._d = new m.StagingBuffer(self._d)
+        buf._ring = self
+        return buf
+
+cdef class StagingBuffer(object):
+    cdef m.StagingBuffer* _d
+    cdef object _ring
+
+    def __cinit__(self):
+        self._d = NULL
+
+    def __dealloc__(self):
+        del self._d
+
+    def array(self, shape):
+        cdef np.npy_intp size = 1
+        for i in shape:
+            size *= i
+        assert(size <= self._d.Capacity())
+        cdef np.ndarray arr = np.PyArray_SimpleNewFromData(
+                1, &size, np.NPY_FLOAT32, <void*>self._d.Data())
+        np.set_array_base(arr, self)
+        return arr.reshape(shape)
+
+    def bytes(self, nbytes):
+        ''' uint8 view of the first ``nbytes`` bytes, uploaded packed four per float '''
+        cdef np.npy_intp size = nbytes
+        assert(size <= self._d.Capacity() * sizeof(float))
+        cdef np.ndarray arr = np.PyArray_SimpleNewFromData(
+                1, &size, np.NPY_UINT8, <void*>self._d.Data())
+        np.set_array_base(arr, self)
+        return arr
+
+    def upload(self, shape):
+        cdef vector[int] v = _list_to_vector(reversed(list(shape)))
+        return _wrap_cpp_narray(self._d.Upload(m.ToScale(&v)))
+
 cdef class PoolingAlgorithmWrapper(object):
     cdef int _d
 
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+""" This module contains the memory introspection of the devices
+
+Each device reports the bytes held by live data, the bytes freed but cached for reuse and the
+peak of live bytes. :py:func:`live_data` lists the data that are still alive: the results of ops
+not freed yet, because they are to be computed, are inputs of pending ops or are referred to by an
+``owl.NArray`` (``extern_rc``). The last is the usual cause of running out of memory: an attribute
+such as ``unit.ff_act`` keeps its activation alive until it is overwritten::
+
+    >>> import owl.memory
+    >>> owl.memory.reset_peak()
+    >>> net.forward('TRAIN'); owl.wait_for_all()
+    >>> owl.memory.print_report()
+"""
+import numpy as np
+import libowl as _owl
+
+def devices():
+    """ Ids of the created devices
+
+    :rtype: list int
+    """
+    return _owl.get_device_ids()
+
+def stats(dev = None):
+    """ Memory of devices
+
+    Each device maps to ``live_bytes``, ``cached_bytes``, ``peak_bytes`` and ``size_histogram``, the
+    number of allocations by size rounded up to a power of two.
+
+    :param int dev: the device; by default, all devices
+    :return: the stats of ``dev``, or a map from device id to stats
+    :rtype: dict
+    """
+    if dev != None:
+        return _owl.memory_stats(dev)
+    return dict([(d, _owl.memory_stats(d)) for d in devices()])
+
+def reset_peak(dev = None):
+    """ Reset the peak of live bytes to the current live bytes
+
+    :param int dev: the device; by default, all devices
+    """
+    for d in ([dev] if dev != None else devices()):
+        _owl.reset_peak_memory(d)
+
+def live_data():
+    """ Data not freed yet, largest first
+
+    Each entry has the ``node`` id, its ``device``, ``shape`` (in Minerva's order), ``bytes``, the
+    ``creator`` op class and ``extern_rc``, the number of ``owl.NArray`` referring to it.
+
+    :rtype: list dict
+    """
+    nodes = _owl.data_nodes()
+    for n in nodes:
+        n['bytes'] = int(np.prod(n['shape'])) * 4
+    return sorted(nodes, key = lambda n: -n['bytes'])
+
+def print_report(top = 20):
+    """ Print the stats of the devices and the largest live data
+
+    :param int top: number of data printed
+    """
+    for (dev, s) in sorted(stats().items()):
+        print 'device #%d: live %.1fMB, cached %.1fMB, peak %.1fMB' % (dev, s['live_bytes'] / 1048576.0, s['cached_bytes'] / 1048576.0, s['peak_bytes'] / 1048576.0)
+    nodes = live_data()
+    print '%d live data, %.1fMB referred to by NArrays' % (len(nodes), sum([n['bytes'] for n in nodes if n['extern_rc'] > 0]) / 1048576.0)
+    for n in nodes[:top]:
+        print '  #%d on device #%d: %s %.1fMB from %s, %d NArrays' % (n['node'], n['device'], n['shape'], n['bytes'] / 1048576.0, n['creator'], n['extern_rc'])
@@ -1,6 +1,8 @@
 from libc.stdint cimport *
 from libcpp cimport bool
 from libcpp.vector cimport vector
+from libcpp.string cimport string
+from libcpp.pair cimport pair
 
 cdef extern from './minerva_utils.h' namespace 'libowl':
   uint64_t CreateCpuDevice() except +
@@ -8,10 +10,40 @@ cdef extern from './minerva_utils.h' namespace 'libowl':
   int GetGpuDeviceCount() except +
   void WaitForAll() except +
   void SetDevice(uint64_t) except +
+  void SetThreadDevice(uint64_t) except +
+  void ResetThreadDevice() except +
+  void EnableProfiler() except +
+  void DisableProfiler() except +
+  void ResetProfiler() except +
+  vector[ProfileRecord] ProfilerReport() except +
+  vector[TagRecord] ProfilerTagReport() except +
+  void SetOpTag(const string&) except +
+  void EnableTracer(size_t) except +
+  void DisableTracer() except +
+  void ClearTracer() except +
+  string ExportChromeTrace() except +
+  void EnableDagRecorder() except +
+  void DisableDagRecorder() except +
+  void ClearDagRecorder() except +
+  string ExportDagJson() except +
+  vector[uint64_t] GetDeviceIds() except +
+  MemoryStats GetMemoryStats(uint64_t) except +
+  void ResetPeakMemory(uint64_t) except +
+  vector[DataNodeInfo] GetDataNodes() except +
+  BackendStats GetBackendStats() except +
+  TaskStats GetTaskStats(uint64_t) except +
   Scale ToScale(vector[int]*) except +
   vector[int] OfScale(const Scale&) except +
   NArray FromNumpy(const float*, const Scale&) except +
-  void ToNumpy(float*, const NArray&) except +
+  NArray FromNumpyUint8(const uint8_t*, size_t) except +
+  void ToNumpy(float*, const NArray&) nogil except +
+  void MoveNArray(NArray&, NArray&) except +
+  vector[NArray] MomentumUpdate(const NArray&, const NArray&, const NArray&, float, float, float) except +
+  cppclass StagingBuffer:
+    StagingBuffer(StagingBufferRing*) except +
+    float* Data() except +
+    size_t Capacity()
+    NArray Upload(const Scale&) except +
 
 cdef extern from '../minerva/minerva.h' namespace 'minerva::MinervaSystem':
   void Initialize(int*, char***) except +
@@ -30,6 +62,8 @@ cdef extern from '../minerva/minerva.h' namespace 'minerva::Elewise':
 
 cdef extern from '../minerva/minerva.h' namespace 'minerva::Convolution':
   NArray ConvForward(NArray, NArray, NArray, ConvInfo) except +
+  NArray FusedConvForward(
+      NArray, NArray, NArray, ConvInfo, ActivationAlgorithm) except +
   NArray ConvBackwardData(NArray, NArray, NArray, ConvInfo) except +
   NArray ConvBackwardFilter(NArray, NArray, NArray, ConvInfo) except +
   NArray ConvBackwardBias(NArray) except +
@@ -43,6 +77,17 @@ cdef extern from '../minerva/minerva.h' namespace 'minerva::Convolution':
   NArray LRNForward(NArray, NArray, int, float, float) except +
   NArray LRNBackward(
       NArray, NArray, NArray, NArray, int, float, float) except +
+  NArray ImageNormalize(NArray, NArray, NArray, const Scale&, int) except +
+  NArray ImageNormalize(
+      NArray, NArray, const vector[float]&, const Scale&, int) except +
+
+cdef extern from '../minerva/minerva.h' namespace 'minerva::Quantization':
+  NArray ToHalf(NArray) except +
+  NArray FromHalf(NArray, const Scale&) except +
+  vector[NArray] ToInt8(NArray) except +
+  NArray FromInt8(NArray, NArray, const Scale&) except +
+  NArray HalfTransMult(NArray, const Scale&, NArray) except +
+  NArray Int8TransMult(NArray, NArray, const Scale&, NArray) except +
 
 cdef extern from '../minerva/minerva.h' namespace 'minerva':
   NArray NArrayAddNArray 'operator+'(const NArray&, const NArray&) except +
@@ -79,8 +124,10 @@ cdef extern from '../minerva/minerva.h' namespace 'minerva':
     NArray Max(int) except +
     NArray Max(const Scale&) except +
     NArray MaxIndex(int) except +
+    vector[NArray] TopK(int, int) except +
     int CountZero() except +
     NArray Trans() except +
+    NArray TransMult(const NArray&) except +
     NArray Reshape(const Scale&) except +
     void Wait() except +
     Scale Size() except +
@@ -116,6 +163,67 @@ cdef extern from '../minerva/minerva.h' namespace 'minerva':
   ActivationAlgorithm ToActivationAlgorithm\
     'libowl::ToEvilEnumClass<minerva::ActivationAlgorithm>'(int) except +
 
+  ctypedef enum ProfilePhase 'minerva::ProfilePhase':
+    kProfilePhaseQueueWait 'minerva::ProfilePhase::kQueueWait'
+    kProfilePhaseMemory 'minerva::ProfilePhase::kMemory'
+    kProfilePhaseCompute 'minerva::ProfilePhase::kCompute'
+  string ProfilePhaseName(ProfilePhase) except +
+
+  cppclass ProfileRecord:
+    string name
+    uint64_t device_id
+    ProfilePhase phase
+    uint64_t count
+    double total
+    double p50
+    double p99
+    double max
+    double flops
+    double bytes
+
+  cppclass TagRecord:
+    string tag
+    uint64_t device_id
+    uint64_t count
+    double total
+    double flops
+    double bytes
+    double output_bytes
+
+  cppclass MemoryStats:
+    size_t live_bytes
+    size_t cached_bytes
+    size_t peak_bytes
+    vector[pair[size_t, uint64_t]] size_histogram
+
+  cppclass DataNodeInfo:
+    uint64_t node_id
+    uint64_t device_id
+    Scale size
+    string creator
+    int extern_rc
+
+  cppclass BackendStats:
+    uint64_t nodes_created
+    uint64_t nodes_deleted
+    int64_t nodes_yet_to_finish
+    vector[size_t] dispatcher_queue
+    vector[uint64_t] ready_to_dispatch
+    vector[uint64_t] dispatch_to_complete
+
+  cppclass TaskStats:
+    int64_t ready
+    int64_t queued
+    int64_t running
+    uint64_t completed
+    size_t num_workers
+    double busy_us
+
+  cppclass StagingBufferRing:
+    StagingBufferRing(size_t, size_t) except +
+    size_t num_buffers()
+    size_t capacity()
+
   cppclass ConvInfo:
     ConvInfo(int, int, int, int)
     int pad_height
@@ -2,6 +2,7 @@
 #include <memory>
 #include <cstring>
 #include <iostream>
+#include <sstream>
 
 namespace libowl {
 
@@ -30,6 +31,120 @@ void SetDevice(uint64_t id) {
   ms.SetDevice(id);
 }
 
+void SetThreadDevice(uint64_t id) {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.SetThreadDevice(id);
+}
+
+void ResetThreadDevice() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.SetThreadDevice(minerva::MinervaSystem::kNoDevice);
+}
+
+void EnableProfiler() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.profiler().Enable();
+}
+
+void DisableProfiler() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.profiler().Disable();
+}
+
+void ResetProfiler() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.profiler().Reset();
+}
+
+std::vector<minerva::ProfileRecord> ProfilerReport() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  return ms.profiler().Report();
+}
+
+std::vector<minerva::TagRecord> ProfilerTagReport() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  return ms.profiler().TagReport();
+}
+
+void SetOpTag(const std::string& tag) {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.SetOpTag(tag);
+}
+
+void EnableTracer(size_t capacity) {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.tracer().Enable(capacity);
+}
+
+void DisableTracer() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.tracer().Disable();
+}
+
+void ClearTracer() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.tracer().Clear();
+}
+
+std::string ExportChromeTrace() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  std::ostringstream os;
+  ms.tracer().ExportChromeTrace(os);
+  return os.str();
+}
+
+void EnableDagRecorder() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.dag_recorder().Enable();
+}
+
+void DisableDagRecorder() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.dag_recorder().Disable();
+}
+
+void ClearDagRecorder() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.dag_recorder().Clear();
+}
+
+std::string ExportDagJson() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  std::ostringstream os;
+  ms.dag_recorder().ExportJson(os);
+  return os.str();
+}
+
+std::vector<uint64_t> GetDeviceIds() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  return ms.device_manager().GetDeviceIds();
+}
+
+minerva::MemoryStats GetMemoryStats(uint64_t id) {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  return ms.device_manager().GetDevice(id)->GetMemoryStats();
+}
+
+void ResetPeakMemory(uint64_t id) {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  ms.device_manager().GetDevice(id)->ResetPeakMemory();
+}
+
+std::vector<minerva::DataNodeInfo> GetDataNodes() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  return ms.physical_dag().DataNodes();
+}
+
+minerva::BackendStats GetBackendStats() {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  return ms.backend().GetStats();
+}
+
+minerva::TaskStats GetTaskStats(uint64_t id) {
+  auto&& ms = minerva::MinervaSystem::Instance();
+  return ms.device_manager().GetDevice(id)->GetTaskStats();
+}
+
 minerva::Scale ToScale(std::vector<int>* v) {
   minerva::Scale r(std::move(*v));
   return r;
@@ -52,11 +167,55 @@ minerva::NArray FromNumpy(float const* data, minerva::Scale const& scale) {
   return minerva::NArray::MakeNArray(scale, ptr);
 }
 
+minerva::NArray FromNumpyUint8(uint8_t const* data, size_t length) {
+  // Bytes are packed four per float, so only `length` bytes are transferred
+  int size = (length + sizeof(float) - 1) / sizeof(float);
+  std::shared_ptr<float> ptr(new float[size], [](float* p) {
+    delete[] p;
+  });
+  memcpy(ptr.get(), data, length);
+  return minerva::NArray::MakeNArray({size}, ptr);
+}
+
 void ToNumpy(float* dst, minerva::NArray const& n) {
   auto size = n.Size().Prod();
   auto ptr = n.Get();
   memcpy(dst, ptr.get(), size * sizeof(float));
 }
 
+void MoveNArray(minerva::NArray& dst, minerva::NArray& src) {
+  dst = std::move(src);
+}
+
+std::vector<minerva::NArray> MomentumUpdate(minerva::NArray const& weight, minerva::NArray const& delta, minerva::NArray const& grad, float momentum, float grad_rate, float decay_rate) {
+  auto new_delta = momentum * delta - grad_rate * grad - decay_rate * weight;
+  auto new_weight = weight + new_delta;
+  std::vector<minerva::NArray> ret;
+  ret.push_back(std::move(new_weight));
+  ret.push_back(std::move(new_delta));
+  return ret;
+}
+
+StagingBuffer::StagingBuffer(minerva::StagingBufferRing* ring) : data_(ring->Acquire()), capacity_(ring->capacity()) {
+}
+
+float* StagingBuffer::Data() const {
+  CHECK(data_) << "staging buffer already uploaded";
+  return data_.get();
+}
+
+size_t StagingBuffer::Capacity() const {
+  return capacity_;
+}
+
+minerva::NArray StagingBuffer::Upload(minerva::Scale const& scale) {
+  CHECK(data_) << "staging buffer already uploaded";
+  CHECK_LE(static_cast<size_t>(scale.Prod()), capacity_) << "upload larger than staging buffer";
+  auto ret = minerva::NArray::Upload(scale, data_);
+  // The upload op now owns the buffer and releases it to the ring once executed
+  data_.reset();
+  return ret;
+}
+
 }  // namespace libowl
 
@@ -2,6 +2,7 @@
 #include "minerva.h"
 #include <vector>
 #include <memory>
+#include <string>
 
 namespace libowl {
 
@@ -10,6 +11,28 @@ uint64_t CreateGpuDevice(int);
 int GetGpuDeviceCount();
 void WaitForAll();
 void SetDevice(uint64_t);
+void SetThreadDevice(uint64_t);
+void ResetThreadDevice();
+void EnableProfiler();
+void DisableProfiler();
+void ResetProfiler();
+std::vector<minerva::ProfileRecord> ProfilerReport();
+std::vector<minerva::TagRecord> ProfilerTagReport();
+void SetOpTag(const std::string&);
+void EnableTracer(size_t);
+void DisableTracer();
+void ClearTracer();
+std::string ExportChromeTrace();
+void EnableDagRecorder();
+void DisableDagRecorder();
+void ClearDagRecorder();
+std::string ExportDagJson();
+std::vector<uint64_t> GetDeviceIds();
+minerva::MemoryStats GetMemoryStats(uint64_t);
+void ResetPeakMemory(uint64_t);
+std::vector<minerva::DataNodeInfo> GetDataNodes();
+minerva::BackendStats GetBackendStats();
+minerva::TaskStats GetTaskStats(uint64_t);
 minerva::Scale ToScale(std::vector<int>*);
 std::vector<int> OfScale(minerva::Scale const&);
 
@@ -25,7 +48,27 @@ T ToEvilEnumClass(int a) {
 }
 
 minerva::NArray FromNumpy(float const*, minerva::Scale const&);
+minerva::NArray FromNumpyUint8(uint8_t const*, size_t);
 void ToNumpy(float*, minerva::NArray const&);
+void MoveNArray(minerva::NArray&, minerva::NArray&);
+// One step of SGD with momentum, issued in a single call from Python:
+// delta = momentum * delta - grad_rate * grad - decay_rate * weight, and
+// weight + delta. Returns the new weight and delta.
+std::vector<minerva::NArray> MomentumUpdate(minerva::NArray const& weight, minerva::NArray const& delta, minerva::NArray const& grad, float momentum, float grad_rate, float decay_rate);
+
+// A buffer acquired from a `StagingBufferRing`, filled from Python and then
+// handed over to an upload op
+class StagingBuffer {
+ public:
+  explicit StagingBuffer(minerva::StagingBufferRing*);
+  float* Data() const;
+  size_t Capacity() const;
+  minerva::NArray Upload(minerva::Scale const&);
+
+ private:
+  std::shared_ptr<float> data_;
+  size_t capacity_;
+};
 
 }  // namespace libowl
 
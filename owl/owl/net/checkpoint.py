@@ -0,0 +1,272 @@
+''' Single-file checkpoint container
+
+A checkpoint stores named tensors in one file that can be memory-mapped::
+
+    [magic][index_offset][index_length]     (padded to 64 bytes)
+    [data_0][data_1]...[data_n]             (each aligned to 64 bytes)
+    [index]                                 (json)
+
+The index holds the name of the ``base`` checkpoint (if any), the ``chunk_size`` used for hashing
+and one entry per tensor with its ``name``, ``shape``, ``dtype``, ``nbytes``, the ``checksum`` (crc32)
+of its bytes and the sha1 ``chunk_hashes`` of each chunk of its bytes.
+
+A full checkpoint stores the ``offset`` of every tensor. A delta checkpoint refers to a full base
+checkpoint in the same directory: for a tensor whose shape matches the base, the entry has a list of
+``chunks`` instead, where ``None`` means the chunk equals the base and ``[offset, length]`` locates the
+zlib-compressed xor of the chunk against the base. Tensors that do not change (e.g. frozen layers)
+therefore take no space at all.
+
+Tensors are float32, except weights stored in reduced precision (see :py:mod:`owl.quantize`), whose
+``dtype`` is ``float16`` or ``int8``; the entry of the latter also has the ``scale`` of each slice along
+the first dimension. These are always stored in full.
+'''
+import os
+import json
+import struct
+import threading
+import hashlib
+import zlib
+import Queue
+import numpy as np
+import owl
+import owl.quantize as oq
+
+CHECKPOINT_MAGIC = 'OWLCKPT1'
+CHECKPOINT_HEADER_SIZE = 64
+CHECKPOINT_HEADER_FORMAT = '<8sqq'
+CHECKPOINT_ALIGN = 64
+CHECKPOINT_CHUNK_SIZE = 1 << 20
+
+def _align(offset):
+    return (offset + CHECKPOINT_ALIGN - 1) / CHECKPOINT_ALIGN * CHECKPOINT_ALIGN
+
+def _checksum(arr):
+    return zlib.crc32(np.ascontiguousarray(arr).view(np.uint8).data) & 0xffffffff
+
+_NUMPY_DTYPES = {'float32': np.float32, 'float16': np.float16, 'int8': np.int8}
+
+def _chunk_hashes(raw, chunk_size):
+    return [hashlib.sha1(raw[i : i + chunk_size].data).hexdigest() for i in range(0, raw.size, chunk_size)]
+
+def read_index(path):
+    ''' Read the index of a checkpoint file without mapping its data
+    '''
+    with open(path, 'rb') as f:
+        (magic, index_offset, index_length) = struct.unpack(CHECKPOINT_HEADER_FORMAT,
+                f.read(struct.calcsize(CHECKPOINT_HEADER_FORMAT)))
+        assert(magic == CHECKPOINT_MAGIC), '%s is not a checkpoint file' % path
+        f.seek(index_offset)
+        return json.loads(f.read(index_length))
+
+def _run_parallel(func, items, num_threads):
+    # Apply func to every item with a small pool of threads; re-raise the first error
+    jobs = Queue.Queue()
+    for item in items:
+        jobs.put(item)
+    errors = []
+    def work():
+        while len(errors) == 0:
+            try:
+                item = jobs.get_nowait()
+            except Queue.Empty:
+                return
+            try:
+                func(item)
+            except Exception as e:
+                errors.append(e)
+    threads = [threading.Thread(target = work) for i in range(max(1, num_threads))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if len(errors) > 0:
+        raise errors[0]
+
+def save_checkpoint(path, tensors, num_threads = 1, base = None):
+    ''' Write tensors into a single checkpoint file
+
+    The file is written as ``<path>.tmp`` and renamed once complete, so a crash never leaves a
+    half-written checkpoint. Tensors are fetched, hashed and written by ``num_threads`` threads
+    in parallel.
+
+    :param str path: path of the checkpoint file
+    :param list tensors: ``(name, array)`` pairs, ``array`` being an ``owl.NArray``, a ``numpy.ndarray`` or
+        an :py:class:`owl.quantize.QuantizedArray`
+    :param int num_threads: number of threads fetching and writing tensors
+    :param Checkpoint base: if given, write a delta checkpoint against this full checkpoint, which
+        must be in the same directory
+    '''
+    assert(base == None or base.base == None), 'the base of a delta checkpoint must be a full checkpoint'
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write('\0' * CHECKPOINT_HEADER_SIZE)
+    entries = [None] * len(tensors)
+    end = [CHECKPOINT_HEADER_SIZE]
+    lock = threading.Lock()
+
+    def append_data(f, payload):
+        with lock:
+            offset = end[0]
+            end[0] = _align(offset + len(payload))
+        f.seek(offset)
+        f.write(payload)
+        return offset
+
+    def write_tensor(i):
+        (name, arr) = tensors[i]
+        dtype = 'float32'
+        scale = None
+        if isinstance(arr, oq.QuantizedArray):
+            # recover the typed values from the bytes of the packed array
+            dtype = arr.dtype
+            if arr.scale != None:
+                scale = arr.scale.to_numpy()
+            shape = list(reversed(arr.shape))
+            values = arr.packed.to_numpy().reshape(-1).view(_NUMPY_DTYPES[dtype])
+            arr = values[: np.prod(shape)].reshape(shape)
+        elif isinstance(arr, owl.NArray):
+            arr = arr.to_numpy()
+        arr = np.ascontiguousarray(arr, dtype=_NUMPY_DTYPES[dtype])
+        raw = arr.reshape(-1).view(np.uint8)
+        entry = {'name': name, 'shape': list(arr.shape), 'dtype': dtype, 'nbytes': raw.size,
+                'checksum': _checksum(arr), 'chunk_hashes': _chunk_hashes(raw, CHECKPOINT_CHUNK_SIZE)}
+        if scale is not None:
+            entry['scale'] = scale.reshape(-1).tolist()
+        with open(tmp_path, 'r+b') as f:
+            if base != None and dtype == 'float32' and base.has(name) and base.dtype(name) == dtype \
+                    and base.shape(name) == entry['shape'] and base.chunk_size == CHECKPOINT_CHUNK_SIZE:
+                base_hashes = base.entries[name]['chunk_hashes']
+                base_raw = base.array(name).reshape(-1).view(np.uint8)
+                chunks = []
+                for (c, h) in enumerate(entry['chunk_hashes']):
+                    if h == base_hashes[c]:
+                        chunks.append(None)
+                        continue
+                    lo = c * CHECKPOINT_CHUNK_SIZE
+                    hi = lo + CHECKPOINT_CHUNK_SIZE
+                    delta = zlib.compress(np.bitwise_xor(raw[lo:hi], base_raw[lo:hi]).tostring(), 1)
+                    chunks.append([append_data(f, delta), len(delta)])
+                entry['chunks'] = chunks
+            else:
+                entry['offset'] = append_data(f, raw.data)
+        entries[i] = entry
+    _run_parallel(write_tensor, range(len(tensors)), num_threads)
+
+    index = json.dumps({
+        'base': os.path.basename(base.path) if base != None else None,
+        'chunk_size': CHECKPOINT_CHUNK_SIZE,
+        'tensors': entries})
+    with open(tmp_path, 'r+b') as f:
+        f.seek(end[0])
+        f.write(index)
+        f.seek(0)
+        f.write(struct.pack(CHECKPOINT_HEADER_FORMAT, CHECKPOINT_MAGIC, end[0], len(index)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.rename(tmp_path, path)
+
+class Checkpoint:
+    ''' Read-only, memory-mapped view of a checkpoint file written by :py:func:`save_checkpoint`
+
+    Only the header and the index are read when opening; tensor data is paged in when accessed.
+    A delta checkpoint also opens its base and composes the tensors from both.
+
+    :ivar str path: path of the checkpoint file
+    :ivar dict entries: index entries by tensor name
+    :ivar Checkpoint base: the base of a delta checkpoint; ``None`` for a full checkpoint
+    '''
+    def __init__(self, path):
+        self.path = path
+        index = read_index(path)
+        self.entries = dict([(e['name'], e) for e in index['tensors']])
+        self.order = [e['name'] for e in index['tensors']]
+        self.chunk_size = index['chunk_size']
+        self.base = None
+        if index['base'] != None:
+            self.base = Checkpoint(os.path.join(os.path.dirname(path), index['base']))
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+
+    def names(self):
+        return list(self.order)
+
+    def has(self, name):
+        return name in self.entries
+
+    def shape(self, name):
+        return list(self.entries[name]['shape'])
+
+    def dtype(self, name):
+        return self.entries[name]['dtype']
+
+    def scale(self, name):
+        ''' The scales of a tensor stored as ``int8``; ``None`` for other types
+        '''
+        if not 'scale' in self.entries[name]:
+            return None
+        return np.array(self.entries[name]['scale'], dtype=np.float32)
+
+    def stored(self, name, verify = False):
+        ''' Get a tensor as a numpy array of the type it is stored in
+
+        The result is a view on the mapping (no copy), unless the tensor is stored as a delta with
+        changed chunks, in which case it is composed from the base in a new array.
+
+        :param str name: name of the tensor
+        :param bool verify: check the checksum of the tensor
+        :rtype: numpy.ndarray
+        '''
+        e = self.entries[name]
+        if 'chunks' not in e:
+            arr = self.data[e['offset'] : e['offset'] + e['nbytes']].view(_NUMPY_DTYPES[e['dtype']]).reshape(e['shape'])
+        elif all([c == None for c in e['chunks']]):
+            arr = self.base.stored(name)
+        else:
+            raw = np.array(self.base.stored(name).reshape(-1).view(np.uint8))
+            for (c, chunk) in enumerate(e['chunks']):
+                if chunk == None:
+                    continue
+                delta = np.frombuffer(zlib.decompress(self.data[chunk[0] : chunk[0] + chunk[1]].tostring()), dtype=np.uint8)
+                lo = c * self.chunk_size
+                np.bitwise_xor(raw[lo : lo + delta.size], delta, out=raw[lo : lo + delta.size])
+            arr = raw.view(np.float32).reshape(e['shape'])
+        if verify:
+            assert(_checksum(arr) == e['checksum']), 'checksum mismatch of %s in %s' % (name, self.path)
+        return arr
+
+    def array(self, name, verify = False):
+        ''' Get a tensor as a float32 numpy array
+
+        Same as :py:meth:`stored`, except that tensors stored in reduced precision are expanded into
+        a new array.
+
+        :rtype: numpy.ndarray
+        '''
+        arr = self.stored(name, verify)
+        if self.dtype(name) != 'float32':
+            arr = oq.dequantize_numpy(arr, self.scale(name))
+        return arr
+
+    def load(self, names, verify = True, num_threads = 4):
+        ''' Create ``owl.NArray`` of the given tensors
+
+        Tensors are paged in (or composed from the base) and verified by ``num_threads`` threads in
+        parallel; each ``owl.NArray`` is then copied directly from the resulting array. Tensors stored
+        in reduced precision are uploaded as they are into :py:class:`owl.quantize.QuantizedArray`.
+
+        :param list names: names of the tensors to load
+        :param bool verify: check the checksums of the tensors
+        :param int num_threads: number of threads reading tensors
+        :return: dict from tensor name to ``owl.NArray`` (dimensions reversed as in :py:func:`owl.from_numpy`)
+        '''
+        views = {}
+        def read_tensor(name):
+            views[name] = self.stored(name, verify)
+        _run_parallel(read_tensor, names, num_threads)
+        ret = {}
+        for name in names:
+            view = views[name]
+            if self.dtype(name) != 'float32':
+                ret[name] = oq.from_numpy(view, self.scale(name))
+            else:
+                ret[name] = owl.NArray._from_numpy(view.reshape(-1), list(view.shape))
+        return ret
@@ -10,9 +10,11 @@ of:
 
 import numpy as np
 import math
-import Queue
+import copy
+import collections
 
 import owl
+import owl.profiler
 import owl.elewise as ele
 import owl.conv as co
 from caffe import *
@@ -20,6 +22,8 @@ from caffe import *
 from netio import LMDBDataProvider
 from netio import ImageListDataProvider
 from netio import ImageWindowDataProvider
+from netio import PackedDataProvider
+from netio import DecodedImageCache
 
 class ComputeUnit(object):
     ''' Interface for each compute unit.
@@ -35,6 +39,8 @@ class ComputeUnit(object):
     :ivar top_names: names of the top units
     :vartype top_names: list str
     :ivar list int out_shape:
+    :ivar bool inference: whether the unit runs in inference mode (see :py:meth:`Net.set_inference`), in which
+        it does not keep the values needed by the backward pass
 
     .. note::
         ``params``, ``name``, ``btm_names`` and ``top_names`` will be parsed from Caffe's network
@@ -48,6 +54,7 @@ class ComputeUnit(object):
         self.top_names = []
         self.out = None
         self.out_shape = None
+        self.inference = False
         self.rec_on_ori = None
         self.stride_on_ori = None
         self.start_on_ori = None
@@ -249,20 +256,18 @@ class WeightedComputeUnit(ComputeUnitSimple):
         if self.weightdelta == None:
             self.weightdelta = owl.zeros(self.weightgrad.shape)
 
-        self.weightdelta = momentum * self.weightdelta \
-                        - (base_lr * self.lr_mult_w / batch_size) * self.weightgrad \
-                        - (base_lr * self.lr_mult_w * base_weight_decay * self.decay_mult_w) * self.weight
-        
-        self.weight = self.weight + self.weightdelta
+        # all the ops of an update are issued in one call
+        (self.weight, self.weightdelta) = owl.NArray.momentum_update(self.weight, self.weightdelta, self.weightgrad, momentum,
+                base_lr * self.lr_mult_w / batch_size,
+                base_lr * self.lr_mult_w * base_weight_decay * self.decay_mult_w)
         self.weightgrad = None
 
         if self.biasdelta == None:
             self.biasdelta = owl.zeros(self.biasgrad.shape)
 
-        self.biasdelta = momentum * self.biasdelta \
-                        - (base_lr * self.lr_mult_b / batch_size) * self.biasgrad \
-                        - (base_lr * self.lr_mult_b * base_weight_decay * self.decay_mult_b) * self.bias
-        self.bias = self.bias + self.biasdelta
+        (self.bias, self.biasdelta) = owl.NArray.momentum_update(self.bias, self.biasdelta, self.biasgrad, momentum,
+                base_lr * self.lr_mult_b / batch_size,
+                base_lr * self.lr_mult_b * base_weight_decay * self.decay_mult_b)
         self.biasgrad = None
 
 class LinearUnit(ComputeUnitSimple):
@@ -289,7 +294,8 @@ class ReluUnit(ComputeUnitSimple):
     ''' Compute unit for RELU non-linearity
     '''
     def ff(self, x, phase):
-        self.ff_x = x
+        if not self.inference:
+            self.ff_x = x
         return ele.relu(x)
     def bp(self, y, phase):
         return ele.relu_back(y, self.ff_x)
@@ -349,9 +355,11 @@ class PoolingUnit(ComputeUnitSimple):
         self.start_on_ori = to_top[self.top_names[0]]['start_on_ori']
 
     def ff(self, x, phase):
-        self.ff_x = x
-        self.ff_y = self.pooler.ff(x)
-        return self.ff_y
+        y = self.pooler.ff(x)
+        if not self.inference:
+            self.ff_x = x
+            self.ff_y = y
+        return y
     def bp(self, y, phase):
         return self.pooler.bp(y, self.ff_y, self.ff_x)
     def __str__(self):
@@ -406,6 +414,10 @@ class SoftmaxUnit(ComputeUnit):
     def forward(self, from_btm, to_top, phase):
         to_top[self.top_names[0]] = co.softmax(from_btm[self.btm_names[0]], co.soft_op.instance)
         self.ff_y = to_top[self.top_names[0]]
+        self.out = self.ff_y
+        if self.inference:
+            # the label matrix is only needed for the loss and the gradient
+            return
         #turn label into matrix form
         nplabel = np.zeros([self.ff_y.shape[1], self.ff_y.shape[0]], dtype=np.float32)
         self.strlabel = from_btm[self.btm_names[1]]
@@ -413,7 +425,6 @@ class SoftmaxUnit(ComputeUnit):
         for i in range(len(self.strlabel)):
             nplabel[i, self.strlabel[i]] = 1
         self.y = owl.from_numpy(nplabel)
-        self.out = self.ff_y
 
 
         
@@ -433,18 +444,76 @@ class SoftmaxUnit(ComputeUnit):
     def __str__(self):
         return 'softmax'
 
+def count_correct(predict, ground_truth, top_k = 1):
+    ''' Count the samples whose label is among the ``top_k`` highest predictions
+
+    The count is computed on the device with :py:meth:`owl.NArray.topk`, so only a scalar has to be
+    fetched instead of the whole prediction matrix.
+
+    :param owl.NArray predict: predictions of shape ``[num_class, N]``
+    :param numpy.ndarray ground_truth: labels of the N samples
+    :param int top_k: number of highest predictions to look at
+    :return: the count as a ``[1, 1]`` owl.NArray
+    :rtype: owl.NArray
+    '''
+    batch_size = predict.shape[1]
+    if top_k == 1:
+        predict_idx = predict.max_index(0)
+    else:
+        predict_idx = predict.topk(top_k, 0)[1]
+    truth = np.repeat(np.asarray(ground_truth, dtype=np.float32).reshape([batch_size, 1]), top_k, axis=1)
+    diff = predict_idx - owl.from_numpy(truth)
+    # min(|diff|, 1) is 0 where the label is hit and 1 elsewhere; a label is hit at most once per sample
+    dist = ele.relu(diff) + ele.relu(diff * -1)
+    miss = dist - ele.relu(dist - 1)
+    return miss.sum([0, 1]) * -1 + top_k * batch_size
+
+class AccuracyAccumulator:
+    ''' Accumulate the number of correct samples over many test batches without waiting for each batch.
+
+    Counts are summed on the device and fetched once in :py:meth:`result`.
+
+    :ivar int top_k: number of highest predictions to look at
+    '''
+    def __init__(self, top_k = 1):
+        self.top_k = top_k
+        self.correct = None
+        self.num = 0
+
+    def add(self, predict, ground_truth):
+        ''' Add a batch
+
+        :param owl.NArray predict: predictions of shape ``[num_class, N]``
+        :param numpy.ndarray ground_truth: labels of the N samples
+        '''
+        self.num += predict.shape[1]
+        correct = count_correct(predict, ground_truth, self.top_k)
+        self.correct = correct if self.correct == None else self.correct + correct
+
+    def result(self):
+        ''' Wait for all batches and get the totals
+
+        :return: ``(num_correct, num_samples)``
+        '''
+        if self.correct == None:
+            return (0, 0)
+        return (int(round(self.correct.to_numpy().reshape(-1)[0])), self.num)
+
 class AccuracyUnit(ComputeUnit):
     ''' Compute unit for calculating accuracy
 
     .. note::
-        In terms of Minerva's lazy evaluation, the unit is a **non-lazy** one since it gets the actual
-        contents (accuracy) out of an ``owl.NArray``.
+        The correct count is built lazily in ``forward``; only reading :py:attr:`acc` waits for the
+        evaluation. Use :py:class:`AccuracyAccumulator` with ``predict`` and ``ground_truth`` to accumulate
+        over many batches without waiting.
     '''
     def __init__(self, params):
         super(AccuracyUnit, self).__init__(params)
-        self.acc = 0
         self.batch_size = 0
         self.top_k = params.accuracy_param.top_k
+        self.predict = None
+        self.ground_truth = None
+        self.correct = None
 
     def compute_size(self, from_btm, to_top):
         to_top[self.top_names[0]] = dict()
@@ -459,26 +528,16 @@ class AccuracyUnit(ComputeUnit):
         self.rec_on_ori = to_top[self.top_names[0]]['rec_on_ori']
     
     def forward(self, from_btm, to_top, phase):
-        if self.top_k == 1:
-            predict = from_btm[self.btm_names[0]].max_index(0)
-            ground_truth = owl.from_numpy(from_btm[self.btm_names[1]]).reshape(predict.shape)
-            self.batch_size = from_btm[self.btm_names[0]].shape[1]
-            correct = (predict - ground_truth).count_zero()
-            self.acc = correct * 1.0 / self.batch_size
-        elif self.top_k == 5:
-            predict = from_btm[self.btm_names[0]].to_numpy()
-            top_5 = np.argsort(predict, axis=1)[:,::-1]
-            ground_truth = from_btm[self.btm_names[1]]
-            self.batch_size = np.shape(ground_truth)[0]
-            correct = 0
-            for i in range(self.batch_size):
-                for t in range(5):
-                    if ground_truth[i] == top_5[i,t]:
-                        correct += 1
-                        break
-            self.acc = correct * 1.0 / self.batch_size
-        else:
-            assert(FALSE)
+        self.predict = from_btm[self.btm_names[0]]
+        self.ground_truth = from_btm[self.btm_names[1]]
+        self.batch_size = self.predict.shape[1]
+        self.correct = count_correct(self.predict, self.ground_truth, self.top_k)
+
+    @property
+    def acc(self):
+        ''' Accuracy of the last batch; reading it waits for the evaluation
+        '''
+        return self.correct.to_numpy().reshape(-1)[0] * 1.0 / self.batch_size
 
     def backward(self, from_top, to_btm, phase):
         pass
@@ -494,10 +553,13 @@ class LRNUnit(ComputeUnitSimple):
         self.lrner = co.Lrner(params.lrn_param.local_size, params.lrn_param.alpha, params.lrn_param.beta)
         self.scale = None
     def ff(self, x, phase):
-        self.ff_x = x
-        self.scale = owl.zeros(x.shape)
-        self.ff_y = self.lrner.ff(x, self.scale)
-        return self.ff_y
+        scale = owl.zeros(x.shape)
+        y = self.lrner.ff(x, scale)
+        if not self.inference:
+            self.ff_x = x
+            self.scale = scale
+            self.ff_y = y
+        return y
     def bp(self, y, phase):
         return self.lrner.bp(self.ff_x, self.ff_y, self.scale, y)
     def __str__(self):
@@ -531,6 +593,8 @@ class ConcatUnit(ComputeUnit):
     def forward(self, from_btm, to_top, phase):
         narrays = []
         self.concat_dim = len(from_btm[self.btm_names[0]].shape) - 1 - self.concat_dim_caffe
+        # only the sizes of this pass, so that they do not pile up over passes
+        self.slice_count = []
         for i in range(len(self.btm_names)):
             narrays.append(from_btm[self.btm_names[i]])
             self.slice_count.append(from_btm[self.btm_names[i]].shape[self.concat_dim])
@@ -550,12 +614,19 @@ class ConcatUnit(ComputeUnit):
 
 class FullyConnection(WeightedComputeUnit):
     ''' Compute unit for traditional fully connected layer
+
+    :ivar owl.NArray weight_t: if set, the transposed weight used by the feed-forward instead of
+        ``weight`` (see :py:func:`owl.net.optimize.optimize_for_inference`)
+    :ivar owl.quantize.QuantizedArray qweight: if set, the transposed weight in reduced precision, used
+        by the feed-forward instead of ``weight`` (see :py:mod:`owl.net.quantize`)
     '''
     def __init__(self, params):
         super(FullyConnection, self).__init__(params)
         self.inner_product_param = params.inner_product_param
         self.weight_filler = params.inner_product_param.weight_filler
         self.bias_filler = params.inner_product_param.bias_filler
+        self.weight_t = None
+        self.qweight = None
     
     def compute_size(self, from_btm, to_top):
         ''' Compute the output size and also weight and bias size
@@ -598,7 +669,12 @@ class FullyConnection(WeightedComputeUnit):
             a = act.reshape([np.prod(shp[0:-1], dtype=np.int32), shp[-1]])
         else:
             a = act
-        self.ff_act = act # save ff value
+        if not self.inference:
+            self.ff_act = act # save ff value
+        if self.qweight != None:
+            return self.qweight.trans_mult(a) + self.bias
+        if self.weight_t != None:
+            return self.weight_t.trans_mult(a) + self.bias
         if self.weight == None:
             self.init_weights_with_filler()
         return self.weight * a + self.bias
@@ -629,6 +705,10 @@ class ConvConnection(WeightedComputeUnit):
         - ``C``: number of image channels (feature maps)
         - ``N``: size of minibatch
 
+    :ivar activation: if set, the activation (``owl.conv.act_op``) applied in the same operation as
+        the convolution (see :py:func:`owl.net.optimize.optimize_for_inference`)
+    :ivar owl.quantize.QuantizedArray qweight: if set, the weight in reduced precision, used by the
+        feed-forward instead of ``weight`` (see :py:mod:`owl.net.quantize`)
     '''
     def __init__(self, params):
         super(ConvConnection, self).__init__(params)
@@ -637,6 +717,8 @@ class ConvConnection(WeightedComputeUnit):
                 self.conv_params.pad, self.conv_params.stride, self.conv_params.stride)
         self.num_output = params.convolution_param.num_output
         self.group = params.convolution_param.group
+        self.activation = None
+        self.qweight = None
         
 
         #TODO: hack, we don't want to slice agian to use it into bp as a parameter
@@ -688,10 +770,18 @@ class ConvConnection(WeightedComputeUnit):
             using a bigger convolution with number of feature maps doubled.
         '''
         if self.group == 1:
-            self.ff_act = act
-            if self.weight == None:
-                self.init_weights_with_filler()
-            return self.convolver.ff(act, self.weight, self.bias)
+            if not self.inference:
+                self.ff_act = act
+            if self.qweight != None:
+                # the float filter only lives until the convolution is done
+                weight = self.qweight.dequantize()
+            else:
+                if self.weight == None:
+                    self.init_weights_with_filler()
+                weight = self.weight
+            if self.activation != None:
+                return self.convolver.ff_act(act, weight, self.bias, self.activation)
+            return self.convolver.ff(act, weight, self.bias)
         else:
             #currently doesn't support multi-group
             assert(False)
@@ -723,10 +813,39 @@ class DataUnit(ComputeUnit):
 
     def __init__(self, params, num_gpu):
         super(DataUnit, self).__init__(params)
+        self.staging = None
 
     def compute_size(self, from_btm, to_top):
         pass
 
+    def upload(self, samples):
+        ''' Upload a batch through a ring of staging buffers, so that the upload of the next batch
+        overlaps with the computation of the current one
+
+        :param numpy.ndarray samples: the batch of shape ``[N, C*H*W]``
+        :return: the batch of shape ``[crop_size, crop_size, 3, N]``
+        :rtype: owl.NArray
+        '''
+        if self.staging == None or self.staging.capacity < samples.size:
+            self.staging = owl.create_staging_ring(3, samples.size)
+        buf = self.staging.acquire()
+        np.copyto(buf.array(samples.shape), samples)
+        return buf.upload(samples.shape).reshape([self.crop_size, self.crop_size, 3, samples.shape[0]])
+
+    def upload_uint8(self, images):
+        ''' Upload the raw bytes of a batch through the same ring of staging buffers
+
+        :param numpy.ndarray images: uint8 batch
+        :return: the bytes packed four per float, as :py:func:`owl.from_numpy_uint8` does
+        :rtype: owl.NArray
+        '''
+        size = (images.size + 3) / 4
+        if self.staging == None or self.staging.capacity < size:
+            self.staging = owl.create_staging_ring(3, size)
+        buf = self.staging.acquire()
+        np.copyto(buf.bytes(images.size), images.reshape(-1))
+        return buf.upload([size])
+
     def forward(self, from_btm, to_top, phase):
         ''' Feed-forward of data unit will get a batch of a fixed batch_size from data provider. 
 
@@ -750,8 +869,7 @@ class DataUnit(ComputeUnit):
                 continue
             break
 
-        to_top[self.top_names[0]] = owl.from_numpy(samples).reshape(
-                [self.crop_size, self.crop_size, 3, samples.shape[0]])
+        to_top[self.top_names[0]] = self.upload(samples)
         #may have multiplier labels
         for i in range (1, len(self.top_names)):
             to_top[self.top_names[i]] = labels[:,i - 1]
@@ -784,6 +902,8 @@ class LMDBDataUnit(DataUnit):
         self.generator = None
         self.out = None
         self.multiview = False
+        self.normalize_on_device = None
+        self.mean_image = None
 
     def compute_size(self, from_btm, to_top):
         self.out_shape = [self.params.transform_param.crop_size,
@@ -807,27 +927,23 @@ class LMDBDataUnit(DataUnit):
             LMDB data provider now support multi-view testing, if multiview == True, it will produce concequtive 10 batches of different views of the same original image     
         '''
         if self.generator == None:
-            if self.multiview == False:
-                self.generator = self.dp.get_mb(phase)
-            #multiview test
-            else:
-                self.generator = self.dp.get_multiview_mb()
+            self.generator = self._new_generator(phase)
         while True:
             try:
-                (samples, labels) = next(self.generator)
-                if len(labels) == 0:
-                    (samples, labels) = next(self.generator)
+                batch = next(self.generator)
+                if len(batch[-1]) == 0:
+                    batch = next(self.generator)
             except StopIteration:
                 print 'Have scanned the whole dataset; start from the begginning agin'
-                if self.multiview == False:
-                    self.generator = self.dp.get_mb(phase)
-                #multiview test
-                else:
-                    self.generator = self.dp.get_multiview_mb()
+                self.generator = self._new_generator(phase)
                 continue
             break
-        to_top[self.top_names[0]] = owl.from_numpy(samples).reshape(
-                [self.crop_size, self.crop_size, 3, samples.shape[0]])
+        if len(batch) == 3:
+            (samples, crop_info, labels) = batch
+            to_top[self.top_names[0]] = self.normalize(samples, crop_info)
+        else:
+            (samples, labels) = batch
+            to_top[self.top_names[0]] = self.upload(samples)
         for i in range (1, len(self.top_names)):
             to_top[self.top_names[i]] = labels[:,i - 1]
         #to_top[self.top_names[0]] = owl.zeros([self.crop_size, self.crop_size, 3, 256])
@@ -835,9 +951,58 @@ class LMDBDataUnit(DataUnit):
             #to_top[self.top_names[i]] = np.ones(256)
         self.out = to_top[self.top_names[0]]
 
+    def _new_generator(self, phase):
+        if self.multiview:
+            return self.dp.get_multiview_mb()
+        if self.normalize_on_device == None:
+            self.normalize_on_device = hasattr(self.dp, 'get_uint8_mb') and self.dp.can_normalize_on_device()
+        if self.normalize_on_device:
+            return self.dp.get_uint8_mb(phase)
+        return self.dp.get_mb(phase)
+
+    def normalize(self, images, crop_info):
+        ''' Upload raw uint8 images and transform them on the device
+
+        Only a quarter of the bytes of the float samples are transferred, through the staging
+        ring of :py:meth:`DataUnit.upload_uint8`; mean subtraction, cropping and mirroring are
+        done by :py:func:`owl.conv.image_normalize`.
+        '''
+        if len(self.dp.mean_value) == 3:
+            mean = self.dp.mean_value
+        else:
+            if self.mean_image == None:
+                self.mean_image = owl.from_numpy(self.dp.mean_data)
+            mean = self.mean_image
+        return co.image_normalize(self.upload_uint8(images), list(images.shape),
+                owl.from_numpy(crop_info), self.crop_size, mean)
+
     def __str__(self):
         return 'lmdb_data'
 
+class PackedDataUnit(LMDBDataUnit):
+    ''' DataUnit load from the packed uint8 record format (see :py:class:`owl.net.netio.PackedDataProvider`).
+    It behaves like :py:class:`LMDBDataUnit` (including multiview testing) but reads from a memory-mapped file.
+
+    :ivar caffe.LayerParameter params: packed data layer param, params.data_param.source is the packed data file, params.transform_param defines data augmentation operations
+    '''
+
+    def __init__(self, params, num_gpu):
+        DataUnit.__init__(self, params, num_gpu)
+        if params.include[0].phase == Phase.Value('TRAIN'):
+            self.dp = PackedDataProvider(params.data_param, params.transform_param, num_gpu)
+        else:
+            self.dp = PackedDataProvider(params.data_param, params.transform_param, 1)
+        self.params = params
+        self.crop_size = params.transform_param.crop_size
+        self.generator = None
+        self.out = None
+        self.multiview = False
+        self.normalize_on_device = False
+        self.mean_image = None
+
+    def __str__(self):
+        return 'packed_data'
+
 class ImageDataUnit(DataUnit):
     ''' DataUnit load from raw images.
     :ivar caffe.LayerParameter params: image data layer param defined by Caffe, this is often used when data is limited. Loading from original image will be slower than loading from LMDB
@@ -866,6 +1031,14 @@ class ImageDataUnit(DataUnit):
         self.stride_on_ori = 1
         self.start_on_ori = 0
 
+    def enable_image_cache(self, mem_budget, spill_dir = None):
+        ''' Cache decoded images across epochs (see :py:class:`owl.net.netio.DecodedImageCache`)
+
+        :param int mem_budget: memory budget of the cache in bytes
+        :param str spill_dir: directory to spill evicted images to (``None`` to drop them)
+        '''
+        self.dp.set_cache(DecodedImageCache(mem_budget, spill_dir))
+
     def __str__(self):
         return 'image_data'
 
@@ -905,6 +1078,14 @@ class ImageWindowDataUnit(DataUnit):
         self.stride_on_ori = 1
         self.start_on_ori = 0
     
+    def enable_image_cache(self, mem_budget, spill_dir = None):
+        ''' Cache decoded images across epochs (see :py:class:`owl.net.netio.DecodedImageCache`)
+
+        :param int mem_budget: memory budget of the cache in bytes
+        :param str spill_dir: directory to spill evicted images to (``None`` to drop them)
+        '''
+        self.dp.set_cache(DecodedImageCache(mem_budget, spill_dir))
+
     def __str__(self):
         return 'window_data'
 
@@ -924,6 +1105,9 @@ class Net:
     :vartype loss_uids: list int
     :ivar accuracy_uids: all the units for calculating accuracy
     :vartype accuracy_uids: list int
+    :ivar bool inference: whether the net runs in inference mode (see :py:meth:`set_inference`)
+    :ivar keep_outputs: names of the units whose ``out`` is kept in inference mode
+    :vartype keep_outputs: set str
     '''
     def __init__(self):
         self.units = []
@@ -935,6 +1119,10 @@ class Net:
         self.name_to_uid = {}
         self.loss_uids = []
         self.accuracy_uids = []
+        self.inference = False
+        self.keep_outputs = set()
+        # topological orders by phase, computed once per structure of the net
+        self._orders = {}
 
     def add_unit(self, unit):
         ''' Method for adding units into the graph
@@ -942,6 +1130,7 @@ class Net:
         :param owl.net.ComputeUnit unit: the unit to add
         '''
         uid = len(self.units)
+        self._orders = {}
         self.units.append(unit)
         self.adjacent.append([])
         self.reverse_adjacent.append([])
@@ -956,6 +1145,7 @@ class Net:
         :param str u1: name of the bottom unit
         :param str u2: name of the top unit
         '''
+        self._orders = {}
         self.adjacent[u1].append(u2)
         self.reverse_adjacent[u2].append(u1)
 
@@ -1008,57 +1198,70 @@ class Net:
                 weights_id.append(i)
         return weights_id
 
+    def set_inference(self, inference = True, keep_outputs = []):
+        ''' Switch the net into (or out of) inference mode
+
+        In inference mode, units do not keep the values needed by :py:meth:`backward` (e.g. ``ff_x``,
+        ``ff_y`` and ``ff_act``) and :py:meth:`forward` releases the output of each unit as soon as all
+        the units consuming it are issued, so the engine can free the activations eagerly and larger
+        batches fit into the same memory. The outputs of the units without consumers (e.g. softmax and
+        accuracy) and of the units in ``keep_outputs`` are still available after the forward pass.
+
+        :param bool inference: whether to enable inference mode
+        :param keep_outputs: names of the units whose ``out`` should be kept
+        :type keep_outputs: list str
+        '''
+        self.inference = inference
+        self.keep_outputs = set(keep_outputs)
+        for unit in self.units:
+            unit.inference = inference
+            if inference:
+                # drop the state kept by the last backward pass
+                for attr in ['ff_x', 'ff_y', 'ff_act']:
+                    if hasattr(unit, attr):
+                        setattr(unit, attr, None)
+
     def _is_excluded(self, unit, phase):
         p = self.units[unit].params
         return phase != None and len(p.include) != 0 and p.include[0].phase != Phase.Value(phase)
 
     def _toporder(self, phase = None):
-        depcount = [len(inunits) for inunits in self.reverse_adjacent]
-        queue = Queue.Queue()
-        # remove dep from excluded units
-        for unit in range(len(depcount)):
-            if self._is_excluded(unit, phase):
-                for l in self.adjacent[unit]:
-                    depcount[l] -= 1
-        # find start units
-        for unit in range(len(depcount)):
-            count = depcount[unit]
-            if count == 0:
-                queue.put(unit)
-        # run
-        while not queue.empty():
-            unit = queue.get()
-            if self._is_excluded(unit, phase):
-                continue
-            yield unit
-            for l in self.adjacent[unit]:
-                depcount[l] -= 1
-                if depcount[l] == 0:
-                    queue.put(l)
+        key = (phase, False)
+        if not key in self._orders:
+            self._orders[key] = self._compute_toporder(self.adjacent, self.reverse_adjacent, phase)
+        return self._orders[key]
 
     def _reverse_toporder(self, phase = None):
-        depcount = [len(outunits) for outunits in self.adjacent]
-        queue = Queue.Queue()
+        key = (phase, True)
+        if not key in self._orders:
+            self._orders[key] = self._compute_toporder(self.reverse_adjacent, self.adjacent, phase)
+        return self._orders[key]
+
+    def _compute_toporder(self, adjacent, reverse_adjacent, phase):
+        depcount = [len(inunits) for inunits in reverse_adjacent]
+        queue = collections.deque()
         # remove dep from excluded units
         for unit in range(len(depcount)):
             if self._is_excluded(unit, phase):
-                for l in self.reverse_adjacent[unit]:
+                for l in adjacent[unit]:
                     depcount[l] -= 1
         # find start units
         for unit in range(len(depcount)):
             count = depcount[unit]
             if count == 0:
-                queue.put(unit)
+                queue.append(unit)
         # run
-        while not queue.empty():
-            unit = queue.get()
+        order = []
+        while len(queue) != 0:
+            unit = queue.popleft()
             if self._is_excluded(unit, phase):
                 continue
-            yield unit
-            for l in self.reverse_adjacent[unit]:
+            order.append(unit)
+            for l in adjacent[unit]:
                 depcount[l] -= 1
                 if depcount[l] == 0:
-                    queue.put(l)
+                    queue.append(l)
+        return order
 
     def compute_size(self, phase = 'TRAIN'):
         ''' Perform the compute_size phase before running
@@ -1081,13 +1284,106 @@ class Net:
 
     def forward(self, phase = 'TRAIN'):
         ''' Perform the forward pass
+
+        In inference mode (see :py:meth:`set_inference`), the output of each unit is released once
+        all its consumers are issued.
         '''
         unit_to_tops = [{} for name in self.units]
+        if self.inference:
+            # number of consumers of each unit that are not yet issued
+            remaining = [len([top for top in tops if not self._is_excluded(top, phase)]) for tops in self.adjacent]
         for u in self._toporder(phase):
+            btms = self.reverse_adjacent[u]
+            if len(btms) == 1:
+                # units only read their inputs, so the tops of a single bottom need no copy
+                from_btm = unit_to_tops[btms[0]]
+            else:
+                from_btm = {}
+                for btm in btms:
+                    from_btm.update(unit_to_tops[btm])
+            owl.profiler.set_tag(self.units[u].name + ':forward')
+            self.units[u].forward(from_btm, unit_to_tops[u], phase)
+            if self.inference:
+                for btm in self.reverse_adjacent[u]:
+                    remaining[btm] -= 1
+                    if remaining[btm] == 0:
+                        unit_to_tops[btm] = {}
+                        if not self.units[btm].name in self.keep_outputs:
+                            self.units[btm].out = None
+        owl.profiler.set_tag('')
+
+    def forward_inputs(self, inputs, output_names, phase = 'TEST'):
+        ''' Perform the forward pass on the given tensors instead of the data units
+
+        Only the units needed to compute ``output_names`` are run. A unit producing any of the
+        ``inputs`` (usually the data unit) is not run; its tops are taken from ``inputs`` instead. The
+        results are read from the pass itself rather than from ``unit.out``, and activations are
+        released once all their consumers are issued, as in :py:meth:`forward` in inference mode.
+
+        :param dict inputs: map from top name (e.g. ``'data'``) to ``owl.NArray``
+        :param output_names: names of the units whose output is returned
+        :type output_names: list str
+        :return: map from unit name to the output of the unit
+        :rtype: dict str owl.NArray
+        '''
+        return self._forward_inputs(self.units, inputs, output_names, phase)
+
+    def infer(self, inputs, output_names, phase = 'TEST'):
+        ''' Stateless forward pass, which several threads can run on the same net at once
+
+        Same as :py:meth:`forward_inputs`, except that each unit runs on a shallow copy made for this
+        call. Whatever units store during the pass (e.g. ``out``) is kept in these copies and dropped
+        with them, while weights are shared, so one loaded net serves concurrent requests without
+        duplicating its weights. The net must be in inference mode (see :py:meth:`set_inference`).
+
+        The ops are issued to the device of the calling thread, so each thread can run on its own
+        device with :py:func:`owl.set_thread_device`.
+
+        :param dict inputs: map from top name (e.g. ``'data'``) to ``owl.NArray``
+        :param output_names: names of the units whose output is returned
+        :type output_names: list str
+        :return: map from unit name to the output of the unit
+        :rtype: dict str owl.NArray
+        '''
+        assert(self.inference), 'infer needs the net in inference mode'
+        return self._forward_inputs([copy.copy(unit) for unit in self.units], inputs, output_names, phase)
+
+    def _forward_inputs(self, units, inputs, output_names, phase):
+        # walk back from the outputs until the units producing the inputs
+        needed = set()
+        fed = set()
+        stack = [uid for name in output_names for uid in self.name_to_uid[name] if not self._is_excluded(uid, phase)]
+        while len(stack) > 0:
+            u = stack.pop()
+            if u in needed or u in fed:
+                continue
+            if any([top in inputs for top in units[u].top_names]):
+                fed.add(u)
+                continue
+            needed.add(u)
+            stack.extend([btm for btm in self.reverse_adjacent[u] if not self._is_excluded(btm, phase)])
+        unit_to_tops = [{} for name in units]
+        for u in fed:
+            unit_to_tops[u] = dict([(top, inputs[top]) for top in units[u].top_names if top in inputs])
+        remaining = [len([top for top in tops if top in needed]) for tops in self.adjacent]
+        ret = {}
+        for u in self._toporder(phase):
+            if not u in needed:
+                continue
+            unit = units[u]
             from_btm = {}
             for btm in self.reverse_adjacent[u]:
                 from_btm.update(unit_to_tops[btm])
-            self.units[u].forward(from_btm, unit_to_tops[u], phase)
+            owl.profiler.set_tag(unit.name + ':forward')
+            unit.forward(from_btm, unit_to_tops[u], phase)
+            if unit.name in output_names:
+                ret[unit.name] = unit_to_tops[u][unit.top_names[0]]
+            for btm in self.reverse_adjacent[u]:
+                remaining[btm] -= 1
+                if remaining[btm] == 0:
+                    unit_to_tops[btm] = {}
+        owl.profiler.set_tag('')
+        return ret
 
     def forward_check(self):
         ''' Check forward function, use the same batch of data, remove random
@@ -1104,6 +1400,8 @@ class Net:
         '''
         unit_to_btms = [{} for name in self.units]
         for u in self._reverse_toporder(phase):
+            # the sum of the gradients from the tops is part of the backward pass of this unit
+            owl.profiler.set_tag(self.units[u].name + ':backward')
             from_top = {}
             for top in self.adjacent[u]:
                 for keys in unit_to_btms[top]:
@@ -1112,16 +1410,83 @@ class Net:
                     else:
                         from_top[keys] = unit_to_btms[top][keys]
             self.units[u].backward(from_top, unit_to_btms[u], phase)
+        owl.profiler.set_tag('')
 
     def update(self, uid):
         ''' Update weights of one compute unit of the given uid
 
         :param int uid: id of the compute unit to update
         '''
+        owl.profiler.set_tag(self.units[uid].name + ':update')
         self.units[uid].weight_update(self.current_lr,
                                       self.base_weight_decay,
                                       self.momentum,
                                       self.batch_size)
+        owl.profiler.set_tag('')
+
+    def profile(self, iterations = 10, phase = 'TRAIN', update = True):
+        ''' Time each unit on the devices, as ``caffe time`` does
+
+        Runs one warm-up iteration, then ``iterations`` forward and backward passes (and weight
+        updates if ``update``, which changes the weights) with the profiler on. The device time of each
+        op goes to the unit and pass that created it, since timing the passes from Python would only
+        measure how long they take to issue the ops. The profiler is reset first.
+
+        :param int iterations: number of timed iterations
+        :param str phase: phase of the passes
+        :param bool update: whether to also run and time the weight updates
+        :return: one entry per unit in topological order, with keys ``name`` and, per iteration,
+            ``forward_ms``, ``backward_ms`` and ``update_ms`` of device time, ``gflops`` achieved over
+            the three and ``memory_mb``, the size of the results of the unit's ops
+        :rtype: list dict
+        '''
+        def run():
+            self.forward(phase)
+            self.backward(phase)
+            if update:
+                self.weight_update()
+            owl.wait_for_all()
+        run()
+        owl.profiler.reset()
+        owl.profiler.start()
+        for i in range(iterations):
+            run()
+        owl.profiler.stop()
+        passes = {}
+        for r in owl.profiler.tag_report():
+            (name, pass_name) = r['tag'].rsplit(':', 1)
+            p = passes.setdefault(name, {}).setdefault(pass_name, {'total_us': 0.0, 'flops': 0.0, 'output_bytes': 0.0})
+            for k in p:
+                p[k] += r[k]
+        ret = []
+        for u in self._toporder(phase):
+            name = self.units[u].name
+            unit_passes = passes.get(name, {})
+            def total(key, pass_names = ['forward', 'backward', 'update']):
+                return sum([unit_passes[p][key] for p in pass_names if p in unit_passes]) / iterations
+            time_us = total('total_us')
+            ret.append({
+                'name': name,
+                'forward_ms': total('total_us', ['forward']) / 1000,
+                'backward_ms': total('total_us', ['backward']) / 1000,
+                'update_ms': total('total_us', ['update']) / 1000,
+                'gflops': total('flops') / time_us / 1e3 if time_us > 0 else 0.0,
+                'memory_mb': total('output_bytes') / 1048576.0,
+            })
+        return ret
+
+    def print_profile(self, iterations = 10, phase = 'TRAIN', update = True):
+        ''' Print the result of :py:meth:`profile` as a table, with the totals of the passes
+
+        :param int iterations: number of timed iterations
+        :param str phase: phase of the passes
+        :param bool update: whether to also run and time the weight updates
+        '''
+        rows = self.profile(iterations, phase, update)
+        print '%24s | %12s | %12s | %12s | %9s | %11s' % ('unit', 'forward(ms)', 'backward(ms)', 'update(ms)', 'GFLOP/s', 'memory(MB)')
+        for r in rows:
+            print '%24.24s | %12.3f | %12.3f | %12.3f | %9.2f | %11.1f' % (r['name'], r['forward_ms'], r['backward_ms'], r['update_ms'], r['gflops'], r['memory_mb'])
+        print 'total per iteration: forward %.3fms, backward %.3fms, update %.3fms, memory %.1fMB' % tuple([sum([r[k] for r in rows]) for k in ['forward_ms', 'backward_ms', 'update_ms', 'memory_mb']])
 
     def weight_update(self):
         ''' Update weights for all units
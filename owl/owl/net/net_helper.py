@@ -7,6 +7,11 @@ import numpy as np
 import owl
 from PIL import Image
 import subprocess
+import threading
+from checkpoint import Checkpoint
+from checkpoint import save_checkpoint
+from checkpoint import read_index
+import re
 
 class CaffeNetBuilder:
     ''' Class to build network from Caffe's solver and configure file. 
@@ -64,7 +69,7 @@ class CaffeNetBuilder:
                 
                 #handle IO. XXX: hard-coded
                 ty = l.type
-                if ty == 'Data':
+                if ty == 'Data' or ty == 'PackedData':
                     owl_net.data_layers.append(l.name)
                     if len(l.include) != 0 and l.include[0].phase == Phase.Value('TRAIN'):
                         owl_net.batch_size = l.data_param.batch_size
@@ -123,6 +128,8 @@ class CaffeNetBuilder:
         ty = caffe_layer.type
         if ty == 'Data':
             return net.LMDBDataUnit(caffe_layer, num_gpu)
+        elif ty == 'PackedData':
+            return net.PackedDataUnit(caffe_layer, num_gpu)
         elif ty == 'ImageData':
             return net.ImageDataUnit(caffe_layer, num_gpu)
         elif ty == 'WindowData':
@@ -155,10 +162,18 @@ class CaffeNetBuilder:
     
     def init_net_from_file(self, owl_net, weightpath, snapshotidx):
         '''Load network parameters from a saved snapshot.
+        A quantized snapshot (see :py:func:`quantized_snapshot_file`) is loaded if there is no training snapshot of that index.
         :ivar owl_net: the network to load parameters to
         :ivar str weightpath: the folder storing parameters 
         :ivar int snapshotidx: the index of the snapshot
         '''
+        if os.path.isfile(snapshot_file(weightpath, snapshotidx)):
+            self.init_net_from_checkpoint(owl_net, snapshot_file(weightpath, snapshotidx))
+            return
+        if os.path.isfile(quantized_snapshot_file(weightpath, snapshotidx)):
+            self.init_net_from_checkpoint(owl_net, quantized_snapshot_file(weightpath, snapshotidx))
+            return
+        # Snapshot saved as a directory of raw files
         weightpath = "%s/snapshot%d/" % (weightpath, snapshotidx)
         for i in range(len(owl_net.units)):
             if isinstance(owl_net.units[i], net.FullyConnection):
@@ -235,39 +250,190 @@ class CaffeNetBuilder:
                     print "Conv Bias Need Reinit %s" % (owl_net.units[i].name)
 
     
+    def init_net_from_checkpoint(self, owl_net, checkpoint_path, num_threads = 4):
+        '''Load network parameters from a checkpoint file.
+
+        Only the tensors of layers present in ``owl_net`` are read; they are paged in from the
+        memory-mapped file in parallel. Weights stored in reduced precision (see
+        :py:mod:`owl.net.quantize`) are loaded as they are into the ``qweight`` of their unit.
+
+        :ivar owl_net: the network to load parameters to
+        :ivar str checkpoint_path: the checkpoint file
+        :ivar int num_threads: number of threads reading parameters
+        '''
+        ckpt = Checkpoint(checkpoint_path)
+        targets = dict()
+        for unit in owl_net.units:
+            if not (isinstance(unit, net.ConvConnection) or isinstance(unit, net.FullyConnection)):
+                continue
+            layername = unit.name.replace("/","_")
+            params = [('weights', 'weight', unit.wshape), ('bias', 'bias', unit.bshape)]
+            qname = '%s_qweights' % layername
+            if ckpt.has(qname) and np.prod(ckpt.shape(qname)) == np.prod(unit.wshape):
+                targets[qname] = (unit, 'qweight', None)
+                params = params[1:]
+            for (suffix, attr, shape) in params:
+                name = '%s_%s' % (layername, suffix)
+                if not ckpt.has(name) or np.prod(ckpt.shape(name)) != np.prod(shape):
+                    print "%s Need Reinit %s" % (attr.capitalize(), unit.name)
+                    continue
+                targets[name] = (unit, attr, shape)
+                delta_name = '%s_%sdelta' % (layername, attr)
+                if ckpt.has(delta_name):
+                    targets[delta_name] = (unit, attr + 'delta', shape)
+        narrays = ckpt.load(targets.keys(), num_threads = num_threads)
+        for (name, narray) in narrays.items():
+            (unit, attr, shape) = targets[name]
+            setattr(unit, attr, narray if shape == None else narray.reshape(shape))
+
     def save_net_to_file(self, owl_net, weightpath, snapshotidx):
         '''Save network parameters to a saved snapshot.
         :ivar owl_net: the network to save parameters from
         :ivar str weightpath: the folder storing parameters 
         :ivar int snapshotidx: the index of the snapshot
         '''
-        weightpath = "%s/snapshot%d/" % (weightpath, snapshotidx)
-        cmd = "mkdir %s" % (weightpath)
-        res = subprocess.call(cmd, shell=True)
-        for i in range(len(owl_net.units)):
-            if isinstance(owl_net.units[i], net.ConvConnection) or isinstance(owl_net.units[i], net.FullyConnection):
-                #print owl_net.units[i].name
-                layername = owl_net.units[i].name
-                layername = layername.replace("/","_")
-                weightname = '%s%s_weights.dat' % (weightpath, layername)
-                wshape = owl_net.units[i].weight.shape 
-                length = np.prod(wshape)
-                npweight = owl_net.units[i].weight.to_numpy().reshape(length)
-                npweight.tofile(weightname)
-
-                weightname = '%s%s_weightdelta.dat' % (weightpath, layername)
-                npweightdelta = owl_net.units[i].weightdelta.to_numpy().reshape(length)
-                npweightdelta.tofile(weightname)
-                
-                biasname = '%s%s_bias.dat' % (weightpath, layername)
-                bshape = owl_net.units[i].bias.shape
-                length = np.prod(bshape)
-                npbias = owl_net.units[i].bias.to_numpy().reshape(length)
-                npbias.tofile(biasname)
-
-                biasname = '%s%s_biasdelta.dat' % (weightpath, layername)
-                npbiasdetla = owl_net.units[i].biasdelta.to_numpy().reshape(length)
-                npbiasdetla.tofile(biasname)
+        write_snapshot(snapshot_tensors(owl_net), weightpath, snapshotidx)
+
+def snapshot_tensors(owl_net):
+    ''' Collect the parameters to be saved in a snapshot
+
+    Parameter updates create new ``owl.NArray`` objects instead of modifying the old ones, so the
+    returned references stay a consistent view of the parameters at the time of the call.
+
+    :ivar owl_net: the network to save parameters from
+    :return: list of ``(name, owl.NArray)``
+    '''
+    tensors = []
+    for unit in owl_net.units:
+        if isinstance(unit, net.ConvConnection) or isinstance(unit, net.FullyConnection):
+            layername = unit.name.replace("/","_")
+            tensors.append(('%s_weights' % layername, unit.weight))
+            tensors.append(('%s_weightdelta' % layername, unit.weightdelta))
+            tensors.append(('%s_bias' % layername, unit.bias))
+            tensors.append(('%s_biasdelta' % layername, unit.biasdelta))
+    return tensors
+
+def snapshot_file(weightpath, snapshotidx):
+    ''' Path of the single-file checkpoint of a snapshot (see :py:mod:`owl.net.checkpoint`)
+    '''
+    return os.path.join(weightpath, 'snapshot%d.ckpt' % snapshotidx)
+
+def quantized_snapshot_file(weightpath, snapshotidx):
+    ''' Path of a snapshot with weights in reduced precision (see :py:class:`owl.net.trainer.WeightQuantizer`)
+
+    It is kept in a subfolder of ``weightpath``, out of reach of :py:func:`apply_retention`.
+    '''
+    return os.path.join(weightpath, 'quantized', 'snapshot%d.ckpt' % snapshotidx)
+
+def write_snapshot(tensors, weightpath, snapshotidx, num_threads = 1, base = None):
+    ''' Write parameters into the checkpoint file ``<weightpath>/snapshot<snapshotidx>.ckpt``
+
+    :ivar list tensors: ``(name, owl.NArray)`` pairs given by :py:func:`snapshot_tensors`
+    :ivar str weightpath: the folder storing parameters
+    :ivar int snapshotidx: the index of the snapshot
+    :ivar int num_threads: number of threads fetching and writing parameters in parallel
+    :ivar owl.net.checkpoint.Checkpoint base: if given, only the differences to this full snapshot are written
+    '''
+    if not os.path.isdir(weightpath):
+        os.makedirs(weightpath)
+    save_checkpoint(snapshot_file(weightpath, snapshotidx), tensors, num_threads, base)
+
+def apply_retention(weightpath, keep_last = 0, keep_every = 0):
+    ''' Delete old snapshot files of ``weightpath``
+
+    A snapshot is kept if it is one of the ``keep_last`` latest snapshots, if its index is a multiple of
+    ``keep_every``, or if it is the base of a kept delta snapshot. ``keep_last`` of zero keeps all
+    snapshots, ``keep_every`` only keeps more of them, and the latest snapshot is always kept.
+
+    :ivar str weightpath: the folder storing parameters
+    :ivar int keep_last: number of latest snapshots to keep (0 means all)
+    :ivar int keep_every: also keep the snapshots whose index is a multiple of it (0 means none)
+    :return: indices of the deleted snapshots
+    '''
+    if keep_last <= 0:
+        return []
+    indices = []
+    for fname in os.listdir(weightpath):
+        match = re.match(r'^snapshot(\d+)\.ckpt$', fname)
+        if match:
+            indices.append(int(match.group(1)))
+    indices.sort()
+    keep = set(indices[-keep_last:])
+    if keep_every > 0:
+        keep.update([idx for idx in indices if idx % keep_every == 0])
+    bases = set()
+    for idx in keep:
+        base = read_index(snapshot_file(weightpath, idx))['base']
+        if base != None:
+            bases.add(base)
+    deleted = []
+    for idx in indices:
+        if idx not in keep and os.path.basename(snapshot_file(weightpath, idx)) not in bases:
+            os.remove(snapshot_file(weightpath, idx))
+            deleted.append(idx)
+    return deleted
+
+class SnapshotWriter:
+    ''' Save snapshots in the background while training goes on.
+
+    :py:meth:`save` only captures references to the current parameters (see :py:func:`snapshot_tensors`);
+    a background thread then fetches them from the devices and writes them with :py:func:`write_snapshot`.
+    At most one snapshot is in flight: saving a new one first waits for the previous one.
+
+    Every ``full_every``-th snapshot is a full one; the snapshots in between only store the chunks that
+    differ from the last full snapshot, so tensors that do not change (e.g. layers with ``lr_mult: 0``)
+    are not written again. After each snapshot, old ones are deleted according to ``keep_last`` and
+    ``keep_every`` (see :py:func:`apply_retention`).
+
+    :ivar int num_threads: number of threads fetching and writing parameters in parallel
+    :ivar int full_every: write a full snapshot every this many snapshots (1 means always)
+    :ivar int keep_last: number of latest snapshots to keep (0 means all)
+    :ivar int keep_every: also keep the snapshots whose index is a multiple of it (0 means none)
+    '''
+    def __init__(self, num_threads = 4, full_every = 1, keep_last = 0, keep_every = 0):
+        self.num_threads = num_threads
+        self.full_every = full_every
+        self.keep_last = keep_last
+        self.keep_every = keep_every
+        self.base_path = None
+        self.since_base = 0
+        self.thread = None
+        self.error = None
+
+    def save(self, owl_net, weightpath, snapshotidx):
+        ''' Start saving the current parameters of ``owl_net`` to ``<weightpath>/snapshot<snapshotidx>.ckpt``
+        '''
+        self.wait()
+        tensors = snapshot_tensors(owl_net)
+        self.thread = threading.Thread(target = self._write, args = (tensors, weightpath, snapshotidx))
+        self.thread.start()
+
+    def wait(self):
+        ''' Wait until the snapshot being written is on disk; re-raise the error if writing failed
+        '''
+        if self.thread != None:
+            self.thread.join()
+            self.thread = None
+        if self.error != None:
+            error = self.error
+            self.error = None
+            raise error
+
+    def _write(self, tensors, weightpath, snapshotidx):
+        try:
+            path = snapshot_file(weightpath, snapshotidx)
+            base = None
+            if self.since_base < self.full_every and self.base_path != path and self.base_path != None and os.path.isfile(self.base_path):
+                base = Checkpoint(self.base_path)
+            write_snapshot(tensors, weightpath, snapshotidx, self.num_threads, base)
+            if base == None:
+                self.base_path = path
+                self.since_base = 1
+            else:
+                self.since_base += 1
+            apply_retention(weightpath, self.keep_last, self.keep_every)
+        except Exception as e:
+            self.error = e
 
 class CaffeModelLoader:
     ''' Class to convert Caffe's caffemodel into numpy array files. Minerva use numpy array files to store and save model snapshots.
@@ -1,5 +1,10 @@
 import sys,os,gc
 import time
+import struct
+import hashlib
+import collections
+import threading
+import Queue
 import lmdb
 import numpy as np
 import numpy.random
@@ -9,6 +14,95 @@ from google.protobuf import text_format
 
 from caffe import *
 
+class DecodedImageCache:
+    ''' LRU cache of decoded (and resized) uint8 images shared by :py:class:`ImageListDataProvider`
+    and :py:class:`ImageWindowDataProvider`, so that each source image is decoded only once
+    instead of once per epoch.
+
+    Entries are kept in memory until ``mem_budget`` bytes are used; the least recently used entries
+    are then evicted, either dropped or, if ``spill_dir`` is given, written to disk as ``.npy``
+    files that are memory-mapped back on the next access.
+
+    The cache is bound to a signature of the transform parameters (e.g. the resize shape). Binding
+    to a different signature drops every entry, including the spilled ones.
+
+    :ivar int mem_budget: memory budget in bytes
+    :ivar str spill_dir: directory for spilled entries (``None`` to disable spilling)
+    '''
+    def __init__(self, mem_budget, spill_dir = None):
+        self.mem_budget = mem_budget
+        self.spill_dir = spill_dir
+        self.signature = None
+        self.entries = collections.OrderedDict()
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        if spill_dir != None and not os.path.isdir(spill_dir):
+            os.makedirs(spill_dir)
+
+    def bind(self, signature):
+        ''' Bind the cache to the given transform signature, invalidating all entries if it changed
+
+        :param signature: any repr-able value describing how the cached images were produced
+        '''
+        signature = repr(signature)
+        if signature == self.signature:
+            return
+        self.entries.clear()
+        self.used = 0
+        if self.spill_dir != None:
+            sigfile = os.path.join(self.spill_dir, 'SIGNATURE')
+            old_signature = None
+            if os.path.isfile(sigfile):
+                with open(sigfile, 'r') as f:
+                    old_signature = f.read()
+            if old_signature != signature:
+                for name in os.listdir(self.spill_dir):
+                    if name.endswith('.npy'):
+                        os.remove(os.path.join(self.spill_dir, name))
+                with open(sigfile, 'w') as f:
+                    f.write(signature)
+        self.signature = signature
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, hashlib.md5(repr(key)).hexdigest() + '.npy')
+
+    def get(self, key):
+        ''' Get a cached image
+
+        :param key: the key of the image (e.g. its path)
+        :return: the cached uint8 image or ``None`` if it is not cached
+        '''
+        if key in self.entries:
+            img = self.entries.pop(key)
+            self.entries[key] = img
+            self.hits += 1
+            return img
+        if self.spill_dir != None:
+            path = self._spill_path(key)
+            if os.path.isfile(path):
+                self.hits += 1
+                return np.load(path, mmap_mode='r')
+        self.misses += 1
+        return None
+
+    def put(self, key, img):
+        ''' Put an image into the cache, evicting the least recently used entries if over budget
+
+        :param key: the key of the image
+        :param numpy.ndarray img: the decoded uint8 image
+        '''
+        if key in self.entries:
+            self.used -= self.entries.pop(key).nbytes
+        self.entries[key] = img
+        self.used += img.nbytes
+        while self.used > self.mem_budget and len(self.entries) > 0:
+            (old_key, old_img) = self.entries.popitem(last=False)
+            self.used -= old_img.nbytes
+            if self.spill_dir != None:
+                np.save(self._spill_path(old_key), old_img)
+
+
 class ImageWindowDataProvider:
     ''' Class for Image Window Data Provider. This data provider will read the original image
     and crop out patches according to the given box position, then resize the patch to form batch. 
@@ -62,10 +156,54 @@ class ImageWindowDataProvider:
             self.mean_data = self.mean_data[:, 
                     mean_range_st : mean_range_ed,
                     mean_range_st : mean_range_ed]
+        self.cache = None
+
+    def set_cache(self, cache):
+        ''' Cache the decoded and resized window patches across epochs
+
+        :param owl.net.netio.DecodedImageCache cache: the cache to use (``None`` to disable caching)
+        '''
+        self.cache = cache
+
+    def _load_patch(self, img, path, box):
+        key = (path, box)
+        if self.cache != None:
+            npimg = self.cache.get(key)
+            if npimg is not None:
+                return (img, npimg)
+        if img is None:
+            #open image
+            try:
+                img = Image.open(path)
+            except IOError, e:
+                print e
+                print "not an image file %s" % (path)
+            #convert to rgb
+            if img.mode not in ('RGB'):
+                img = img.convert('RGB')
+        (x1, y1, x2, y2) = box
+        #crop image
+        patch = img.crop((y1, x1, y2, x2))
+        
+        #resize
+        try:
+            patch = patch.resize((self.crop_size, self.crop_size), Image.ANTIALIAS)
+        except IOError, e:
+            print e
+            print "resize error occur %s" % (path)
+
+        orinpimg = np.array(patch, dtype = np.uint8)
+        npimg = np.transpose(orinpimg.reshape([self.crop_size * self.crop_size, 3])).reshape(np.shape(self.mean_data))
+        npimg = npimg[::-1,:,:]
+        if self.cache != None:
+            self.cache.put(key, np.ascontiguousarray(npimg))
+        return (img, npimg)
 
     def get_mb(self, phase = 'TRAIN'):
         ''' Get next minibatch
         '''
+        if self.cache != None:
+            self.cache.bind(('window', self.crop_size))
         sourcefile = open(self.source, 'r')
         samples = np.zeros([self.batch_size, self.crop_size ** 2 * 3], dtype = np.float32)
         labels = np.zeros([self.batch_size, 1], dtype=np.float32)
@@ -83,15 +221,8 @@ class ImageWindowDataProvider:
             width = int(sourcefile.readline())
             boxnum = int(sourcefile.readline())
             
-            #open image
-            try:
-                img = Image.open(path)
-            except IOError, e:
-                print e
-                print "not an image file %s" % (path[0])
-            #convert to rgb
-            if img.mode not in ('RGB'):
-                img = img.convert('RGB')
+            #the image is opened lazily, only when a patch is not cached
+            img = None
             #read boxes 
             for i in range(boxnum):
                 line = sourcefile.readline()
@@ -102,19 +233,7 @@ class ImageWindowDataProvider:
                 x2 = int(box_info[4]) 
                 y2 = int(box_info[5])
 
-                #crop image
-                patch = img.crop((y1, x1, y2, x2))
-                
-                #resize
-                try:
-                    patch = patch.resize((self.crop_size, self.crop_size), Image.ANTIALIAS)
-                except IOError, e:
-                    print e
-                    print "resize error occur %s" % (line_info[0])
-
-                orinpimg = np.array(patch, dtype = np.uint8)
-                npimg = np.transpose(orinpimg.reshape([self.crop_size * self.crop_size, 3])).reshape(np.shape(self.mean_data))
-                npimg = npimg[::-1,:,:]
+                (img, npimg) = self._load_patch(img, path, (x1, y1, x2, y2))
                 
                 '''
                 #output
@@ -188,10 +307,48 @@ class ImageListDataProvider:
         self.batch_size = image_data_param.batch_size / mm_batch_num
         self.crop_size = transform_param.crop_size
         self.mirror = transform_param.mirror
+        self.cache = None
+
+    def set_cache(self, cache):
+        ''' Cache the decoded and resized images across epochs
+
+        :param owl.net.netio.DecodedImageCache cache: the cache to use (``None`` to disable caching)
+        '''
+        self.cache = cache
+
+    def _load_image(self, path):
+        if self.cache != None:
+            npimg = self.cache.get(path)
+            if npimg is not None:
+                return npimg
+        #read img
+        try:
+            img = Image.open(path)
+        except IOError, e:
+            print e
+            print "not an image file %s" % (path)
+        #convert to rgb
+        if img.mode not in ('RGB'):
+            img = img.convert('RGB')
+        #resize
+        try:
+            img = img.resize((self.new_height, self.new_width), Image.ANTIALIAS)
+        except IOError, e:
+            print e
+            print "resize error occur %s" % (path)
+        
+        orinpimg = np.array(img, dtype = np.uint8)
+        npimg = np.transpose(orinpimg.reshape([self.new_height * self.new_width, 3])).reshape(np.shape(self.mean_data))
+        npimg = npimg[::-1,:,:]
+        if self.cache != None:
+            self.cache.put(path, np.ascontiguousarray(npimg))
+        return npimg
 
     def get_mb(self, phase = 'TRAIN'):
         ''' Get next minibatch
         '''
+        if self.cache != None:
+            self.cache.bind(('list', self.new_height, self.new_width))
         sourcefile = open(self.source, 'r')
         samples = np.zeros([self.batch_size, self.crop_size ** 2 * 3], dtype = np.float32)
         num_label = -1
@@ -208,25 +365,7 @@ class ImageListDataProvider:
             for labelidx in range(num_label):
                 labels[count][labelidx] = float(line_info[labelidx+1])
             
-            #read img
-            try:
-                img = Image.open(line_info[0])
-            except IOError, e:
-                print e
-                print "not an image file %s" % (line_info[0])
-            #convert to rgb
-            if img.mode not in ('RGB'):
-                img = img.convert('RGB')
-            #resize
-            try:
-                img = img.resize((self.new_height, self.new_width), Image.ANTIALIAS)
-            except IOError, e:
-                print e
-                print "resize error occur %s" % (line_info[0])
-            
-            orinpimg = np.array(img, dtype = np.uint8)
-            npimg = np.transpose(orinpimg.reshape([self.new_height * self.new_width, 3])).reshape(np.shape(self.mean_data))
-            npimg = npimg[::-1,:,:]
+            npimg = self._load_image(line_info[0])
             pixels = npimg - self.mean_data
 
             #crop 
@@ -278,6 +417,7 @@ class LMDBDataProvider:
             mean_narray = np.array(bp.data, dtype=np.float32)
             h_w = np.sqrt(np.shape(mean_narray)[0] / 3)
             self.mean_data = np.array(bp.data, dtype=np.float32).reshape([3, h_w, h_w])
+        self.mean_value = list(transform_param.mean_value)
         self.source = data_param.source
         self.batch_size = data_param.batch_size / mm_batch_num
         self.crop_size = transform_param.crop_size
@@ -338,11 +478,74 @@ class LMDBDataProvider:
             delete_idx = np.arange(count, self.batch_size)
             yield (np.delete(samples, delete_idx, 0), np.delete(labels, delete_idx, 0))
 
+    def can_normalize_on_device(self):
+        ''' Whether the transform can be done by :py:func:`owl.conv.image_normalize`
+
+        Per-channel mean values are always supported; a mean file is only supported when it has the
+        same size as the stored images.
+        '''
+        if len(self.mean_value) == 3:
+            return True
+        env = lmdb.open(self.source, readonly=True)
+        with env.begin(write=False, buffers=False) as txn:
+            for key, value in txn.cursor():
+                d = Datum()
+                d.ParseFromString(value)
+                return len(d.data) == self.mean_data.size
+        return False
+
+    def get_uint8_mb(self, phase = 'TRAIN'):
+        ''' Get next minibatch of raw uint8 images
+
+        Instead of transformed float samples, yields ``(images, crop_info, labels)`` where
+        ``images`` is the uint8 array of shape ``[N, 3, H, W]`` and ``crop_info`` holds
+        ``(crop_h, crop_w, mirror)`` of each image, so that the conversion, mean subtraction,
+        cropping and mirroring can be done on the device.
+        '''
+        env = lmdb.open(self.source, readonly=True)
+        samples = None
+        crop_info = np.zeros([self.batch_size, 3], dtype=np.float32)
+        num_label = -1
+        count = 0
+        with env.begin(write=False, buffers=False) as txn:
+            cursor = txn.cursor()
+            for key, value in cursor:
+                d = Datum()
+                d.ParseFromString(value)
+                ori_size = int(np.sqrt(len(d.data) / 3))
+                if samples is None:
+                    samples = np.zeros([self.batch_size, 3, ori_size, ori_size], dtype=np.uint8)
+                samples[count] = np.frombuffer(d.data, dtype=np.uint8).reshape([3, ori_size, ori_size])
+                if phase == 'TRAIN':
+                    crop_info[count, 0:2] = np.random.randint(ori_size - self.crop_size, size=2)
+                else:
+                    crop_info[count, 0:2] = (ori_size - self.crop_size) / 2
+                crop_info[count, 2] = self.mirror == True and numpy.random.rand() > 0.5
+
+                if num_label == -1:
+                    num_label = len(d.label)
+                    labels = np.zeros([self.batch_size, num_label], dtype=np.float32)
+                labels[count, :] = d.label
+
+                count = count + 1
+                if count == self.batch_size:
+                    yield (samples, crop_info, labels)
+                    if phase == 'CHECK':
+                        while True:
+                            yield (samples, crop_info, labels)
+
+                    labels = np.zeros([self.batch_size, num_label], dtype=np.float32)
+                    count = 0
+        if count != self.batch_size:
+            yield (samples[:count], crop_info[:count], labels[:count])
+
     def get_multiview_mb(self):
         '''  Multiview testing will get better accuracy than single view testing. For each image,
         it will crop out the left-top, right-top, left-down, right-down, central patches and their
         hirizontal flipped version. The final prediction is averaged according to the 10 views.
-        Thus, for each original batch, get_multiview_mb will produce 10 consecutive batches for the batch.
+        Thus, for each original batch, get_multiview_mb will produce one batch of ``10 * batch_size`` samples
+        holding the 10 views one after another (view-major), so that all views go through the network in one
+        forward pass. Labels are repeated for each view accordingly.
         '''
 
         env = lmdb.open(self.source, readonly=True)
@@ -379,17 +582,331 @@ class LMDBDataProvider:
                 
                 count = count + 1
                 if count == self.batch_size:
-                    for i in range(view_num):
-                        yield (samples[i,:,:], labels)
+                    yield (samples.reshape([view_num * self.batch_size, self.crop_size ** 2 * 3]),
+                           np.tile(labels, (view_num, 1)))
                     labels = np.zeros([self.batch_size, num_label], dtype=np.float32)
                     count = 0
-        if count != self.batch_size:
-            delete_idx = np.arange(count, self.batch_size)
-            left_samples = np.delete(samples, delete_idx, 1)
-            left_labels = np.delete(labels, delete_idx, 0)
+        if count != self.batch_size and count > 0:
+            yield (samples[:, 0:count].reshape([view_num * count, self.crop_size ** 2 * 3]),
+                   np.tile(labels[0:count], (view_num, 1)))
+
+
+PACKED_MAGIC = 'OWLPACK1'
+PACKED_HEADER_SIZE = 64
+PACKED_HEADER_FORMAT = '<8siiiqi'
+
+class PackedDataWriter:
+    ''' Writer for the packed record format read by :py:class:`PackedDataProvider`.
+
+    Every record is an uint8 image of shape ``[C, H, W]`` (BGR, already resized) stored
+    with a fixed stride after a small header. Labels and record offsets are stored in an
+    index file next to the data file (``<path>.idx``).
+
+    .. note::
+
+        File layout::
+
+            # <path>
+            [magic][version][C][H][W][num_records][num_label]   (padded to 64 bytes)
+            [record_0][record_1]...[record_n]                   (C*H*W bytes each)
+            # <path>.idx
+            numpy array of (offset, label[num_label]) entries
+
+    :ivar str path: path of the packed data file
+    :ivar list shape: ``[C, H, W]`` of each record
+    :ivar int num_label: number of labels per record
+    '''
+    def __init__(self, path, shape, num_label):
+        self.path = path
+        self.shape = list(shape)
+        self.num_label = num_label
+        self.stride = int(np.prod(self.shape))
+        self.offsets = []
+        self.labels = []
+        self.f = open(path, 'wb')
+        self.f.write('\0' * PACKED_HEADER_SIZE)
+
+    def append(self, img, label):
+        ''' Append one record
+
+        :param numpy.ndarray img: uint8 image of shape ``[C, H, W]``
+        :param label: labels of the image
+        '''
+        assert(list(img.shape) == self.shape)
+        assert(len(label) == self.num_label)
+        self.offsets.append(PACKED_HEADER_SIZE + len(self.offsets) * self.stride)
+        self.labels.append(label)
+        self.f.write(np.ascontiguousarray(img, dtype=np.uint8).tostring())
+
+    def close(self):
+        ''' Write the header and the index file
+        '''
+        header = struct.pack(PACKED_HEADER_FORMAT, PACKED_MAGIC, 1,
+                self.shape[0], self.shape[1], self.shape[2], len(self.offsets), self.num_label)
+        self.f.seek(0)
+        self.f.write(header)
+        self.f.close()
+        index = np.zeros(len(self.offsets), dtype=packed_index_dtype(self.num_label))
+        index['offset'] = self.offsets
+        index['label'] = np.array(self.labels, dtype=np.float32).reshape([len(self.offsets), self.num_label])
+        with open(self.path + '.idx', 'wb') as f:
+            np.save(f, index)
+
+def packed_index_dtype(num_label):
+    return np.dtype([('offset', '<i8'), ('label', '<f4', (num_label,))])
+
+def pack_lmdb(source, path):
+    ''' Convert a Caffe LMDB of ``Datum`` into the packed record format
+
+    :param str source: path of the LMDB
+    :param str path: path of the packed data file to write
+    :return: number of records written
+    :rtype: int
+    '''
+    env = lmdb.open(source, readonly=True)
+    writer = None
+    with env.begin(write=False, buffers=False) as txn:
+        cursor = txn.cursor()
+        for key, value in cursor:
+            d = Datum()
+            d.ParseFromString(value)
+            shape = [d.channels, d.height, d.width]
+            if writer == None:
+                writer = PackedDataWriter(path, shape, len(d.label))
+            writer.append(np.fromstring(d.data, dtype=np.uint8).reshape(shape), d.label)
+    assert(writer != None)
+    writer.close()
+    return len(writer.offsets)
+
+def pack_image_list(source, path, new_height, new_width):
+    ''' Convert an image list (the source of :py:class:`ImageListDataProvider`) into the packed
+    record format. Images are resized to ``new_height x new_width`` once, at conversion time.
+
+    :param str source: path of the image list
+    :param str path: path of the packed data file to write
+    :param int new_height: height of the stored images
+    :param int new_width: width of the stored images
+    :return: number of records written
+    :rtype: int
+    '''
+    writer = None
+    with open(source, 'r') as sourcefile:
+        for line in sourcefile:
+            line_info = line.split()
+            if len(line_info) == 0:
+                continue
+            assert(len(line_info) >= 2)
+            try:
+                img = Image.open(line_info[0])
+            except IOError, e:
+                print e
+                print "not an image file %s" % (line_info[0])
+                continue
+            if img.mode not in ('RGB'):
+                img = img.convert('RGB')
+            img = img.resize((new_width, new_height), Image.ANTIALIAS)
+            # HWC RGB -> CHW BGR
+            npimg = np.array(img, dtype=np.uint8).transpose([2, 0, 1])[::-1, :, :]
+            if writer == None:
+                writer = PackedDataWriter(path, npimg.shape, len(line_info) - 1)
+            writer.append(npimg, [float(l) for l in line_info[1:]])
+    assert(writer != None)
+    writer.close()
+    return len(writer.offsets)
+
+
+class PackedDataProvider:
+    ''' Class for Packed Data Provider. The data file written by :py:class:`PackedDataWriter` is
+    memory-mapped, so reading a record costs neither a protobuf parse nor a string copy. Crops and
+    mirrors are taken as strided views of the mapping; the only copy is the mean subtraction into
+    the float32 batch buffer, which is reused across batches.
+
+    .. note::
+        Layer type in Caffe's configure file: PackedData (uses ``data_param`` and ``transform_param``)
+
+        Use :py:func:`pack_lmdb` or :py:func:`pack_image_list` (or ``scripts/learning/data_packer.py``)
+        to produce the data file.
+
+    '''
+
+    def __init__(self, data_param, transform_param, mm_batch_num):
+        self.source = data_param.source
+        with open(self.source, 'rb') as f:
+            header = struct.unpack(PACKED_HEADER_FORMAT, f.read(struct.calcsize(PACKED_HEADER_FORMAT)))
+        (magic, version, channels, height, width, num_records, num_label) = header
+        assert(magic == PACKED_MAGIC)
+        self.shape = [channels, height, width]
+        self.num_records = num_records
+        self.num_label = num_label
+        self.records = np.memmap(self.source, dtype=np.uint8, mode='r', offset=PACKED_HEADER_SIZE,
+                shape=(num_records, channels, height, width))
+        self.index = np.load(self.source + '.idx', mmap_mode='r')
+        assert(len(self.index) == num_records)
+        self.rows = (self.index['offset'] - PACKED_HEADER_SIZE) / (channels * height * width)
+
+        bp = BlobProto()
+        if len(transform_param.mean_file) == 0:
+            self.mean_data = np.ones(self.shape, dtype=np.float32)
+            assert(len(transform_param.mean_value) == 3)
+            self.mean_data[0] = transform_param.mean_value[0]
+            self.mean_data[1] = transform_param.mean_value[1]
+            self.mean_data[2] = transform_param.mean_value[2]
+        else:
+            with open(transform_param.mean_file, 'rb') as f:
+                bp.ParseFromString(f.read())
+            np_mean = np.array(bp.data, dtype=np.float32)
+            mean_size = int(np.sqrt(np.shape(np_mean)[0] / 3))
+            mean_height_st = (mean_size - height) / 2
+            mean_width_st = (mean_size - width) / 2
+            self.mean_data = np_mean.reshape([3, mean_size, mean_size])[:,
+                    mean_height_st : mean_height_st + height,
+                    mean_width_st : mean_width_st + width]
+        self.batch_size = data_param.batch_size / mm_batch_num
+        self.crop_size = transform_param.crop_size
+        self.mirror = transform_param.mirror
+
+    def _fill(self, out, row, crop_h, crop_w, mirror):
+        im_cropped = self.records[row, :, crop_h:crop_h+self.crop_size, crop_w:crop_w+self.crop_size]
+        mean_cropped = self.mean_data[:, crop_h:crop_h+self.crop_size, crop_w:crop_w+self.crop_size]
+        if mirror:
+            im_cropped = im_cropped[:,:,::-1]
+            mean_cropped = mean_cropped[:,:,::-1]
+        np.subtract(im_cropped, mean_cropped, out=out)
+
+    def get_mb(self, phase = 'TRAIN'):
+        ''' Get next minibatch
+        '''
+        samples = np.zeros([self.batch_size, 3, self.crop_size, self.crop_size], dtype=np.float32)
+        flat_samples = samples.reshape([self.batch_size, self.crop_size ** 2 * 3])
+        diff_h = self.shape[1] - self.crop_size
+        diff_w = self.shape[2] - self.crop_size
+        for start in range(0, self.num_records, self.batch_size):
+            end = min(start + self.batch_size, self.num_records)
+            for count in range(end - start):
+                if phase == 'TRAIN':
+                    crop_h = np.random.randint(diff_h) if diff_h > 0 else 0
+                    crop_w = np.random.randint(diff_w) if diff_w > 0 else 0
+                else:
+                    crop_h = diff_h / 2
+                    crop_w = diff_w / 2
+                mirror = self.mirror == True and numpy.random.rand() > 0.5
+                self._fill(samples[count], self.rows[start + count], crop_h, crop_w, mirror)
+            labels = self.index['label'][start:end]
+            yield (flat_samples[0:end - start], labels)
+            if phase == 'CHECK':
+                while True:
+                    yield (flat_samples[0:end - start], labels)
+
+    def get_multiview_mb(self):
+        ''' Same as :py:meth:`LMDBDataProvider.get_multiview_mb`: for each original batch, produce one
+        batch of its 10 views (four corners, center and their horizontal flips), view-major.
+        '''
+        view_num = 10
+        samples = np.zeros([view_num, self.batch_size, 3, self.crop_size, self.crop_size], dtype=np.float32)
+        for start in range(0, self.num_records, self.batch_size):
+            end = min(start + self.batch_size, self.num_records)
+            count = end - start
+            labels = self.index['label'][start:end]
+            diff_h = self.shape[1] - self.crop_size
+            diff_w = self.shape[2] - self.crop_size
+            start_h = [0, diff_h, 0, diff_h, diff_h/2]
+            start_w = [0, 0, diff_w, diff_w, diff_w/2]
             for i in range(view_num):
-                yield (left_samples[i,:,:], left_labels)
+                for n in range(count):
+                    self._fill(samples[i, n], self.rows[start + n], start_h[i/2], start_w[i/2], i%2 == 1)
+            yield (samples[:, 0:count].reshape([view_num * count, self.crop_size ** 2 * 3]),
+                   np.tile(labels, (view_num, 1)))
+
+NPY_HEADER_SIZE = 128
+
+def _npy_header(num_rows, feature_length):
+    # Fixed-size header, so the row count can be rewritten in place while appending
+    header = "{'descr': '<f4', 'fortran_order': False, 'shape': (%d, %d), }" % (num_rows, feature_length)
+    header = header.ljust(NPY_HEADER_SIZE - 11) + '\n'
+    return '\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header
+
+class FeatureWriter:
+    ''' Appendable writer of a float32 feature matrix in ``.npy`` format.
+
+    Rows are written by a background thread, so the caller only pays for handing over the
+    numpy array. The row count in the header is updated after every write, so the file is
+    always a valid ``.npy`` file that can be opened with ``np.load(path, mmap_mode='r')``,
+    even while extraction is still running or after it was interrupted.
+
+    :ivar str path: path of the ``.npy`` file
+    :ivar int num_rows: number of rows in the file (the resume offset when opening an existing file)
+    :ivar int feature_length: length of each row, known after the first row is appended
+    '''
+    def __init__(self, path, resume = False, queue_size = 4):
+        self.path = path
+        self.num_rows = 0
+        self.feature_length = None
+        if resume and os.path.exists(path) and os.path.getsize(path) > 0:
+            self.f = open(path, 'r+b')
+            np.lib.format.read_magic(self.f)
+            (shape, fortran_order, dtype) = np.lib.format.read_array_header_1_0(self.f)
+            assert(self.f.tell() == NPY_HEADER_SIZE and dtype == np.float32 and not fortran_order)
+            (self.num_rows, self.feature_length) = shape
+            # Drop rows written after the last header update
+            self.truncate(self.num_rows)
+        else:
+            self.f = open(path, 'wb')
+        self.queue = Queue.Queue(queue_size)
+        self.error = None
+        self.thread = threading.Thread(target = self._write_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def truncate(self, num_rows):
+        ''' Keep only the first ``num_rows`` rows; must be called before any :py:meth:`append`
+        '''
+        assert(num_rows <= self.num_rows)
+        self.num_rows = num_rows
+        if self.feature_length != None:
+            self._write_header()
+            self.f.truncate(NPY_HEADER_SIZE + num_rows * self.feature_length * 4)
 
+    def append(self, rows):
+        ''' Queue rows for writing; blocks only when the writer thread falls behind
+
+        :param numpy.ndarray rows: features of shape ``[num_img, feature_length]``
+        '''
+        if self.error != None:
+            raise self.error
+        if self.feature_length == None:
+            self.feature_length = rows.shape[1]
+        assert(rows.shape[1] == self.feature_length)
+        self.queue.put(rows)
+
+    def close(self):
+        ''' Wait for all queued rows to be written and close the file
+        '''
+        self.queue.put(None)
+        self.thread.join()
+        self.f.close()
+        if self.error != None:
+            raise self.error
+
+    def _write_header(self):
+        self.f.seek(0)
+        self.f.write(_npy_header(self.num_rows, self.feature_length))
+
+    def _write_loop(self):
+        while True:
+            rows = self.queue.get()
+            if rows is None:
+                break
+            if self.error != None:
+                continue
+            try:
+                self.f.seek(NPY_HEADER_SIZE + self.num_rows * self.feature_length * 4)
+                self.f.write(np.ascontiguousarray(rows, dtype=np.float32).tostring())
+                self.f.flush()
+                self.num_rows += rows.shape[0]
+                self._write_header()
+                self.f.flush()
+            except Exception as e:
+                self.error = e
 
 if __name__ == '__main__':
     ''' 
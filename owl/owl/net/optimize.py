@@ -0,0 +1,137 @@
+''' Rewrite a trained :py:class:`owl.net.Net` for inference
+
+:py:func:`optimize_for_inference` returns a new net sharing the weights of the trained one, in which
+
+* identity units (dropout, which only scales in ``TRAIN``, and linear units) are removed,
+* a relu following a convolution is computed in the same operation as the convolution and its bias,
+* the weights of fully-connected units are transposed once, so that the multiplication reads both
+  operands contiguously.
+
+The rewritten net is run on a sample batch along with the original one and the outputs are compared;
+a ``RuntimeError`` is raised if they differ.
+'''
+import copy
+import numpy as np
+import owl.conv as co
+import net
+
+def _bypass(owl_net, uid):
+    # Remove a unit with one bottom by connecting its bottom directly to its tops
+    unit = owl_net.units[uid]
+    btms = owl_net.reverse_adjacent[uid]
+    tops = owl_net.adjacent[uid]
+    for t in tops:
+        owl_net.reverse_adjacent[t] = [b for b in owl_net.reverse_adjacent[t] if b != uid] + btms
+        top_unit = owl_net.units[t]
+        top_unit.btm_names = [unit.btm_names[0] if name == unit.top_names[0] else name for name in top_unit.btm_names]
+    for b in btms:
+        owl_net.adjacent[b] = [t for t in owl_net.adjacent[b] if t != uid] + tops
+    owl_net.adjacent[uid] = []
+    owl_net.reverse_adjacent[uid] = []
+    owl_net._orders = {}
+
+def _included(owl_net, uids, phase):
+    return [u for u in uids if not owl_net._is_excluded(u, phase)]
+
+def _compared_outputs(owl_net, phase):
+    # The last units before the loss and accuracy units, and the other units without consumers
+    loss_uids = set(owl_net.loss_uids + owl_net.accuracy_uids)
+    names = []
+    for u in owl_net._toporder(phase):
+        if len(_included(owl_net, owl_net.adjacent[u], phase)) > 0:
+            continue
+        if not u in loss_uids:
+            names.append(owl_net.units[u].name)
+            continue
+        for b in _included(owl_net, owl_net.reverse_adjacent[u], phase):
+            if not owl_net.units[b].name in owl_net.data_layers:
+                names.append(owl_net.units[b].name)
+    return sorted(set(names))
+
+def optimize_for_inference(owl_net, sample_inputs, keep_outputs = [], phase = 'TEST', tolerance = 1e-3):
+    ''' Rewrite a trained net into a net for inference
+
+    The returned net is in inference mode (see :py:meth:`owl.net.Net.set_inference`) and shares the
+    weights of ``owl_net``, which is left unchanged.
+
+    :param owl.net.Net owl_net: the trained net
+    :param dict sample_inputs: a sample batch, as a map from top name (e.g. ``'data'``) to ``owl.NArray``;
+        both nets are run on it with :py:meth:`owl.net.Net.forward_inputs`
+    :param keep_outputs: names of units that must not be removed or fused, e.g. the layers features are
+        extracted from
+    :type keep_outputs: list str
+    :param str phase: phase the net is run in
+    :param float tolerance: max difference of the outputs, relative to the max absolute output
+    :return: the rewritten net
+    :rtype: owl.net.Net
+    '''
+    opt = copy.copy(owl_net)
+    opt.units = []
+    for unit in owl_net.units:
+        unit = copy.copy(unit)
+        unit.btm_names = list(unit.btm_names)
+        unit.top_names = list(unit.top_names)
+        opt.units.append(unit)
+    opt.adjacent = [list(l) for l in owl_net.adjacent]
+    opt.reverse_adjacent = [list(l) for l in owl_net.reverse_adjacent]
+    opt._orders = {}
+
+    removed = set()
+    num_fused = 0
+    num_transposed = 0
+    for u in owl_net._toporder(phase):
+        unit = opt.units[u]
+        if unit.name in keep_outputs:
+            continue
+        if isinstance(unit, net.DropoutUnit) or isinstance(unit, net.LinearUnit):
+            _bypass(opt, u)
+            removed.add(u)
+        elif isinstance(unit, net.ReluUnit):
+            btms = _included(opt, opt.reverse_adjacent[u], phase)
+            if len(btms) != 1:
+                continue
+            conv = opt.units[btms[0]]
+            if not isinstance(conv, net.ConvConnection) or conv.group != 1 or conv.activation != None:
+                continue
+            if conv.name in keep_outputs or _included(opt, opt.adjacent[btms[0]], phase) != [u]:
+                continue
+            conv.activation = co.act_op.relu
+            _bypass(opt, u)
+            removed.add(u)
+            num_fused += 1
+        elif isinstance(unit, net.FullyConnection) and unit.weight != None:
+            unit.weight_t = unit.weight.trans()
+            num_transposed += 1
+
+    # compact the graph
+    kept = [u for u in range(len(opt.units)) if not u in removed]
+    index = dict([(u, i) for (i, u) in enumerate(kept)])
+    opt.units = [opt.units[u] for u in kept]
+    opt.adjacent = [[index[t] for t in opt.adjacent[u]] for u in kept]
+    opt.reverse_adjacent = [[index[b] for b in opt.reverse_adjacent[u]] for u in kept]
+    opt.name_to_uid = {}
+    for (uid, unit) in enumerate(opt.units):
+        opt.name_to_uid.setdefault(unit.name, []).append(uid)
+    opt.loss_uids = [index[u] for u in owl_net.loss_uids if u in index]
+    opt.accuracy_uids = [index[u] for u in owl_net.accuracy_uids if u in index]
+    # cached orders refer to the uids before compaction
+    opt._orders = {}
+    opt.set_inference(True, keep_outputs)
+    print 'Removed %d identity units, fused %d conv+relu, pre-transposed %d fc weights' % (
+            len(removed) - num_fused, num_fused, num_transposed)
+
+    # check that both nets compute the same
+    outputs = sorted(set(_compared_outputs(opt, phase) + list(keep_outputs)))
+    expected = owl_net.forward_inputs(sample_inputs, outputs, phase)
+    actual = opt.forward_inputs(sample_inputs, outputs, phase)
+    for name in outputs:
+        e = expected[name].to_numpy()
+        a = actual[name].to_numpy()
+        # raised rather than asserted, so that the check is not stripped by python -O
+        if e.shape != a.shape:
+            raise RuntimeError('output %s changes shape from %s to %s' % (name, e.shape, a.shape))
+        err = np.max(np.abs(a - e)) / max(np.max(np.abs(e)), 1e-6)
+        if not err <= tolerance:
+            raise RuntimeError('output %s differs by %g after optimization' % (name, err))
+        print 'Output %s: max relative difference %g' % (name, err)
+    return opt
@@ -0,0 +1,146 @@
+''' Store the weights of a trained :py:class:`owl.net.Net` in reduced precision
+
+:py:func:`calibrate` runs a few batches through the net and picks, for every fully-connected and
+convolution unit in turn, the smallest type (see :py:mod:`owl.quantize`) that keeps the outputs of
+the net within a tolerance, with the types already picked for the previous units applied. :py:func:`quantize_net` then replaces the float weights of these units, so
+that they take a quarter (``int8``) or a half (``float16``) of the memory; fully-connected units also
+multiply with the quantized weights directly, reading a quarter or a half of the bytes.
+
+:py:func:`quantized_tensors` gives the parameters of such a net for a checkpoint, which
+:py:meth:`owl.net.net_helper.CaffeNetBuilder.init_net_from_checkpoint` loads without expanding the
+weights to float.
+'''
+import numpy as np
+import owl.quantize as oq
+import net
+from optimize import _compared_outputs
+
+def _weighted_units(owl_net):
+    return [u for u in owl_net.units if isinstance(u, net.FullyConnection) or isinstance(u, net.ConvConnection)]
+
+def _quantized_weight(unit, dtype):
+    # Fully-connected weights are quantized transposed, so that the scales are per output
+    if isinstance(unit, net.FullyConnection):
+        return oq.quantize(unit.weight_t if unit.weight_t != None else unit.weight.trans(), dtype)
+    return oq.quantize(unit.weight, dtype)
+
+def reference_outputs(owl_net, batches, outputs = None, phase = 'TEST'):
+    ''' Run the batches through the net and fetch the outputs, to compare other nets with
+
+    :param owl.net.Net owl_net: the net
+    :param list batches: input batches, each a map from top name (e.g. ``'data'``) to ``owl.NArray`` as
+        taken by :py:meth:`owl.net.Net.forward_inputs`
+    :param outputs: names of the output units; by default, the last units before the loss and
+        accuracy units
+    :type outputs: list str
+    :param str phase: phase the net is run in
+    :return: for each batch, a map from output name to ``numpy.ndarray``
+    :rtype: list
+    '''
+    if outputs == None:
+        outputs = _compared_outputs(owl_net, phase)
+    expected = []
+    for batch in batches:
+        ret = owl_net.forward_inputs(batch, outputs, phase)
+        expected.append(dict([(name, ret[name].to_numpy()) for name in outputs]))
+    return expected
+
+def max_error(owl_net, batches, expected, phase = 'TEST'):
+    ''' Max difference of the outputs of a net to the expected ones, relative to the max absolute output
+
+    :param owl.net.Net owl_net: the net
+    :param list batches: input batches
+    :param list expected: the outputs given by :py:func:`reference_outputs`
+    :param str phase: phase the net is run in
+    :rtype: float
+    '''
+    err = 0
+    for (batch, outputs) in zip(batches, expected):
+        actual = owl_net.forward_inputs(batch, outputs.keys(), phase)
+        for (name, e) in outputs.items():
+            a = actual[name].to_numpy()
+            err = max(err, np.max(np.abs(a - e)) / max(np.max(np.abs(e)), 1e-6))
+    return err
+
+def calibrate(owl_net, batches, outputs = None, tolerance = 1e-2, phase = 'TEST', expected = None):
+    ''' Pick the type of the weights of each fully-connected and convolution unit
+
+    The units are tried one at a time, ``int8`` first, then ``float16``; a unit keeps float weights if
+    neither type is within ``tolerance``. Each unit is tried with the types picked for the previous
+    ones applied, so the errors of the units cannot add up past ``tolerance`` once they are all
+    quantized. The net is left unchanged.
+
+    :param owl.net.Net owl_net: the trained net
+    :param list batches: input batches, each a map from top name (e.g. ``'data'``) to ``owl.NArray``
+    :param outputs: names of the compared units; by default, the last units before the loss and
+        accuracy units
+    :type outputs: list str
+    :param float tolerance: max difference of the outputs, relative to the max absolute output
+    :param str phase: phase the net is run in
+    :param list expected: the outputs of the float net given by :py:func:`reference_outputs`; computed
+        if not given
+    :return: dict from unit name to ``'int8'``, ``'float16'`` or ``'float32'``
+    '''
+    if expected == None:
+        expected = reference_outputs(owl_net, batches, outputs, phase)
+    dtypes = {}
+    picked = []
+    for unit in _weighted_units(owl_net):
+        if unit.weight == None:
+            continue
+        dtypes[unit.name] = 'float32'
+        for dtype in ['int8', 'float16']:
+            unit.qweight = _quantized_weight(unit, dtype)
+            err = max_error(owl_net, batches, expected, phase)
+            print 'Unit %s in %s: max relative difference %g' % (unit.name, dtype, err)
+            if err <= tolerance:
+                dtypes[unit.name] = dtype
+                # kept while the next units are tried
+                picked.append(unit)
+                break
+            unit.qweight = None
+    for unit in picked:
+        unit.qweight = None
+    return dtypes
+
+def quantize_net(owl_net, dtypes):
+    ''' Replace the float weights of units by quantized ones
+
+    The float weights and their deltas are dropped, so the net can only be used for inference
+    afterwards.
+
+    :param owl.net.Net owl_net: the net
+    :param dict dtypes: map from unit name to type, as given by :py:func:`calibrate`; units that are
+        not in it or mapped to ``'float32'`` are left unchanged
+    :return: bytes of weights saved
+    :rtype: int
+    '''
+    saved = 0
+    for unit in _weighted_units(owl_net):
+        dtype = dtypes.get(unit.name, 'float32')
+        if dtype == 'float32' or unit.weight == None:
+            continue
+        unit.qweight = _quantized_weight(unit, dtype)
+        saved += np.prod(unit.weight.shape) * 4 - unit.qweight.nbytes()
+        unit.weight = None
+        unit.weight_t = None
+        unit.weightdelta = None
+    return saved
+
+def quantized_tensors(owl_net):
+    ''' Collect the parameters of a net with quantized weights for a checkpoint
+
+    Quantized weights are named ``<layer>_qweights``; float weights and biases are named as in
+    :py:func:`owl.net.net_helper.snapshot_tensors`. Deltas are not included.
+
+    :return: list of ``(name, array)``
+    '''
+    tensors = []
+    for unit in _weighted_units(owl_net):
+        layername = unit.name.replace("/","_")
+        if unit.qweight != None:
+            tensors.append(('%s_qweights' % layername, unit.qweight))
+        else:
+            tensors.append(('%s_weights' % layername, unit.weight))
+        tensors.append(('%s_bias' % layername, unit.bias))
+    return tensors
@@ -0,0 +1,399 @@
+''' In-process inference server for trained ``owl.net`` models
+
+Several models are loaded once and served together. Individual requests (an encoded image or a
+tensor of one sample) are queued per model and gathered into batches of up to ``max_batch`` samples,
+waiting at most ``max_delay`` milliseconds after the first request of a batch. Batches are run by one
+worker thread per device and every request gets its own :py:class:`InferenceFuture`.
+
+Run it as::
+    >>> cpu = owl.create_cpu_device()
+    >>> owl.set_device(cpu)
+    >>> server = InferenceServer([InferenceModel('alexnet', solver_file, 60, 'prob')], [cpu])
+    >>> server.start()
+    >>> server.infer('alexnet', image_bytes)
+    >>> server.serve(('localhost', 8080))     # or server.serve('/tmp/owl.sock')
+
+The HTTP front end accepts::
+    POST /models/<name>/infer   body: an encoded image (``Content-Type: image/*``) or
+                                ``{"data": <nested list of one sample>}`` (``application/json``)
+    GET  /models                input shapes of the models
+    GET  /metrics               queue depth, batch-fill ratio and latency of each model
+'''
+import os
+import time
+import json
+import threading
+import collections
+import Queue
+import SocketServer
+import BaseHTTPServer
+from cStringIO import StringIO
+import numpy as np
+from PIL import Image
+import owl
+from net import Net
+from net_helper import CaffeNetBuilder
+from optimize import optimize_for_inference
+
+class InferenceFuture:
+    ''' The pending result of one request
+
+    :ivar float submit_time: time the request was submitted
+    '''
+    def __init__(self):
+        self.submit_time = time.time()
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    def set_result(self, value = None, error = None):
+        with self.lock:
+            self.value = value
+            self.error = error
+            self.done.set()
+            callbacks = self.callbacks
+            self.callbacks = []
+        for cb in callbacks:
+            cb(self)
+
+    def add_done_callback(self, cb):
+        ''' Call ``cb(future)`` once the result is ready (immediately if it already is)
+        '''
+        with self.lock:
+            if not self.done.is_set():
+                self.callbacks.append(cb)
+                return
+        cb(self)
+
+    def result(self, timeout = None):
+        ''' Wait for the result
+
+        :param float timeout: seconds to wait; ``None`` waits forever
+        :return: the output of the sample
+        :rtype: numpy.ndarray
+        '''
+        # Event.wait without timeout cannot be interrupted in python 2
+        while not self.done.wait(1.0 if timeout == None else timeout):
+            if timeout != None:
+                raise RuntimeError('inference request timed out')
+        if self.error != None:
+            raise self.error
+        return self.value
+
+class InferenceMetrics:
+    ''' Metrics of the requests of one model
+
+    Latency is measured from submission to the result being ready, over the last ``window`` requests.
+    '''
+    def __init__(self, window = 10000):
+        self.lock = threading.Lock()
+        self.latencies = collections.deque(maxlen = window)
+        self.num_requests = 0
+        self.num_errors = 0
+        self.num_batches = 0
+        self.batch_fill = 0.0
+
+    def add_batch(self, futures, max_batch, failed = False):
+        now = time.time()
+        with self.lock:
+            self.num_batches += 1
+            self.num_requests += len(futures)
+            self.batch_fill += float(len(futures)) / max_batch
+            if failed:
+                self.num_errors += len(futures)
+            self.latencies.extend([now - f.submit_time for f in futures])
+
+    def report(self, queue_depth):
+        ''' Get the metrics as a dict
+
+        :param int queue_depth: number of requests waiting to be batched
+        '''
+        with self.lock:
+            latencies = np.array(self.latencies, dtype=np.float64) * 1000
+            ret = {'requests': self.num_requests,
+                   'errors': self.num_errors,
+                   'batches': self.num_batches,
+                   'queue_depth': queue_depth,
+                   'batch_fill_ratio': self.batch_fill / self.num_batches if self.num_batches > 0 else 0.0}
+        ret['latency_p50_ms'] = float(np.percentile(latencies, 50)) if latencies.size > 0 else 0.0
+        ret['latency_p99_ms'] = float(np.percentile(latencies, 99)) if latencies.size > 0 else 0.0
+        return ret
+
+def _center_crop(img, height, width):
+    h_st = (img.shape[1] - height) / 2
+    w_st = (img.shape[2] - width) / 2
+    return img[:, h_st : h_st + height, w_st : w_st + width]
+
+class InferenceModel:
+    ''' A trained model served by :py:class:`InferenceServer`
+
+    The network is built from Caffe's solver file and runs in inference mode (see
+    :py:meth:`owl.net.Net.set_inference`). Inputs are fed to the top of the ``TEST`` data layer,
+    so the data layer only provides the input shape and the mean for image requests.
+
+    :ivar str name: name of the model in requests
+    :ivar str output_layer: name of the layer whose output is returned
+    :ivar list int input_shape: shape of one sample in numpy order ``[C, H, W]``
+    :ivar int max_batch: max number of samples in a batch
+    :ivar float max_delay: max milliseconds to wait for a batch to fill
+
+    If ``optimize`` is set, the net is rewritten by :py:func:`owl.net.optimize.optimize_for_inference`,
+    checked on a random batch.
+    '''
+    def __init__(self, name, solver_file, snapshot, output_layer, max_batch = 32, max_delay = 5.0, optimize = False):
+        self.name = name
+        self.output_layer = output_layer
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        builder = CaffeNetBuilder(solver_file)
+        self.net = Net()
+        builder.build_net(self.net)
+        self.net.compute_size('TEST')
+        builder.init_net_from_file(self.net, builder.snapshot_dir, snapshot)
+        self.net.set_inference(True)
+        data_unit = self.net.get_data_unit('TEST')
+        self.input_name = data_unit.top_names[0]
+        self.input_shape = [3, data_unit.crop_size, data_unit.crop_size]
+        # images are stored at the size of the mean image and center-cropped when testing
+        self.image_size = list(data_unit.dp.mean_data.shape[1:])
+        self.mean = _center_crop(data_unit.dp.mean_data, data_unit.crop_size, data_unit.crop_size)
+        if optimize:
+            sample = np.random.randn(*([max_batch] + self.input_shape)).astype(np.float32)
+            self.net = optimize_for_inference(self.net, {self.input_name: owl.from_numpy(sample)}, [output_layer])
+
+    def preprocess_image(self, data):
+        ''' Decode an image into a sample as the data layers do when testing (resized to the stored
+        size, BGR, center-cropped, mean subtracted)
+
+        :param str data: the encoded image
+        :rtype: numpy.ndarray
+        '''
+        img = Image.open(StringIO(data))
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        (h, w) = self.image_size
+        img = img.resize((w, h), Image.ANTIALIAS)
+        npimg = np.transpose(np.array(img, dtype=np.float32), [2, 0, 1])[::-1, :, :]
+        (c, crop_h, crop_w) = self.input_shape
+        return _center_crop(npimg, crop_h, crop_w) - self.mean
+
+    def run(self, samples):
+        ''' Issue the forward pass of a batch; several threads may run the same model at once
+
+        :param numpy.ndarray samples: the batch of shape ``[N, C, H, W]``
+        :return: the output of the batch (not evaluated yet)
+        :rtype: owl.NArray
+        '''
+        outputs = self.net.infer({self.input_name: owl.from_numpy(samples)}, [self.output_layer])
+        return outputs[self.output_layer]
+
+class InferenceServer:
+    ''' Batched inference over several models and devices
+
+    :ivar dict models: models by name
+    :ivar list int devices: devices running batches; one worker thread is started for each
+    '''
+    def __init__(self, models, devices = None):
+        self.models = dict([(m.name, m) for m in models])
+        if devices == None:
+            devices = [owl.create_cpu_device()]
+        self.devices = devices
+        self.queues = dict([(name, Queue.Queue()) for name in self.models])
+        self.metrics = dict([(name, InferenceMetrics()) for name in self.models])
+        # batches wait here for a free device, so requests keep accumulating while all devices are busy
+        self.batches = Queue.Queue(len(devices))
+        self.threads = []
+        self.running = False
+        self.stopped = False
+        # serializes submitting with stopping, so that no request is queued once the queues are drained
+        self.lock = threading.Lock()
+        self.httpd = None
+
+    def start(self):
+        ''' Start the batching and the worker threads
+        '''
+        self.running = True
+        self.stopped = False
+        for name in self.models:
+            self.threads.append(threading.Thread(target = self._batch_loop, args = (self.models[name],)))
+        for dev in self.devices:
+            self.threads.append(threading.Thread(target = self._device_loop, args = (dev,)))
+        for t in self.threads:
+            t.daemon = True
+            t.start()
+
+    def stop(self):
+        ''' Stop the front end and the threads; requests still queued are failed
+        '''
+        if self.httpd != None:
+            self.httpd.shutdown()
+        with self.lock:
+            self.running = False
+            self.stopped = True
+        for t in self.threads:
+            t.join()
+        self.threads = []
+        # requests not batched yet, and batches no device took
+        requests = []
+        for name in self.queues:
+            while not self.queues[name].empty():
+                requests.append(self.queues[name].get_nowait())
+        while not self.batches.empty():
+            requests.extend(self.batches.get_nowait()[1])
+        for (sample, future) in requests:
+            future.set_result(error = RuntimeError('inference server stopped'))
+
+    def submit(self, model_name, sample):
+        ''' Submit one request
+
+        :param str model_name: name of the model
+        :param sample: an encoded image (str), or a sample of shape ``model.input_shape``
+        :type sample: str or numpy.ndarray
+        :rtype: InferenceFuture
+        '''
+        model = self.models[model_name]
+        future = InferenceFuture()
+        if isinstance(sample, str):
+            sample = model.preprocess_image(sample)
+        sample = np.asarray(sample, dtype=np.float32)
+        if list(sample.shape) != model.input_shape:
+            future.set_result(error = ValueError('expect a sample of shape %s but got %s' % (model.input_shape, list(sample.shape))))
+            return future
+        with self.lock:
+            if not self.stopped:
+                self.queues[model_name].put((sample, future))
+                return future
+        future.set_result(error = RuntimeError('inference server stopped'))
+        return future
+
+    def infer(self, model_name, sample, timeout = None):
+        ''' Submit one request and wait for its result
+
+        :rtype: numpy.ndarray
+        '''
+        return self.submit(model_name, sample).result(timeout)
+
+    def report(self):
+        ''' Get the metrics of all models
+
+        :return: dict from model name to the dict of :py:meth:`InferenceMetrics.report`
+        '''
+        return dict([(name, self.metrics[name].report(self.queues[name].qsize())) for name in self.models])
+
+    def _batch_loop(self, model):
+        queue = self.queues[model.name]
+        while self.running:
+            try:
+                requests = [queue.get(timeout = 0.1)]
+            except Queue.Empty:
+                continue
+            deadline = time.time() + model.max_delay / 1000.0
+            while len(requests) < model.max_batch:
+                timeout = deadline - time.time()
+                try:
+                    if timeout > 0:
+                        requests.append(queue.get(timeout = timeout))
+                    else:
+                        requests.append(queue.get_nowait())
+                except Queue.Empty:
+                    break
+            while self.running:
+                try:
+                    self.batches.put((model, requests), timeout = 0.1)
+                    break
+                except Queue.Full:
+                    continue
+            else:
+                for (sample, future) in requests:
+                    future.set_result(error = RuntimeError('inference server stopped'))
+
+    def _device_loop(self, dev):
+        # ops issued by this thread go to its own device, whatever the other threads use
+        owl.set_thread_device(dev)
+        while self.running:
+            try:
+                (model, requests) = self.batches.get(timeout = 0.1)
+            except Queue.Empty:
+                continue
+            futures = [future for (sample, future) in requests]
+            try:
+                samples = np.array([sample for (sample, future) in requests], dtype=np.float32)
+                out = model.run(samples)
+                # to_numpy releases the GIL while waiting, so other batches are issued meanwhile
+                result = out.to_numpy()
+            except Exception as e:
+                self.metrics[model.name].add_batch(futures, model.max_batch, True)
+                for f in futures:
+                    f.set_result(error = e)
+                continue
+            result = result.reshape([len(futures)] + list(result.shape[1:]))
+            self.metrics[model.name].add_batch(futures, model.max_batch)
+            for (i, f) in enumerate(futures):
+                f.set_result(result[i])
+
+    def serve(self, address):
+        ''' Serve the HTTP front end until :py:meth:`stop` is called
+
+        :param address: ``(host, port)`` for TCP, or the path of a unix socket
+        :type address: tuple or str
+        '''
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.remove(address)
+            self.httpd = _UnixHTTPServer(address, _InferenceRequestHandler)
+        else:
+            self.httpd = _TCPHTTPServer(address, _InferenceRequestHandler)
+        self.httpd.inference_server = self
+        self.httpd.serve_forever()
+
+class _TCPHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+class _UnixHTTPServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+    daemon_threads = True
+
+class _InferenceRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def address_string(self):
+        # client_address is empty on unix sockets
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def _reply(self, code, obj):
+        body = json.dumps(obj)
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server.inference_server
+        if self.path == '/metrics':
+            self._reply(200, server.report())
+        elif self.path == '/models':
+            self._reply(200, dict([(name, {'input_shape': m.input_shape, 'max_batch': m.max_batch})
+                for (name, m) in server.models.items()]))
+        else:
+            self._reply(404, {'error': 'unknown path %s' % self.path})
+
+    def do_POST(self):
+        server = self.server.inference_server
+        parts = self.path.strip('/').split('/')
+        if len(parts) != 3 or parts[0] != 'models' or parts[2] != 'infer' or not parts[1] in server.models:
+            self._reply(404, {'error': 'unknown path %s' % self.path})
+            return
+        body = self.rfile.read(int(self.headers.getheader('Content-Length', 0)))
+        try:
+            if self.headers.getheader('Content-Type', '').startswith('application/json'):
+                sample = np.array(json.loads(body)['data'], dtype=np.float32)
+            else:
+                sample = body
+            output = server.submit(parts[1], sample).result()
+        except (ValueError, IOError) as e:
+            self._reply(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._reply(500, {'error': str(e)})
+            return
+        self._reply(200, {'shape': list(output.shape), 'output': output.tolist()})
@@ -1,11 +1,19 @@
 import math
+import os
 import sys
 import time
+import collections
 import numpy as np
 import owl
 from net import Net
+from net import AccuracyAccumulator
 import net
 from net_helper import CaffeNetBuilder
+from net_helper import SnapshotWriter
+from net_helper import quantized_snapshot_file
+from checkpoint import save_checkpoint
+import quantize
+from netio import FeatureWriter
 from caffe import *
 from PIL import Image
 
@@ -26,6 +34,10 @@ class NetTrainer:
                          minibatches will the trainer call ``owl.wait_for_all()``. Note that this will influence the training
                          speed. Normally, the higher value is given, the faster the training speed but the more memory is used
                          during execution.
+
+    Snapshots are saved asynchronously by a :py:class:`owl.net.net_helper.SnapshotWriter`, so training is not
+    stalled while the parameters are written to disk. Replace ``trainer.snapshot_writer`` before ``run`` to
+    write incremental snapshots or delete old ones.
     '''
     def __init__(self, solver_file, snapshot = 0, num_gpu = 1, sync_freq=1):
         self.solver_file = solver_file
@@ -33,6 +45,7 @@ class NetTrainer:
         self.num_gpu = num_gpu
         self.sync_freq = sync_freq
         self.gpu = [owl.create_gpu_device(i) for i in range(num_gpu)]
+        self.snapshot_writer = SnapshotWriter()
 
     def build_net(self):
         ''' Build network structure using Caffe's proto definition. It will also initialize
@@ -155,24 +168,24 @@ class NetTrainer:
 
             # decide whether to test
             if (iteridx + 1) % (s.owl_net.solver.test_interval) == 0:
-                acc_num = 0
-                test_num = 0
+                all_accunits = s.owl_net.get_accuracy_units()
+                accunit = all_accunits[len(all_accunits)-1]
+                acc = AccuracyAccumulator(accunit.top_k)
+                s.owl_net.set_inference(True)
                 for testiteridx in range(s.owl_net.solver.test_iter[0]):
                     s.owl_net.forward('TEST')
-                    all_accunits = s.owl_net.get_accuracy_units()
-                    accunit = all_accunits[len(all_accunits)-1]
-                    #accunit = all_accunits[0]
-                    test_num += accunit.batch_size
-                    acc_num += (accunit.batch_size * accunit.acc)
-                    print "Accuracy the %d mb: %f" % (testiteridx, accunit.acc)
-                    sys.stdout.flush()
+                    acc.add(accunit.predict, accunit.ground_truth)
+                s.owl_net.set_inference(False)
+                (acc_num, test_num) = acc.result()
                 print "Testing Accuracy: %f" % (float(acc_num)/test_num)
+                sys.stdout.flush()
 
             # decide whether to save model
             if (iteridx + 1) % (s.owl_net.solver.snapshot) == 0:
                 print "Save to snapshot %d, current lr %f" % ((iteridx + 1) / (s.owl_net.solver.snapshot), s.owl_net.current_lr)
-                s.builder.save_net_to_file(s.owl_net, s.snapshot_dir, (iteridx + 1) / (s.owl_net.solver.snapshot))
+                s.snapshot_writer.save(s.owl_net, s.snapshot_dir, (iteridx + 1) / (s.owl_net.solver.snapshot))
             sys.stdout.flush()
+        s.snapshot_writer.wait()
 
     def gradient_checker(s, checklayer_name):
         ''' Check backpropagation on multiple GPUs
@@ -276,9 +289,14 @@ class NetTester:
         self.builder.init_net_from_file(self.owl_net, self.snapshot_dir, self.snapshot)
 
     def run(s, multiview):
-        #multi-view test
-        acc_num = 0
-        test_num = 0
+        ''' Run the test over ``solver.test_iter`` batches
+
+        Correct counts are accumulated without waiting for each batch (see
+        :py:class:`owl.net.net.AccuracyAccumulator`), so the result is only fetched at the end.
+
+        :param bool multiview: average the predictions of 10 views of each image; all views of a
+            batch are evaluated in one forward pass
+        '''
         loss_unit = s.owl_net.units[s.owl_net.name_to_uid[s.softmax_layer_name][0]] 
         accunit = s.owl_net.units[s.owl_net.name_to_uid[s.accuracy_layer_name][0]] 
         data_unit = None
@@ -290,52 +308,39 @@ class NetTester:
         if multiview == True:
             data_unit.multiview = True
 
+        # Activations are released as soon as they are consumed, so larger test batches fit in memory
+        s.owl_net.set_inference(True)
+        acc = AccuracyAccumulator(accunit.top_k)
+        view_num = 10
         for testiteridx in range(s.owl_net.solver.test_iter[0]):
+            s.owl_net.forward('TEST')
             if multiview == True:
-                for i in range(10): 
-                    s.owl_net.forward('TEST')
-                    if i == 0:
-                        softmax_val = loss_unit.ff_y
-                        batch_size = softmax_val.shape[1]
-                        softmax_label = loss_unit.y
-                    else:
-                        softmax_val = softmax_val + loss_unit.ff_y
-                test_num += batch_size
-                if accunit.top_k == 5:
-                    predict = softmax_val.to_numpy()
-                    top_5 = np.argsort(predict, axis=1)[:,::-1]
-                    ground_truth = softmax_label.max_index(0).to_numpy()
-                    correct = 0
-                    for i in range(batch_size):
-                        for t in range(5):
-                            if ground_truth[i] == top_5[i,t]:
-                                correct += 1
-                                break
-                    acc_num += correct
-                else:
-                    predict = softmax_val.max_index(0)
-                    truth = softmax_label.max_index(0)
-                    correct = (predict - truth).count_zero()
-                    acc_num += correct
+                # The batch holds the views one after another; sum the predictions over views
+                softmax_val = loss_unit.ff_y
+                num_class = softmax_val.shape[0]
+                batch_size = softmax_val.shape[1] / view_num
+                predict = softmax_val.reshape([num_class, batch_size, view_num]).sum(2).reshape([num_class, batch_size])
+                acc.add(predict, accunit.ground_truth[0:batch_size])
             else:
-                s.owl_net.forward('TEST')
-                all_accunits = s.owl_net.get_accuracy_units()
-                batch_size = accunit.batch_size
-                test_num += batch_size
-                acc_num += (batch_size * accunit.acc)
-                correct = batch_size * accunit.acc
-            print "Accuracy of the %d mb: %f, batch_size: %d, current mean accuracy: %f" % (testiteridx, (correct * 1.0)/batch_size, batch_size, float(acc_num)/test_num)
+                acc.add(accunit.predict, accunit.ground_truth)
+            print "Issued the %d mb" % (testiteridx)
             sys.stdout.flush()
+        (acc_num, test_num) = acc.result()
         print "Testing Accuracy: %f" % (float(acc_num)/test_num)
 
 class FeatureExtractor:
     ''' Class for extracting trained features
-    Feature will be stored in a txt file as a matrix. The size of the feature matrix is [num_img, feature_dimension]
+    Features of each layer will be stored in a ``.npy`` file as a float32 matrix. The size of the feature matrix is [num_img, feature_dimension]
+
+    Extraction is pipelined: up to ``in_flight`` batches are evaluated by the engine before the
+    features of the oldest one are fetched, and the files are written by a background thread.
+    The output can be read with ``np.load(feature_path, mmap_mode='r')``.
 
     Run it as::
         >>> extractor = FeatureExtractor(solver_file, snapshot, gpu_idx)
         >>> extractor.build_net()
         >>> extractor.run(layer_name, feature_path)
+        >>> extractor.run(['fc6', 'fc7'], feature_dir, resume=True)
 
     :ivar str solver_file: path of the solver file in Caffe's proto format
     :ivar int snapshot: the snapshot for testing
@@ -356,30 +361,143 @@ class FeatureExtractor:
         self.owl_net.compute_size('TEST')
         self.builder.init_net_from_file(self.owl_net, self.snapshot_dir, self.snapshot)
 
-    def run(s, layer_name, feature_path):
+    def run(s, layer_name, feature_path, in_flight = 4, resume = False):
         ''' Run feature extractor
 
-        :param str layer_name: the layer to extract feature from
-        :param str feature_path: feature output path
+        :param layer_name: the layer to extract feature from, or a list of layers to extract in one pass
+        :type layer_name: str or list
+        :param str feature_path: feature output path; if several layers are given, it is a directory
+            and the features of each layer are stored in ``<feature_path>/<layer_name>.npy``
+        :param int in_flight: number of batches evaluated ahead of the one being written
+        :param bool resume: continue after the last batch already in the output files
         '''
-        feature_unit = s.owl_net.units[s.owl_net.name_to_uid[layer_name][0]] 
-        feature_file = open(feature_path, 'w')
-        batch_dir = 0
-        for testiteridx in range(s.owl_net.solver.test_iter[0]):
+        if isinstance(layer_name, str):
+            layer_names = [layer_name]
+            feature_paths = [feature_path]
+        else:
+            layer_names = list(layer_name)
+            if not os.path.isdir(feature_path):
+                os.makedirs(feature_path)
+            feature_paths = [os.path.join(feature_path, name.replace('/', '_') + '.npy') for name in layer_names]
+        feature_units = [s.owl_net.units[s.owl_net.name_to_uid[name][0]] for name in layer_names]
+        writers = [FeatureWriter(path, resume, in_flight) for path in feature_paths]
+        s.owl_net.set_inference(True, layer_names)
+
+        # Output files of different layers may end at different batches if interrupted
+        done_num = min([w.num_rows for w in writers])
+        for w in writers:
+            w.truncate(done_num)
+        first_batch = s._skip_batches(done_num)
+        if done_num > 0:
+            print "Resume from image %d (batch %d)" % (done_num, first_batch)
+
+        pending = collections.deque()
+        for testiteridx in range(first_batch, s.owl_net.solver.test_iter[0]):
             s.owl_net.forward('TEST')
-            feature = feature_unit.out.to_numpy()
-            feature_shape = np.shape(feature)
-            img_num = feature_shape[0]
-            feature_length = np.prod(feature_shape[1:len(feature_shape)])
-            feature = np.reshape(feature, [img_num, feature_length])
-            for imgidx in range(img_num):
-                for feaidx in range(feature_length):
-                    info ='%f ' % (feature[imgidx, feaidx])
-                    feature_file.write(info)
-                feature_file.write('\n')
-            print "Finish One Batch %d" % (batch_dir)
-            batch_dir += 1
-        feature_file.close()
+            pending.append((testiteridx, [unit.out for unit in feature_units]))
+            if len(pending) >= in_flight:
+                s._write_batch(pending.popleft(), writers)
+        while len(pending) > 0:
+            s._write_batch(pending.popleft(), writers)
+        for w in writers:
+            w.close()
+
+    def _skip_batches(s, num_img):
+        # Only advance the data layers over the batches that are already extracted
+        data_units = []
+        for data_name in s.owl_net.data_layers:
+            for uid in s.owl_net.name_to_uid[data_name]:
+                if s.owl_net.units[uid].params.include[0].phase == 1:
+                    data_units.append(s.owl_net.units[uid])
+        skipped = 0
+        batch_idx = 0
+        while skipped < num_img:
+            to_top = {}
+            for unit in data_units:
+                unit.forward({}, to_top, 'TEST')
+            skipped += to_top[data_units[0].top_names[0]].shape[-1]
+            batch_idx += 1
+        assert(skipped == num_img)
+        return batch_idx
+
+    def _write_batch(s, batch, writers):
+        (batch_idx, outs) = batch
+        for (out, writer) in zip(outs, writers):
+            feature = out.to_numpy()
+            writer.append(np.reshape(feature, [feature.shape[0], -1]))
+        print "Finish One Batch %d" % (batch_idx)
+
+class WeightQuantizer:
+    ''' Class for storing the weights of a trained net in reduced precision
+
+    A few test batches are read as in :py:class:`FeatureExtractor` and used to pick the type of the
+    weights of every layer (see :py:func:`owl.net.quantize.calibrate`). The error of the quantized net
+    on the same batches is reported and the net saved as a new snapshot, which can be tested or served as any
+    other snapshot but not trained further. It is saved apart from the training snapshots (see
+    :py:func:`owl.net.net_helper.quantized_snapshot_file`), so that their retention never deletes it.
+
+    Run it as::
+        >>> quantizer = WeightQuantizer(solver_file, snapshot, gpu_idx)
+        >>> quantizer.build_net()
+        >>> quantizer.run(output_snapshot, num_batches, tolerance)
+
+    :ivar str solver_file: path of the solver file in Caffe's proto format
+    :ivar int snapshot: the snapshot to quantize
+    :ivar int gpu_idx: which gpu to run the net on; the net runs on the cpu if owl is built without CUDA
+    '''
+    def __init__(self, solver_file, snapshot, gpu_idx = 0):
+        self.solver_file = solver_file
+        self.snapshot = snapshot
+        if owl.has_cuda():
+            self.device = owl.create_gpu_device(gpu_idx)
+        else:
+            self.device = owl.create_cpu_device()
+        owl.set_device(self.device)
+
+    def build_net(self):
+        self.owl_net = Net()
+        self.builder = CaffeNetBuilder(self.solver_file)
+        self.snapshot_dir = self.builder.snapshot_dir
+        self.builder.build_net(self.owl_net)
+        self.owl_net.compute_size('TEST')
+        self.builder.init_net_from_file(self.owl_net, self.snapshot_dir, self.snapshot)
+
+    def run(s, output_snapshot, num_batches = 4, tolerance = 1e-2):
+        ''' Calibrate, quantize and save the net
+
+        :param int output_snapshot: index of the snapshot the quantized net is saved as
+        :param int num_batches: number of test batches used for calibration
+        :param float tolerance: max difference of the outputs, relative to the max absolute output
+        :return: map from layer name to the type of its weights, and the max relative difference of
+            the outputs of the quantized net
+        :rtype: tuple
+        '''
+        data_units = []
+        for data_name in s.owl_net.data_layers:
+            for uid in s.owl_net.name_to_uid[data_name]:
+                if s.owl_net.units[uid].params.include[0].phase == 1:
+                    data_units.append(s.owl_net.units[uid])
+        batches = []
+        for i in range(num_batches):
+            to_top = {}
+            for unit in data_units:
+                unit.forward({}, to_top, 'TEST')
+            batches.append(to_top)
+        s.owl_net.set_inference(True)
+
+        expected = quantize.reference_outputs(s.owl_net, batches)
+        dtypes = quantize.calibrate(s.owl_net, batches, tolerance = tolerance, expected = expected)
+        saved = quantize.quantize_net(s.owl_net, dtypes)
+        err = quantize.max_error(s.owl_net, batches, expected)
+        print "Quantized net: max relative difference %g (tolerance %g), %.1f MB of weights saved" % (err, tolerance, saved / 1048576.0)
+        if not err <= tolerance:
+            raise RuntimeError('quantized net out of tolerance')
+        path = quantized_snapshot_file(s.snapshot_dir, output_snapshot)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        save_checkpoint(path, quantize.quantized_tensors(s.owl_net))
+        print "Saved as snapshot %d in %s" % (output_snapshot, path)
+        return (dtypes, err)
 
 class FilterVisualizer:
     ''' Class of filter visualizer.
@@ -440,6 +558,7 @@ class FilterVisualizer:
         mean_data = mean_data[:, crop_h_w:crop_h_w + crop_size, crop_h_w:crop_h_w + crop_size]
 
         feature_unit = s.owl_net.units[s.owl_net.name_to_uid[s.layer_name][0]] 
+        s.owl_net.set_inference(True, [s.layer_name, data_unit.name])
         batch_dir = 0
         #we use 10000 images to conduct visualization
         all_data = np.zeros([10000, 3, crop_size, crop_size], dtype=np.float32)
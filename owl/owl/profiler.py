@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+""" This module contains the execution profiler
+
+Once started, every executed op records the time it spent in three phases: waiting in the queue of
+its device (``'queue_wait'``), copying its inputs from other devices and allocating its outputs
+(``'memory'``) and running (``'compute'``). The profiler can be started and stopped at any time, and
+costs well under a microsecond per op while running::
+
+    >>> import owl.profiler
+    >>> owl.profiler.start()
+    >>> net.forward('TRAIN'); owl.wait_for_all()
+    >>> owl.profiler.stop()
+    >>> owl.profiler.print_report()
+
+It can also be started for the whole run with the ``--profile`` flag.
+
+Every op also counts its flops and the bytes it reads and writes, from the shapes of its inputs and
+outputs. :py:func:`roofline` compares the achieved GFLOP/s and GB/s of each op type with the peaks of
+its device and flags the kernels far below what the device can attain::
+
+    >>> owl.set_device(gpu)
+    >>> peaks = {gpu: owl.profiler.measure_peaks()}
+    >>> owl.profiler.print_roofline(owl.profiler.roofline(peaks))
+"""
+import time
+import libowl as _owl
+
+phases = ['queue_wait', 'memory', 'compute']
+""" Phases of the execution of an op
+"""
+
+def start():
+    """ Start recording the executed ops
+
+    Timings add up to what was recorded before; call :py:func:`reset` to drop them.
+    """
+    _owl.enable_profiler()
+
+def stop():
+    """ Stop recording; what was recorded stays in :py:func:`report`
+    """
+    _owl.disable_profiler()
+
+def reset():
+    """ Drop the recorded timings
+    """
+    _owl.reset_profiler()
+
+def report():
+    """ Get the recorded timings
+
+    ``ops`` has one entry per op type, device and phase, with keys ``op``, ``device``, ``phase``,
+    ``count``, ``total_us``, ``p50_us``, ``p99_us`` and ``max_us``, sorted by decreasing total time.
+    The percentiles are estimated from a sample of the ops once there are more than a thousand of a
+    kind. ``'compute'`` entries also have the total ``flops`` and ``bytes`` of the ops, and the
+    achieved ``gflops`` and ``gbps`` (GB/s). ``devices`` maps each device id to a map from phase to
+    ``{'count', 'total_us'}``.
+
+    :return: ``{'ops': list, 'devices': dict}``
+    :rtype: dict
+    """
+    ops = _owl.profiler_report()
+    devices = {}
+    for r in ops:
+        if r['phase'] == 'compute':
+            r['gflops'] = r['flops'] / r['total_us'] / 1e3 if r['total_us'] > 0 else 0.0
+            r['gbps'] = r['bytes'] / r['total_us'] / 1e3 if r['total_us'] > 0 else 0.0
+        else:
+            del r['flops'], r['bytes']
+        dev = devices.setdefault(r['device'], dict([(p, {'count': 0, 'total_us': 0.0}) for p in phases]))
+        dev[r['phase']]['count'] += r['count']
+        dev[r['phase']]['total_us'] += r['total_us']
+    return {'ops': ops, 'devices': devices}
+
+def set_tag(tag):
+    """ Tag the ops created from now on by the calling thread
+
+    The profiler sums the compute time, flops, bytes and result bytes of the ops of each tag, see
+    :py:func:`tag_report`. ``owl.net.Net`` tags the ops of each unit with ``'<unit>:<pass>'``.
+
+    :param str tag: the tag; empty for no tag
+    """
+    _owl.set_op_tag(tag)
+
+def tag_report():
+    """ Get the recorded aggregates of the tagged ops
+
+    One entry per tag and device, with keys ``tag``, ``device``, ``count``, ``total_us`` (compute
+    time), ``flops``, ``bytes`` (read and written) and ``output_bytes`` (allocated for the results).
+
+    :rtype: list dict
+    """
+    return _owl.profiler_tag_report()
+
+def print_report(result = None):
+    """ Print the report as tables of ops and devices
+
+    :param dict result: a result of :py:func:`report`; by default, the current one
+    """
+    if result == None:
+        result = report()
+    print '%32s | %6s | %10s | %8s | %12s | %10s | %10s' % ('op', 'device', 'phase', 'count', 'total(ms)', 'p50(us)', 'p99(us)')
+    for r in result['ops']:
+        print '%32.32s | %6d | %10s | %8d | %12.3f | %10.1f | %10.1f' % (r['op'], r['device'], r['phase'], r['count'], r['total_us'] / 1000, r['p50_us'], r['p99_us'])
+    for dev in sorted(result['devices']):
+        print 'device #%d: %s' % (dev, ', '.join(['%s %.3fms' % (p, result['devices'][dev][p]['total_us'] / 1000) for p in phases]))
+
+def measure_peaks(matrix_size = 2048, vector_size = 1 << 24, repeat = 3):
+    """ Measure the peak GFLOP/s and GB/s of the current device
+
+    The peaks are the best of ``repeat`` runs of a product of square matrices and of a sum of vectors.
+
+    :param int matrix_size: side of the matrices
+    :param int vector_size: number of elements of the vectors
+    :param int repeat: number of timed runs
+    :return: ``(gflops, gbps)``
+    :rtype: tuple
+    """
+    import owl
+    def best(run):
+        run()
+        owl.wait_for_all()
+        ret = None
+        for i in range(repeat):
+            start = time.time()
+            run()
+            owl.wait_for_all()
+            t = time.time() - start
+            ret = t if ret == None else min(ret, t)
+        return ret
+    a = owl.randn([matrix_size, matrix_size], 0, 1)
+    b = owl.randn([matrix_size, matrix_size], 0, 1)
+    gflops = 2.0 * matrix_size ** 3 / best(lambda: a * b) / 1e9
+    x = owl.randn([vector_size], 0, 1)
+    y = owl.randn([vector_size], 0, 1)
+    # two vectors read and one written
+    gbps = 12.0 * vector_size / best(lambda: x + y) / 1e9
+    return (gflops, gbps)
+
+def roofline(peaks, result = None, threshold = 0.1):
+    """ Compare the op types with the roofline of their device
+
+    An op type reading and writing ``bytes`` for ``flops`` can attain at most
+    ``min(peak_gflops, flops / bytes * peak_gbps)`` GFLOP/s; it is ``'compute'`` bound if the first
+    term is the smaller, ``'memory'`` bound otherwise. Each entry has the ``op``, ``device``,
+    ``count``, ``total_us``, achieved ``gflops`` and ``gbps``, ``intensity`` (flops per byte),
+    ``bound``, ``efficiency`` (achieved over attainable) and ``flagged`` when the efficiency is below
+    ``threshold``. Ops of devices without peaks are skipped.
+
+    :param peaks: ``(gflops, gbps)`` of every device, or a map from device id to it, e.g. from :py:func:`measure_peaks`
+    :param dict result: a result of :py:func:`report`; by default, the current one
+    :param float threshold: efficiency under which an op type is flagged
+    :return: the entries, sorted by decreasing total time
+    :rtype: list dict
+    """
+    if result == None:
+        result = report()
+    ret = []
+    for r in result['ops']:
+        if r['phase'] != 'compute' or r['bytes'] == 0 or r['total_us'] == 0:
+            continue
+        dev_peaks = peaks.get(r['device']) if isinstance(peaks, dict) else peaks
+        if dev_peaks == None:
+            continue
+        (peak_gflops, peak_gbps) = dev_peaks
+        intensity = r['flops'] / r['bytes']
+        compute_bound = intensity * peak_gbps >= peak_gflops
+        if compute_bound:
+            efficiency = r['gflops'] / peak_gflops
+        else:
+            # the same as achieved over attainable GFLOP/s, and defined for ops without flops
+            efficiency = r['gbps'] / peak_gbps
+        ret.append({
+            'op': r['op'],
+            'device': r['device'],
+            'count': r['count'],
+            'total_us': r['total_us'],
+            'gflops': r['gflops'],
+            'gbps': r['gbps'],
+            'intensity': intensity,
+            'bound': 'compute' if compute_bound else 'memory',
+            'efficiency': efficiency,
+            'flagged': efficiency < threshold,
+        })
+    return ret
+
+def print_roofline(entries):
+    """ Print a result of :py:func:`roofline`, marking the flagged op types with ``!``
+
+    :param list entries: the result of :py:func:`roofline`
+    """
+    print '%32s | %6s | %8s | %12s | %9s | %9s | %9s | %7s | %6s' % ('op', 'device', 'count', 'total(ms)', 'GFLOP/s', 'GB/s', 'flop/B', 'bound', 'eff')
+    for e in entries:
+        print '%32.32s | %6d | %8d | %12.3f | %9.2f | %9.2f | %9.2f | %7s | %5.1f%%%s' % (e['op'], e['device'], e['count'], e['total_us'] / 1000, e['gflops'], e['gbps'], e['intensity'], e['bound'], e['efficiency'] * 100, ' !' if e['flagged'] else '')
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+""" This module contains reduced-precision storage of weights
+
+A :py:class:`QuantizedArray` keeps the values of a weight in half precision (``'float16'``) or in 8 bits
+with a scale per slice along the last dimension (``'int8'``), packed into an ``owl.NArray`` of a half or
+a quarter of the size. For the fully-connected and convolution weights of :py:mod:`owl.net`, that
+dimension is the outputs, so every output keeps its own range.
+"""
+import numpy as np
+import libowl as _owl
+
+dtypes = ['float16', 'int8']
+""" The supported reduced-precision types
+"""
+
+def quantize_numpy(nparr, dtype):
+    """ Quantize a numpy array on the host, the same way as :py:func:`quantize` does on the device
+
+    Since dimensions are reversed in Minerva, the scales of ``'int8'`` are per slice along the *first*
+    dimension of the numpy array.
+
+    :param numpy.ndarray nparr: the float array
+    :param str dtype: one of :py:data:`dtypes`
+    :return: ``(values, scale)``; ``values`` is of type ``numpy.float16`` or ``numpy.int8`` and of the
+        shape of ``nparr``, ``scale`` is ``None`` for ``'float16'``
+    :rtype: tuple
+    """
+    nparr = np.require(nparr, dtype=np.float32, requirements=['C'])
+    if dtype == 'float16':
+        return (nparr.astype(np.float16), None)
+    assert(dtype == 'int8'), 'unknown dtype %s' % dtype
+    slices = nparr.reshape(nparr.shape[0], -1)
+    max_abs = np.max(np.abs(slices), axis=1)
+    scale = max_abs / np.float32(127)
+    inv_scale = np.where(max_abs > 0, np.float32(127) / np.maximum(max_abs, np.float32(1e-38)), 0).astype(np.float32)
+    scaled = slices * inv_scale[:, np.newaxis]
+    # round half away from zero as the kernels do
+    values = np.clip(np.sign(scaled) * np.floor(np.abs(scaled) + 0.5), -127, 127).astype(np.int8)
+    return (values.reshape(nparr.shape), scale)
+
+def dequantize_numpy(values, scale):
+    """ Inverse of :py:func:`quantize_numpy`
+
+    :rtype: numpy.ndarray
+    """
+    if scale is None:
+        return values.astype(np.float32)
+    slices = values.reshape(values.shape[0], -1).astype(np.float32) * scale[:, np.newaxis]
+    return slices.reshape(values.shape)
+
+class QuantizedArray(object):
+    """ A float array stored in reduced precision
+
+    :ivar str dtype: one of :py:data:`dtypes`
+    :ivar list shape: shape of the float array (in Minerva's order, as ``owl.NArray.shape``)
+    :ivar owl.NArray packed: the packed values
+    :ivar owl.NArray scale: scales of the slices along the last dimension; ``None`` for ``'float16'``
+    """
+    def __init__(self, dtype, shape, packed, scale = None):
+        assert(dtype in dtypes), 'unknown dtype %s' % dtype
+        self.dtype = dtype
+        self.shape = list(shape)
+        self.packed = packed
+        self.scale = scale
+
+    def nbytes(self):
+        """ Device memory taken by the quantized array
+        """
+        n = np.prod(self.packed.shape) * 4
+        if self.scale != None:
+            n += np.prod(self.scale.shape) * 4
+        return n
+
+    def dequantize(self):
+        """ Expand the values into a float ``owl.NArray`` of :py:attr:`shape`
+        """
+        if self.dtype == 'float16':
+            return _owl.NArray.from_half(self.packed, self.shape)
+        return _owl.NArray.from_int8(self.packed, self.scale, self.shape)
+
+    def trans_mult(self, rhs):
+        """ Same as ``self.dequantize().trans_mult(rhs)``, but reads the quantized values directly
+
+        :param owl.NArray rhs: the right operand
+        :rtype: owl.NArray
+        """
+        if self.dtype == 'float16':
+            return _owl.NArray.half_trans_mult(self.packed, self.shape, rhs)
+        return _owl.NArray.int8_trans_mult(self.packed, self.scale, self.shape, rhs)
+
+def quantize(x, dtype):
+    """ Quantize an ``owl.NArray`` on the device
+
+    :param owl.NArray x: the float array
+    :param str dtype: one of :py:data:`dtypes`
+    :rtype: owl.quantize.QuantizedArray
+    """
+    if dtype == 'float16':
+        return QuantizedArray(dtype, x.shape, x.to_half())
+    assert(dtype == 'int8'), 'unknown dtype %s' % dtype
+    (packed, scale) = x.to_int8()
+    return QuantizedArray(dtype, x.shape, packed, scale)
+
+def from_numpy(values, scale = None):
+    """ Upload values quantized by :py:func:`quantize_numpy` without expanding them to float
+
+    :param numpy.ndarray values: array of type ``numpy.float16`` or ``numpy.int8``
+    :param numpy.ndarray scale: the scales of ``'int8'`` values
+    :rtype: owl.quantize.QuantizedArray
+    """
+    dtype = 'float16' if values.dtype == np.float16 else 'int8'
+    raw = np.ascontiguousarray(values).reshape(-1).view(np.uint8)
+    packed = _owl.NArray.from_numpy_uint8(raw)
+    shape = list(reversed(values.shape))
+    if scale is None:
+        return QuantizedArray(dtype, shape, packed)
+    scale = np.require(scale, dtype=np.float32, requirements=['C'])
+    return QuantizedArray(dtype, shape, packed, _owl.NArray.from_numpy(scale))
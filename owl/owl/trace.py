@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+""" This module contains the timeline of the engine
+
+While tracing, the engine keeps its latest events in a ring buffer: the creation of ops
+(``enqueue``), their dispatch to a device once their inputs are ready, the copies of inputs from
+other devices, the computations and the freeing of data. Each event has its device, thread, stream,
+node id, op name and size in bytes. The timeline is saved in the Chrome Trace Event format, to be
+opened in ``chrome://tracing`` or https://ui.perfetto.dev, where each device is a process and idle
+gaps and the overlap of copies with computations show up directly::
+
+    >>> import owl.trace
+    >>> owl.trace.start()
+    >>> net.forward('TRAIN'); net.backward('TRAIN'); owl.wait_for_all()
+    >>> owl.trace.stop()
+    >>> owl.trace.save('iteration.json')
+"""
+import libowl as _owl
+
+def start(capacity = 1 << 18):
+    """ Start tracing; events traced before are dropped
+
+    :param int capacity: number of events kept; older ones are overwritten
+    """
+    _owl.enable_tracer(capacity)
+
+def stop():
+    """ Stop tracing; the events stay in the buffer until the next :py:func:`start` or :py:func:`clear`
+    """
+    _owl.disable_tracer()
+
+def clear():
+    """ Drop the events traced so far
+    """
+    _owl.clear_tracer()
+
+def chrome_trace():
+    """ The traced events in the Chrome Trace Event format
+
+    :rtype: str
+    """
+    return _owl.export_chrome_trace()
+
+def save(filename):
+    """ Save the traced events in the Chrome Trace Event format
+
+    :param str filename: the JSON file
+    """
+    with open(filename, 'w') as f:
+        f.write(chrome_trace())
@@ -0,0 +1,45 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from owl.net.netio import DecodedImageCache
+
+class TestDecodedImageCache(unittest.TestCase):
+    def setUp(self):
+        self.images = dict([(k, np.random.randint(0, 256, [3, 4, 4]).astype(np.uint8)) for k in 'abc'])
+        self.nbytes = self.images['a'].nbytes
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_hit_and_evict(self):
+        cache = DecodedImageCache(2 * self.nbytes)
+        cache.bind(('list', 4, 4))
+        self.assertTrue(cache.get('a') is None)
+        cache.put('a', self.images['a'])
+        cache.put('b', self.images['b'])
+        # a becomes the most recently used, so b is evicted by c
+        np.testing.assert_array_equal(cache.get('a'), self.images['a'])
+        cache.put('c', self.images['c'])
+        self.assertEqual(cache.used, 2 * self.nbytes)
+        self.assertTrue(cache.get('b') is None)
+        np.testing.assert_array_equal(cache.get('a'), self.images['a'])
+        np.testing.assert_array_equal(cache.get('c'), self.images['c'])
+        self.assertEqual((cache.hits, cache.misses), (3, 2))
+
+    def test_spill(self):
+        cache = DecodedImageCache(self.nbytes, os.path.join(self.dir, 'spill'))
+        cache.bind(('list', 4, 4))
+        cache.put('a', self.images['a'])
+        cache.put('b', self.images['b'])
+        self.assertEqual(list(cache.entries.keys()), ['b'])
+        np.testing.assert_array_equal(cache.get('a'), self.images['a'])
+        # another signature drops the spilled images too
+        cache.bind(('list', 8, 8))
+        self.assertTrue(cache.get('a') is None)
+        self.assertTrue(cache.get('b') is None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from owl.net.caffe import DataParameter, TransformationParameter
+from owl.net.netio import PackedDataWriter, PackedDataProvider
+
+class TestPackedData(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'train.packed')
+        self.images = np.random.randint(0, 256, [5, 3, 6, 5]).astype(np.uint8)
+        self.labels = [[i, 2 * i] for i in range(5)]
+        writer = PackedDataWriter(self.path, [3, 6, 5], 2)
+        for (img, label) in zip(self.images, self.labels):
+            writer.append(img, label)
+        writer.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def provider(self, batch_size, crop_size):
+        data_param = DataParameter()
+        data_param.source = self.path
+        data_param.batch_size = batch_size
+        transform_param = TransformationParameter()
+        transform_param.crop_size = crop_size
+        transform_param.mean_value.extend([1, 2, 3])
+        return PackedDataProvider(data_param, transform_param, 1)
+
+    def test_round_trip(self):
+        dp = self.provider(2, 4)
+        self.assertEqual(dp.shape, [3, 6, 5])
+        self.assertEqual(dp.num_records, 5)
+        self.assertEqual(dp.num_label, 2)
+        for i in range(5):
+            np.testing.assert_array_equal(dp.records[dp.rows[i]], self.images[i])
+        np.testing.assert_array_equal(dp.index['label'], np.array(self.labels, dtype=np.float32))
+
+    def test_center_crop(self):
+        dp = self.provider(2, 4)
+        mean = np.array([1, 2, 3], dtype=np.float32).reshape([3, 1, 1])
+        start = 0
+        for (samples, labels) in dp.get_mb('TEST'):
+            count = samples.shape[0]
+            # (6 - 4) / 2 rows and (5 - 4) / 2 columns are cropped from the top and the left
+            expected = self.images[start : start + count, :, 1:5, 0:4] - mean
+            np.testing.assert_array_equal(samples.reshape([count, 3, 4, 4]), expected)
+            np.testing.assert_array_equal(labels, np.array(self.labels[start : start + count], dtype=np.float32))
+            start += count
+        self.assertEqual(start, 5)
+
+if __name__ == '__main__':
+    unittest.main()
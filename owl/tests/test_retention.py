@@ -0,0 +1,34 @@
+import os
+import shutil
+import tempfile
+import unittest
+import owl
+from owl.net.net_helper import write_snapshot, apply_retention
+
+class TestRetention(unittest.TestCase):
+    def setUp(self):
+        owl.set_device(owl.create_cpu_device())
+        self.path = tempfile.mkdtemp()
+        for idx in range(1, 8):
+            write_snapshot([('fc_weights', owl.ones([4, 3]) * idx)], self.path, idx)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def remaining(self):
+        return sorted([int(f[len('snapshot'):-len('.ckpt')]) for f in os.listdir(self.path)])
+
+    def test_keep_last_zero_keeps_all(self):
+        self.assertEqual(apply_retention(self.path, keep_last = 0, keep_every = 5), [])
+        self.assertEqual(self.remaining(), range(1, 8))
+
+    def test_keep_every_adds_to_keep_last(self):
+        self.assertEqual(apply_retention(self.path, keep_last = 1, keep_every = 5), [1, 2, 3, 4, 6])
+        self.assertEqual(self.remaining(), [5, 7])
+
+    def test_keep_last(self):
+        self.assertEqual(apply_retention(self.path, keep_last = 2), [1, 2, 3, 4, 5])
+        self.assertEqual(self.remaining(), [6, 7])
+
+if __name__ == '__main__':
+    unittest.main()
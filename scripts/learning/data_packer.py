@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+
+import sys, argparse
+import time
+from owl.net.netio import pack_lmdb, pack_image_list
+
+if __name__ == "__main__":
+    # parse command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument('source_type', help='type of the source data', choices=['lmdb', 'imagelist'])
+    parser.add_argument('source', help='lmdb folder or image list file')
+    parser.add_argument('output', help='packed data file to write')
+    parser.add_argument('new_height', help='height of the packed images (imagelist only)', type=int, nargs='?', default=256)
+    parser.add_argument('new_width', help='width of the packed images (imagelist only)', type=int, nargs='?', default=256)
+
+    (args, remain) = parser.parse_known_args()
+
+    print ' === Packing %s into %s === ' % (args.source, args.output)
+
+    last = time.time()
+    if args.source_type == 'lmdb':
+        num = pack_lmdb(args.source, args.output)
+    else:
+        num = pack_image_list(args.source, args.output, args.new_height, args.new_width)
+    print 'Packed %d records in %f seconds' % (num, time.time() - last)
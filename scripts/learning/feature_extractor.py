@@ -11,14 +11,18 @@ if __name__ == "__main__":
     # parse command line arguments
     parser = argparse.ArgumentParser()
     parser.add_argument('solver_file', help='caffe solver configure file')
-    parser.add_argument('layer_name', help='layer_name')
-    parser.add_argument('feature_path', help='feature_path')
+    parser.add_argument('layer_name', help='layer_name, or comma-separated layer names')
+    parser.add_argument('feature_path', help='feature_path (a directory if several layers are given)')
     parser.add_argument('snapshot', help='the snapshot idx for test', type=int, default=0)
     parser.add_argument('gpu_idx', help='gpu to use', type=int, default=0)
+    parser.add_argument('--in_flight', help='number of batches evaluated ahead of writing', type=int, default=4)
+    parser.add_argument('--resume', help='continue an interrupted extraction', action='store_true')
 
     (args, remain) = parser.parse_known_args()
     solver_file = args.solver_file
     layer_name = args.layer_name
+    if ',' in layer_name:
+        layer_name = layer_name.split(',')
     feature_path = args.feature_path
     gpu_idx = args.gpu_idx
     snapshot = args.snapshot
@@ -29,4 +33,4 @@ if __name__ == "__main__":
 
     extractor = FeatureExtractor(solver_file, snapshot, gpu_idx)
     extractor.build_net()
-    extractor.run(layer_name, feature_path)
+    extractor.run(layer_name, feature_path, args.in_flight, args.resume)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+import sys, argparse
+import owl
+from owl.net.server import InferenceModel
+from owl.net.server import InferenceServer
+
+if __name__ == "__main__":
+    # parse command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument('models', help='models to serve, each as name:solver_file:snapshot:output_layer', nargs='+')
+    parser.add_argument('--address', help='host:port, or the path of a unix socket', default='localhost:8080')
+    parser.add_argument('--gpus', help='comma-separated gpus to use; run on cpu if not given', default='')
+    parser.add_argument('--max_batch', help='max number of requests in a batch', type=int, default=32)
+    parser.add_argument('--max_delay', help='max milliseconds to wait for a batch to fill', type=float, default=5.0)
+    parser.add_argument('--optimize', help='remove identity layers and fuse layers before serving', action='store_true')
+
+    (args, remain) = parser.parse_known_args()
+    if len(args.gpus) > 0:
+        devices = [owl.create_gpu_device(int(i)) for i in args.gpus.split(',')]
+    else:
+        devices = [owl.create_cpu_device()]
+    owl.set_device(devices[0])
+
+    models = []
+    for desc in args.models:
+        (name, solver_file, snapshot, output_layer) = desc.split(':')
+        models.append(InferenceModel(name, solver_file, int(snapshot), output_layer, args.max_batch, args.max_delay, args.optimize))
+
+    if ':' in args.address:
+        (host, port) = args.address.rsplit(':', 1)
+        address = (host, int(port))
+    else:
+        address = args.address
+    print ' === Serving %d models on %s using %d devices === ' % (len(models), args.address, len(devices))
+
+    server = InferenceServer(models, devices)
+    server.start()
+    try:
+        server.serve(address)
+    except KeyboardInterrupt:
+        server.stop()
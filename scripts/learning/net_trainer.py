@@ -7,6 +7,7 @@ import numpy as np
 import owl
 import owl.net as net
 from owl.net.trainer import NetTrainer
+from owl.net.net_helper import SnapshotWriter
 
 if __name__ == "__main__":
     # parse command line arguments
@@ -15,6 +16,9 @@ if __name__ == "__main__":
     parser.add_argument('snapshot', help='the snapshot idx to start from', type=int, default=0)
     parser.add_argument('num_gpu', help='number of gpus to use', type=int, default=1)
     parser.add_argument('freq', help='frequency (number of minibatches) to call wait_for_all', type=int, default=1)
+    parser.add_argument('--full_every', help='write a full snapshot every this many snapshots, deltas in between', type=int, default=1)
+    parser.add_argument('--keep_last', help='number of latest snapshots to keep (0: keep all)', type=int, default=0)
+    parser.add_argument('--keep_every', help='also keep snapshots whose index is a multiple of it', type=int, default=0)
 
     (args, remain) = parser.parse_known_args()
     solver_file = args.solver_file
@@ -26,5 +30,6 @@ if __name__ == "__main__":
 
     sys_args = [sys.argv[0]] + remain
     trainer = NetTrainer(solver_file, snapshot, num_gpu, freq)
+    trainer.snapshot_writer = SnapshotWriter(full_every=args.full_every, keep_last=args.keep_last, keep_every=args.keep_every)
     trainer.build_net()
     trainer.run()
@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+
+import sys, argparse
+import owl
+from owl.net.trainer import WeightQuantizer
+
+if __name__ == "__main__":
+    # parse command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument('solver_file', help='caffe solver configure file')
+    parser.add_argument('snapshot', help='the snapshot idx to quantize', type=int)
+    parser.add_argument('output_snapshot', help='the snapshot idx to save the quantized net as', type=int)
+    parser.add_argument('gpu_idx', help='gpu to use (ignored without CUDA)', type=int, default=0)
+    parser.add_argument('--num_batches', help='number of test batches used for calibration', type=int, default=4)
+    parser.add_argument('--tolerance', help='max difference of the outputs, relative to the max output', type=float, default=0.01)
+
+    (args, remain) = parser.parse_known_args()
+
+    device = 'gpu #%d' % args.gpu_idx if owl.has_cuda() else 'the cpu'
+    print ' === Quantize snapshot %d into snapshot %d, using %s === ' % (args.snapshot, args.output_snapshot, device)
+
+    quantizer = WeightQuantizer(args.solver_file, args.snapshot, args.gpu_idx)
+    quantizer.build_net()
+    quantizer.run(args.output_snapshot, args.num_batches, args.tolerance)
@@ -4,11 +4,32 @@ import os
 import sys, argparse
 import owl
 from owl.net.caffe import *
+from owl.net.checkpoint import Checkpoint
+from owl.net.net_helper import snapshot_file, quantized_snapshot_file
 from google.protobuf import text_format
 import numpy as np
 import owl
 import subprocess
 
+def read_param(weightdir, snapshot, layername, suffix):
+    ''' Flat float32 values of a parameter of a snapshot, from its checkpoint file or, for snapshots
+    saved as a directory, from its raw file
+    '''
+    path = snapshot_file(weightdir, snapshot)
+    if not os.path.isfile(path):
+        path = quantized_snapshot_file(weightdir, snapshot)
+    if os.path.isfile(path):
+        ckpt = Checkpoint(path)
+        name = '%s_%s' % (layername, suffix)
+        # weights stored in reduced precision are expanded back to float32
+        if suffix == 'weights' and not ckpt.has(name):
+            name = '%s_qweights' % layername
+        print '%s:%s' % (path, name)
+        return np.array(ckpt.array(name, verify = True)).reshape(-1)
+    filename = '%s/snapshot%d/%s_%s.dat' % (weightdir, snapshot, layername, suffix)
+    print filename
+    return np.fromfile(filename, dtype=np.float32)
+
 class Minerva2CaffeConvertor:
     def __init__(self, config_file, weightdir, snapshot, caffemodelpath):
         layerparam = V1LayerParameter()
@@ -20,12 +41,9 @@ class Minerva2CaffeConvertor:
             layername = netparam.layers[i].name
             layername = layername.replace("/","_")
             if netparam.layers[i].type == layerparam.LayerType.Value('CONVOLUTION'):
-                filename = '%s/snapshot%d/%s_weights.dat' % (weightdir, snapshot, layername)
-                print filename
-
                 num_output = netparam.layers[i].convolution_param.num_output
                 kernelsize = netparam.layers[i].convolution_param.kernel_size
-                orifilters =  np.fromfile(filename, dtype=np.float32) 
+                orifilters = read_param(weightdir, snapshot, layername, 'weights')
                 channels = np.shape(orifilters)[0] / num_output / kernelsize / kernelsize
                 orifilters = orifilters.reshape([num_output, channels, kernelsize, kernelsize])
                 newfilters = np.zeros(np.shape(orifilters), dtype=np.float32)
@@ -41,8 +59,7 @@ class Minerva2CaffeConvertor:
                 thisblob.height = kernelsize
                 thisblob.width = kernelsize
 
-                filename = '%s/snapshot%d/%s_bias.dat' % (weightdir, snapshot, layername)                
-                theweight = np.fromfile(filename, dtype=np.float32)
+                theweight = read_param(weightdir, snapshot, layername, 'bias')
                 thisblob = netparam.layers[i].blobs.add()
                 thisblob.data.extend(theweight.tolist())
                 thisblob.num = 1
@@ -51,11 +68,8 @@ class Minerva2CaffeConvertor:
                 thisblob.width = num_output             
                 
             elif netparam.layers[i].type == layerparam.LayerType.Value('INNER_PRODUCT'):
-                filename = '%s/snapshot%d/%s_weights.dat' % (weightdir, snapshot, layername)
-                print filename
-                
                 num_output = netparam.layers[i].inner_product_param.num_output
-                orifilters = np.fromfile(filename,dtype=np.float32)
+                orifilters = read_param(weightdir, snapshot, layername, 'weights')
                 input_dim = np.shape(orifilters)[0] / num_output
                 theweight = np.transpose(orifilters.reshape([input_dim, num_output])).reshape([num_output * input_dim])
                
@@ -66,9 +80,7 @@ class Minerva2CaffeConvertor:
                 thisblob.height = num_output
                 thisblob.width = input_dim
                
-                filename = '%s/snapshot%d/%s_bias.dat' % (weightdir, snapshot, layername)                
-                print filename
-                theweight = np.fromfile(filename, dtype=np.float32)
+                theweight = read_param(weightdir, snapshot, layername, 'bias')
                 thisblob = netparam.layers[i].blobs.add()
                 thisblob.data.extend(theweight.tolist())
                 thisblob.num = 1
@@ -0,0 +1,451 @@
+#!/usr/bin/env python
+""" Benchmarks of the engine, the Python binding, the kernels, the memory pool and whole nets
+
+Every benchmark runs once to warm up (filling the memory pool and the caches) and then ``--repeat``
+times; the median is reported. Results are written as JSON, and compared against a baseline file
+with ``--baseline``::
+
+    python benchmark.py --output base.json
+    python benchmark.py --baseline base.json --tolerance 0.1
+
+The comparison exits with status 1 if any result is worse than the baseline by more than the
+tolerance. The ``host`` suite measures how fast ops are issued from Python, without waiting for
+them; comparing it between two builds shows the change of the binding's overhead::
+
+    python benchmark.py --suites host --output before.json
+    python benchmark.py --suites host --baseline before.json
+"""
+import sys, argparse
+import json
+import math
+import platform
+import time
+import numpy as np
+import owl
+import owl.elewise as ele
+import owl.conv as co
+import owl.memory
+import owl.net as net
+from owl.net.net_helper import CaffeNetBuilder
+from owl.net.caffe import *
+from google.protobuf import text_format
+
+suites = ['engine', 'host', 'kernel', 'alloc', 'net']
+
+def timed(fn):
+    """ Wrap ``fn`` to return the seconds taken by it and the ops it issued """
+    def run():
+        owl.wait_for_all()
+        start = time.time()
+        fn()
+        owl.wait_for_all()
+        return time.time() - start
+    return run
+
+def issue_time(fn):
+    """ Wrap ``fn`` to return the seconds taken to issue its ops, without the time to run them
+
+    What ``fn`` returns is freed after the timing.
+    """
+    def run():
+        owl.wait_for_all()
+        start = time.time()
+        kept = fn()
+        elapsed = time.time() - start
+        owl.wait_for_all()
+        return elapsed
+    return run
+
+def median_time(run, repeat):
+    """ Median seconds of ``repeat`` calls of ``run``, which returns its own time """
+    run()
+    times = sorted([run() for i in range(repeat)])
+    return times[len(times) / 2]
+
+class Results:
+    """ Results by name, each with its ``value``, ``unit`` and ``higher_is_better`` """
+    def __init__(self):
+        self.results = {}
+
+    def add(self, name, value, unit, higher_is_better = True):
+        self.results[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+        print '%-48s %14.3f %s' % (name, value, unit)
+
+# Engine overhead
+
+def bench_engine(results, args):
+    n = 2000 if args.quick else 10000
+    a = owl.zeros([1])
+
+    def tiny_ops():
+        x = a
+        for i in range(n):
+            x = x + 1
+    results.add('engine/tiny_ops', n / median_time(timed(tiny_ops), args.repeat), 'ops/s')
+
+    def dag_build():
+        # kept alive, so that no node is freed while the ops are issued
+        return [a + 1 for i in range(n)]
+    results.add('engine/dag_build', n / median_time(issue_time(dag_build), args.repeat), 'ops/s')
+
+    def latency():
+        owl.wait_for_all()
+        start = time.time()
+        (a + 1).wait_for_eval()
+        return time.time() - start
+    samples = 200 if args.quick else 1000
+    results.add('engine/scheduler_latency', median_time(latency, samples) * 1e6, 'us', False)
+
+# Python binding overhead
+
+def bench_host(results, args):
+    n = 2000 if args.quick else 10000
+    a = owl.zeros([16, 16])
+    b = owl.zeros([16, 16])
+    calls = [
+        ('binary_op', lambda: [a + b for i in range(n)]),
+        ('scalar_op', lambda: [a * 2.0 for i in range(n)]),
+        ('reshape', lambda: [a.reshape([256, 1]) for i in range(n)]),
+        ('zeros', lambda: [owl.zeros([16, 16]) for i in range(n)]),
+        ('shape', lambda: [a.shape for i in range(n)]),
+    ]
+    for (name, fn) in calls:
+        results.add('host/%s' % name, n / median_time(issue_time(fn), args.repeat), 'calls/s')
+
+    # issuing one training iteration of a net, which is all the Python side of training does
+    (name, layers, batch_size, side, channels, num_classes, iters) = nets(args)[1]
+    owl_net = net.Net()
+    SyntheticNetBuilder(layers, batch_size, side, channels, num_classes).build_net(owl_net)
+    owl_net.compute_size()
+    def iteration():
+        owl_net.forward('TRAIN')
+        owl_net.backward('TRAIN')
+        owl_net.weight_update()
+    results.add('host/%s_iteration' % name, 1 / median_time(issue_time(iteration), args.repeat), 'iter/s')
+
+# Kernel throughput
+
+def gemm(m, k, n):
+    a = owl.randn([m, k], 0.0, 1.0)
+    b = owl.randn([k, n], 0.0, 1.0)
+    return (lambda: a * b, 2.0 * m * k * n, 4.0 * (m * k + k * n + m * n))
+
+def conv(num, channels, side, filters, kernel, pad, stride):
+    x = owl.randn([side, side, channels, num], 0.0, 1.0)
+    w = owl.randn([kernel, kernel, channels, filters], 0.0, 0.1)
+    b = owl.zeros([filters])
+    convolver = co.Convolver(pad, pad, stride, stride)
+    out = (side + 2 * pad - kernel) / stride + 1
+    flops = 2.0 * num * filters * out * out * channels * kernel * kernel
+    return (lambda: convolver.ff(x, w, b), flops, 4.0 * (side * side * channels * num + kernel * kernel * channels * filters + out * out * filters * num))
+
+def pool(num, channels, side, kernel, stride):
+    x = owl.randn([side, side, channels, num], 0.0, 1.0)
+    pooler = co.Pooler(kernel, kernel, stride, stride, 0, 0, co.pool_op.max)
+    out = int(math.ceil(float(side - kernel) / stride)) + 1
+    return (lambda: pooler.ff(x), 1.0 * num * channels * out * out * kernel * kernel, 4.0 * num * channels * (side * side + out * out))
+
+def add(n):
+    a = owl.randn([n], 0.0, 1.0)
+    b = owl.randn([n], 0.0, 1.0)
+    return (lambda: a + b, 1.0 * n, 12.0 * n)
+
+def relu(n):
+    a = owl.randn([n], 0.0, 1.0)
+    return (lambda: ele.relu(a), 1.0 * n, 8.0 * n)
+
+def reduce_sum(m, n, axis):
+    a = owl.randn([m, n], 0.0, 1.0)
+    out = n if axis == 0 else m
+    return (lambda: a.sum(axis), 1.0 * m * n, 4.0 * (m * n + out))
+
+def kernels(quick):
+    """ Kernels as ``(name, setup, args)``; the quick set has smaller shapes """
+    if quick:
+        return [
+            ('gemm', gemm, (256, 256, 256)),
+            ('conv', conv, (16, 3, 32, 32, 5, 2, 1)),
+            ('pool', pool, (16, 32, 32, 3, 2)),
+            ('add', add, (1 << 20,)),
+            ('relu', relu, (1 << 20,)),
+            ('sum', reduce_sum, (1024, 1024, 0)),
+        ]
+    return [
+        ('gemm', gemm, (256, 256, 256)),
+        ('gemm', gemm, (1024, 1024, 1024)),
+        ('gemm', gemm, (4096, 4096, 128)),
+        ('conv', conv, (32, 3, 32, 32, 5, 2, 1)),
+        ('conv', conv, (16, 3, 227, 96, 11, 0, 4)),
+        ('conv', conv, (16, 96, 27, 256, 5, 2, 1)),
+        ('conv', conv, (16, 256, 13, 384, 3, 1, 1)),
+        ('pool', pool, (16, 96, 55, 3, 2)),
+        ('pool', pool, (256, 16, 24, 2, 2)),
+        ('add', add, (1 << 16,)),
+        ('add', add, (1 << 22,)),
+        ('relu', relu, (1 << 22,)),
+        ('sum', reduce_sum, (4096, 1024, 0)),
+        ('sum', reduce_sum, (4096, 1024, 1)),
+    ]
+
+def bench_kernel(results, args):
+    for (name, setup, shape) in kernels(args.quick):
+        (op, flops, nbytes) = setup(*shape)
+        owl.wait_for_all()
+        # enough calls for a tenth of a second, so that the engine overhead is amortized
+        once = timed(op)()
+        calls = max(1, min(1000, int(0.1 / max(once, 1e-6))))
+        def run():
+            for i in range(calls):
+                op()
+        t = median_time(timed(run), args.repeat) / calls
+        tag = 'kernel/%s/%s' % (name, 'x'.join([str(s) for s in shape]))
+        results.add(tag + '/gflops', flops / t / 1e9, 'GFLOP/s')
+        results.add(tag + '/gbps', nbytes / t / 1e9, 'GB/s')
+
+# Memory pool
+
+def bench_alloc(results, args):
+    n = 2000 if args.quick else 20000
+    sizes = [1 << s for s in range(8, 22, 2)]
+    def churn(sync):
+        live = []
+        for i in range(n):
+            live.append(owl.zeros([sizes[i % len(sizes)]]))
+            # a few arrays stay alive, so freed blocks are reused out of order
+            if len(live) > 8:
+                # an array is freed when it is released only if it is computed, otherwise
+                # later, when its op completes
+                if sync:
+                    owl.wait_for_all()
+                del live[(i * 7) % len(live)]
+            if i % 64 == 63:
+                owl.wait_for_all()
+        owl.wait_for_all()
+    results.add('alloc/churn', n / median_time(timed(lambda: churn(False)), args.repeat), 'allocs/s')
+    # the peak of a churn that frees every array before the next allocation, which does not
+    # depend on how the frees interleave with the ops
+    owl.memory.reset_peak()
+    churn(True)
+    peak = sum([s['peak_bytes'] for s in owl.memory.stats().values()])
+    results.add('alloc/peak', peak / 1048576.0, 'MB', False)
+
+# Whole nets
+
+mnist_mlp = '''
+layer { name: "data" type: "Data" top: "data" top: "label" include { phase: TRAIN } }
+layer { name: "fc1" type: "InnerProduct" bottom: "data" top: "fc1"
+  inner_product_param { num_output: 256 weight_filler { type: "xavier" } } }
+layer { name: "relu1" type: "ReLU" bottom: "fc1" top: "fc1" }
+layer { name: "fc2" type: "InnerProduct" bottom: "fc1" top: "fc2"
+  inner_product_param { num_output: 10 weight_filler { type: "xavier" } } }
+layer { name: "loss" type: "SoftmaxWithLoss" bottom: "fc2" bottom: "label" top: "loss" }
+'''
+
+mnist_cnn = '''
+layer { name: "data" type: "Data" top: "data" top: "label" include { phase: TRAIN } }
+layer { name: "conv1" type: "Convolution" bottom: "data" top: "conv1"
+  convolution_param { num_output: 16 kernel_size: 5 weight_filler { type: "xavier" } } }
+layer { name: "relu1" type: "ReLU" bottom: "conv1" top: "conv1" }
+layer { name: "pool1" type: "Pooling" bottom: "conv1" top: "pool1"
+  pooling_param { pool: MAX kernel_size: 2 stride: 2 } }
+layer { name: "conv2" type: "Convolution" bottom: "pool1" top: "conv2"
+  convolution_param { num_output: 32 kernel_size: 5 pad: 2 weight_filler { type: "xavier" } } }
+layer { name: "relu2" type: "ReLU" bottom: "conv2" top: "conv2" }
+layer { name: "pool2" type: "Pooling" bottom: "conv2" top: "pool2"
+  pooling_param { pool: MAX kernel_size: 3 stride: 3 } }
+layer { name: "fc" type: "InnerProduct" bottom: "pool2" top: "fc"
+  inner_product_param { num_output: 10 weight_filler { type: "xavier" } } }
+layer { name: "loss" type: "SoftmaxWithLoss" bottom: "fc" bottom: "label" top: "loss" }
+'''
+
+def _alexnet_conv(name, bottom, num_output, kernel, pad = 0, stride = 1):
+    return '''
+layer { name: "%s" type: "Convolution" bottom: "%s" top: "%s"
+  convolution_param { num_output: %d kernel_size: %d pad: %d stride: %d weight_filler { type: "gaussian" std: 0.01 } } }
+layer { name: "relu_%s" type: "ReLU" bottom: "%s" top: "%s" }
+''' % (name, bottom, name, num_output, kernel, pad, stride, name, name, name)
+
+def _alexnet_pool(name, bottom):
+    return '''
+layer { name: "%s" type: "Pooling" bottom: "%s" top: "%s" pooling_param { pool: MAX kernel_size: 3 stride: 2 } }
+''' % (name, bottom, name)
+
+def _alexnet_fc(name, bottom, num_output, relu = True):
+    ret = '''
+layer { name: "%s" type: "InnerProduct" bottom: "%s" top: "%s"
+  inner_product_param { num_output: %d weight_filler { type: "gaussian" std: 0.005 } } }
+''' % (name, bottom, name, num_output)
+    if relu:
+        ret += '''
+layer { name: "relu_%s" type: "ReLU" bottom: "%s" top: "%s" }
+layer { name: "drop_%s" type: "Dropout" bottom: "%s" top: "%s" dropout_param { dropout_ratio: 0.5 } }
+''' % (name, name, name, name, name, name)
+    return ret
+
+# AlexNet without the groups of conv2, conv4 and conv5
+alexnet = ('''
+layer { name: "data" type: "Data" top: "data" top: "label" include { phase: TRAIN } }
+''' + _alexnet_conv('conv1', 'data', 96, 11, 0, 4) + _alexnet_pool('pool1', 'conv1')
+    + '''
+layer { name: "norm1" type: "LRN" bottom: "pool1" top: "norm1" lrn_param { local_size: 5 alpha: 0.0001 beta: 0.75 } }
+''' + _alexnet_conv('conv2', 'norm1', 256, 5, 2) + _alexnet_pool('pool2', 'conv2')
+    + '''
+layer { name: "norm2" type: "LRN" bottom: "pool2" top: "norm2" lrn_param { local_size: 5 alpha: 0.0001 beta: 0.75 } }
+''' + _alexnet_conv('conv3', 'norm2', 384, 3, 1) + _alexnet_conv('conv4', 'conv3', 384, 3, 1)
+    + _alexnet_conv('conv5', 'conv4', 256, 3, 1) + _alexnet_pool('pool5', 'conv5')
+    + _alexnet_fc('fc6', 'pool5', 4096) + _alexnet_fc('fc7', 'fc6', 4096) + _alexnet_fc('fc8', 'fc7', 1000, False)
+    + '''
+layer { name: "loss" type: "SoftmaxWithLoss" bottom: "fc8" bottom: "label" top: "loss" }
+''')
+
+class SyntheticDataUnit(net.DataUnit):
+    """ Data unit that feeds the same random batch in every iteration """
+    def __init__(self, params, side, channels, num_classes):
+        super(SyntheticDataUnit, self).__init__(params, 1)
+        self.side = side
+        self.channels = channels
+        batch_size = params.data_param.batch_size
+        self.samples = owl.randn([side, side, channels, batch_size], 0.0, 1.0)
+        self.labels = np.random.randint(0, num_classes, batch_size)
+
+    def compute_size(self, from_btm, to_top):
+        self.out_shape = [self.side, self.side, self.channels, 1]
+        to_top[self.top_names[0]] = dict()
+        to_top[self.top_names[0]]['out_shape'] = self.out_shape[:]
+        to_top[self.top_names[0]]['rec_on_ori'] = 1
+        to_top[self.top_names[0]]['stride_on_ori'] = 1
+        to_top[self.top_names[0]]['start_on_ori'] = 0
+        self.rec_on_ori = 1
+        self.stride_on_ori = 1
+        self.start_on_ori = 0
+
+    def forward(self, from_btm, to_top, phase):
+        to_top[self.top_names[0]] = self.samples
+        to_top[self.top_names[1]] = self.labels
+        self.out = self.samples
+
+    def __str__(self):
+        return 'synthetic_data'
+
+class SyntheticNetBuilder(CaffeNetBuilder):
+    """ Build a net from the text of its layers, with synthetic data instead of its data layer """
+    def __init__(self, net_text, batch_size, side, channels, num_classes):
+        self.solverconfig = SolverParameter()
+        text_format.Merge('base_lr: 0.01 momentum: 0.9 weight_decay: 0.0005 lr_policy: "fixed"', self.solverconfig)
+        self.netconfig = NetParameter()
+        text_format.Merge(net_text, self.netconfig)
+        for l in self.netconfig.layer:
+            if l.type == 'Data':
+                l.data_param.batch_size = batch_size
+        self.snapshot_dir = ''
+        self.data_shape = (side, channels, num_classes)
+
+    def _convert_type(self, caffe_layer, num_gpu):
+        if caffe_layer.type == 'Data':
+            return SyntheticDataUnit(caffe_layer, *self.data_shape)
+        return CaffeNetBuilder._convert_type(self, caffe_layer, num_gpu)
+
+def nets(args):
+    """ Nets as ``(name, layers, batch size, side, channels, classes, iterations)`` """
+    iters = 2 if args.quick else 5
+    ret = [
+        ('mnist_mlp', mnist_mlp, 256, 28, 1, 10, iters * 4),
+        ('mnist_cnn', mnist_cnn, 256, 28, 1, 10, iters),
+    ]
+    if not args.quick:
+        ret.append(('alexnet', alexnet, args.alexnet_batch, 227, 3, 1000, iters))
+    return ret
+
+def bench_net(results, args):
+    for (name, layers, batch_size, side, channels, num_classes, iters) in nets(args):
+        owl_net = net.Net()
+        SyntheticNetBuilder(layers, batch_size, side, channels, num_classes).build_net(owl_net)
+        owl_net.compute_size()
+        wunits = owl_net.get_weighted_unit_ids()
+        def train():
+            for i in range(iters):
+                owl_net.forward('TRAIN')
+                owl_net.backward('TRAIN')
+                for uid in wunits:
+                    owl_net.update(uid)
+                owl.wait_for_all()
+        owl.wait_for_all()
+        owl.memory.reset_peak()
+        results.add('net/%s' % name, batch_size * iters / median_time(timed(train), args.repeat), 'img/s')
+        peak = max([s['peak_bytes'] for s in owl.memory.stats().values()])
+        results.add('net/%s/peak' % name, peak / 1048576.0, 'MB', False)
+
+# Baseline comparison
+
+def compare(current, baseline, tolerance):
+    """ Print the change of every result that is in both files
+
+    :return: names of the results worse than the baseline by more than ``tolerance``
+    :rtype: list str
+    """
+    regressions = []
+    print '%-48s %14s %14s %9s' % ('benchmark', 'baseline', 'current', 'change')
+    for name in sorted(current):
+        if not name in baseline:
+            continue
+        (cur, base) = (current[name], baseline[name])
+        change = (cur['value'] - base['value']) / base['value'] if base['value'] != 0 else 0.0
+        worse = -change if cur['higher_is_better'] else change
+        mark = ''
+        if worse > tolerance:
+            regressions.append(name)
+            mark = ' REGRESSION'
+        print '%-48s %14.3f %14.3f %+8.1f%%%s' % (name, base['value'], cur['value'], change * 100, mark)
+    missing = [name for name in baseline if not name in current]
+    if len(missing) != 0:
+        print 'not run: %s' % ', '.join(sorted(missing))
+    return regressions
+
+if __name__ == "__main__":
+    # parse command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--suites', help='comma-separated suites to run, among %s' % ', '.join(suites), default=','.join(suites))
+    parser.add_argument('--repeat', help='runs of each benchmark, after a warm-up run', type=int, default=5)
+    parser.add_argument('--quick', help='smaller shapes and fewer iterations', action='store_true')
+    parser.add_argument('--gpu', help='run on gpu #0 instead of the cpu', action='store_true')
+    parser.add_argument('--alexnet_batch', help='batch size of the AlexNet-like net', type=int, default=16)
+    parser.add_argument('--output', help='file to write the results to, as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--tolerance', help='relative slowdown above which a result is a regression', type=float, default=0.1)
+
+    (args, remain) = parser.parse_known_args()
+    selected = args.suites.split(',')
+    for s in selected:
+        assert(s in suites), 'unknown suite %s' % s
+
+    np.random.seed(0)
+    dev = owl.create_gpu_device(0) if args.gpu else owl.create_cpu_device()
+    owl.set_device(dev)
+
+    results = Results()
+    for s in suites:
+        if s in selected:
+            print ' === %s === ' % s
+            globals()['bench_' + s](results, args)
+
+    report = {
+        'config': {
+            'device': 'gpu' if args.gpu else 'cpu',
+            'suites': selected,
+            'repeat': args.repeat,
+            'quick': args.quick,
+            'host': platform.node(),
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        },
+        'results': results.results,
+    }
+    if args.output != None:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.baseline != None:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results.results, baseline['results'], args.tolerance)
+        if len(regressions) != 0:
+            print '%d regressions over %.0f%%' % (len(regressions), args.tolerance * 100)
+            sys.exit(1)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+""" Analyze a dag recorded by ``owl.dag``
+
+Prints the critical path, the available and achieved parallelism, the utilization of each device,
+the transfers between devices and the peak of live memory of each device::
+
+    python dag_analyzer.py iteration.json --memory_csv memory.csv --output metrics.json
+"""
+import sys, argparse
+import json
+
+def duration(op):
+    return op['finished'] - op['started']
+
+class DagAnalyzer:
+    """ Metrics of a recorded dag
+
+    :ivar list ops: the executed ops, in order of creation
+    :ivar dict data: the data by node id
+    """
+    def __init__(self, recorded):
+        self.ops = [op for op in recorded['ops'] if op['started'] != None and op['finished'] != None]
+        self.num_unfinished = len(recorded['ops']) - len(self.ops)
+        self.data = dict([(d['id'], d) for d in recorded['data']])
+        assert(len(self.ops) != 0), 'no op was executed while recording'
+        self.begin = min([op['started'] for op in self.ops])
+        self.end = max([op['finished'] for op in self.ops])
+        self.span = self.end - self.begin
+
+    def critical_path(self):
+        """ Longest chain of dependent ops, weighted by their execution time
+
+        :return: ``(length in us, ops on the path from first to last)``
+        """
+        executed = dict([(op['id'], op) for op in self.ops])
+        finish = {}
+        pred = {}
+        # producers are created, hence numbered, before their consumers
+        for op in self.ops:
+            best = None
+            for i in op['inputs']:
+                p = self.data[i]['producer']
+                if p in finish and (best == None or finish[p] > finish[best]):
+                    best = p
+            pred[op['id']] = best
+            finish[op['id']] = duration(op) + (finish[best] if best != None else 0)
+        last = max(finish, key = lambda i: finish[i])
+        path = []
+        while last != None:
+            path.append(executed[last])
+            last = pred[last]
+        path.reverse()
+        return (sum([duration(op) for op in path]), path)
+
+    def devices(self):
+        """ Per device: number of ops, total execution time and busy time (union of the executions)
+
+        :rtype: dict
+        """
+        ret = {}
+        for dev in set([op['device'] for op in self.ops]):
+            intervals = sorted([(op['started'], op['finished']) for op in self.ops if op['device'] == dev])
+            busy = 0
+            (cur_start, cur_end) = intervals[0]
+            for (s, e) in intervals[1:]:
+                if s > cur_end:
+                    busy += cur_end - cur_start
+                    (cur_start, cur_end) = (s, e)
+                else:
+                    cur_end = max(cur_end, e)
+            busy += cur_end - cur_start
+            ret[dev] = {
+                'ops': len(intervals),
+                'work_us': sum([e - s for (s, e) in intervals]),
+                'busy_us': busy,
+                'utilization': busy / self.span if self.span > 0 else 1.0,
+            }
+        return ret
+
+    def transfers(self):
+        """ Bytes copied between devices, by ``(source, destination)``; each data is copied once per device
+
+        :rtype: dict
+        """
+        copied = set()
+        ret = {}
+        for op in self.ops:
+            for i in op['inputs']:
+                d = self.data[i]
+                if d['device'] != op['device'] and not (i, op['device']) in copied:
+                    copied.add((i, op['device']))
+                    key = (d['device'], op['device'])
+                    ret[key] = ret.get(key, 0) + d['bytes']
+        return ret
+
+    def memory_timeline(self):
+        """ Live bytes of each device after each allocation or free
+
+        Outputs are allocated when their op starts, and copies of remote inputs when the first op
+        using them on a device starts. Both are freed with the data. Data computed before the
+        recording are live from its beginning.
+
+        :return: a map from device to a list of ``(time in us, live bytes)``
+        :rtype: dict
+        """
+        executed = dict([(op['id'], op) for op in self.ops])
+        events = {}
+        def add(dev, alloc, free, nbytes):
+            events.setdefault(dev, []).append((alloc, nbytes))
+            if free != None:
+                events[dev].append((free, -nbytes))
+        allocated = set()
+        for d in self.data.values():
+            p = d['producer']
+            if p == None:
+                add(d['device'], self.begin, d['freed'], d['bytes'])
+            elif p in executed:
+                add(d['device'], executed[p]['started'], d['freed'], d['bytes'])
+        for op in self.ops:
+            for i in op['inputs']:
+                d = self.data[i]
+                if d['device'] != op['device'] and not (i, op['device']) in allocated:
+                    allocated.add((i, op['device']))
+                    add(op['device'], op['started'], d['freed'], d['bytes'])
+        ret = {}
+        for (dev, evs) in events.items():
+            live = 0
+            ret[dev] = []
+            # frees first at equal times, as a freed block may be reused right away
+            for (t, delta) in sorted(evs, key = lambda e: (e[0], e[1])):
+                live += delta
+                ret[dev].append((t, live))
+        return ret
+
+    def waits(self):
+        """ Mean time of the ops from creation to dispatch (waiting for their inputs) and from
+        dispatch to start (waiting for a worker), in us
+
+        :rtype: dict
+        """
+        dispatched = [op for op in self.ops if op['dispatched'] != None]
+        if len(dispatched) == 0:
+            return {'inputs_us': 0.0, 'worker_us': 0.0}
+        return {
+            'inputs_us': sum([op['dispatched'] - op['created'] for op in dispatched]) / len(dispatched),
+            'worker_us': sum([op['started'] - op['dispatched'] for op in dispatched]) / len(dispatched),
+        }
+
+    def metrics(self):
+        """ All the metrics, as printed by :py:meth:`print_report`
+
+        :rtype: dict
+        """
+        (length, path) = self.critical_path()
+        work = sum([duration(op) for op in self.ops])
+        memory = self.memory_timeline()
+        peaks = {}
+        for (dev, timeline) in memory.items():
+            (t, peak) = max(timeline, key = lambda e: e[1])
+            peaks[str(dev)] = {'peak_bytes': peak, 'time_us': t - self.begin}
+        path_ops = {}
+        for op in path:
+            path_ops[op['name']] = path_ops.get(op['name'], 0) + duration(op)
+        return {
+            'ops': len(self.ops),
+            'unfinished_ops': self.num_unfinished,
+            'span_us': self.span,
+            'work_us': work,
+            'critical_path_us': length,
+            'critical_path_ops': len(path),
+            'critical_path_by_op': path_ops,
+            'available_parallelism': work / length if length > 0 else 1.0,
+            'achieved_parallelism': work / self.span if self.span > 0 else 1.0,
+            'waits': self.waits(),
+            'devices': dict([(str(dev), v) for (dev, v) in self.devices().items()]),
+            'transfers': dict([('%d->%d' % k, v) for (k, v) in self.transfers().items()]),
+            'memory': peaks,
+        }
+
+    def print_report(self):
+        m = self.metrics()
+        print '%d ops executed (%d unfinished), span %.3fms, work %.3fms' % (m['ops'], m['unfinished_ops'], m['span_us'] / 1000, m['work_us'] / 1000)
+        print 'critical path: %.3fms over %d ops' % (m['critical_path_us'] / 1000, m['critical_path_ops'])
+        for (name, t) in sorted(m['critical_path_by_op'].items(), key = lambda e: -e[1])[:10]:
+            print '  %32.32s %10.3fms' % (name, t / 1000)
+        print 'parallelism: %.2f available (work / critical path), %.2f achieved (work / span)' % (m['available_parallelism'], m['achieved_parallelism'])
+        print 'mean wait: %.1fus for inputs, %.1fus for a worker' % (m['waits']['inputs_us'], m['waits']['worker_us'])
+        for (dev, d) in sorted(m['devices'].items()):
+            print 'device #%s: %d ops, work %.3fms, busy %.3fms (%.0f%% of the span)' % (dev, d['ops'], d['work_us'] / 1000, d['busy_us'] / 1000, d['utilization'] * 100)
+        for (key, nbytes) in sorted(m['transfers'].items()):
+            print 'transfer %s: %.1fMB' % (key, nbytes / 1048576.0)
+        for (dev, p) in sorted(m['memory'].items()):
+            print 'device #%s: peak %.1fMB live at %.3fms' % (dev, p['peak_bytes'] / 1048576.0, p['time_us'] / 1000)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('dag_file', help='dag saved by owl.dag.save')
+    parser.add_argument('--memory_csv', help='file to write the live bytes of each device over time to')
+    parser.add_argument('--output', help='file to write the metrics to, as JSON')
+    args = parser.parse_args()
+
+    with open(args.dag_file, 'r') as f:
+        analyzer = DagAnalyzer(json.load(f))
+    analyzer.print_report()
+    if args.memory_csv != None:
+        with open(args.memory_csv, 'w') as f:
+            f.write('time_us,device,live_bytes\n')
+            for (dev, timeline) in sorted(analyzer.memory_timeline().items()):
+                for (t, live) in timeline:
+                    f.write('%.3f,%d,%d\n' % (t - analyzer.begin, dev, live))
+    if args.output != None:
+        with open(args.output, 'w') as f:
+            json.dump(analyzer.metrics(), f, indent=2, sort_keys=True)
@@ -1,4 +1,5 @@
 import sys
+import json
 
 class Dag:
     def __init__(self, fname):
@@ -7,6 +8,9 @@ class Dag:
         self.adj = {}
         self.rev_adj = {}
     def load(self):
+        if self.fname.endswith('.json'):
+            self.load_recorded()
+            return
         with open(self.fname, 'r') as f:
             line = f.readline() # line == 'Nodes:'
             line = f.readline()
@@ -23,6 +27,22 @@ class Dag:
                 self.adj[src].append(dst)
                 self.rev_adj[dst].append(src)
                 line = f.readline()
+    def load_recorded(self):
+        # dag saved by owl.dag.save
+        with open(self.fname, 'r') as f:
+            recorded = json.load(f)
+        for d in recorded['data']:
+            self.node_attr[str(d['id'])] = {'type' : 'd', 'size' : str(d['shape']), 'device_id' : str(d['device'])}
+        for o in recorded['ops']:
+            self.node_attr[str(o['id'])] = {'type' : 'o', 'name' : o['name']}
+        for name in self.node_attr:
+            self.adj[name] = []
+            self.rev_adj[name] = []
+        for o in recorded['ops']:
+            edges = [(str(i), str(o['id'])) for i in o['inputs']] + [(str(o['id']), str(i)) for i in o['outputs']]
+            for (src, dst) in edges:
+                self.adj[src].append(dst)
+                self.rev_adj[dst].append(src)
 
 if __name__ == '__main__':
     dag = Dag(sys.argv[1])
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+""" Performance gate: run the benchmarks several times and compare them with a committed baseline
+
+Each run of ``benchmark.py`` is a new process, so that runs share neither the memory pool nor the
+state of the engine. Every result is summarized by its median and its median absolute deviation
+(MAD) over the runs. A result regresses when it is worse than the median of the baseline by more
+than its tolerance and by more than ``--mad_factor`` times the larger of the two MADs, so that a
+noisy result needs a larger change to fail::
+
+    python perf_gate.py --update_baseline baselines/cpu.json
+    python perf_gate.py --baseline baselines/cpu.json
+
+Baselines are recorded on the machine that runs the gate and committed. Their ``tolerances`` map
+prefixes of result names to the allowed relative change, the longest matching prefix applying;
+they are kept when the baseline is updated and can be edited by hand. The gate prints every result
+with its change and exits with status 1 if any regressed or is missing, or with status 2 if the
+baseline is missing or, as committed before a gate machine is chosen, has no results.
+"""
+import sys, os, argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+
+default_tolerances = {
+    '': 0.1,
+    # a few hundred samples of a short wait, noisier than the others
+    'engine/scheduler_latency': 0.25,
+    # the workers run independent ops of an iteration in any order, which moves the peak
+    'net/mnist_mlp/peak': 0.25,
+    'net/mnist_cnn/peak': 0.25,
+    'net/alexnet/peak': 0.25,
+}
+
+def median(values):
+    values = sorted(values)
+    n = len(values)
+    return values[n / 2] if n % 2 == 1 else (values[n / 2 - 1] + values[n / 2]) / 2.0
+
+def mad(values):
+    m = median(values)
+    return median([abs(v - m) for v in values])
+
+def tolerance(name, tolerances):
+    prefix = max([p for p in tolerances if name.startswith(p)], key = len)
+    return tolerances[prefix]
+
+def run_benchmarks(args):
+    """ Results of ``args.runs`` runs of ``benchmark.py``
+
+    :rtype: list dict
+    """
+    script = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'benchmark.py')
+    runs = []
+    for i in range(args.runs):
+        (fd, path) = tempfile.mkstemp(suffix = '.json')
+        os.close(fd)
+        cmd = [sys.executable, script, '--suites', args.suites, '--repeat', str(args.repeat), '--output', path]
+        if not args.full:
+            cmd.append('--quick')
+        print 'run %d/%d: %s' % (i + 1, args.runs, ' '.join(cmd))
+        try:
+            with open(os.devnull, 'w') as devnull:
+                status = subprocess.call(cmd, stdout = None if args.verbose else devnull)
+            assert(status == 0), 'benchmark.py failed with status %d' % status
+            with open(path, 'r') as f:
+                runs.append(json.load(f)['results'])
+        finally:
+            os.remove(path)
+    return runs
+
+def summarize(runs):
+    """ Median and MAD of every result over the runs
+
+    :rtype: dict
+    """
+    ret = {}
+    for name in runs[0]:
+        values = [r[name]['value'] for r in runs if name in r]
+        ret[name] = {
+            'median': median(values),
+            'mad': mad(values),
+            'runs': values,
+            'unit': runs[0][name]['unit'],
+            'higher_is_better': runs[0][name]['higher_is_better'],
+        }
+    return ret
+
+def compare(current, baseline, tolerances, mad_factor):
+    """ Print every result with its change from the baseline
+
+    :return: descriptions of the regressions, one per result
+    :rtype: list str
+    """
+    regressions = []
+    print '%-40s %22s %22s %9s %8s  %s' % ('benchmark', 'baseline', 'current', 'change', 'allowed', 'status')
+    for name in sorted(set(current) | set(baseline)):
+        if not name in current:
+            print '%-40s %22s %22s %9s %8s  %s' % (name, '', '', '', '', 'MISSING')
+            regressions.append('%s: not run' % name)
+            continue
+        cur = current[name]
+        if not name in baseline:
+            print '%-40s %22s %13.3f+/-%-6.3f %9s %8s  %s' % (name, '', cur['median'], cur['mad'], '', '', 'new')
+            continue
+        base = baseline[name]
+        change = (cur['median'] - base['median']) / base['median'] if base['median'] != 0 else 0.0
+        worse = -change if cur['higher_is_better'] else change
+        allowed = tolerance(name, tolerances)
+        # the same change can be noise for a result that varies much from run to run
+        noise = mad_factor * max(cur['mad'], base['mad']) / abs(base['median']) if base['median'] != 0 else 0.0
+        if worse > allowed and worse > noise:
+            status = 'REGRESSION'
+            regressions.append('%s: %.3f -> %.3f %s (%+.1f%%, allowed %.1f%%)' % (name, base['median'], cur['median'], cur['unit'], change * 100, max(allowed, noise) * 100))
+        elif -worse > allowed and -worse > noise:
+            status = 'improved'
+        else:
+            status = 'ok'
+        print '%-40s %13.3f+/-%-6.3f %13.3f+/-%-6.3f %+8.1f%% %7.1f%%  %s' % (name, base['median'], base['mad'], cur['median'], cur['mad'], change * 100, max(allowed, noise) * 100, status)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--baseline', help='committed baseline to compare with')
+    parser.add_argument('--update_baseline', help='file to write the results to as the new baseline, keeping its tolerances')
+    parser.add_argument('--suites', help='comma-separated suites of benchmark.py to run', default='engine,host,kernel,alloc,net')
+    parser.add_argument('--runs', help='runs of benchmark.py, each in a new process', type=int, default=5)
+    parser.add_argument('--repeat', help='repetitions of each benchmark within a run', type=int, default=3)
+    parser.add_argument('--full', help='full shapes instead of the quick ones of benchmark.py', action='store_true')
+    parser.add_argument('--mad_factor', help='MADs a change must exceed to be a regression', type=float, default=3.0)
+    parser.add_argument('--verbose', help='show the output of benchmark.py', action='store_true')
+    args = parser.parse_args()
+    assert(args.baseline != None or args.update_baseline != None), 'give --baseline or --update_baseline'
+    assert(args.runs >= 3), 'at least 3 runs are needed for a MAD'
+
+    baseline = None
+    if args.baseline != None:
+        if not os.path.exists(args.baseline):
+            print 'no baseline at %s; record one on this machine with --update_baseline %s and commit it' % (args.baseline, args.baseline)
+            sys.exit(2)
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        if len(baseline.get('results', {})) == 0:
+            if args.update_baseline == None:
+                print 'baseline %s not recorded; record it on this machine with --update_baseline %s and commit it' % (args.baseline, args.baseline)
+                sys.exit(2)
+            baseline = None
+
+    current = summarize(run_benchmarks(args))
+    config = {
+        'suites': args.suites,
+        'runs': args.runs,
+        'repeat': args.repeat,
+        'full': args.full,
+        'host': platform.node(),
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+    status = 0
+    if baseline != None:
+        for key in ['suites', 'full', 'host']:
+            if baseline['config'].get(key) != config[key]:
+                print 'warning: baseline recorded with %s=%s, running with %s' % (key, baseline['config'].get(key), config[key])
+        suites = args.suites.split(',')
+        # results of suites not run this time are not missing
+        base_results = dict([(name, r) for (name, r) in baseline['results'].items() if name.split('/')[0] in suites])
+        regressions = compare(current, base_results, baseline.get('tolerances', default_tolerances), args.mad_factor)
+        if len(regressions) != 0:
+            print '%d regressions:' % len(regressions)
+            for r in regressions:
+                print '  ' + r
+            status = 1
+        else:
+            print 'no regression'
+    if args.update_baseline != None:
+        tolerances = default_tolerances
+        if os.path.exists(args.update_baseline):
+            with open(args.update_baseline, 'r') as f:
+                tolerances = json.load(f).get('tolerances', default_tolerances)
+        elif os.path.dirname(args.update_baseline) != '' and not os.path.isdir(os.path.dirname(args.update_baseline)):
+            os.makedirs(os.path.dirname(args.update_baseline))
+        with open(args.update_baseline, 'w') as f:
+            json.dump({'config': config, 'tolerances': tolerances, 'results': current}, f, indent=2, sort_keys=True)
+        print 'baseline written to %s' % args.update_baseline
+    sys.exit(status)
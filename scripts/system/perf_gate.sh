@@ -0,0 +1,24 @@
+#!/bin/bash
+# CPU-only performance gate: builds Minerva and owl without CUDA, then runs perf_gate.py.
+# Arguments are passed to perf_gate.py; without any, the results are compared with the
+# committed baseline of the CPU build. setup.py links owl against release/, so the build
+# replaces any GPU build there.
+set -e
+
+ROOT=$(cd "$(dirname "$0")/../.." && pwd)
+BASELINE=$ROOT/scripts/system/baselines/cpu.json
+
+cd $ROOT
+mkdir -p release
+cd release
+cmake -DCMAKE_BUILD_TYPE=Release -DBUILD_CPU_ONLY=ON -DBUILD_WITH_BLAS=${BUILD_WITH_BLAS:-0} -DBLAS_ROOT=$BLAS_ROOT ..
+make -j${JOBS:-4}
+cd ..
+python setup.py build_ext --inplace --force
+
+export PYTHONPATH=$ROOT/owl:$PYTHONPATH
+if [ $# -eq 0 ]; then
+  python scripts/system/perf_gate.py --baseline $BASELINE
+else
+  python scripts/system/perf_gate.py "$@"
+fi
@@ -92,3 +92,56 @@ TEST(Activation, CpuTanhForward) {
     EXPECT_FLOAT_EQ(output_ptr.get()[i], tanh(input_ptr.get()[i]));
   }
 }
+
+TEST(Activation, CpuReluBackward) {
+  auto& ms = MinervaSystem::Instance();
+  Scale input_size{7, 6, 3, 2};
+
+  ms.SetDevice(cpu_device);
+  ImageBatch bottom = NArray::Randn(input_size, 0, 1);
+  ImageBatch top = Convolution::ActivationForward(bottom, ActivationAlgorithm::kRelu);
+  ImageBatch top_diff = NArray::Randn(input_size, 0, 1);
+  ImageBatch output = Convolution::ActivationBackward(top_diff, top, bottom, ActivationAlgorithm::kRelu);
+  auto bottom_ptr = bottom.Get();
+  auto top_diff_ptr = top_diff.Get();
+  auto output_ptr = output.Get();
+  for (int i = 0; i < input_size.Prod(); ++i) {
+    EXPECT_FLOAT_EQ(output_ptr.get()[i], 0 < bottom_ptr.get()[i] ? top_diff_ptr.get()[i] : 0);
+  }
+}
+
+TEST(Activation, CpuSigmoidBackward) {
+  auto& ms = MinervaSystem::Instance();
+  Scale input_size{7, 6, 3, 2};
+
+  ms.SetDevice(cpu_device);
+  ImageBatch bottom = NArray::Randn(input_size, 0, 1);
+  ImageBatch top = Convolution::ActivationForward(bottom, ActivationAlgorithm::kSigmoid);
+  ImageBatch top_diff = NArray::Randn(input_size, 0, 1);
+  ImageBatch output = Convolution::ActivationBackward(top_diff, top, bottom, ActivationAlgorithm::kSigmoid);
+  auto top_ptr = top.Get();
+  auto top_diff_ptr = top_diff.Get();
+  auto output_ptr = output.Get();
+  for (int i = 0; i < input_size.Prod(); ++i) {
+    float y = top_ptr.get()[i];
+    EXPECT_FLOAT_EQ(output_ptr.get()[i], top_diff_ptr.get()[i] * y * (1 - y));
+  }
+}
+
+TEST(Activation, CpuTanhBackward) {
+  auto& ms = MinervaSystem::Instance();
+  Scale input_size{7, 6, 3, 2};
+
+  ms.SetDevice(cpu_device);
+  ImageBatch bottom = NArray::Randn(input_size, 0, 1);
+  ImageBatch top = Convolution::ActivationForward(bottom, ActivationAlgorithm::kTanh);
+  ImageBatch top_diff = NArray::Randn(input_size, 0, 1);
+  ImageBatch output = Convolution::ActivationBackward(top_diff, top, bottom, ActivationAlgorithm::kTanh);
+  auto top_ptr = top.Get();
+  auto top_diff_ptr = top_diff.Get();
+  auto output_ptr = output.Get();
+  for (int i = 0; i < input_size.Prod(); ++i) {
+    float y = top_ptr.get()[i];
+    EXPECT_FLOAT_EQ(output_ptr.get()[i], top_diff_ptr.get()[i] * (1 - y * y));
+  }
+}
@@ -0,0 +1,51 @@
+#include "unittest_main.h"
+#include <sstream>
+
+using namespace minerva;
+using namespace std;
+
+static size_t Count(const string& s, const string& pattern) {
+  size_t ret = 0;
+  for (auto pos = s.find(pattern); pos != string::npos; pos = s.find(pattern, pos + 1)) {
+    ++ret;
+  }
+  return ret;
+}
+
+static void TestDagRecorder(uint64_t device) {
+  auto& ms = MinervaSystem::Instance();
+  ms.SetDevice(device);
+  auto& recorder = ms.dag_recorder();
+  auto a = NArray::Randn({10, 20}, 0, 1);
+  a.Wait();
+  recorder.Enable();
+  auto b = NArray::Randn({20, 30}, 0, 1);
+  (a * b).Wait();
+  ms.WaitForAll();
+  recorder.Disable();
+  (a * b).Wait();
+  ostringstream os;
+  recorder.ExportJson(os);
+  auto json = os.str();
+  EXPECT_EQ(Count(json, "\"name\":"), 2u);
+  EXPECT_EQ(Count(json, "\"name\":\"*\""), 1u);
+  EXPECT_EQ(Count(json, "\"finished\":null"), 0u);
+  // `a` was computed before; the product is freed, `a` and `b` are not
+  EXPECT_EQ(Count(json, "\"producer\":null"), 1u);
+  EXPECT_EQ(Count(json, "\"shape\":[10,30],\"bytes\":1200"), 1u);
+  EXPECT_EQ(Count(json, "\"freed\":null"), 2u);
+  recorder.Clear();
+  ostringstream empty;
+  recorder.ExportJson(empty);
+  EXPECT_EQ(Count(empty.str(), "\"id\":"), 0u);
+}
+
+TEST(DagRecorder, Cpu) {
+  TestDagRecorder(cpu_device);
+}
+
+#ifdef HAS_CUDA
+TEST(DagRecorder, Gpu) {
+  TestDagRecorder(gpu_device);
+}
+#endif
@@ -0,0 +1,53 @@
+#include "unittest_main.h"
+
+using namespace minerva;
+using namespace std;
+
+static uint64_t Sum(const vector<uint64_t>& v) {
+  uint64_t ret = 0;
+  for (auto i : v) {
+    ret += i;
+  }
+  return ret;
+}
+
+static void TestEngineStats(uint64_t device) {
+  auto& ms = MinervaSystem::Instance();
+  ms.SetDevice(device);
+  ms.WaitForAll();
+  auto before = ms.backend().GetStats();
+  auto device_before = ms.device_manager().GetDevice(device)->GetTaskStats();
+  auto a = NArray::Randn({10, 20}, 0, 1);
+  auto b = NArray::Randn({20, 30}, 0, 1);
+  for (int i = 0; i < 5; ++i) {
+    (a * b).Wait();
+  }
+  ms.WaitForAll();
+  auto after = ms.backend().GetStats();
+  auto device_after = ms.device_manager().GetDevice(device)->GetTaskStats();
+  // Two random ops and five multiplications, each with one output
+  EXPECT_GE(after.nodes_created - before.nodes_created, 14u);
+  EXPECT_GE(after.nodes_deleted - before.nodes_deleted, 10u);
+  EXPECT_EQ(after.nodes_yet_to_finish, 0);
+  for (auto size : after.dispatcher_queue) {
+    EXPECT_EQ(size, 0u);
+  }
+  EXPECT_EQ(Sum(after.ready_to_dispatch) - Sum(before.ready_to_dispatch), 7u);
+  EXPECT_EQ(Sum(after.dispatch_to_complete) - Sum(before.dispatch_to_complete), 7u);
+  EXPECT_EQ(device_after.ready, 0);
+  EXPECT_EQ(device_after.queued, 0);
+  EXPECT_EQ(device_after.running, 0);
+  EXPECT_EQ(device_after.completed - device_before.completed, 7u);
+  EXPECT_GT(device_after.num_workers, 0u);
+  EXPECT_GT(device_after.busy_us, device_before.busy_us);
+}
+
+TEST(EngineStats, Cpu) {
+  TestEngineStats(cpu_device);
+}
+
+#ifdef HAS_CUDA
+TEST(EngineStats, Gpu) {
+  TestEngineStats(gpu_device);
+}
+#endif
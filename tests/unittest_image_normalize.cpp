@@ -0,0 +1,57 @@
+#include "unittest_main.h"
+#include <cstring>
+
+using namespace minerva;
+using namespace std;
+
+static void TestImageNormalize(uint64_t device) {
+  MinervaSystem::Instance().SetDevice(device);
+  const int num = 2, channels = 3, height = 4, width = 5, crop = 2;
+  Scale src_size{width, height, channels, num};
+  int num_bytes = src_size.Prod();
+  vector<uint8_t> bytes(num_bytes);
+  for (int i = 0; i < num_bytes; ++i) {
+    bytes[i] = (i * 7) % 256;
+  }
+  int packed_size = (num_bytes + 3) / 4;
+  shared_ptr<float> packed(new float[packed_size], [](float* p) {
+    delete[] p;
+  });
+  memcpy(packed.get(), bytes.data(), num_bytes);
+  // (crop_h, crop_w, mirror) of each image
+  float crop_info[] = {1, 2, 0, 2, 3, 1};
+  shared_ptr<float> crop_info_ptr(new float[3 * num], [](float* p) {
+    delete[] p;
+  });
+  memcpy(crop_info_ptr.get(), crop_info, sizeof(crop_info));
+  vector<float> mean_value{1, 2, 3};
+  NArray na = Convolution::ImageNormalize(
+      NArray::MakeNArray({packed_size}, packed),
+      NArray::MakeNArray({3, num}, crop_info_ptr),
+      mean_value, src_size, crop);
+  ASSERT_EQ(na.Size(), Scale({crop, crop, channels, num}));
+  auto res = na.Get();
+  auto res_ptr = res.get();
+  for (int n = 0; n < num; ++n) {
+    for (int c = 0; c < channels; ++c) {
+      for (int y = 0; y < crop; ++y) {
+        for (int x = 0; x < crop; ++x) {
+          int h = crop_info[3 * n] + y;
+          int w = crop_info[3 * n + 1] + (crop_info[3 * n + 2] ? crop - 1 - x : x);
+          float expected = bytes[((n * channels + c) * height + h) * width + w] - mean_value[c];
+          EXPECT_FLOAT_EQ(res_ptr[((n * channels + c) * crop + y) * crop + x], expected);
+        }
+      }
+    }
+  }
+}
+
+TEST(ImageNormalize, CpuImageNormalize) {
+  TestImageNormalize(cpu_device);
+}
+
+#ifdef HAS_CUDA
+TEST(ImageNormalize, GpuImageNormalize) {
+  TestImageNormalize(gpu_device);
+}
+#endif
@@ -0,0 +1,68 @@
+#include "unittest_main.h"
+
+using namespace minerva;
+using namespace std;
+
+static void TestMemoryStats(uint64_t device) {
+  auto& ms = MinervaSystem::Instance();
+  ms.SetDevice(device);
+  ms.WaitForAll();
+  auto dev = ms.device_manager().GetDevice(device);
+  dev->ResetPeakMemory();
+  auto before = dev->GetMemoryStats();
+  {
+    auto a = NArray::Constant({256, 256}, 1);
+    a.Wait();
+    auto during = dev->GetMemoryStats();
+    EXPECT_EQ(during.live_bytes, before.live_bytes + 256 * 256 * sizeof(float));
+    EXPECT_GE(during.peak_bytes, during.live_bytes);
+    bool counted = false;
+    for (auto& i : during.size_histogram) {
+      if (i.first == 256 * 256 * sizeof(float)) {
+        counted = i.second > 0;
+      }
+    }
+    EXPECT_TRUE(counted);
+  }
+  ms.WaitForAll();
+  auto after = dev->GetMemoryStats();
+  EXPECT_EQ(after.live_bytes, before.live_bytes);
+  EXPECT_GE(after.peak_bytes, before.live_bytes + 256 * 256 * sizeof(float));
+  dev->ResetPeakMemory();
+  EXPECT_EQ(dev->GetMemoryStats().peak_bytes, after.live_bytes);
+}
+
+static void TestDataNodes(uint64_t device) {
+  auto& ms = MinervaSystem::Instance();
+  ms.SetDevice(device);
+  auto a = NArray::Randn({3, 4}, 0, 1);
+  auto b = a * 2;
+  b.Wait();
+  bool found = false;
+  for (auto& n : ms.physical_dag().DataNodes()) {
+    if (n.size == Scale({3, 4}) && n.creator == "ArithmeticConstOp") {
+      EXPECT_EQ(n.device_id, device);
+      EXPECT_EQ(n.extern_rc, 1);
+      found = true;
+    }
+  }
+  EXPECT_TRUE(found);
+}
+
+TEST(Memory, CpuStats) {
+  TestMemoryStats(cpu_device);
+}
+
+TEST(Memory, CpuDataNodes) {
+  TestDataNodes(cpu_device);
+}
+
+#ifdef HAS_CUDA
+TEST(Memory, GpuStats) {
+  TestMemoryStats(gpu_device);
+}
+
+TEST(Memory, GpuDataNodes) {
+  TestDataNodes(gpu_device);
+}
+#endif
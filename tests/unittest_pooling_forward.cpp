@@ -3,8 +3,7 @@
 using namespace std;
 using namespace minerva;
 
-#ifdef HAS_CUDA
-TEST(PoolingForward, GpuWithoutPadding) {
+static void TestPoolingWithoutPadding(uint64_t device) {
   float input_raw[] = {1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16};
   float correct_raw[] = {11, 12, 15, 16};
   auto& ms = MinervaSystem::Instance();
@@ -12,7 +11,7 @@ TEST(PoolingForward, GpuWithoutPadding) {
   Scale correct_size{2, 2, 1, 1};
   shared_ptr<float> input_ptr(new float[input_size.Prod()], [](float* ptr) { delete[] ptr; });
   memcpy(input_ptr.get(), input_raw, input_size.Prod() * sizeof(float));
-  ms.SetDevice(gpu_device);
+  ms.SetDevice(device);
   ImageBatch input = NArray::MakeNArray(input_size, input_ptr);
   PoolingInfo pooling_info(PoolingInfo::Algorithm::kMax, 3, 3, 1, 1);
   ImageBatch output = Convolution::PoolingForward(input, pooling_info);
@@ -23,7 +22,7 @@ TEST(PoolingForward, GpuWithoutPadding) {
   }
 }
 
-TEST(PoolingForward, GpuWithExactPadding) {
+static void TestPoolingWithExactPadding(uint64_t device) {
   float input_raw[] = {1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16};
   float correct_raw[] = {6, 7, 8, 8, 10, 11, 12, 12, 14, 15, 16, 16, 14, 15, 16, 16};
   auto& ms = MinervaSystem::Instance();
@@ -31,7 +30,7 @@ TEST(PoolingForward, GpuWithExactPadding) {
   Scale correct_size{4, 4, 1, 1};
   shared_ptr<float> input_ptr(new float[input_size.Prod()], [](float* ptr) { delete[] ptr; });
   memcpy(input_ptr.get(), input_raw, input_size.Prod() * sizeof(float));
-  ms.SetDevice(gpu_device);
+  ms.SetDevice(device);
   ImageBatch input = NArray::MakeNArray(input_size, input_ptr);
   PoolingInfo pooling_info(PoolingInfo::Algorithm::kMax, 3, 3, 1, 1, 1, 1);
   ImageBatch output = Convolution::PoolingForward(input, pooling_info);
@@ -42,7 +41,7 @@ TEST(PoolingForward, GpuWithExactPadding) {
   }
 }
 
-TEST(PoolingForward, GpuWithInsufficientPadding) {
+static void TestPoolingWithInsufficientPadding(uint64_t device) {
   float input_raw[] = {1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16};
   float correct_raw[] = {6, 8, 8, 14, 16, 16, 14, 16, 16};
   auto& ms = MinervaSystem::Instance();
@@ -50,7 +49,7 @@ TEST(PoolingForward, GpuWithInsufficientPadding) {
   Scale correct_size{3, 3, 1, 1};
   shared_ptr<float> input_ptr(new float[input_size.Prod()], [](float* ptr) { delete[] ptr; });
   memcpy(input_ptr.get(), input_raw, input_size.Prod() * sizeof(float));
-  ms.SetDevice(gpu_device);
+  ms.SetDevice(device);
   ImageBatch input = NArray::MakeNArray(input_size, input_ptr);
   PoolingInfo pooling_info(PoolingInfo::Algorithm::kMax, 3, 3, 2, 2, 1, 1);
   ImageBatch output = Convolution::PoolingForward(input, pooling_info);
@@ -61,7 +60,7 @@ TEST(PoolingForward, GpuWithInsufficientPadding) {
   }
 }
 
-TEST(PoolingForward, GpuWithTooMuchPadding) {
+static void TestPoolingWithTooMuchPadding(uint64_t device) {
   float input_raw[] = {1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16};
   float correct_raw[] = {6, 8, 14, 16};
   auto& ms = MinervaSystem::Instance();
@@ -69,7 +68,7 @@ TEST(PoolingForward, GpuWithTooMuchPadding) {
   Scale correct_size{2, 2, 1, 1};
   shared_ptr<float> input_ptr(new float[input_size.Prod()], [](float* ptr) { delete[] ptr; });
   memcpy(input_ptr.get(), input_raw, input_size.Prod() * sizeof(float));
-  ms.SetDevice(gpu_device);
+  ms.SetDevice(device);
   ImageBatch input = NArray::MakeNArray(input_size, input_ptr);
   PoolingInfo pooling_info(PoolingInfo::Algorithm::kMax, 4, 4, 3, 3, 2, 2);
   ImageBatch output = Convolution::PoolingForward(input, pooling_info);
@@ -79,4 +78,37 @@ TEST(PoolingForward, GpuWithTooMuchPadding) {
     EXPECT_NEAR(output_ptr.get()[i], correct_raw[i], 0.001);
   }
 }
+
+TEST(PoolingForward, CpuWithoutPadding) {
+  TestPoolingWithoutPadding(cpu_device);
+}
+
+TEST(PoolingForward, CpuWithExactPadding) {
+  TestPoolingWithExactPadding(cpu_device);
+}
+
+TEST(PoolingForward, CpuWithInsufficientPadding) {
+  TestPoolingWithInsufficientPadding(cpu_device);
+}
+
+TEST(PoolingForward, CpuWithTooMuchPadding) {
+  TestPoolingWithTooMuchPadding(cpu_device);
+}
+
+#ifdef HAS_CUDA
+TEST(PoolingForward, GpuWithoutPadding) {
+  TestPoolingWithoutPadding(gpu_device);
+}
+
+TEST(PoolingForward, GpuWithExactPadding) {
+  TestPoolingWithExactPadding(gpu_device);
+}
+
+TEST(PoolingForward, GpuWithInsufficientPadding) {
+  TestPoolingWithInsufficientPadding(gpu_device);
+}
+
+TEST(PoolingForward, GpuWithTooMuchPadding) {
+  TestPoolingWithTooMuchPadding(gpu_device);
+}
 #endif
@@ -0,0 +1,80 @@
+#include "unittest_main.h"
+
+using namespace minerva;
+using namespace std;
+
+static void TestProfiler(uint64_t device) {
+  auto& ms = MinervaSystem::Instance();
+  ms.SetDevice(device);
+  auto& profiler = ms.profiler();
+  profiler.Reset();
+  profiler.Enable();
+  auto a = NArray::Randn({10, 20}, 0, 1);
+  auto b = NArray::Randn({20, 30}, 0, 1);
+  for (int i = 0; i < 5; ++i) {
+    (a * b).Wait();
+  }
+  profiler.Disable();
+  (a * b).Wait();
+  auto records = profiler.Report();
+  bool found = false;
+  for (auto& r : records) {
+    EXPECT_EQ(r.device_id, device);
+    EXPECT_LE(r.p50, r.p99);
+    EXPECT_LE(r.p99, r.max);
+    EXPECT_LE(r.max, r.total);
+    if (r.name == "*" && r.phase == ProfilePhase::kCompute) {
+      EXPECT_EQ(r.count, 5u);
+      EXPECT_DOUBLE_EQ(r.flops, 5 * 2.0 * 10 * 30 * 20);
+      EXPECT_DOUBLE_EQ(r.bytes, 5 * 4.0 * (10 * 20 + 20 * 30 + 10 * 30));
+      found = true;
+    }
+  }
+  EXPECT_TRUE(found);
+  profiler.Reset();
+  EXPECT_TRUE(profiler.Report().empty());
+}
+
+static void TestProfilerTags(uint64_t device) {
+  auto& ms = MinervaSystem::Instance();
+  ms.SetDevice(device);
+  auto& profiler = ms.profiler();
+  profiler.Reset();
+  profiler.Enable();
+  auto a = NArray::Randn({10, 20}, 0, 1);
+  auto b = NArray::Randn({20, 30}, 0, 1);
+  ms.SetOpTag("fc:forward");
+  auto c = a * b;
+  auto d = c + c;
+  ms.SetOpTag("");
+  (d * 2).Wait();
+  profiler.Disable();
+  auto records = profiler.TagReport();
+  ASSERT_EQ(records.size(), 1u);
+  auto& r = records[0];
+  EXPECT_EQ(r.tag, "fc:forward");
+  EXPECT_EQ(r.device_id, device);
+  EXPECT_EQ(r.count, 2u);
+  EXPECT_DOUBLE_EQ(r.flops, 2.0 * 10 * 30 * 20 + 10 * 30);
+  EXPECT_DOUBLE_EQ(r.output_bytes, 2 * 4.0 * 10 * 30);
+  profiler.Reset();
+  EXPECT_TRUE(profiler.TagReport().empty());
+}
+
+TEST(Profiler, Cpu) {
+  TestProfiler(cpu_device);
+}
+
+TEST(Profiler, CpuTags) {
+  TestProfilerTags(cpu_device);
+}
+
+#ifdef HAS_CUDA
+TEST(Profiler, Gpu) {
+  TestProfiler(gpu_device);
+}
+
+TEST(Profiler, GpuTags) {
+  TestProfilerTags(gpu_device);
+}
+#endif
@@ -0,0 +1,91 @@
+#include "unittest_main.h"
+#include <cmath>
+
+using namespace minerva;
+using namespace std;
+
+static void TestHalf(uint64_t device) {
+  MinervaSystem::Instance().SetDevice(device);
+  Scale size{5, 3};
+  auto a = NArray::Randn(size, 0, 5);
+  auto packed = Quantization::ToHalf(a);
+  ASSERT_EQ(packed.Size(), Scale({8}));
+  auto b = Quantization::FromHalf(packed, size);
+  ASSERT_EQ(b.Size(), size);
+  auto a_ptr = a.Get();
+  auto b_ptr = b.Get();
+  for (int i = 0; i < size.Prod(); ++i) {
+    EXPECT_NEAR(b_ptr.get()[i], a_ptr.get()[i], fabs(a_ptr.get()[i]) / 1024 + 1e-7);
+  }
+}
+
+static void TestInt8(uint64_t device) {
+  MinervaSystem::Instance().SetDevice(device);
+  Scale size{6, 3};
+  auto a = NArray::Randn(size, 0, 5);
+  auto quantized = Quantization::ToInt8(a);
+  ASSERT_EQ(quantized[0].Size(), Scale({5}));
+  ASSERT_EQ(quantized[1].Size(), Scale({3}));
+  auto b = Quantization::FromInt8(quantized[0], quantized[1], size);
+  auto a_ptr = a.Get();
+  auto b_ptr = b.Get();
+  auto scale_ptr = quantized[1].Get();
+  for (int j = 0; j < 3; ++j) {
+    float max_abs = 0;
+    for (int i = 0; i < 6; ++i) {
+      max_abs = max(max_abs, fabsf(a_ptr.get()[i + j * 6]));
+    }
+    EXPECT_FLOAT_EQ(scale_ptr.get()[j], max_abs / 127);
+    for (int i = 0; i < 6; ++i) {
+      EXPECT_NEAR(b_ptr.get()[i + j * 6], a_ptr.get()[i + j * 6], scale_ptr.get()[j] / 2 + 1e-5);
+    }
+  }
+}
+
+static void TestQuantizedTransMult(uint64_t device) {
+  MinervaSystem::Instance().SetDevice(device);
+  Scale size{4, 3};
+  auto a = NArray::Randn(size, 0, 5);
+  auto b = NArray::Randn({4, 5}, 0, 5);
+  auto packed = Quantization::ToHalf(a);
+  auto quantized = Quantization::ToInt8(a);
+  auto half_res = Quantization::HalfTransMult(packed, size, b);
+  auto int8_res = Quantization::Int8TransMult(quantized[0], quantized[1], size, b);
+  ASSERT_EQ(half_res.Size(), Scale({3, 5}));
+  ASSERT_EQ(int8_res.Size(), Scale({3, 5}));
+  // Both must equal the product with the dequantized operand
+  auto half_expected = Quantization::FromHalf(packed, size).TransMult(b).Get();
+  auto int8_expected = Quantization::FromInt8(quantized[0], quantized[1], size).TransMult(b).Get();
+  auto half_ptr = half_res.Get();
+  auto int8_ptr = int8_res.Get();
+  for (int i = 0; i < 15; ++i) {
+    EXPECT_NEAR(half_ptr.get()[i], half_expected.get()[i], 0.001);
+    EXPECT_NEAR(int8_ptr.get()[i], int8_expected.get()[i], 0.001);
+  }
+}
+
+TEST(Quantization, CpuHalf) {
+  TestHalf(cpu_device);
+}
+
+TEST(Quantization, CpuInt8) {
+  TestInt8(cpu_device);
+}
+
+TEST(Quantization, CpuQuantizedTransMult) {
+  TestQuantizedTransMult(cpu_device);
+}
+
+#ifdef HAS_CUDA
+TEST(Quantization, GpuHalf) {
+  TestHalf(gpu_device);
+}
+
+TEST(Quantization, GpuInt8) {
+  TestInt8(gpu_device);
+}
+
+TEST(Quantization, GpuQuantizedTransMult) {
+  TestQuantizedTransMult(gpu_device);
+}
+#endif
@@ -148,3 +148,40 @@ TEST(Reduction, GpuSumOnSecondDimension) {
   }
 }
 #endif
+
+static void TestTopKOnFirstDimension(uint64_t device) {
+  MinervaSystem::Instance().SetDevice(device);
+  Scale size{5, 3};
+  int k = 2;
+  shared_ptr<float> data(new float[size.Prod()], [](float* ptr) {
+    delete[] ptr;
+  });
+  // Each column is a permutation of 0..4
+  for (int i = 0; i < size[0]; ++i) {
+    for (int j = 0; j < size[1]; ++j) {
+      data.get()[j * size[0] + i] = (2 * i + 3 * j) % 5;
+    }
+  }
+  NArray na = NArray::MakeNArray(size, data);
+  auto topk = na.TopK(k, 0);
+  ASSERT_EQ(topk[0].Size(), Scale({k, 3}));
+  auto values = topk[0].Get();
+  auto indices = topk[1].Get();
+  for (int j = 0; j < size[1]; ++j) {
+    for (int t = 0; t < k; ++t) {
+      EXPECT_FLOAT_EQ(values.get()[j * k + t], 4 - t);
+      int index = indices.get()[j * k + t];
+      EXPECT_FLOAT_EQ(data.get()[j * size[0] + index], 4 - t);
+    }
+  }
+}
+
+TEST(Reduction, CpuTopKOnFirstDimension) {
+  TestTopKOnFirstDimension(cpu_device);
+}
+
+#ifdef HAS_CUDA
+TEST(Reduction, GpuTopKOnFirstDimension) {
+  TestTopKOnFirstDimension(gpu_device);
+}
+#endif
@@ -47,3 +47,36 @@ TEST(sgemm, CpuGpuCrossCheck) {
   }
 }
 #endif
+
+static void TestTransMult(uint64_t device) {
+  auto& ms = MinervaSystem::Instance();
+  ms.SetDevice(device);
+  Scale sizeA{4, 3};
+  Scale sizeB{4, 5};
+  auto a = NArray::Randn(sizeA, 0, 5);
+  auto b = NArray::Randn(sizeB, 0, 5);
+  auto c = a.TransMult(b);
+  ASSERT_EQ(c.Size(), Scale({3, 5}));
+  auto a_ptr = a.Get();
+  auto b_ptr = b.Get();
+  auto c_ptr = c.Get();
+  for (int i = 0; i < 3; ++i) {
+    for (int j = 0; j < 5; ++j) {
+      float sum = 0;
+      for (int k = 0; k < 4; ++k) {
+        sum += a_ptr.get()[k + i * 4] * b_ptr.get()[k + j * 4];
+      }
+      EXPECT_NEAR(c_ptr.get()[i + j * 3], sum, 0.001);
+    }
+  }
+}
+
+TEST(sgemm, CpuTransMult) {
+  TestTransMult(cpu_device);
+}
+
+#ifdef HAS_CUDA
+TEST(sgemm, GpuTransMult) {
+  TestTransMult(gpu_device);
+}
+#endif
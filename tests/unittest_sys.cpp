@@ -1,6 +1,6 @@
-#include <minerva.h>
-#include <gtest/gtest.h>
+#include "unittest_main.h"
 #include <memory>
+#include <thread>
 
 using namespace std;
 using namespace minerva;
@@ -63,3 +63,58 @@ TEST(WaitFinishTest, OnlyWait) {
   MinervaSystem::Instance().backend().WaitForAll();
 }
 
+
+TEST(WaitFinishTest, ConcurrentWait) {
+  MinervaSystem::Instance().SetDevice(cpu_device);
+  vector<float> sums(4);
+  vector<thread> threads;
+  for (int t = 0; t < 4; ++t) {
+    threads.emplace_back([&sums, t] {
+      NArray a = NArray::Constant({20, 30}, t);
+      NArray b = NArray::Constant({30, 10}, 1);
+      sums[t] = (a * b).Sum({0, 1}).Get().get()[0];
+    });
+  }
+  MinervaSystem::Instance().backend().WaitForAll();
+  for (auto& t : threads) {
+    t.join();
+  }
+  for (int t = 0; t < 4; ++t) {
+    EXPECT_FLOAT_EQ(sums[t], 20 * 30 * 10 * t);
+  }
+}
+
+TEST(ThreadDeviceTest, ConcurrentEval) {
+  auto& ms = MinervaSystem::Instance();
+  ms.SetDevice(cpu_device);
+  vector<float> sums(4);
+  vector<thread> threads;
+  for (int t = 0; t < 4; ++t) {
+    threads.emplace_back([&ms, &sums, t] {
+      ms.SetThreadDevice(cpu_device);
+      NArray a = NArray::Constant({20, 30}, t);
+      NArray b = NArray::Constant({30, 10}, 1);
+      sums[t] = (a * b).Sum({0, 1}).Get().get()[0];
+      ms.SetThreadDevice(MinervaSystem::kNoDevice);
+    });
+  }
+  for (auto& t : threads) {
+    t.join();
+  }
+  for (int t = 0; t < 4; ++t) {
+    EXPECT_FLOAT_EQ(sums[t], 20 * 30 * 10 * t);
+  }
+}
+
+#ifdef HAS_CUDA
+TEST(ThreadDeviceTest, OtherThreadsKeepDevice) {
+  auto& ms = MinervaSystem::Instance();
+  ms.SetDevice(cpu_device);
+  thread th([&ms] {
+    ms.SetThreadDevice(gpu_device);
+    EXPECT_EQ(ms.current_device_id(), gpu_device);
+  });
+  th.join();
+  EXPECT_EQ(ms.current_device_id(), cpu_device);
+}
+#endif
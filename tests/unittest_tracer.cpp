@@ -0,0 +1,68 @@
+#include "unittest_main.h"
+#include <sstream>
+
+using namespace minerva;
+using namespace std;
+
+static void TestTracer(uint64_t device) {
+  auto& ms = MinervaSystem::Instance();
+  ms.SetDevice(device);
+  auto& tracer = ms.tracer();
+  tracer.Enable(1024);
+  auto a = NArray::Randn({10, 20}, 0, 1);
+  auto b = NArray::Randn({20, 30}, 0, 1);
+  (a * b).Wait();
+  tracer.Disable();
+  (a * b).Wait();
+  ostringstream os;
+  tracer.ExportChromeTrace(os);
+  auto trace = os.str();
+  EXPECT_EQ(trace.find("{\"displayTimeUnit\":\"ms\",\"traceEvents\":["), 0u);
+  EXPECT_NE(trace.find("\"name\":\"*\",\"cat\":\"enqueue\""), string::npos);
+  EXPECT_NE(trace.find("\"name\":\"*\",\"cat\":\"dispatch\""), string::npos);
+  EXPECT_NE(trace.find("\"name\":\"*\",\"cat\":\"compute\",\"ph\":\"X\""), string::npos);
+  tracer.Clear();
+  ostringstream cleared;
+  tracer.ExportChromeTrace(cleared);
+  EXPECT_EQ(cleared.str().find("\"cat\""), string::npos);
+}
+
+static void TestTracerRing(uint64_t device) {
+  auto& ms = MinervaSystem::Instance();
+  ms.SetDevice(device);
+  auto& tracer = ms.tracer();
+  tracer.Enable(16);
+  auto a = NArray::Constant({10, 10}, 0);
+  for (int i = 0; i < 100; ++i) {
+    a += 1;
+  }
+  a.Wait();
+  tracer.Disable();
+  ostringstream os;
+  tracer.ExportChromeTrace(os);
+  auto trace = os.str();
+  size_t events = 0;
+  for (auto pos = trace.find("\"cat\""); pos != string::npos; pos = trace.find("\"cat\"", pos + 1)) {
+    ++events;
+  }
+  EXPECT_GT(events, 0u);
+  EXPECT_LE(events, 16u);
+}
+
+TEST(Tracer, Cpu) {
+  TestTracer(cpu_device);
+}
+
+TEST(Tracer, CpuRing) {
+  TestTracerRing(cpu_device);
+}
+
+#ifdef HAS_CUDA
+TEST(Tracer, Gpu) {
+  TestTracer(gpu_device);
+}
+
+TEST(Tracer, GpuRing) {
+  TestTracerRing(gpu_device);
+}
+#endif
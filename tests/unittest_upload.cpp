@@ -0,0 +1,34 @@
+#include "unittest_main.h"
+
+using namespace minerva;
+using namespace std;
+
+static void TestUpload(uint64_t device) {
+  MinervaSystem::Instance().SetDevice(device);
+  Scale size{5, 3};
+  StagingBufferRing ring(2, size.Prod());
+  for (int iter = 0; iter < 4; ++iter) {
+    // Only two buffers, so this would block forever if buffers were not recycled
+    auto buf = ring.Acquire();
+    for (int i = 0; i < size.Prod(); ++i) {
+      buf.get()[i] = iter * 100 + i;
+    }
+    NArray na = NArray::Upload(size, buf);
+    buf.reset();
+    auto res = na.Get();
+    auto res_ptr = res.get();
+    for (int i = 0; i < size.Prod(); ++i) {
+      EXPECT_FLOAT_EQ(res_ptr[i], iter * 100 + i);
+    }
+  }
+}
+
+TEST(Upload, CpuUpload) {
+  TestUpload(cpu_device);
+}
+
+#ifdef HAS_CUDA
+TEST(Upload, GpuUpload) {
+  TestUpload(gpu_device);
+}
+#endif